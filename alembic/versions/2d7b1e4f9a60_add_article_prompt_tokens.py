@@ -0,0 +1,30 @@
+"""Add article prompt token count
+
+Revision ID: 2d7b1e4f9a60
+Revises: 5c0e6a93f1d2
+Create Date: 2026-10-19 15:20:37.518204
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '2d7b1e4f9a60'
+down_revision: Union[str, None] = '5c0e6a93f1d2'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    with op.batch_alter_table('news_articles') as batch_op:
+        batch_op.add_column(sa.Column('prompt_tokens', sa.Integer(), nullable=True))
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    with op.batch_alter_table('news_articles') as batch_op:
+        batch_op.drop_column('prompt_tokens')
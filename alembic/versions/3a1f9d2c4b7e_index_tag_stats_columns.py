@@ -0,0 +1,30 @@
+"""Index tag stats columns
+
+Revision ID: 3a1f9d2c4b7e
+Revises: c7dfa2432938
+Create Date: 2026-10-19 09:12:41.204117
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '3a1f9d2c4b7e'
+down_revision: Union[str, None] = 'c7dfa2432938'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_index(op.f('ix_tags_article_count'), 'tags', ['article_count'], unique=False)
+    op.create_index(op.f('ix_tags_popularity_score'), 'tags', ['popularity_score'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index(op.f('ix_tags_popularity_score'), table_name='tags')
+    op.drop_index(op.f('ix_tags_article_count'), table_name='tags')
@@ -0,0 +1,32 @@
+"""Add article llm_degraded flag
+
+Revision ID: 4f8a2c6d9e13
+Revises: 9b3e5d71c2a8
+Create Date: 2026-10-19 19:36:14.502817
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '4f8a2c6d9e13'
+down_revision: Union[str, None] = '9b3e5d71c2a8'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    with op.batch_alter_table('news_articles') as batch_op:
+        batch_op.add_column(sa.Column('llm_degraded', sa.Boolean(), nullable=True))
+        batch_op.create_index(batch_op.f('ix_news_articles_llm_degraded'), ['llm_degraded'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    with op.batch_alter_table('news_articles') as batch_op:
+        batch_op.drop_index(batch_op.f('ix_news_articles_llm_degraded'))
+        batch_op.drop_column('llm_degraded')
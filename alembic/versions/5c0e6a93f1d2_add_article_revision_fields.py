@@ -0,0 +1,34 @@
+"""Add article revision fields
+
+Revision ID: 5c0e6a93f1d2
+Revises: 8e42b7c1d905
+Create Date: 2026-10-19 10:41:52.093318
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '5c0e6a93f1d2'
+down_revision: Union[str, None] = '8e42b7c1d905'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    with op.batch_alter_table('news_articles') as batch_op:
+        batch_op.add_column(sa.Column('content_fingerprint', sa.String(length=16), nullable=True))
+        batch_op.add_column(sa.Column('revision', sa.Integer(), nullable=True))
+        batch_op.add_column(sa.Column('pending_llm_steps', sa.Text(), nullable=True))
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    with op.batch_alter_table('news_articles') as batch_op:
+        batch_op.drop_column('pending_llm_steps')
+        batch_op.drop_column('revision')
+        batch_op.drop_column('content_fingerprint')
@@ -0,0 +1,30 @@
+"""Add article llm_step_attempts
+
+Revision ID: 6d2b9f4e1a37
+Revises: 4f8a2c6d9e13
+Create Date: 2026-10-19 21:12:40.318562
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '6d2b9f4e1a37'
+down_revision: Union[str, None] = '4f8a2c6d9e13'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    with op.batch_alter_table('news_articles') as batch_op:
+        batch_op.add_column(sa.Column('llm_step_attempts', sa.Integer(), nullable=True))
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    with op.batch_alter_table('news_articles') as batch_op:
+        batch_op.drop_column('llm_step_attempts')
@@ -0,0 +1,39 @@
+"""Add archived article index
+
+Revision ID: 8e42b7c1d905
+Revises: 3a1f9d2c4b7e
+Create Date: 2026-10-19 10:03:17.512934
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '8e42b7c1d905'
+down_revision: Union[str, None] = '3a1f9d2c4b7e'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table('archived_article_index',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('url', sa.Text(), nullable=False),
+    sa.Column('archive_key', sa.String(length=7), nullable=False),
+    sa.Column('published_at', sa.DateTime(), nullable=True),
+    sa.Column('archived_at', sa.DateTime(), nullable=True),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index(op.f('ix_archived_article_index_archive_key'), 'archived_article_index', ['archive_key'], unique=False)
+    op.create_index(op.f('ix_archived_article_index_url'), 'archived_article_index', ['url'], unique=True)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index(op.f('ix_archived_article_index_url'), table_name='archived_article_index')
+    op.drop_index(op.f('ix_archived_article_index_archive_key'), table_name='archived_article_index')
+    op.drop_table('archived_article_index')
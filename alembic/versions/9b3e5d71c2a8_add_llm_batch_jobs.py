@@ -0,0 +1,49 @@
+"""Add LLM batch jobs
+
+Revision ID: 9b3e5d71c2a8
+Revises: 2d7b1e4f9a60
+Create Date: 2026-10-19 18:42:05.731260
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '9b3e5d71c2a8'
+down_revision: Union[str, None] = '2d7b1e4f9a60'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table('llm_batch_jobs',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('provider', sa.String(length=20), nullable=False),
+    sa.Column('remote_id', sa.String(length=100), nullable=False, comment='提供商返回的批次 ID'),
+    sa.Column('input_file_id', sa.String(length=100), nullable=True),
+    sa.Column('output_file_id', sa.String(length=100), nullable=True),
+    sa.Column('error_file_id', sa.String(length=100), nullable=True),
+    sa.Column('status', sa.String(length=20), nullable=False),
+    sa.Column('article_ids', sa.Text(), nullable=False, comment='本批包含的文章 ID（JSON 数组）'),
+    sa.Column('request_count', sa.Integer(), nullable=True),
+    sa.Column('completed_count', sa.Integer(), nullable=True),
+    sa.Column('failed_count', sa.Integer(), nullable=True),
+    sa.Column('applied_count', sa.Integer(), nullable=True, comment='成功写回的文章数'),
+    sa.Column('error', sa.Text(), nullable=True),
+    sa.Column('created_at', sa.DateTime(), nullable=True),
+    sa.Column('updated_at', sa.DateTime(), nullable=True),
+    sa.Column('finished_at', sa.DateTime(), nullable=True, comment='结果写回时间，为空表示批次尚未处理完'),
+    sa.PrimaryKeyConstraint('id'),
+    sa.UniqueConstraint('remote_id')
+    )
+    op.create_index(op.f('ix_llm_batch_jobs_finished_at'), 'llm_batch_jobs', ['finished_at'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index(op.f('ix_llm_batch_jobs_finished_at'), table_name='llm_batch_jobs')
+    op.drop_table('llm_batch_jobs')
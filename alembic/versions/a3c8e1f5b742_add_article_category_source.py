@@ -0,0 +1,30 @@
+"""Add article category_source
+
+Revision ID: a3c8e1f5b742
+Revises: 6d2b9f4e1a37
+Create Date: 2026-10-19 21:48:05.906214
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'a3c8e1f5b742'
+down_revision: Union[str, None] = '6d2b9f4e1a37'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    with op.batch_alter_table('news_articles') as batch_op:
+        batch_op.add_column(sa.Column('category_source', sa.String(length=20), nullable=True))
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    with op.batch_alter_table('news_articles') as batch_op:
+        batch_op.drop_column('category_source')
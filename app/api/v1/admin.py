@@ -13,8 +13,17 @@ from app.core.tasks import (
     resume_background_processing,
     get_background_processing_status
 )
+from sqlalchemy.orm import Session
 from app.core.llm_factory import get_llm_manager
+from app.models.database import get_db
+from app.services.archive_service import ArchiveService
+from app.services.category_classifier import category_classifier
+from app.services.step_planner import step_planner
+from app.services.llm_batch import LLMBatchService
 from app.services.llm_interface import LLMProvider
+from app.services.llm_http import http_clients
+from app.services.llm_retry import retry_metrics
+from app.services.llm_streaming import stream_metrics
 import logging
 
 logger = logging.getLogger(__name__)
@@ -179,13 +188,40 @@ async def get_delay_options():
     }
 
 
+# 文章归档相关接口
+@router.get("/archive/stats")
+async def get_archive_stats(db: Session = Depends(get_db)):
+    """获取热表与归档库统计"""
+    try:
+        return ArchiveService(db).get_archive_stats()
+    except Exception as e:
+        logger.error(f"获取归档统计失败: {e}")
+        raise HTTPException(status_code=500, detail=f"获取归档统计失败: {str(e)}")
+
+
+@router.post("/archive/run")
+async def run_archive(
+    compact: bool = Query(True, description="归档后是否执行 VACUUM"),
+    db: Session = Depends(get_db)
+):
+    """手动执行一次归档"""
+    try:
+        service = ArchiveService(db)
+        result = service.archive_articles()
+        result["compacted"] = service.compact() if compact and result["archived"] else False
+        return {"message": "归档完成", "result": result}
+    except Exception as e:
+        logger.error(f"执行归档失败: {e}")
+        raise HTTPException(status_code=500, detail=f"执行归档失败: {str(e)}")
+
+
 # LLM 管理相关接口
 @router.get("/llm/health")
-async def get_llm_health():
-    """获取 LLM 服务健康状态（管理后台）"""
+async def get_llm_health(refresh: bool = Query(False, description="立即重新探测，不使用缓存结果")):
+    """获取 LLM 服务健康状态及熔断状态（管理后台）"""
     try:
         llm_mgr = get_llm_manager()
-        health_results = await llm_mgr.health_check_all()
+        health_results = await llm_mgr.health_check_all(max_age=0 if refresh else None)
 
         return {
             "providers": health_results,
@@ -197,6 +233,154 @@ async def get_llm_health():
         raise HTTPException(status_code=500, detail=f"获取 LLM 健康状态失败: {str(e)}")
 
 
+@router.get("/llm/cache")
+async def get_llm_cache_stats():
+    """获取 LLM 响应缓存命中统计"""
+    llm_mgr = get_llm_manager()
+    if llm_mgr.cache is None:
+        return {"enabled": False}
+    try:
+        return {"enabled": True, **llm_mgr.cache.get_stats()}
+    except Exception as e:
+        logger.error(f"获取 LLM 缓存统计失败: {e}")
+        raise HTTPException(status_code=500, detail=f"获取 LLM 缓存统计失败: {str(e)}")
+
+
+@router.delete("/llm/cache")
+async def clear_llm_cache():
+    """清空 LLM 响应缓存"""
+    llm_mgr = get_llm_manager()
+    if llm_mgr.cache is None:
+        return {"message": "LLM 响应缓存未启用"}
+    try:
+        llm_mgr.cache.clear()
+        return {"message": "LLM 响应缓存已清空"}
+    except Exception as e:
+        logger.error(f"清空 LLM 缓存失败: {e}")
+        raise HTTPException(status_code=500, detail=f"清空 LLM 缓存失败: {str(e)}")
+
+
+@router.get("/llm/routing")
+async def get_llm_routing_stats():
+    """获取 LLM 路由决策统计及各提供商延迟分位数"""
+    try:
+        return get_llm_manager().get_routing_stats()
+    except Exception as e:
+        logger.error(f"获取 LLM 路由统计失败: {e}")
+        raise HTTPException(status_code=500, detail=f"获取 LLM 路由统计失败: {str(e)}")
+
+
+@router.get("/llm/throughput")
+async def get_llm_throughput_stats():
+    """获取各提供商流式生成的吞吐（tokens/s）、首 token 延迟及停止原因"""
+    try:
+        return stream_metrics.get_stats()
+    except Exception as e:
+        logger.error(f"获取 LLM 吞吐统计失败: {e}")
+        raise HTTPException(status_code=500, detail=f"获取 LLM 吞吐统计失败: {str(e)}")
+
+
+@router.get("/llm/connections")
+async def get_llm_connection_stats():
+    """获取各提供商的 HTTP 请求数、新建连接数及连接复用率"""
+    try:
+        return http_clients.get_stats()
+    except Exception as e:
+        logger.error(f"获取 LLM 连接统计失败: {e}")
+        raise HTTPException(status_code=500, detail=f"获取 LLM 连接统计失败: {str(e)}")
+
+
+@router.get("/llm/rate-limits")
+async def get_llm_rate_limit_stats():
+    """获取各提供商的重试次数及 RPM/TPM 限速状态"""
+    try:
+        return {
+            "retries": retry_metrics.get_stats(),
+            "limiters": get_llm_manager().get_rate_limiter_stats(),
+        }
+    except Exception as e:
+        logger.error(f"获取 LLM 限速统计失败: {e}")
+        raise HTTPException(status_code=500, detail=f"获取 LLM 限速统计失败: {str(e)}")
+
+
+@router.get("/llm/concurrency")
+async def get_llm_concurrency_stats():
+    """获取各提供商及 Ollama 端点当前的自适应并发上限、进行中和排队的请求数"""
+    try:
+        return get_llm_manager().get_concurrency_stats()
+    except Exception as e:
+        logger.error(f"获取 LLM 并发统计失败: {e}")
+        raise HTTPException(status_code=500, detail=f"获取 LLM 并发统计失败: {str(e)}")
+
+
+@router.get("/llm/cascade")
+async def get_llm_cascade_stats():
+    """获取模型级联配置及各方法的小模型调用次数与升级率"""
+    try:
+        return get_llm_manager().get_cascade_stats()
+    except Exception as e:
+        logger.error(f"获取模型级联统计失败: {e}")
+        raise HTTPException(status_code=500, detail=f"获取模型级联统计失败: {str(e)}")
+
+
+@router.get("/llm/batches")
+async def get_llm_batches(
+    limit: int = Query(20, ge=1, le=100, description="返回最近结束的批次数"),
+    db: Session = Depends(get_db)
+):
+    """获取未完成及最近结束的 Batch API 批次"""
+    try:
+        return LLMBatchService(db).get_batches(limit)
+    except Exception as e:
+        logger.error(f"获取 LLM 批次失败: {e}")
+        raise HTTPException(status_code=500, detail=f"获取 LLM 批次失败: {str(e)}")
+
+
+@router.post("/llm/batches")
+async def submit_llm_batch(
+    limit: int = Query(None, ge=1, le=50000, description="本批最多提交的文章数，默认 LLM_BATCH_API_MAX_REQUESTS"),
+    db: Session = Depends(get_db)
+):
+    """手动把待处理文章提交为一个 Batch API 批次（不检查积压阈值）"""
+    try:
+        return await LLMBatchService(db).submit_pending(limit)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        logger.error(f"提交 LLM 批次失败: {e}")
+        raise HTTPException(status_code=500, detail=f"提交 LLM 批次失败: {str(e)}")
+
+
+@router.post("/llm/batches/poll")
+async def poll_llm_batches(db: Session = Depends(get_db)):
+    """立即刷新未完成批次的状态，已结束的批次写回结果"""
+    try:
+        return await LLMBatchService(db).poll()
+    except Exception as e:
+        logger.error(f"刷新 LLM 批次失败: {e}")
+        raise HTTPException(status_code=500, detail=f"刷新 LLM 批次失败: {str(e)}")
+
+
+@router.get("/llm/classifier")
+async def get_category_classifier_stats():
+    """获取本地分类模型信息及交由 LLM 分类的比例"""
+    try:
+        return category_classifier.get_stats()
+    except Exception as e:
+        logger.error(f"获取分类器统计失败: {e}")
+        raise HTTPException(status_code=500, detail=f"获取分类器统计失败: {str(e)}")
+
+
+@router.get("/llm/planner")
+async def get_step_planner_stats():
+    """获取各处理步骤交给 LLM、本地完成和跳过的次数及原因"""
+    try:
+        return step_planner.get_stats()
+    except Exception as e:
+        logger.error(f"获取步骤规划统计失败: {e}")
+        raise HTTPException(status_code=500, detail=f"获取步骤规划统计失败: {str(e)}")
+
+
 @router.post("/llm/switch-provider")
 async def switch_llm_provider(provider: str = Query(..., description="LLM 提供商")):
     """切换 LLM 提供商（管理后台）"""
@@ -6,7 +6,7 @@ from fastapi import APIRouter, Depends, HTTPException, Query
 from sqlalchemy.orm import Session
 from app.models.database import get_db
 from app.services.article_service import ArticleService
-from app.schemas.article import Article, ArticleListResponse
+from app.schemas.article import Article, ArticleListItem, ArticleListResponse, ArticleUpdate
 from app.schemas.common import PaginationParams
 
 router = APIRouter(prefix="/articles", tags=["articles"])
@@ -43,7 +43,7 @@ async def get_articles(
         total=total,
         page=page,
         size=size,
-        articles=[Article.model_validate(article) for article in articles]
+        articles=[ArticleListItem.model_validate(article) for article in articles]
     )
 
 
@@ -56,6 +56,27 @@ async def get_article(
     article_service = ArticleService(db)
     article = article_service.get_article(article_id)
     
+    if not article:
+        # 已移出热表的文章从归档库读取
+        from app.services.archive_service import ArchiveService
+        archived = ArchiveService(db).get_archived_article(article_id)
+        if archived:
+            return Article.model_validate(archived)
+        raise HTTPException(status_code=404, detail="Article not found")
+    
+    return Article.model_validate(article)
+
+
+@router.put("/{article_id}", response_model=Article)
+async def update_article(
+    article_id: int,
+    article_update: ArticleUpdate,
+    db: Session = Depends(get_db)
+):
+    """更新新闻文章（修改分类即人工修正，用于训练本地分类器）"""
+    article_service = ArticleService(db)
+    article = article_service.update_article(article_id, article_update)
+    
     if not article:
         raise HTTPException(status_code=404, detail="Article not found")
     
@@ -76,12 +76,12 @@ async def get_category_articles(
     
     total = article_service.get_articles_count(category=category.name)
     
-    from app.schemas.article import Article
+    from app.schemas.article import ArticleListItem
     return ArticleListResponse(
         total=total,
         page=page,
         size=size,
-        articles=[Article.model_validate(article) for article in articles]
+        articles=[ArticleListItem.model_validate(article) for article in articles]
     )
 
 
@@ -2,14 +2,16 @@
 搜索 API 路由
 """
 import time
+from datetime import datetime
 from typing import List
 from fastapi import APIRouter, Depends, HTTPException, Query
-from sqlalchemy.orm import Session
+from sqlalchemy.orm import Session, selectinload
 from sqlalchemy import or_, and_
 from app.models.database import get_db
 from app.models.article import NewsArticle
+from app.models.tag import ArticleTag
 from app.schemas.search import SearchQuery, SearchResponse
-from app.schemas.article import Article
+from app.schemas.article import ArticleListItem
 
 router = APIRouter(prefix="/search", tags=["search"])
 
@@ -21,6 +23,7 @@ async def search_articles(
     page: int = Query(1, ge=1, description="页码"),
     size: int = Query(20, ge=1, le=100, description="每页数量"),
     sort: str = Query("published_at", description="排序方式"),
+    include_archive: bool = Query(False, description="是否同时搜索归档文章"),
     db: Session = Depends(get_db)
 ):
     """搜索新闻文章"""
@@ -53,7 +56,29 @@ async def search_articles(
     
     # 分页
     skip = (page - 1) * size
-    articles = query.offset(skip).limit(size).all()
+    query = query.options(selectinload(NewsArticle.article_tags).joinedload(ArticleTag.tag))
+    
+    if include_archive:
+        # 热表与归档各取前 skip + size 条，按排序字段合并后再分页
+        from app.services.archive_service import ArchiveService
+        sort_field = "fetched_at" if sort == "fetched_at" else "published_at"
+        if sort not in ("published_at", "fetched_at"):
+            query = query.order_by(NewsArticle.published_at.desc())
+        hot = [ArticleListItem.model_validate(article) for article in query.limit(skip + size).all()]
+        archive_total, archived = ArchiveService(db).search_archive(
+            q,
+            category=category,
+            skip=0,
+            limit=skip + size,
+            sort=sort_field
+        )
+        total += archive_total
+        merged = hot + [ArticleListItem.model_validate(article) for article in archived]
+        merged.sort(key=lambda item: getattr(item, sort_field) or datetime.min, reverse=True)
+        results = merged[skip:skip + size]
+    else:
+        articles = query.offset(skip).limit(size).all()
+        results = [ArticleListItem.model_validate(article) for article in articles]
     
     # 计算搜索耗时
     took = time.time() - start_time
@@ -63,6 +88,6 @@ async def search_articles(
         total=total,
         page=page,
         size=size,
-        articles=[Article.model_validate(article) for article in articles],
+        articles=results,
         took=took
     )
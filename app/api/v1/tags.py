@@ -1,4 +1,4 @@
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Query, status
 from typing import List
 from sqlalchemy.orm import Session
 from app.models.database import get_db
@@ -9,6 +9,19 @@ from app.schemas.tag import TagResponse
 
 router = APIRouter(prefix="/tags", tags=["tags"])
 
+@router.get("/", response_model=List[TagResponse])
+async def list_tags(
+    sort: str = Query("popular", pattern="^(popular|count|name)$", description="排序方式: popular, count, name"),
+    limit: int = Query(50, ge=1, le=200, description="返回数量"),
+    skip: int = Query(0, ge=0, description="跳过数量"),
+    db: Session = Depends(get_db)
+):
+    """
+    List tags sorted by the incrementally maintained counters.
+    """
+    tag_service = TagService(db)
+    return tag_service.get_tags(sort=sort, limit=limit, skip=skip)
+
 @router.post("/{tag_id}/follow", status_code=status.HTTP_200_OK)
 async def follow_tag(
     tag_id: int,
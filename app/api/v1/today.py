@@ -1,9 +1,10 @@
 """
 今日功能 API 路由
 """
+import json
 from fastapi import APIRouter, Depends, Query, HTTPException
 from typing import List, Optional
-from sqlalchemy.orm import Session
+from sqlalchemy.orm import Session, undefer
 from app.models.database import get_db
 from app.schemas.today import (
     TodayArticleListResponse,
@@ -15,7 +16,7 @@ from app.services.content_processor import ContentProcessorService
 from app.services.llm_manager import LLMServiceManager
 from app.services.llm_config import LLMConfig, OllamaConfig
 from app.services.llm_interface import LLMProvider
-from app.models.article import NewsArticle
+from app.models.article import NewsArticle, LLMProcessingStatus
 from app.core.llm_factory import get_llm_manager
 from app.core.deps import get_current_user_optional
 from app.models.user import User
@@ -114,9 +115,10 @@ async def process_today_articles(
         today_start = datetime.now().replace(hour=0, minute=0, second=0, microsecond=0)
         unprocessed_articles = (
             db.query(NewsArticle)
+            .options(undefer(NewsArticle.content))
             .filter(NewsArticle.fetched_at >= today_start)
             .filter(
-                (NewsArticle.llm_processing_status == "PENDING") |
+                (NewsArticle.llm_processing_status == LLMProcessingStatus.PENDING) |
                 (NewsArticle.llm_processing_status == None)
             )
             .limit(10)  # 限制每次处理10篇，避免超时
@@ -125,54 +127,25 @@ async def process_today_articles(
         
         logger.info(f"找到 {len(unprocessed_articles)} 篇待处理文章")
         
-        # 第3步: 使用LLM处理文章
-        processed_count = 0
-        failed_count = 0
+        # 第3步: 使用LLM处理文章（与后台任务相同的写回、并发和小批量提交）
+        counts = await content_processor.process_and_save(db, unprocessed_articles)
+        processed_count = counts["processed_count"]
+        failed_count = counts["failed_count"]
         
+        # 第4步: 把 LLM 提取的关键词关联为标签（订阅源标签已在入库时关联）
+        from app.services.tag_service import TagService
+        tag_service = TagService(db)
         for article in unprocessed_articles:
+            if article.llm_processing_status != LLMProcessingStatus.COMPLETED or \
+                    not (article.tags or "").startswith("["):
+                continue
             try:
-                logger.info(f"处理文章: {article.title[:50]}...")
-                article.llm_processing_status = "PROCESSING"
-                db.commit()
-                
-                # 调用LLM处理
-                result = await content_processor.process_article_content(article)
-                
-                # 更新文章数据
-                article.chinese_title = result.get("chinese_title")
-                article.llm_summary = result.get("llm_summary")
-                article.original_language = result.get("original_language")
-                article.category = result.get("category")
-                article.llm_processed_at = result.get("llm_processed_at")
-                article.llm_processing_status = result.get("llm_processing_status")
-                article.is_processed = (result.get("llm_processing_status") == "COMPLETED")
-                
-                # 更新关键词
-                keywords = result.get("keywords", [])
-                
-                # 获取原有标签 (Source tags)
-                combined_tags = []
-                if article.tags:
-                    combined_tags.extend([t for t in article.tags.split(',') if t.strip()])
-                
-                if keywords and isinstance(keywords, list):
-                    combined_tags.extend(keywords)
-                
-                if combined_tags:
-                    # 使用 TagService 处理标签关联
-                    from app.services.tag_service import TagService
-                    tag_service = TagService(db)
-                    tag_service.link_tags_to_article(article, combined_tags)
-                
-                db.commit()
-                processed_count += 1
-                logger.info(f"文章处理成功: {article.title[:50]}")
-                
-            except Exception as e:
-                logger.error(f"处理文章失败: {article.title[:50]}, 错误: {e}")
-                article.llm_processing_status = "FAILED"
-                db.commit()
-                failed_count += 1
+                keywords = json.loads(article.tags)
+            except ValueError:
+                continue
+            if keywords:
+                tag_service.link_tags_to_article(article, keywords)
+        db.commit()
         
         # 返回处理结果
         return {
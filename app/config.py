@@ -27,33 +27,113 @@ class Settings(BaseSettings):
     OLLAMA_BASE_URL: str
     OLLAMA_MODEL: str = "qwen3:latest"
     OLLAMA_TIMEOUT: int = 60
+    OLLAMA_MAX_CONCURRENCY: int = 2  # 同时发往 Ollama 的请求上限（自适应并发的初始值）
+    OLLAMA_CONCURRENCY_CEILING: int = 4  # 每个端点自适应并发可增长到的上限，0 表示固定为 OLLAMA_MAX_CONCURRENCY
+    OLLAMA_ENDPOINTS: str = ""  # 多台 Ollama 服务，逗号分隔，每项为 URL 或 URL=并发上限；为空时只使用 OLLAMA_BASE_URL
+    OLLAMA_MAX_INPUT_TOKENS: int = 1500  # 正文 token 上限，超出时分块摘要或截断
+    OLLAMA_KEEP_ALIVE: str = "30m"  # 模型在最后一次请求后常驻内存的时长（Ollama keep_alive）
+    OLLAMA_NUM_CTX: int = 0  # 上下文窗口，0 表示使用服务端默认；调大时可相应调高 OLLAMA_MAX_INPUT_TOKENS
+    OLLAMA_NUM_PREDICT: int = 0  # 单次生成 token 上限，0 表示不限制
+    OLLAMA_NUM_THREAD: int = 0  # 推理线程数，0 表示由服务端决定
+    OLLAMA_WARMUP_ENABLED: bool = True  # 后台处理启动时预加载模型，积压期间定期保温
+    OLLAMA_KEEP_WARM_INTERVAL: int = 240  # 有待处理文章时的保温间隔（秒）
+    OLLAMA_METHOD_MODELS: str = ""  # 按方法指定模型，逗号分隔的 方法名=模型，未列出的方法使用 OLLAMA_MODEL
+    OLLAMA_CASCADE_MODEL: str = ""  # LLM_CASCADE_METHODS 先尝试的小模型，为空表示不级联
     
     # OpenAI配置
     OPENAI_API_KEY: str = ""
     OPENAI_MODEL: str = "gpt-3.5-turbo"
     OPENAI_BASE_URL: str = "https://api.openai.com/v1"
+    OPENAI_MAX_CONCURRENCY: int = 16
+    OPENAI_CONCURRENCY_CEILING: int = 48
+    OPENAI_MAX_INPUT_TOKENS: int = 3000
+    OPENAI_REQUESTS_PER_MINUTE: int = 0  # 每分钟请求数上限，0 表示不限制
+    OPENAI_TOKENS_PER_MINUTE: int = 0  # 每分钟 token 数上限，0 表示不限制
+    OPENAI_METHOD_MODELS: str = ""  # 按方法指定模型，格式同 OLLAMA_METHOD_MODELS
+    OPENAI_CASCADE_MODEL: str = ""  # 级联方法先尝试的小模型，为空表示不级联
     
     # 火山引擎配置
     HUOSHAN_API_KEY: str = ""
     HUOSHAN_SECRET_KEY: str = ""
     HUOSHAN_MODEL: str = "ep-xxx"
+    HUOSHAN_MAX_CONCURRENCY: int = 16
+    HUOSHAN_CONCURRENCY_CEILING: int = 48
+    HUOSHAN_MAX_INPUT_TOKENS: int = 3000
+    HUOSHAN_REQUESTS_PER_MINUTE: int = 0
+    HUOSHAN_TOKENS_PER_MINUTE: int = 0
     
     # 阿里千问配置
     QIANWEN_API_KEY: str = ""
     QIANWEN_MODEL: str = "qwen-turbo"
+    QIANWEN_MAX_CONCURRENCY: int = 16
+    QIANWEN_CONCURRENCY_CEILING: int = 48
+    QIANWEN_MAX_INPUT_TOKENS: int = 3000
+    QIANWEN_REQUESTS_PER_MINUTE: int = 0
+    QIANWEN_TOKENS_PER_MINUTE: int = 0
     
     # LLM处理配置
     DEFAULT_LLM_PROVIDER: str = "ollama"
     SUMMARY_TARGET_LENGTH: int = 400
     BATCH_PROCESS_SIZE: int = 50
-    MAX_RETRIES: int = 3
+    MAX_RETRIES: int = 3  # 远程提供商遇到 429/5xx 或连接错误时的重试次数
+    LLM_RETRY_BASE_DELAY: int = 1  # 指数退避的初始等待（秒）
     ENABLE_LLM_FALLBACK: bool = True
+    LLM_MAX_CONCURRENT_TASKS: int = 10  # 批量处理时同时处理的文章数
+    LLM_COMMIT_BATCH_SIZE: int = 10  # 批量处理时每完成多少篇提交一次
+    LLM_STEP_MAX_ATTEMPTS: int = 3  # 部分步骤失败或降级的文章最多重新处理几次，超过后保留已有结果
+    LANGUAGE_DETECT_MIN_CONFIDENCE: float = 0.7  # 离线语言检测低于该置信度时才调用 LLM
+    KEYWORD_EXTRACTION_MODE: str = "local"  # local: 本地 TF-IDF；llm: 由模型提取
+    KEYWORD_STATS_PATH: str = "./data/keyword_df.bin"  # 关键词文档频率文件
+    KEYWORD_MIN_CORPUS_DOCUMENTS: int = 200  # 语料文档数达到该值后才使用本地提取，之前交给 LLM；0 表示不限制
+    CATEGORY_MODEL_PATH: str = "./data/category_model.json.gz"  # 本地分类模型文件，由训练脚本生成
+    CATEGORY_CLASSIFIER_MIN_CONFIDENCE: float = 0.95  # 本地分类低于该置信度时才调用 LLM
+    LLM_COMBINED_PROCESSING: bool = True  # 单次调用返回 JSON 完成全部步骤，缺失字段逐项回退
+    LLM_BATCH_PROMPTS: bool = True  # 批量处理时多篇文章的标题翻译、语言检测和分类合并为一次调用
+    LLM_BATCH_PROMPT_SIZE: int = 20  # 每次批量调用合并的文章数
+    # 先用 *_CASCADE_MODEL、输出未通过校验再升级到正式模型的方法（逗号分隔）
+    LLM_CASCADE_METHODS: str = "detect_language,extract_keywords,categorize_article,detect_languages_batch,categorize_batch"
+    # 步骤规划：中文标题不翻译、中文短文直接作为摘要、订阅源标签足够时不提取关键词（源配置的跳过/强制始终生效）
+    LLM_STEP_PLANNER_ENABLED: bool = True
+    LLM_PLANNER_MIN_FEED_TAGS: int = 3  # 订阅源给出至少该数量的标签时不再提取关键词
     
     # LLM异步处理超时配置  
     LLM_ASYNC_TIMEOUT: int = 120  # 异步文章处理超时时间（秒）
     LLM_BATCH_TIMEOUT: int = 300  # 批量处理超时时间（秒）
     LLM_SINGLE_TIMEOUT: int = 60  # 单文章处理超时时间（秒）
     
+    # LLM 响应缓存配置
+    LLM_CACHE_ENABLED: bool = True
+    LLM_CACHE_PATH: str = "./data/llm_cache.db"
+    LLM_CACHE_MEMORY_SIZE: int = 1024  # 内存 LRU 条目数
+    LLM_CACHE_TTL: int = 604800  # 缓存有效期（秒），默认 7 天
+    LLM_CACHE_MAX_ENTRIES: int = 50000  # 磁盘缓存最大条目数
+    
+    # LLM 熔断与健康探测配置
+    LLM_CIRCUIT_FAILURE_THRESHOLD: int = 3  # 连续失败多少次后跳过该提供商
+    LLM_CIRCUIT_RECOVERY_TIMEOUT: int = 30  # 熔断后多少秒放行试探请求
+    LLM_HEALTH_PROBE_INTERVAL: int = 30  # 后台健康探测间隔（秒）
+    
+    # LLM 路由配置
+    LLM_ROUTING_POLICY: str = "static"  # static: 固定回退顺序；latency: 按实测延迟选择提供商
+    LLM_ROUTING_MAX_COST: float = 1.0  # 参与延迟路由和对冲的提供商相对成本上限（本地 Ollama 为 0）
+    LLM_ROUTING_MIN_SAMPLES: int = 20  # 延迟样本达到该数量后才按分位数估计
+    LLM_HEDGING_ENABLED: bool = False  # 首选提供商超过 p95 耗时未返回时向下一个提供商发出对冲请求
+    LLM_ADAPTIVE_CONCURRENCY: bool = True  # 并发上限随延迟和超时/429 自动增减（AIMD），上限为各 *_CONCURRENCY_CEILING
+    
+    # OpenAI Batch API 配置（积压较多时把待处理文章提交为离线批次，需配置 OPENAI_API_KEY）
+    LLM_BATCH_API_ENABLED: bool = False
+    LLM_BATCH_API_MIN_BACKLOG: int = 200  # 待处理文章达到该数量才提交批次
+    LLM_BATCH_API_MAX_REQUESTS: int = 1000  # 单个批次最多包含的文章数
+    LLM_BATCH_API_POLL_INTERVAL: int = 300  # 检查批次状态、提交新批次的间隔（秒）
+    
+    # 降级处理配置：所有模型提供商都失败时用本地抽取式摘要、离线语言检测、本地关键词和分类器
+    LLM_EXTRACTIVE_FALLBACK: bool = True
+    LLM_DEGRADED_UPGRADE_BATCH: int = 20  # 模型恢复后每轮重新处理的降级文章数
+    
+    # LLM 流式输出配置（Ollama、OpenAI）
+    LLM_STREAMING_ENABLED: bool = True  # 摘要流式接收，达到目标长度后提前结束生成
+    LLM_STREAM_DEADLINE: int = 45  # 单次流式调用的截止时间（秒），到期使用已生成的部分
+    
     # 安全配置
     SECRET_KEY: str = ""
     ADMIN_PASSWORD: str = ""
@@ -70,6 +150,22 @@ class Settings(BaseSettings):
     # API限流配置
     RATE_LIMIT_PER_MINUTE: int = 60
 
+    # 标签统计配置
+    TAG_STATS_FLUSH_SIZE: int = 500  # 缓冲多少个关联增量后批量写回
+    TAG_STATS_RECONCILE_INTERVAL: int = 3600  # 对账间隔（秒）
+    TAG_POPULARITY_HALF_LIFE_HOURS: float = 72.0  # 标签热度半衰期（小时）
+
+    # 修订检测配置
+    REVISION_SIMILARITY_THRESHOLD: float = 0.9  # 正文指纹相似度低于该值视为实质修改
+
+    # 文章归档配置
+    ARCHIVE_ENABLED: bool = False  # 默认关闭，启用后定期归档旧文章并 VACUUM 热库
+    ARCHIVE_DIR: str = "./data/archive"  # 月度归档库存放目录
+    ARCHIVE_AFTER_DAYS: int = 90  # 超过该天数的文章移入归档库
+    ARCHIVE_MAX_HOT_ARTICLES: int = 0  # 热表最大文章数，0 表示不限制
+    ARCHIVE_BATCH_SIZE: int = 500
+    ARCHIVE_INTERVAL: int = 86400  # 归档任务间隔（秒）
+
     @field_validator('SECRET_KEY')
     @classmethod
     def validate_secret_key(cls, v: str) -> str:
@@ -82,6 +178,44 @@ class Settings(BaseSettings):
             )
         return v
 
+    @field_validator('KEYWORD_EXTRACTION_MODE')
+    @classmethod
+    def validate_keyword_mode(cls, v: str) -> str:
+        """验证关键词提取模式"""
+        v = v.lower()
+        if v not in ("local", "llm"):
+            raise ValueError("KEYWORD_EXTRACTION_MODE 只能是 local 或 llm")
+        return v
+
+    @field_validator('OLLAMA_ENDPOINTS')
+    @classmethod
+    def validate_ollama_endpoints(cls, v: str) -> str:
+        """验证每个端点的并发上限为正整数"""
+        for item in filter(None, (part.strip() for part in v.split(","))):
+            url, sep, limit = item.rpartition("=")
+            if sep and (not limit.isdigit() or int(limit) <= 0):
+                raise ValueError(f"OLLAMA_ENDPOINTS 中 {item} 的并发上限必须为正整数")
+        return v
+
+    @field_validator('OLLAMA_METHOD_MODELS', 'OPENAI_METHOD_MODELS')
+    @classmethod
+    def validate_method_models(cls, v: str) -> str:
+        """验证每项均为 方法名=模型"""
+        for item in filter(None, (part.strip() for part in v.split(","))):
+            method, sep, model = item.partition("=")
+            if not sep or not method.strip() or not model.strip():
+                raise ValueError(f"按方法指定模型的配置项 {item} 格式应为 方法名=模型")
+        return v
+
+    @field_validator('LLM_ROUTING_POLICY')
+    @classmethod
+    def validate_routing_policy(cls, v: str) -> str:
+        """验证 LLM 路由策略"""
+        v = v.lower()
+        if v not in ("static", "latency"):
+            raise ValueError("LLM_ROUTING_POLICY 只能是 static 或 latency")
+        return v
+
     @field_validator('OLLAMA_TIMEOUT', 'LLM_ASYNC_TIMEOUT', 'LLM_BATCH_TIMEOUT', 'LLM_SINGLE_TIMEOUT')
     @classmethod
     def validate_timeout(cls, v: int) -> int:
@@ -90,7 +224,34 @@ class Settings(BaseSettings):
             raise ValueError("超时时间必须大于0")
         return v
 
-    @field_validator('RATE_LIMIT_PER_MINUTE', 'MAX_ARTICLES_PER_SOURCE', 'BATCH_PROCESS_SIZE')
+    @field_validator(
+        'OLLAMA_NUM_CTX', 'OLLAMA_NUM_PREDICT', 'OLLAMA_NUM_THREAD', 'MAX_RETRIES',
+        'OPENAI_REQUESTS_PER_MINUTE', 'OPENAI_TOKENS_PER_MINUTE', 'HUOSHAN_REQUESTS_PER_MINUTE',
+        'HUOSHAN_TOKENS_PER_MINUTE', 'QIANWEN_REQUESTS_PER_MINUTE', 'QIANWEN_TOKENS_PER_MINUTE',
+        'OLLAMA_CONCURRENCY_CEILING', 'OPENAI_CONCURRENCY_CEILING', 'HUOSHAN_CONCURRENCY_CEILING',
+        'QIANWEN_CONCURRENCY_CEILING'
+    )
+    @classmethod
+    def validate_non_negative_int(cls, v: int) -> int:
+        """验证不能为负数（0 表示使用默认值）"""
+        if v < 0:
+            raise ValueError("该值不能小于0")
+        return v
+
+    @field_validator(
+        'RATE_LIMIT_PER_MINUTE', 'MAX_ARTICLES_PER_SOURCE', 'BATCH_PROCESS_SIZE',
+        'TAG_STATS_FLUSH_SIZE', 'TAG_STATS_RECONCILE_INTERVAL', 'TAG_POPULARITY_HALF_LIFE_HOURS',
+        'ARCHIVE_AFTER_DAYS', 'ARCHIVE_BATCH_SIZE', 'ARCHIVE_INTERVAL',
+        'LLM_MAX_CONCURRENT_TASKS', 'LLM_COMMIT_BATCH_SIZE', 'OLLAMA_MAX_CONCURRENCY',
+        'OPENAI_MAX_CONCURRENCY', 'HUOSHAN_MAX_CONCURRENCY', 'QIANWEN_MAX_CONCURRENCY',
+        'OLLAMA_MAX_INPUT_TOKENS', 'OPENAI_MAX_INPUT_TOKENS', 'HUOSHAN_MAX_INPUT_TOKENS', 'QIANWEN_MAX_INPUT_TOKENS',
+        'LLM_CACHE_MEMORY_SIZE', 'LLM_CACHE_TTL', 'LLM_CACHE_MAX_ENTRIES',
+        'LLM_CIRCUIT_FAILURE_THRESHOLD', 'LLM_CIRCUIT_RECOVERY_TIMEOUT', 'LLM_HEALTH_PROBE_INTERVAL',
+        'LLM_ROUTING_MIN_SAMPLES', 'LLM_STREAM_DEADLINE', 'OLLAMA_KEEP_WARM_INTERVAL',
+        'LLM_RETRY_BASE_DELAY', 'LLM_BATCH_PROMPT_SIZE', 'LLM_BATCH_API_MIN_BACKLOG',
+        'LLM_BATCH_API_MAX_REQUESTS', 'LLM_BATCH_API_POLL_INTERVAL', 'LLM_DEGRADED_UPGRADE_BATCH',
+        'LLM_PLANNER_MIN_FEED_TAGS', 'LLM_STEP_MAX_ATTEMPTS'
+    )
     @classmethod
     def validate_positive_int(cls, v: int) -> int:
         """验证必须为正整数"""
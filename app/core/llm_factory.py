@@ -1,23 +1,69 @@
 """
 LLM 管理器配置工厂
 """
+from typing import Dict, List
 from app.services.llm_manager import LLMServiceManager
-from app.services.llm_config import LLMConfig, OllamaConfig, OpenAIConfig, HuoshanConfig, QianwenConfig
+from app.services.llm_cache import LLMResponseCache
+from app.services.llm_config import (
+    LLMConfig, OllamaConfig, OllamaEndpointConfig, OpenAIConfig, HuoshanConfig, QianwenConfig, ExtractiveConfig
+)
 from app.services.llm_interface import LLMProvider
 from app.config import settings
 
 
+def parse_ollama_endpoints(value: str, default_concurrency: int, concurrency_ceiling: int = 0) -> List[OllamaEndpointConfig]:
+    """解析 OLLAMA_ENDPOINTS：逗号分隔，每项为 URL 或 URL=并发上限；concurrency_ceiling 为每个端点的自适应上限"""
+    endpoints = []
+    for item in filter(None, (part.strip() for part in value.split(","))):
+        url, sep, limit = item.rpartition("=")
+        if sep and limit.isdigit():
+            endpoints.append(OllamaEndpointConfig(
+                url=url, max_concurrency=int(limit), concurrency_ceiling=concurrency_ceiling
+            ))
+        else:
+            endpoints.append(OllamaEndpointConfig(
+                url=item, max_concurrency=default_concurrency, concurrency_ceiling=concurrency_ceiling
+            ))
+    return endpoints
+
+
+def parse_method_models(value: str) -> Dict[str, str]:
+    """解析 *_METHOD_MODELS：逗号分隔的 方法名=模型"""
+    models = {}
+    for item in filter(None, (part.strip() for part in value.split(","))):
+        method, _, model = item.partition("=")
+        models[method.strip()] = model.strip()
+    return models
+
+
 def create_llm_manager() -> LLMServiceManager:
     """根据配置创建 LLM 管理器"""
     
     # 创建提供商配置
     providers = {}
     
-    # Ollama 配置（默认启用）
+    # Ollama 配置（默认启用）；多端点时总并发及其自适应上限为各端点之和
+    ollama_endpoints = parse_ollama_endpoints(
+        settings.OLLAMA_ENDPOINTS, settings.OLLAMA_MAX_CONCURRENCY, settings.OLLAMA_CONCURRENCY_CEILING
+    )
     providers[LLMProvider.OLLAMA] = OllamaConfig(
-        base_url=settings.OLLAMA_BASE_URL,
+        base_url=ollama_endpoints[0].url if ollama_endpoints else settings.OLLAMA_BASE_URL,
         model=settings.OLLAMA_MODEL,
         timeout=settings.OLLAMA_TIMEOUT,
+        max_concurrency=sum(e.max_concurrency for e in ollama_endpoints) or settings.OLLAMA_MAX_CONCURRENCY,
+        concurrency_ceiling=sum(max(e.max_concurrency, e.concurrency_ceiling) for e in ollama_endpoints)
+        or settings.OLLAMA_CONCURRENCY_CEILING,
+        adaptive_concurrency=settings.LLM_ADAPTIVE_CONCURRENCY,
+        endpoints=ollama_endpoints,
+        max_input_tokens=settings.OLLAMA_MAX_INPUT_TOKENS,
+        streaming=settings.LLM_STREAMING_ENABLED,
+        stream_deadline=settings.LLM_STREAM_DEADLINE,
+        keep_alive=settings.OLLAMA_KEEP_ALIVE or None,
+        num_ctx=settings.OLLAMA_NUM_CTX or None,
+        num_predict=settings.OLLAMA_NUM_PREDICT or None,
+        num_thread=settings.OLLAMA_NUM_THREAD or None,
+        method_models=parse_method_models(settings.OLLAMA_METHOD_MODELS),
+        cascade_model=settings.OLLAMA_CASCADE_MODEL or None,
         enabled=True
     )
     
@@ -26,7 +72,19 @@ def create_llm_manager() -> LLMServiceManager:
         providers[LLMProvider.OPENAI] = OpenAIConfig(
             api_key=settings.OPENAI_API_KEY,
             model=settings.OPENAI_MODEL,
+            method_models=parse_method_models(settings.OPENAI_METHOD_MODELS),
+            cascade_model=settings.OPENAI_CASCADE_MODEL or None,
             base_url=settings.OPENAI_BASE_URL,
+            max_concurrency=settings.OPENAI_MAX_CONCURRENCY,
+            concurrency_ceiling=settings.OPENAI_CONCURRENCY_CEILING,
+            adaptive_concurrency=settings.LLM_ADAPTIVE_CONCURRENCY,
+            max_input_tokens=settings.OPENAI_MAX_INPUT_TOKENS,
+            requests_per_minute=settings.OPENAI_REQUESTS_PER_MINUTE,
+            tokens_per_minute=settings.OPENAI_TOKENS_PER_MINUTE,
+            max_retries=settings.MAX_RETRIES,
+            retry_delay=settings.LLM_RETRY_BASE_DELAY,
+            streaming=settings.LLM_STREAMING_ENABLED,
+            stream_deadline=settings.LLM_STREAM_DEADLINE,
             enabled=True
         )
     
@@ -36,6 +94,14 @@ def create_llm_manager() -> LLMServiceManager:
             api_key=settings.HUOSHAN_API_KEY,
             secret_key=settings.HUOSHAN_SECRET_KEY,
             model=settings.HUOSHAN_MODEL,
+            max_concurrency=settings.HUOSHAN_MAX_CONCURRENCY,
+            concurrency_ceiling=settings.HUOSHAN_CONCURRENCY_CEILING,
+            adaptive_concurrency=settings.LLM_ADAPTIVE_CONCURRENCY,
+            max_input_tokens=settings.HUOSHAN_MAX_INPUT_TOKENS,
+            requests_per_minute=settings.HUOSHAN_REQUESTS_PER_MINUTE,
+            tokens_per_minute=settings.HUOSHAN_TOKENS_PER_MINUTE,
+            max_retries=settings.MAX_RETRIES,
+            retry_delay=settings.LLM_RETRY_BASE_DELAY,
             enabled=True
         )
     
@@ -44,9 +110,21 @@ def create_llm_manager() -> LLMServiceManager:
         providers[LLMProvider.QIANWEN] = QianwenConfig(
             api_key=settings.QIANWEN_API_KEY,
             model=settings.QIANWEN_MODEL,
+            max_concurrency=settings.QIANWEN_MAX_CONCURRENCY,
+            concurrency_ceiling=settings.QIANWEN_CONCURRENCY_CEILING,
+            adaptive_concurrency=settings.LLM_ADAPTIVE_CONCURRENCY,
+            max_input_tokens=settings.QIANWEN_MAX_INPUT_TOKENS,
+            requests_per_minute=settings.QIANWEN_REQUESTS_PER_MINUTE,
+            tokens_per_minute=settings.QIANWEN_TOKENS_PER_MINUTE,
+            max_retries=settings.MAX_RETRIES,
+            retry_delay=settings.LLM_RETRY_BASE_DELAY,
             enabled=True
         )
     
+    # 本地抽取式降级，排在所有提供商之后
+    if settings.LLM_EXTRACTIVE_FALLBACK:
+        providers[LLMProvider.CUSTOM] = ExtractiveConfig()
+    
     # 确定默认提供商
     try:
         default_provider = LLMProvider(settings.DEFAULT_LLM_PROVIDER)
@@ -59,6 +137,18 @@ def create_llm_manager() -> LLMServiceManager:
         providers=providers,
         summary_target_length=settings.SUMMARY_TARGET_LENGTH,
         batch_process_size=settings.BATCH_PROCESS_SIZE,
+        max_concurrent_tasks=settings.LLM_MAX_CONCURRENT_TASKS,
+        batch_prompt_size=settings.LLM_BATCH_PROMPT_SIZE,
+        language_detect_min_confidence=settings.LANGUAGE_DETECT_MIN_CONFIDENCE,
+        cascade_methods=[m.strip() for m in settings.LLM_CASCADE_METHODS.split(",") if m.strip()],
+        circuit_failure_threshold=settings.LLM_CIRCUIT_FAILURE_THRESHOLD,
+        circuit_recovery_timeout=settings.LLM_CIRCUIT_RECOVERY_TIMEOUT,
+        # 探测偶尔慢一轮时接口仍返回缓存，不退化为同步探测
+        health_cache_ttl=settings.LLM_HEALTH_PROBE_INTERVAL * 2,
+        routing_policy=settings.LLM_ROUTING_POLICY,
+        routing_max_cost=settings.LLM_ROUTING_MAX_COST,
+        routing_min_samples=settings.LLM_ROUTING_MIN_SAMPLES,
+        hedging_enabled=settings.LLM_HEDGING_ENABLED,
         enable_fallback=settings.ENABLE_LLM_FALLBACK,
         fallback_order=[
             LLMProvider.OLLAMA,
@@ -68,7 +158,17 @@ def create_llm_manager() -> LLMServiceManager:
         ]
     )
     
-    return LLMServiceManager(llm_config)
+    # 响应缓存
+    cache = None
+    if settings.LLM_CACHE_ENABLED:
+        cache = LLMResponseCache(
+            path=settings.LLM_CACHE_PATH,
+            memory_size=settings.LLM_CACHE_MEMORY_SIZE,
+            ttl_seconds=settings.LLM_CACHE_TTL,
+            max_entries=settings.LLM_CACHE_MAX_ENTRIES
+        )
+    
+    return LLMServiceManager(llm_config, cache=cache)
 
 
 # 全局LLM管理器实例（单例模式）
@@ -1,8 +1,13 @@
+import asyncio
 from apscheduler.schedulers.asyncio import AsyncIOScheduler
 from apscheduler.triggers.interval import IntervalTrigger
 from sqlalchemy.orm import Session
 from app.models.database import SessionLocal
+from app.models.article import NewsArticle, LLMProcessingStatus
 from app.services.news_aggregator import NewsAggregatorService
+from app.services.tag_stats import tag_stats_buffer, reconcile_tag_stats
+from app.services.keyword_extractor import keyword_extractor
+from app.config import settings
 import logging
 
 logger = logging.getLogger(__name__)
@@ -25,6 +30,124 @@ async def fetch_news_job():
     finally:
         db.close()
 
+async def flush_tag_stats_job():
+    """
+    Scheduled job to write buffered tag counter deltas back to the tags table.
+    """
+    if not tag_stats_buffer.pending_events:
+        return
+    db: Session = SessionLocal()
+    try:
+        tag_stats_buffer.flush(db)
+    except Exception as e:
+        logger.error(f"Error flushing tag stats: {e}")
+    finally:
+        db.close()
+
+async def save_keyword_stats_job():
+    """
+    Scheduled job to persist keyword document frequencies collected at ingest.
+    """
+    try:
+        keyword_extractor.save()
+    except Exception as e:
+        logger.error(f"Error saving keyword stats: {e}")
+
+async def probe_llm_health_job():
+    """
+    Scheduled job to probe LLM providers; health endpoints serve the cached results
+    and open circuit breakers recover as soon as a provider answers again.
+    """
+    from app.core.llm_factory import get_llm_manager
+    try:
+        await get_llm_manager().probe_health()
+    except Exception as e:
+        logger.error(f"Error probing LLM health: {e}")
+
+async def keep_llm_warm_job():
+    """
+    Scheduled job to keep the local model loaded while articles are waiting for LLM
+    processing, so batches between worker cycles do not pay a cold model load.
+    """
+    from app.core.llm_factory import get_llm_manager
+    db: Session = SessionLocal()
+    try:
+        backlog = db.query(NewsArticle.id).filter(
+            NewsArticle.llm_processing_status == LLMProcessingStatus.PENDING
+        ).first()
+    finally:
+        db.close()
+    if backlog is None:
+        return
+    try:
+        await get_llm_manager().warm_up()
+    except Exception as e:
+        logger.error(f"Error keeping LLM warm: {e}")
+
+async def reconcile_tag_stats_job():
+    """
+    Scheduled job to recompute tag counters and decayed popularity from article_tags.
+    """
+    db: Session = SessionLocal()
+    try:
+        result = reconcile_tag_stats(db)
+        logger.info(f"Tag stats reconciliation completed: {result}")
+    except Exception as e:
+        logger.error(f"Error in tag stats reconciliation: {e}")
+    finally:
+        db.close()
+
+def _archive_articles() -> dict:
+    db: Session = SessionLocal()
+    try:
+        from app.services.archive_service import ArchiveService
+        return ArchiveService(db).archive_articles()
+    finally:
+        db.close()
+
+def _compact_hot_db() -> bool:
+    db: Session = SessionLocal()
+    try:
+        from app.services.archive_service import ArchiveService
+        return ArchiveService(db).compact()
+    finally:
+        db.close()
+
+async def archive_articles_job():
+    """
+    Scheduled job to move old articles into the monthly archive and compact the hot DB.
+    Both steps run in worker threads so the batched copy and VACUUM do not block the event loop.
+    """
+    try:
+        result = await asyncio.to_thread(_archive_articles)
+        if result["archived"]:
+            await asyncio.to_thread(_compact_hot_db)
+        logger.info(f"Article archival completed: {result}")
+    except Exception as e:
+        logger.error(f"Error in article archival: {e}")
+
+async def process_llm_batches_job():
+    """
+    Scheduled job to poll outstanding Batch API jobs, apply finished results, and
+    submit the oldest pending articles as a new batch once the backlog is large enough.
+    """
+    from app.services.llm_batch import LLMBatchService
+    db: Session = SessionLocal()
+    try:
+        service = LLMBatchService(db)
+        if not service.available:
+            return
+        result = await service.poll()
+        if result["finished"]:
+            logger.info(f"LLM batch poll completed: {result}")
+        if service.count_backlog() >= settings.LLM_BATCH_API_MIN_BACKLOG:
+            result = await service.submit_pending(settings.LLM_BATCH_API_MAX_REQUESTS)
+            logger.info(f"LLM batch submission completed: {result['message']}")
+    except Exception as e:
+        logger.error(f"Error processing LLM batches: {e}")
+    finally:
+        db.close()
+
 def start_scheduler():
     """Start the scheduler"""
     if not scheduler.running:
@@ -35,6 +158,51 @@ def start_scheduler():
             id="fetch_news_job",
             replace_existing=True
         )
+        scheduler.add_job(
+            flush_tag_stats_job,
+            trigger=IntervalTrigger(minutes=1),
+            id="flush_tag_stats_job",
+            replace_existing=True
+        )
+        scheduler.add_job(
+            save_keyword_stats_job,
+            trigger=IntervalTrigger(minutes=5),
+            id="save_keyword_stats_job",
+            replace_existing=True
+        )
+        scheduler.add_job(
+            probe_llm_health_job,
+            trigger=IntervalTrigger(seconds=settings.LLM_HEALTH_PROBE_INTERVAL),
+            id="probe_llm_health_job",
+            replace_existing=True
+        )
+        if settings.OLLAMA_WARMUP_ENABLED:
+            scheduler.add_job(
+                keep_llm_warm_job,
+                trigger=IntervalTrigger(seconds=settings.OLLAMA_KEEP_WARM_INTERVAL),
+                id="keep_llm_warm_job",
+                replace_existing=True
+            )
+        scheduler.add_job(
+            reconcile_tag_stats_job,
+            trigger=IntervalTrigger(seconds=settings.TAG_STATS_RECONCILE_INTERVAL),
+            id="reconcile_tag_stats_job",
+            replace_existing=True
+        )
+        if settings.ARCHIVE_ENABLED:
+            scheduler.add_job(
+                archive_articles_job,
+                trigger=IntervalTrigger(seconds=settings.ARCHIVE_INTERVAL),
+                id="archive_articles_job",
+                replace_existing=True
+            )
+        if settings.LLM_BATCH_API_ENABLED:
+            scheduler.add_job(
+                process_llm_batches_job,
+                trigger=IntervalTrigger(seconds=settings.LLM_BATCH_API_POLL_INTERVAL),
+                id="process_llm_batches_job",
+                replace_existing=True
+            )
         scheduler.start()
         logger.info("Scheduler started")
 
@@ -42,4 +210,11 @@ def stop_scheduler():
     """Stop the scheduler"""
     if scheduler.running:
         scheduler.shutdown()
+        # Persist whatever is still buffered before the process goes away
+        db: Session = SessionLocal()
+        try:
+            tag_stats_buffer.flush(db)
+            keyword_extractor.save()
+        finally:
+            db.close()
         logger.info("Scheduler stopped")
@@ -7,14 +7,14 @@ import time
 from typing import List, Dict, Any, Optional
 from datetime import datetime, date, timedelta
 from enum import Enum
-from sqlalchemy.orm import Session
+from sqlalchemy.orm import Session, undefer
 from sqlalchemy import func
 from app.models.database import SessionLocal
 from app.models.article import NewsArticle, LLMProcessingStatus
 from app.services.content_processor import ContentProcessorService
 from app.core.llm_factory import get_llm_manager
+from app.services.llm_http import http_clients
 from app.config import settings
-import json
 import logging
 
 logger = logging.getLogger(__name__)
@@ -97,6 +97,11 @@ class BackgroundTaskManager:
     def _background_worker(self):
         """后台工作线程"""
         logger.info("后台LLM处理工作线程开始运行")
+        # 整个线程使用同一个事件循环，LLM 客户端的长连接可以跨轮次复用
+        loop = asyncio.new_event_loop()
+        asyncio.set_event_loop(loop)
+        if settings.OLLAMA_WARMUP_ENABLED:
+            self._warm_up(loop)
         
         while not self._stop_event.is_set():
             try:
@@ -110,7 +115,7 @@ class BackgroundTaskManager:
                     self.content_processor = ContentProcessorService(get_llm_manager())
                     
                 # 执行处理任务
-                asyncio.run(self._process_articles_batch())
+                loop.run_until_complete(self._process_articles_batch())
                 
                 # 等待一段时间后继续
                 time.sleep(60)  # 每分钟检查一次新文章
@@ -119,8 +124,19 @@ class BackgroundTaskManager:
                 logger.error(f"后台处理线程错误: {e}")
                 time.sleep(30)  # 出错后等待30秒
                 
+        loop.run_until_complete(http_clients.aclose())
+        loop.close()
         logger.info("后台LLM处理工作线程已退出")
         
+    def _warm_up(self, loop: asyncio.AbstractEventLoop):
+        """启动时预加载本地模型，避免第一批文章承担冷启动耗时"""
+        try:
+            results = loop.run_until_complete(get_llm_manager().warm_up())
+            if results:
+                logger.info(f"LLM 模型预热完成: {results}")
+        except Exception as e:
+            logger.warning(f"LLM 模型预热失败: {e}")
+        
     def _should_pause(self) -> bool:
         """检查是否应该暂停"""
         if self._is_paused:
@@ -142,6 +158,14 @@ class BackgroundTaskManager:
         result = await processor.process_pending_articles()
         if result["processed_count"] > 0:
             logger.info(f"后台处理完成: 成功 {result['processed_count']}, 失败 {result['failed_count']}")
+        elif result["failed_count"] == 0:
+            # 没有新文章时，重跑部分步骤失败的文章，再用恢复的模型重新处理降级结果
+            retried = await processor.retry_incomplete_articles()
+            if retried["completed_count"] > 0:
+                logger.info(f"失败步骤重跑完成: {retried['completed_count']} 篇")
+            upgraded = await processor.upgrade_degraded_articles()
+            if upgraded["upgraded_count"] > 0:
+                logger.info(f"降级结果重新处理完成: {upgraded['upgraded_count']} 篇")
 
 
 class AsyncTaskProcessor:
@@ -158,7 +182,9 @@ class AsyncTaskProcessor:
         db = SessionLocal()
         try:
             # 获取待处理文章
-            pending_articles = db.query(NewsArticle).filter(
+            pending_articles = db.query(NewsArticle).options(
+                undefer(NewsArticle.content)
+            ).filter(
                 NewsArticle.llm_processing_status == LLMProcessingStatus.PENDING
             ).limit(limit).all()
             
@@ -171,47 +197,9 @@ class AsyncTaskProcessor:
             
             logger.info(f"开始处理 {len(pending_articles)} 篇待处理文章")
             
-            processed_count = 0
-            failed_count = 0
-            
-            for article in pending_articles:
-                try:
-                    # 更新状态为处理中
-                    article.llm_processing_status = LLMProcessingStatus.PROCESSING
-                    db.commit()
-                    
-                    # 使用内容处理器处理文章
-                    result = await self.content_processor.process_article_content(article)
-                    
-                    # 更新文章信息
-                    if result.get("llm_processing_status") == LLMProcessingStatus.COMPLETED:
-                        article.chinese_title = result.get("chinese_title")
-                        article.llm_summary = result.get("llm_summary")
-                        article.original_language = result.get("original_language")
-                        article.llm_processed_at = result.get("llm_processed_at")
-                        article.llm_processing_status = LLMProcessingStatus.COMPLETED
-                        
-                        # 更新关键词和分类
-                        if result.get("keywords"):
-                            article.tags = json.dumps(result["keywords"], ensure_ascii=False)
-                        if result.get("category"):
-                            article.category = result["category"]
-                        
-                        db.commit()
-                        processed_count += 1
-                        logger.info(f"文章 {article.id} 处理成功")
-                        
-                    else:
-                        article.llm_processing_status = LLMProcessingStatus.FAILED
-                        db.commit()
-                        failed_count += 1
-                        logger.error(f"文章 {article.id} 处理失败: {result.get('error', '未知错误')}")
-                        
-                except Exception as e:
-                    logger.error(f"处理文章 {article.id} 时发生异常: {e}")
-                    article.llm_processing_status = LLMProcessingStatus.FAILED
-                    db.commit()
-                    failed_count += 1
+            counts = await self.content_processor.process_and_save(db, pending_articles)
+            processed_count = counts["processed_count"]
+            failed_count = counts["failed_count"]
             
             return {
                 "message": f"批量处理完成，成功: {processed_count}, 失败: {failed_count}",
@@ -222,6 +210,92 @@ class AsyncTaskProcessor:
         finally:
             db.close()
     
+    async def retry_incomplete_articles(self, limit: Optional[int] = None) -> Dict[str, Any]:
+        """重跑已完成但有步骤失败的文章（pending_llm_steps 非空、非降级）
+        
+        只重跑 pending_llm_steps 中记录的步骤，文章保持 COMPLETED 状态；
+        每篇最多处理 LLM_STEP_MAX_ATTEMPTS 次，按已尝试次数排序，避免反复失败的文章挡住其余文章。
+        """
+        if limit is None:
+            limit = settings.BATCH_PROCESS_SIZE
+        
+        db = SessionLocal()
+        try:
+            articles = db.query(NewsArticle).options(
+                undefer(NewsArticle.content)
+            ).filter(
+                NewsArticle.llm_processing_status == LLMProcessingStatus.COMPLETED,
+                NewsArticle.pending_llm_steps.isnot(None),
+                NewsArticle.llm_degraded.isnot(True),
+                func.coalesce(NewsArticle.llm_step_attempts, 0) < settings.LLM_STEP_MAX_ATTEMPTS
+            ).order_by(func.coalesce(NewsArticle.llm_step_attempts, 0), NewsArticle.id).limit(limit).all()
+            
+            completed_count = 0
+            retried_count = 0
+            revisions = {article.id: article.revision for article in articles}
+            async for article, result in self.content_processor.iter_process_articles(articles):
+                if self.content_processor.revised_since(db, article, revisions[article.id]):
+                    continue
+                if result.get("llm_processing_status") == LLMProcessingStatus.COMPLETED:
+                    self.content_processor.apply_result(article, result)
+                else:
+                    # 整体失败时保留已有结果，只累计次数
+                    article.llm_step_attempts = (article.llm_step_attempts or 0) + 1
+                    if result.get("prompt_tokens"):
+                        article.prompt_tokens = (article.prompt_tokens or 0) + result["prompt_tokens"]
+                if article.pending_llm_steps is None:
+                    completed_count += 1
+                else:
+                    retried_count += 1
+            db.commit()
+            return {"completed_count": completed_count, "retried_count": retried_count}
+        
+        finally:
+            db.close()
+    
+    async def upgrade_degraded_articles(self, limit: Optional[int] = None) -> Dict[str, Any]:
+        """用恢复的模型重新处理结果来自本地降级的文章
+        
+        只重跑 pending_llm_steps 中记录的步骤；文章保持 COMPLETED 状态，
+        只有全部步骤都由模型完成时才替换原结果，否则保留降级结果并累计次数，
+        按次数排序、达到 LLM_STEP_MAX_ATTEMPTS 后不再重试，始终无法升级的文章不会挡住其余文章。
+        """
+        if limit is None:
+            limit = settings.LLM_DEGRADED_UPGRADE_BATCH
+        if not self.content_processor.llm_manager.has_llm_available():
+            return {"upgraded_count": 0, "skipped_count": 0}
+        
+        db = SessionLocal()
+        try:
+            articles = db.query(NewsArticle).options(
+                undefer(NewsArticle.content)
+            ).filter(
+                NewsArticle.llm_degraded.is_(True),
+                NewsArticle.llm_processing_status == LLMProcessingStatus.COMPLETED,
+                func.coalesce(NewsArticle.llm_step_attempts, 0) < settings.LLM_STEP_MAX_ATTEMPTS
+            ).order_by(func.coalesce(NewsArticle.llm_step_attempts, 0), NewsArticle.id).limit(limit).all()
+            
+            upgraded_count = 0
+            skipped_count = 0
+            revisions = {article.id: article.revision for article in articles}
+            async for article, result in self.content_processor.iter_process_articles(articles):
+                if self.content_processor.revised_since(db, article, revisions[article.id]):
+                    continue
+                if result.get("llm_processing_status") == LLMProcessingStatus.COMPLETED \
+                        and not result.get("degraded_steps") and not result.get("failed_steps"):
+                    self.content_processor.apply_result(article, result)
+                    upgraded_count += 1
+                else:
+                    skipped_count += 1
+                    article.llm_step_attempts = (article.llm_step_attempts or 0) + 1
+                    if result.get("prompt_tokens"):
+                        article.prompt_tokens = (article.prompt_tokens or 0) + result["prompt_tokens"]
+            db.commit()
+            return {"upgraded_count": upgraded_count, "skipped_count": skipped_count}
+        
+        finally:
+            db.close()
+    
     async def process_today_articles(self) -> Dict[str, Any]:
         """专门处理今日的文章"""
         db = SessionLocal()
@@ -262,6 +336,7 @@ class AsyncTaskProcessor:
             failed = db.query(NewsArticle).filter(
                 NewsArticle.llm_processing_status == LLMProcessingStatus.FAILED
             ).count()
+            degraded = db.query(NewsArticle).filter(NewsArticle.llm_degraded.is_(True)).count()
             
             return {
                 "total_articles": total,
@@ -269,6 +344,7 @@ class AsyncTaskProcessor:
                 "processing": processing,
                 "completed": completed,
                 "failed": failed,
+                "degraded": degraded,
                 "completion_rate": round(completed / total * 100, 2) if total > 0 else 0
             }
             
@@ -68,7 +68,9 @@ async def startup_event():
 async def shutdown_event():
     """应用关闭事件"""
     from app.core.scheduler import stop_scheduler
+    from app.services.llm_http import http_clients
     stop_scheduler()
+    await http_clients.aclose()
 
 
 @app.get("/")
@@ -7,6 +7,8 @@ from app.models.source import NewsSource
 from app.models.category import Category
 from app.models.user import User
 from app.models.tag import Tag, ArticleTag, UserTagPreference
+from app.models.archive import ArchivedArticleIndex
+from app.models.llm_batch import LLMBatchJob
 from app.models.interaction import (
     ReadingHistory,
     Favorite,
@@ -33,4 +35,6 @@ __all__ = [
     "AIPromptTemplate",
     "AggregatedTopic",
     "TopicArticle",
+    "ArchivedArticleIndex",
+    "LLMBatchJob",
 ]
@@ -0,0 +1,21 @@
+"""
+文章归档索引模型
+"""
+from datetime import datetime, timezone
+from sqlalchemy import Column, Integer, String, Text, DateTime
+from app.models.database import Base
+
+
+class ArchivedArticleIndex(Base):
+    """已归档文章索引 - 记录文章被移入哪个月度归档库
+
+    正文等数据保存在 ARCHIVE_DIR 下的月度 SQLite 文件中，热库只保留这一行，
+    用于按 id 查找归档文章以及抓取时按 URL 去重。
+    """
+    __tablename__ = "archived_article_index"
+
+    id = Column(Integer, primary_key=True)  # 与原 news_articles.id 相同
+    url = Column(Text, unique=True, nullable=False, index=True)
+    archive_key = Column(String(7), nullable=False, index=True)  # 归档月份，如 2026-01
+    published_at = Column(DateTime)
+    archived_at = Column(DateTime, default=lambda: datetime.now(timezone.utc))
@@ -3,7 +3,7 @@
 """
 from datetime import datetime, timezone
 from sqlalchemy import Column, Integer, String, Boolean, DateTime, Text, ForeignKey, Enum, Float, TIMESTAMP
-from sqlalchemy.orm import relationship
+from sqlalchemy.orm import relationship, deferred
 from app.models.database import Base
 import enum
 
@@ -16,6 +16,12 @@ class LLMProcessingStatus(enum.Enum):
     FAILED = "failed"
 
 
+# 分类来源：只有模型和人工给出的分类用于训练本地分类器
+CATEGORY_SOURCE_LLM = "llm"
+CATEGORY_SOURCE_USER = "user"
+CATEGORY_SOURCE_LOCAL = "local"  # 本地分类器（入库、规划或降级处理）
+
+
 class NewsArticle(Base):
     """新闻文章模型"""
     __tablename__ = "news_articles"
@@ -23,7 +29,7 @@ class NewsArticle(Base):
     id = Column(Integer, primary_key=True, index=True)
     title = Column(Text, nullable=False)
     summary = Column(Text)
-    content = Column(Text)
+    content = deferred(Column(Text))  # 正文体积大，仅在详情/处理时按需加载
     url = Column(Text, unique=True, nullable=False, index=True)
     source_id = Column(Integer, ForeignKey("news_sources.id"))
     author = Column(String(100))
@@ -31,6 +37,7 @@ class NewsArticle(Base):
     fetched_at = Column(DateTime, default=lambda: datetime.now(timezone.utc))
     is_processed = Column(Boolean, default=False)
     category = Column(String(50))
+    category_source = Column(String(20), comment="分类来源：llm、user、local")
     tags = Column(Text)  # JSON格式存储标签数组
     
     # LLM 处理相关字段
@@ -44,6 +51,14 @@ class NewsArticle(Base):
         comment="LLM 处理状态"
     )
     
+    # 修订检测相关字段
+    content_fingerprint = Column(String(16), comment="正文 SimHash 指纹（最近一次处理的版本）")
+    revision = Column(Integer, default=1, comment="内容修订号")
+    pending_llm_steps = Column(Text, comment="待重新执行的 LLM 步骤（JSON 数组），为空表示全部")
+    prompt_tokens = Column(Integer, default=0, comment="LLM 处理累计消耗的提示词 token 数")
+    llm_degraded = Column(Boolean, default=False, index=True, comment="部分结果来自本地降级处理，模型恢复后重新处理")
+    llm_step_attempts = Column(Integer, default=0, comment="pending_llm_steps 未能完成的连续处理次数")
+    
     # Engagement metrics
     view_count = Column(Integer, default=0)
     like_count = Column(Integer, default=0)
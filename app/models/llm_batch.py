@@ -0,0 +1,32 @@
+"""
+LLM 批量任务模型
+"""
+from datetime import datetime, timezone
+from sqlalchemy import Column, Integer, String, Text, DateTime
+from app.models.database import Base
+
+
+class LLMBatchJob(Base):
+    """提交到提供商 Batch API 的一批文章处理请求
+
+    status 沿用提供商返回的批次状态（validating、in_progress、finalizing、completed、failed、
+    expired、cancelled 等）；批次结束且结果已写回文章后记录 finished_at。
+    """
+    __tablename__ = "llm_batch_jobs"
+
+    id = Column(Integer, primary_key=True)
+    provider = Column(String(20), nullable=False)
+    remote_id = Column(String(100), unique=True, nullable=False, comment="提供商返回的批次 ID")
+    input_file_id = Column(String(100))
+    output_file_id = Column(String(100))
+    error_file_id = Column(String(100))
+    status = Column(String(20), nullable=False)
+    article_ids = Column(Text, nullable=False, comment="本批包含的文章 ID（JSON 数组）")
+    request_count = Column(Integer, default=0)
+    completed_count = Column(Integer, default=0)
+    failed_count = Column(Integer, default=0)
+    applied_count = Column(Integer, default=0, comment="成功写回的文章数")
+    error = Column(Text)
+    created_at = Column(DateTime, default=lambda: datetime.now(timezone.utc))
+    updated_at = Column(DateTime, default=lambda: datetime.now(timezone.utc))
+    finished_at = Column(DateTime, index=True, comment="结果写回时间，为空表示批次尚未处理完")
@@ -29,9 +29,9 @@ class Tag(Base):
     ai_keywords = Column(Text)  # JSON string array for SQLite compatibility
     ai_prompt_id = Column(Integer, ForeignKey("ai_prompt_templates.id"), nullable=True)
     
-    # Stats
-    article_count = Column(Integer, default=0)
-    popularity_score = Column(Float, default=0.0)
+    # Stats - maintained incrementally by app/services/tag_stats.py
+    article_count = Column(Integer, default=0, index=True)
+    popularity_score = Column(Float, default=0.0, index=True)
     
     # Status
     is_active = Column(Boolean, default=True)
@@ -39,9 +39,15 @@ from pydantic import BaseModel, HttpUrl, field_validator, ConfigDict, Field
 
 # ... (skipped types)
 
-class Article(ArticleBase):
-    """文章响应模式"""
+class ArticleListItem(BaseModel):
+    """文章列表项模式 - 不含正文，正文仅由详情接口返回"""
     id: int
+    title: str
+    summary: Optional[str] = None
+    url: HttpUrl
+    author: Optional[str] = None
+    published_at: Optional[datetime] = None
+    category: Optional[str] = None
     source_id: int
     fetched_at: datetime
     is_processed: bool = False
@@ -58,9 +64,14 @@ class Article(ArticleBase):
     model_config = ConfigDict(from_attributes=True)
 
 
+class Article(ArticleListItem):
+    """文章响应模式"""
+    content: Optional[str] = None
+
+
 class ArticleListResponse(BaseModel):
     """文章列表响应"""
     total: int
     page: int
     size: int
-    articles: List[Article]
+    articles: List[ArticleListItem]
@@ -4,7 +4,7 @@
 from datetime import datetime
 from typing import List, Optional
 from pydantic import BaseModel
-from app.schemas.article import Article
+from app.schemas.article import ArticleListItem
 
 
 class SearchQuery(BaseModel):
@@ -24,5 +24,5 @@ class SearchResponse(BaseModel):
     total: int
     page: int
     size: int
-    articles: List[Article]
+    articles: List[ArticleListItem]
     took: float  # 搜索耗时(秒)
@@ -8,6 +8,7 @@ class TagBase(BaseModel):
 class TagResponse(TagBase):
     id: int
     article_count: int = 0
+    popularity_score: float = 0.0
     
     model_config = ConfigDict(from_attributes=True)
 
@@ -0,0 +1,383 @@
+"""
+文章归档服务 - 热表保留策略
+
+超过保留期的文章（连同标签关联）按发布月份移入 ARCHIVE_DIR 下的
+月度 SQLite 归档库，并从 news_articles 中删除，使热表规模保持稳定。
+热库中的 archived_article_index 记录每篇归档文章所在的月份，
+用于按 id 读取归档文章和抓取去重。
+"""
+import enum
+import os
+import re
+import threading
+from collections import defaultdict
+from datetime import datetime, timedelta
+from typing import Dict, Any, List, Optional, Tuple
+from sqlalchemy import (
+    create_engine, MetaData, Table, Column, Integer, String, Text, DateTime, Float, Boolean,
+    select, insert, delete, func, or_, text
+)
+from sqlalchemy.engine import Engine
+from sqlalchemy.orm import Session
+from app.models.article import NewsArticle
+from app.models.tag import Tag, ArticleTag
+from app.models.archive import ArchivedArticleIndex
+from app.models.interaction import Favorite, ReadingHistory, TopicArticle
+from app.services.tag_stats import tag_stats_buffer
+from app.config import settings
+import logging
+
+logger = logging.getLogger(__name__)
+
+# 归档库表结构（与热库分离的独立 MetaData）
+archive_metadata = MetaData()
+
+archived_articles = Table(
+    "archived_articles",
+    archive_metadata,
+    Column("id", Integer, primary_key=True),
+    Column("title", Text, nullable=False),
+    Column("summary", Text),
+    Column("content", Text),
+    Column("url", Text, nullable=False),
+    Column("source_id", Integer),
+    Column("author", String(100)),
+    Column("published_at", DateTime, index=True),
+    Column("fetched_at", DateTime),
+    Column("is_processed", Boolean),
+    Column("category", String(50)),
+    Column("tags", Text),
+    Column("chinese_title", Text),
+    Column("llm_summary", Text),
+    Column("original_language", String(10)),
+    Column("llm_processed_at", DateTime),
+    Column("llm_processing_status", String(20)),
+    Column("view_count", Integer),
+    Column("like_count", Integer),
+    Column("share_count", Integer),
+    Column("trending_score", Float),
+    Column("archived_at", DateTime),
+)
+
+archived_article_tags = Table(
+    "archived_article_tags",
+    archive_metadata,
+    Column("article_id", Integer, nullable=False, index=True),
+    Column("tag_id", Integer),
+    Column("tag_name", String(100)),
+    Column("tag_slug", String(100)),
+    Column("relevance_score", Float),
+    Column("assigned_by", String(20)),
+)
+
+ARTICLE_COLUMNS = [c.name for c in archived_articles.columns if c.name != "archived_at"]
+ARCHIVE_FILE_PATTERN = re.compile(r"^articles_(\d{4})_(\d{2})\.db$")
+SORT_COLUMNS = ("published_at", "fetched_at")
+
+_engines: Dict[str, Engine] = {}
+_engines_lock = threading.Lock()
+
+
+class ArchiveService:
+    """文章归档服务"""
+
+    def __init__(self, db: Session, archive_dir: Optional[str] = None):
+        self.db = db
+        self.archive_dir = archive_dir or settings.ARCHIVE_DIR
+
+    # ---- 归档库管理 ----
+
+    def _archive_path(self, archive_key: str) -> str:
+        return os.path.join(self.archive_dir, f"articles_{archive_key.replace('-', '_')}.db")
+
+    def _get_engine(self, archive_key: str, create: bool = False) -> Optional[Engine]:
+        """获取月度归档库引擎，create=False 时归档库不存在则返回 None"""
+        path = os.path.abspath(self._archive_path(archive_key))
+        if not create and not os.path.exists(path):
+            return None
+
+        with _engines_lock:
+            engine = _engines.get(path)
+            if engine is None:
+                os.makedirs(os.path.dirname(path), exist_ok=True)
+                engine = create_engine(f"sqlite:///{path}")
+                archive_metadata.create_all(engine)
+                _engines[path] = engine
+        return engine
+
+    def list_archive_keys(self) -> List[str]:
+        """列出已有的归档月份（新到旧）"""
+        if not os.path.isdir(self.archive_dir):
+            return []
+        keys = []
+        for name in os.listdir(self.archive_dir):
+            match = ARCHIVE_FILE_PATTERN.match(name)
+            if match:
+                keys.append(f"{match.group(1)}-{match.group(2)}")
+        return sorted(keys, reverse=True)
+
+    @staticmethod
+    def _archive_key(row: Dict[str, Any]) -> str:
+        moment = row.get("published_at") or row.get("fetched_at") or datetime.utcnow()
+        return moment.strftime("%Y-%m")
+
+    # ---- 归档 ----
+
+    def _candidate_ids(self, limit: int, cutoff: Optional[datetime] = None) -> List[int]:
+        """按时间从旧到新挑选可归档文章
+
+        被收藏、阅读历史或话题引用的文章保留在热表（外键级联删除会丢失这些记录）；id 最大的文章也保留，
+        避免热表被清空后 SQLite 重新从小 id 开始分配、与归档 id 冲突。
+        """
+        newest_id = self.db.query(func.max(NewsArticle.id)).scalar()
+        if newest_id is None:
+            return []
+
+        age = func.coalesce(NewsArticle.published_at, NewsArticle.fetched_at)
+        query = self.db.query(NewsArticle.id).filter(
+            NewsArticle.id != newest_id,
+            ~NewsArticle.id.in_(select(Favorite.article_id)),
+            ~NewsArticle.id.in_(select(ReadingHistory.article_id)),
+            ~NewsArticle.id.in_(select(TopicArticle.article_id))
+        )
+        if cutoff is not None:
+            query = query.filter(age < cutoff)
+
+        return [row[0] for row in query.order_by(age, NewsArticle.id).limit(limit).all()]
+
+    def archive_articles(self, now: Optional[datetime] = None) -> Dict[str, int]:
+        """执行保留策略：先按年龄归档，再按热表容量上限归档最旧的文章"""
+        now = now or datetime.utcnow()
+        batch_size = settings.ARCHIVE_BATCH_SIZE
+        cutoff = now - timedelta(days=settings.ARCHIVE_AFTER_DAYS)
+        archived = 0
+
+        while True:
+            ids = self._candidate_ids(batch_size, cutoff=cutoff)
+            if not ids:
+                break
+            archived += self._archive_batch(ids, now)
+
+        max_hot = settings.ARCHIVE_MAX_HOT_ARTICLES
+        if max_hot > 0:
+            while True:
+                overflow = self.db.query(func.count(NewsArticle.id)).scalar() - max_hot
+                if overflow <= 0:
+                    break
+                ids = self._candidate_ids(min(overflow, batch_size))
+                if not ids:
+                    break
+                archived += self._archive_batch(ids, now)
+
+        hot_articles = self.db.query(func.count(NewsArticle.id)).scalar()
+        if archived:
+            logger.info(f"归档完成: 移出 {archived} 篇文章, 热表剩余 {hot_articles} 篇")
+        return {"archived": archived, "hot_articles": hot_articles}
+
+    def _archive_batch(self, article_ids: List[int], now: datetime) -> int:
+        """将一批文章写入归档库后从热表删除"""
+        article_table = NewsArticle.__table__
+        rows = self.db.execute(
+            select(article_table).where(article_table.c.id.in_(article_ids))
+        ).mappings().all()
+        if not rows:
+            return 0
+
+        tag_rows = self.db.execute(
+            select(
+                ArticleTag.article_id,
+                ArticleTag.tag_id,
+                Tag.name.label("tag_name"),
+                Tag.slug.label("tag_slug"),
+                ArticleTag.relevance_score,
+                ArticleTag.assigned_by,
+            )
+            .join(Tag, Tag.id == ArticleTag.tag_id)
+            .where(ArticleTag.article_id.in_(article_ids))
+        ).mappings().all()
+
+        rows_by_key: Dict[str, List[Dict[str, Any]]] = defaultdict(list)
+        for row in rows:
+            rows_by_key[self._archive_key(row)].append(row)
+        tags_by_article: Dict[int, List[Dict[str, Any]]] = defaultdict(list)
+        for tag_row in tag_rows:
+            tags_by_article[tag_row["article_id"]].append(dict(tag_row))
+
+        # 先写归档库，全部成功后才删除热表数据
+        for archive_key, key_rows in rows_by_key.items():
+            key_ids = [row["id"] for row in key_rows]
+            key_tags = [t for article_id in key_ids for t in tags_by_article.get(article_id, [])]
+            engine = self._get_engine(archive_key, create=True)
+            with engine.begin() as conn:
+                # 重复执行时保持幂等
+                conn.execute(delete(archived_article_tags).where(archived_article_tags.c.article_id.in_(key_ids)))
+                conn.execute(delete(archived_articles).where(archived_articles.c.id.in_(key_ids)))
+                conn.execute(insert(archived_articles), [self._to_archive_row(row, now) for row in key_rows])
+                if key_tags:
+                    conn.execute(insert(archived_article_tags), key_tags)
+
+        try:
+            for row in rows:
+                self.db.merge(ArchivedArticleIndex(
+                    id=row["id"],
+                    url=row["url"],
+                    archive_key=self._archive_key(row),
+                    published_at=row["published_at"],
+                    archived_at=now,
+                ))
+            self.db.execute(delete(ArticleTag.__table__).where(ArticleTag.__table__.c.article_id.in_(article_ids)))
+            self.db.execute(delete(article_table).where(article_table.c.id.in_(article_ids)))
+            self.db.commit()
+        except Exception:
+            self.db.rollback()
+            raise
+
+        tag_stats_buffer.record_unlinks([t["tag_id"] for t in tag_rows])
+        return len(rows)
+
+    @staticmethod
+    def _to_archive_row(row: Dict[str, Any], now: datetime) -> Dict[str, Any]:
+        data = {name: row.get(name) for name in ARTICLE_COLUMNS}
+        status = data.get("llm_processing_status")
+        if isinstance(status, enum.Enum):
+            data["llm_processing_status"] = status.value
+        data["archived_at"] = now
+        return data
+
+    def compact(self, engine: Optional[Engine] = None) -> bool:
+        """归档后整理热库（VACUUM + PRAGMA optimize），仅 SQLite 需要"""
+        if engine is None:
+            from app.models.database import engine as hot_engine
+            engine = hot_engine
+        if engine.dialect.name != "sqlite":
+            return False
+
+        with engine.connect().execution_options(isolation_level="AUTOCOMMIT") as conn:
+            conn.execute(text("VACUUM"))
+            conn.execute(text("PRAGMA optimize"))
+        logger.info("热库 VACUUM 完成")
+        return True
+
+    # ---- 读取 ----
+
+    def is_archived_url(self, url: str) -> bool:
+        """URL 是否已经归档（抓取去重用）"""
+        return self.db.query(ArchivedArticleIndex.id).filter(ArchivedArticleIndex.url == url).first() is not None
+
+    def get_archived_article(self, article_id: int) -> Optional[Dict[str, Any]]:
+        """按 id 读取归档文章，返回可直接用于 Article 模式校验的字典"""
+        entry = self.db.query(ArchivedArticleIndex).filter(ArchivedArticleIndex.id == article_id).first()
+        if not entry:
+            return None
+
+        engine = self._get_engine(entry.archive_key)
+        if engine is None:
+            logger.warning(f"文章 {article_id} 的归档库 {entry.archive_key} 不存在")
+            return None
+
+        with engine.connect() as conn:
+            row = conn.execute(
+                select(archived_articles).where(archived_articles.c.id == article_id)
+            ).mappings().first()
+            if not row:
+                return None
+            tag_rows = conn.execute(
+                select(archived_article_tags).where(archived_article_tags.c.article_id == article_id)
+            ).mappings().all()
+
+        return self._to_article_dict(row, tag_rows)
+
+    def search_archive(
+        self,
+        q: str,
+        category: Optional[str] = None,
+        skip: int = 0,
+        limit: int = 20,
+        sort: str = "published_at"
+    ) -> Tuple[int, List[Dict[str, Any]]]:
+        """在所有归档库中搜索，按 sort（published_at 或 fetched_at）倒序合并，返回 (总数, 当前页文章)"""
+        sort = sort if sort in SORT_COLUMNS else "published_at"
+        order_column = archived_articles.c[sort]
+        total = 0
+        candidates: List[Tuple[str, Any]] = []
+
+        conditions = []
+        if q:
+            conditions.append(or_(
+                archived_articles.c.title.contains(q),
+                archived_articles.c.summary.contains(q),
+                archived_articles.c.content.contains(q)
+            ))
+        if category:
+            conditions.append(archived_articles.c.category == category)
+
+        # 每个月份取前 skip + limit 条，合并排序后再分页
+        for archive_key in self.list_archive_keys():
+            engine = self._get_engine(archive_key)
+            if engine is None:
+                continue
+            with engine.connect() as conn:
+                count = conn.execute(
+                    select(func.count()).select_from(archived_articles).where(*conditions)
+                ).scalar() or 0
+                if count:
+                    rows = conn.execute(
+                        select(archived_articles)
+                        .where(*conditions)
+                        .order_by(order_column.desc())
+                        .limit(skip + limit)
+                    ).mappings().all()
+                    candidates.extend((archive_key, row) for row in rows)
+            total += count
+
+        candidates.sort(key=lambda item: item[1][sort] or datetime.min, reverse=True)
+        page = candidates[skip:skip + limit]
+
+        rows_by_key: Dict[str, List[Any]] = defaultdict(list)
+        for archive_key, row in page:
+            rows_by_key[archive_key].append(row)
+        tags_by_article: Dict[int, List[Any]] = defaultdict(list)
+        for archive_key, rows in rows_by_key.items():
+            with self._get_engine(archive_key).connect() as conn:
+                for tag_row in conn.execute(
+                    select(archived_article_tags).where(
+                        archived_article_tags.c.article_id.in_([row["id"] for row in rows])
+                    )
+                ).mappings().all():
+                    tags_by_article[tag_row["article_id"]].append(tag_row)
+
+        return total, [self._to_article_dict(row, tags_by_article.get(row["id"], [])) for _, row in page]
+
+    @staticmethod
+    def _to_article_dict(row: Any, tag_rows: List[Any]) -> Dict[str, Any]:
+        data = dict(row)
+        for counter in ("view_count", "like_count", "share_count"):
+            data[counter] = data.get(counter) or 0
+        data["trending_score"] = data.get("trending_score") or 0.0
+        data["is_processed"] = bool(data.get("is_processed"))
+        data["article_tags"] = [
+            {
+                "tag": {"id": t["tag_id"], "name": t["tag_name"], "slug": t["tag_slug"]},
+                "relevance_score": t["relevance_score"] if t["relevance_score"] is not None else 1.0,
+            }
+            for t in tag_rows
+        ]
+        return data
+
+    def get_archive_stats(self) -> Dict[str, Any]:
+        """归档统计"""
+        files = []
+        for archive_key in self.list_archive_keys():
+            path = self._archive_path(archive_key)
+            files.append({
+                "archive_key": archive_key,
+                "path": path,
+                "size_bytes": os.path.getsize(path) if os.path.exists(path) else 0,
+            })
+        return {
+            "hot_articles": self.db.query(func.count(NewsArticle.id)).scalar(),
+            "archived_articles": self.db.query(func.count(ArchivedArticleIndex.id)).scalar(),
+            "retention_days": settings.ARCHIVE_AFTER_DAYS,
+            "max_hot_articles": settings.ARCHIVE_MAX_HOT_ARTICLES,
+            "archives": files,
+        }
@@ -3,9 +3,11 @@
 """
 import json
 from typing import List, Optional
-from sqlalchemy.orm import Session
+from sqlalchemy.orm import Session, undefer
 from sqlalchemy import desc, asc
-from app.models.article import NewsArticle
+from app.models.article import NewsArticle, CATEGORY_SOURCE_USER
+from app.models.tag import ArticleTag
+from app.services.step_planner import STEP_CATEGORY
 from app.schemas.article import ArticleCreate, ArticleUpdate
 
 
@@ -16,8 +18,10 @@ class ArticleService:
         self.db = db
     
     def get_article(self, article_id: int) -> Optional[NewsArticle]:
-        """获取单个文章"""
-        return self.db.query(NewsArticle).filter(NewsArticle.id == article_id).first()
+        """获取单个文章（包含正文）"""
+        return self.db.query(NewsArticle).options(
+            undefer(NewsArticle.content)
+        ).filter(NewsArticle.id == article_id).first()
     
     def get_articles(
         self, 
@@ -27,7 +31,7 @@ class ArticleService:
         source_id: Optional[int] = None,
         tag_id: Optional[int] = None
     ) -> List[NewsArticle]:
-        """获取文章列表"""
+        """获取文章列表（正文为延迟加载列，不会随列表查询读取）"""
         query = self.db.query(NewsArticle)
         
         if category:
@@ -37,7 +41,6 @@ class ArticleService:
             query = query.filter(NewsArticle.source_id == source_id)
             
         if tag_id:
-            from app.models.tag import ArticleTag
             query = query.join(NewsArticle.article_tags).filter(ArticleTag.tag_id == tag_id)
         
         return query.order_by(desc(NewsArticle.published_at)).offset(skip).limit(limit).all()
@@ -58,7 +61,6 @@ class ArticleService:
             query = query.filter(NewsArticle.source_id == source_id)
 
         if tag_id:
-            from app.models.tag import ArticleTag
             query = query.join(NewsArticle.article_tags).filter(ArticleTag.tag_id == tag_id)
         
         return query.count()
@@ -95,6 +97,13 @@ class ArticleService:
             
         for field, value in update_data.items():
             setattr(db_article, field, value)
+        
+        # 人工修正的分类作为训练标签，且不再由 LLM 重跑分类步骤
+        if update_data.get('category'):
+            db_article.category_source = CATEGORY_SOURCE_USER
+            if db_article.pending_llm_steps:
+                steps = [step for step in json.loads(db_article.pending_llm_steps) if step != STEP_CATEGORY]
+                db_article.pending_llm_steps = json.dumps(steps) if steps else None
 
         self.db.commit()
         self.db.refresh(db_article)
@@ -106,6 +115,9 @@ class ArticleService:
         if not db_article:
             return False
         
+        from app.services.tag_service import TagService
+        TagService(self.db).unlink_article_tags(db_article)
+        
         self.db.delete(db_article)
         self.db.commit()
         return True
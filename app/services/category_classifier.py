@@ -0,0 +1,296 @@
+"""
+本地分类器 - 基于历史 LLM 分类结果训练的哈希 n-gram 多项式朴素贝叶斯
+
+特征沿用关键词提取的切分（中文 2~4 字片段、英文单词），按哈希计入固定数量的桶，
+标题中的词额外加权。模型由脚本从数据库训练并保存为 gzip 压缩的 JSON 文件，
+服务运行时检测到文件更新会自动重新加载。置信度达到阈值时直接采用本地分类，否则交给 LLM。
+"""
+import gzip
+import json
+import math
+import os
+import threading
+import zlib
+from collections import Counter
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+from sqlalchemy.orm import Session
+from app.models.article import NewsArticle, LLMProcessingStatus, CATEGORY_SOURCE_LLM, CATEGORY_SOURCE_USER
+from app.services.keyword_extractor import tokenize
+from app.config import settings
+import logging
+
+logger = logging.getLogger(__name__)
+
+MODEL_VERSION = 1
+DEFAULT_BUCKETS = 1 << 18
+MAX_CONTENT_CHARS = 3000  # 只取正文前若干字符
+_TITLE_WEIGHT = 2
+_ALPHA = 0.1  # 加性平滑系数
+_MIN_FEATURE_COUNT = 2  # 训练集中总次数低于该值的特征不写入模型
+_HOLDOUT_MODULUS = 10  # id % 10 == 0 的文章用于评估
+# 只用模型和人工给出的分类训练，避免学习本地分类器自己的输出
+TRAINING_CATEGORY_SOURCES = (CATEGORY_SOURCE_LLM, CATEGORY_SOURCE_USER)
+
+
+@dataclass(frozen=True)
+class CategoryPrediction:
+    """分类结果"""
+    category: str
+    confidence: float
+
+
+class CategoryClassifier:
+    """置信度门控的本地文章分类器"""
+
+    def __init__(self, path: Optional[str] = None, buckets: int = DEFAULT_BUCKETS):
+        self.path = path
+        self.buckets = buckets
+        self.categories: List[str] = []
+        self.metadata: Dict[str, Any] = {}
+        self._log_prior: List[float] = []
+        self._log_likelihood: List[Dict[int, float]] = []
+        self._log_unseen: List[float] = []
+        self._mtime: Optional[float] = None
+        self._lock = threading.Lock()
+        # 分类决策统计：本地直接采用 / 交给 LLM
+        self.local_decisions = 0
+        self.deferred_decisions = 0
+
+    def _bucket(self, term: str) -> int:
+        return zlib.crc32(term.encode("utf-8")) % self.buckets
+
+    def features(self, title: Optional[str], content: Optional[str]) -> Counter:
+        """文章的哈希特征计数"""
+        features: Counter = Counter()
+        for term, count in tokenize((content or "")[:MAX_CONTENT_CHARS])[0].items():
+            features[self._bucket(term)] += count
+        for term, count in tokenize(title)[0].items():
+            features[self._bucket(term)] += count * _TITLE_WEIGHT
+        return features
+
+    @property
+    def is_loaded(self) -> bool:
+        self._reload_if_changed()
+        return bool(self.categories)
+
+    def _reload_if_changed(self):
+        """模型文件被训练脚本更新后重新加载"""
+        if not self.path:
+            return
+        try:
+            mtime = os.path.getmtime(self.path)
+        except OSError:
+            return
+        if mtime == self._mtime:
+            return
+        with self._lock:
+            if mtime == self._mtime:
+                return
+            try:
+                with gzip.open(self.path, "rt", encoding="utf-8") as f:
+                    self._load_model(json.load(f))
+                logger.info(f"已加载分类模型: {self.path}")
+            except Exception as e:
+                logger.warning(f"读取分类模型失败: {e}")
+            self._mtime = mtime
+
+    def _load_model(self, model: Dict[str, Any]):
+        if model.get("version") != MODEL_VERSION or model.get("buckets") != self.buckets:
+            raise ValueError("模型版本或桶数量不匹配")
+        categories = model["categories"]
+        doc_counts = model["doc_counts"]
+        total_docs = sum(doc_counts)
+        log_prior, log_likelihood, log_unseen = [], [], []
+        for index in range(len(categories)):
+            counts = model["feature_counts"][index]
+            denominator = model["feature_totals"][index] + _ALPHA * self.buckets
+            log_prior.append(math.log((doc_counts[index] + 1) / (total_docs + len(categories))))
+            log_likelihood.append({
+                int(bucket): math.log((count + _ALPHA) / denominator) for bucket, count in counts.items()
+            })
+            log_unseen.append(math.log(_ALPHA / denominator))
+        self.categories = categories
+        self.metadata = model.get("metadata", {})
+        self._log_prior = log_prior
+        self._log_likelihood = log_likelihood
+        self._log_unseen = log_unseen
+
+    def classify(self, title: Optional[str], content: Optional[str]) -> Optional[CategoryPrediction]:
+        """对单篇文章分类，没有模型或没有可用特征时返回 None"""
+        if not self.is_loaded:
+            return None
+        features = self.features(title, content)
+        if not features:
+            return None
+        return self._classify_features(features)
+
+    def classify_many(
+        self,
+        documents: Sequence[Tuple[Optional[str], Optional[str]]]
+    ) -> List[Optional[CategoryPrediction]]:
+        """批量分类，documents 为 (标题, 正文) 列表，结果与输入一一对应"""
+        if not self.is_loaded:
+            return [None] * len(documents)
+        return [self.classify(title, content) for title, content in documents]
+
+    @staticmethod
+    def is_confident(prediction: Optional[CategoryPrediction]) -> bool:
+        """置信度是否足以跳过 LLM 分类"""
+        return prediction is not None and prediction.confidence >= settings.CATEGORY_CLASSIFIER_MIN_CONFIDENCE
+
+    def record_decision(self, local: bool, count: int = 1):
+        """记录分类由本地完成还是交给了 LLM"""
+        with self._lock:
+            if local:
+                self.local_decisions += count
+            else:
+                self.deferred_decisions += count
+
+    def train_from_db(self, db: Session, categories: Sequence[str], batch_size: int = 1000) -> Dict[str, Any]:
+        """用已完成 LLM 处理的文章训练模型并保存，返回留出集评估结果
+
+        只使用分类来源为 LLM 或人工的文章；id 尾数为 0 的文章先作为留出集评估，评估后再计入模型。
+        """
+        index_of = {category: i for i, category in enumerate(categories)}
+        train = _Counts(len(categories))
+        holdout: List[Tuple[int, Counter]] = []
+
+        last_id = 0
+        while True:
+            rows = db.query(
+                NewsArticle.id, NewsArticle.title, NewsArticle.summary, NewsArticle.content, NewsArticle.category
+            ).filter(
+                NewsArticle.id > last_id,
+                NewsArticle.llm_processing_status == LLMProcessingStatus.COMPLETED,
+                NewsArticle.category.in_(list(categories)),
+                NewsArticle.category_source.in_(TRAINING_CATEGORY_SOURCES)
+            ).order_by(NewsArticle.id).limit(batch_size).all()
+            if not rows:
+                break
+            for row in rows:
+                features = self.features(row.title, row.content or row.summary)
+                if not features:
+                    continue
+                if row.id % _HOLDOUT_MODULUS == 0:
+                    holdout.append((index_of[row.category], features))
+                else:
+                    train.add(index_of[row.category], features)
+            last_id = rows[-1].id
+
+        if not any(train.doc_counts):
+            raise ValueError("没有可用于训练的已分类文章")
+
+        evaluation = self._evaluate(train.to_model(list(categories), self.buckets), holdout, categories)
+        for category_index, features in holdout:
+            train.add(category_index, features)
+
+        model = train.to_model(list(categories), self.buckets)
+        model["metadata"] = {
+            "trained_at": datetime.utcnow().isoformat(),
+            "documents": sum(train.doc_counts),
+            "features": sum(len(counts) for counts in model["feature_counts"]),
+            **evaluation,
+        }
+        self._save_model(model)
+        with self._lock:
+            self._load_model(model)
+        return model["metadata"]
+
+    def _evaluate(
+        self,
+        model: Dict[str, Any],
+        holdout: List[Tuple[int, Counter]],
+        categories: Sequence[str]
+    ) -> Dict[str, Any]:
+        """留出集上的整体准确率，以及达到置信度阈值部分的覆盖率与准确率"""
+        if not holdout:
+            return {"holdout_documents": 0}
+        evaluator = CategoryClassifier(buckets=self.buckets)
+        evaluator._load_model(model)
+        threshold = settings.CATEGORY_CLASSIFIER_MIN_CONFIDENCE
+        correct = confident = confident_correct = 0
+        for category_index, features in holdout:
+            prediction = evaluator._classify_features(features)
+            hit = prediction.category == categories[category_index]
+            correct += hit
+            if prediction.confidence >= threshold:
+                confident += 1
+                confident_correct += hit
+        return {
+            "holdout_documents": len(holdout),
+            "holdout_accuracy": round(correct / len(holdout), 4),
+            "threshold": threshold,
+            "confident_coverage": round(confident / len(holdout), 4),
+            "confident_accuracy": round(confident_correct / confident, 4) if confident else None,
+        }
+
+    def _classify_features(self, features: Counter) -> CategoryPrediction:
+        scores = list(self._log_prior)
+        for bucket, count in features.items():
+            for index, likelihood in enumerate(self._log_likelihood):
+                scores[index] += count * likelihood.get(bucket, self._log_unseen[index])
+        best = max(range(len(scores)), key=scores.__getitem__)
+        # softmax 归一化得到后验概率
+        total = sum(math.exp(score - scores[best]) for score in scores)
+        return CategoryPrediction(self.categories[best], round(1.0 / total, 4))
+
+    def _save_model(self, model: Dict[str, Any]):
+        """原子写入模型文件"""
+        if not self.path:
+            return
+        os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+        tmp_path = f"{self.path}.tmp"
+        with gzip.open(tmp_path, "wt", encoding="utf-8") as f:
+            json.dump(model, f, ensure_ascii=False, separators=(",", ":"))
+        os.replace(tmp_path, self.path)
+        self._mtime = os.path.getmtime(self.path)
+
+    def get_stats(self) -> Dict[str, Any]:
+        """模型信息与 LLM 分类的回退比例"""
+        decisions = self.local_decisions + self.deferred_decisions
+        return {
+            "model_loaded": self.is_loaded,
+            "model_path": self.path,
+            "min_confidence": settings.CATEGORY_CLASSIFIER_MIN_CONFIDENCE,
+            "local_decisions": self.local_decisions,
+            "deferred_decisions": self.deferred_decisions,
+            "deferral_rate": round(self.deferred_decisions / decisions, 4) if decisions else None,
+            "model": self.metadata,
+        }
+
+
+class _Counts:
+    """训练时累计的各分类文档数与特征计数"""
+
+    def __init__(self, size: int):
+        self.doc_counts = [0] * size
+        self.feature_counts: List[Counter] = [Counter() for _ in range(size)]
+
+    def add(self, category_index: int, features: Counter):
+        self.doc_counts[category_index] += 1
+        self.feature_counts[category_index].update(features)
+
+    def to_model(self, categories: List[str], buckets: int) -> Dict[str, Any]:
+        # 只保留在全部分类中合计出现足够次数的特征，控制模型文件大小
+        totals: Counter = Counter()
+        for counts in self.feature_counts:
+            totals.update(counts)
+        kept = {bucket for bucket, count in totals.items() if count >= _MIN_FEATURE_COUNT}
+        feature_counts = [
+            {str(bucket): count for bucket, count in counts.items() if bucket in kept}
+            for counts in self.feature_counts
+        ]
+        return {
+            "version": MODEL_VERSION,
+            "buckets": buckets,
+            "categories": categories,
+            "doc_counts": list(self.doc_counts),
+            "feature_counts": feature_counts,
+            "feature_totals": [sum(counts.values()) for counts in feature_counts],
+        }
+
+
+# 全局分类器实例
+category_classifier = CategoryClassifier(settings.CATEGORY_MODEL_PATH)
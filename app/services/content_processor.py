@@ -2,15 +2,55 @@
 内容处理服务 - 使用策略模式集成 LLM 能力
 """
 import asyncio
-from typing import Dict, Any, List
+import json
+from typing import Dict, Any, List, Tuple, AsyncIterator, Optional
 from datetime import datetime
+from sqlalchemy.orm import Session
 from app.services.llm_manager import LLMServiceManager
-from app.models.article import NewsArticle, LLMProcessingStatus
+from app.services.llm_interface import LLMProcessingError
+from app.services import llm_structured
+from app.services.llm_usage import track_usage
+from app.services.keyword_extractor import keyword_extractor
+from app.services.step_planner import (
+    step_planner, ALL_STEPS, STEP_CATEGORY, STEP_KEYWORDS, STEP_LANGUAGE, STEP_SUMMARY, STEP_TITLE
+)
+from app.utils import language_detect
+from app.models.article import NewsArticle, LLMProcessingStatus, CATEGORY_SOURCE_LLM, CATEGORY_SOURCE_LOCAL, CATEGORY_SOURCE_USER
 from app.config import settings
 import logging
 
 logger = logging.getLogger(__name__)
 
+CATEGORIES = ["科技", "财经", "体育", "娱乐", "政治", "社会", "教育", "健康", "其他"]
+CHINESE_LANGUAGES = ("zh", "zh-cn", "chinese")  # 与适配器 translate_to_chinese 跳过翻译的语言一致
+
+# 处理步骤与处理结果字段的对应关系
+STEP_RESULT_KEYS = {
+    STEP_LANGUAGE: "original_language",
+    STEP_TITLE: "chinese_title",
+    STEP_SUMMARY: "llm_summary",
+    STEP_KEYWORDS: "keywords",
+    STEP_CATEGORY: "category",
+}
+
+# 管理器方法与处理步骤的对应关系，用于标记哪些步骤的结果来自降级提供商
+METHOD_STEPS = {
+    "detect_language": STEP_LANGUAGE,
+    "translate_to_chinese": STEP_TITLE,
+    "summarize_content": STEP_SUMMARY,
+    "extract_keywords": STEP_KEYWORDS,
+    "categorize_article": STEP_CATEGORY,
+}
+
+# 处理步骤与合并调用 JSON 字段的对应关系
+STEP_FIELDS = {
+    STEP_LANGUAGE: llm_structured.FIELD_LANGUAGE,
+    STEP_TITLE: llm_structured.FIELD_CHINESE_TITLE,
+    STEP_SUMMARY: llm_structured.FIELD_SUMMARY,
+    STEP_KEYWORDS: llm_structured.FIELD_KEYWORDS,
+    STEP_CATEGORY: llm_structured.FIELD_CATEGORY,
+}
+
 
 class ContentProcessorService:
     """内容处理服务 - 使用策略模式集成 LLM 能力"""
@@ -18,12 +58,31 @@ class ContentProcessorService:
     def __init__(self, llm_manager: LLMServiceManager):
         self.llm_manager = llm_manager
     
-    async def process_article_content(self, article: NewsArticle) -> Dict[str, Any]:
-        """综合处理文章内容"""
+    async def process_article_content(
+        self, article: NewsArticle, prefilled: Optional[Dict[str, Any]] = None
+    ) -> Dict[str, Any]:
+        """综合处理文章内容，结果中附带本次实际消耗的提示词 token 数
+        
+        prefilled 为批量调用已得到的合并字段（见 prefill_batch），对应步骤不再单独调用。
+        结果来自降级提供商的步骤列在 degraded_steps 中。
+        """
+        with track_usage() as usage:
+            result = await self._process_with_timeout(article, prefilled or {})
+        result["prompt_tokens"] = usage.prompt_tokens
+        degraded_steps = [
+            step for step in ALL_STEPS
+            if step in {METHOD_STEPS.get(method) for method in usage.degraded_methods}
+            and STEP_RESULT_KEYS[step] in result
+        ]
+        if degraded_steps:
+            result["degraded_steps"] = degraded_steps
+        return result
+    
+    async def _process_with_timeout(self, article: NewsArticle, prefilled: Dict[str, Any]) -> Dict[str, Any]:
         try:
             # 使用超时包装整个处理过程
             return await asyncio.wait_for(
-                self._process_article_content_internal(article),
+                self._process_article_content_internal(article, prefilled),
                 timeout=settings.LLM_ASYNC_TIMEOUT
             )
         except asyncio.TimeoutError:
@@ -39,9 +98,7 @@ class ContentProcessorService:
                 "error": str(e)
             }
     
-    async def _process_article_content_internal(self, article: NewsArticle) -> Dict[str, Any]:
-        """内部处理方法 - 不包含超时包装"""
-    async def _process_article_content_internal(self, article: NewsArticle) -> Dict[str, Any]:
+    async def _process_article_content_internal(self, article: NewsArticle, prefilled: Dict[str, Any]) -> Dict[str, Any]:
         """内部处理方法 - 不包含超时包装"""
         content = article.content or article.summary or ""
         title = article.title or ""
@@ -49,37 +106,219 @@ class ContentProcessorService:
         if not content.strip():
             raise ValueError("文章内容为空")
         
-        # 检测语言
-        original_language = await self.llm_manager.detect_language(f"{title} {content}")
-        
-        # 翻译标题
-        chinese_title = await self.llm_manager.translate_to_chinese(title, original_language)
+        # 规划阶段：源配置跳过的步骤不执行，可本地完成的步骤（中文标题、中文短文、确定的分类）不调用 LLM
+        plan = step_planner.plan(article, self.get_pending_steps(article), title, content)
+        if plan.reasons:
+            logger.debug(f"文章 {article.id} 不调用 LLM 的步骤: {plan.reasons}")
         
-        # 生成摘要
-        llm_summary = await self.llm_manager.summarize_content(content, target_length=400)
+        combined = {**prefilled, **await self._process_combined(
+            title, content, plan.llm_steps, prefilled, plan.summary_length
+        )}
+        outcomes = await self._run_steps(article, title, content, plan.llm_steps, combined, plan.summary_length)
+        outcomes.update(plan.local)
         
-        # 提取关键词
-        keywords = await self.llm_manager.extract_keywords(content, max_keywords=5)
+        # 单个步骤失败不影响其余步骤，全部失败才视为文章处理失败
+        steps = plan.run_steps
+        failed_steps = [step for step in steps if isinstance(outcomes.get(step), BaseException)]
+        for step in failed_steps:
+            logger.warning(f"文章 {article.id} 的 {step} 步骤失败: {outcomes[step]}")
+        if steps and len(failed_steps) == len(steps):
+            raise LLMProcessingError(f"所有处理步骤都失败: {outcomes[failed_steps[0]]}")
         
-        categories = ["科技", "财经", "体育", "娱乐", "政治", "社会", "教育", "健康", "其他"]
-        raw_category = await self.llm_manager.categorize_article(title, content, categories)
+        result: Dict[str, Any] = {}
+        for step, value in outcomes.items():
+            if not isinstance(value, BaseException):
+                result[STEP_RESULT_KEYS[step]] = value
+        if failed_steps:
+            result["failed_steps"] = failed_steps
+        if plan.reasons:
+            result["skipped_steps"] = dict(plan.reasons)
         
-        # Clean up category - try to find one of the valid categories in the output
-        category = "其他"
-        for cat in categories:
-            if cat in raw_category:
-                category = cat
-                break
-        
-        return {
-            "chinese_title": chinese_title,
-            "llm_summary": llm_summary,
-            "original_language": original_language,
-            "keywords": keywords,
-            "category": category,
+        result.update({
             "llm_processed_at": datetime.utcnow(),
             "llm_processing_status": LLMProcessingStatus.COMPLETED
+        })
+        return result
+    
+    async def _run_steps(
+        self,
+        article: NewsArticle,
+        title: str,
+        content: str,
+        steps: Tuple[str, ...],
+        combined: Dict[str, Any],
+        summary_length: int = 400
+    ) -> Dict[str, Any]:
+        """按依赖关系并发执行各步骤，返回 步骤 -> 结果或异常
+        
+        只有标题翻译依赖语言检测，摘要、关键词和分类互不依赖；合并调用已给出的字段直接复用。
+        """
+        async def detect_language() -> str:
+            if llm_structured.FIELD_LANGUAGE in combined:
+                return combined[llm_structured.FIELD_LANGUAGE]
+            return await self.llm_manager.detect_language(f"{title} {content}")
+        
+        # 仅重译标题且已有语言时沿用原结果
+        language_task = None
+        if STEP_LANGUAGE in steps or (STEP_TITLE in steps and not article.original_language):
+            language_task = asyncio.ensure_future(detect_language())
+        
+        async def translate_title() -> str:
+            if llm_structured.FIELD_CHINESE_TITLE in combined:
+                return combined[llm_structured.FIELD_CHINESE_TITLE]
+            source_language = article.original_language or "auto"
+            if language_task is not None:
+                try:
+                    source_language = await language_task
+                except Exception:
+                    pass  # 语言检测失败时仍按自动识别翻译
+            return await self.llm_manager.translate_to_chinese(title, source_language)
+        
+        async def summarize() -> str:
+            if llm_structured.FIELD_SUMMARY in combined:
+                return combined[llm_structured.FIELD_SUMMARY]
+            return await self.llm_manager.summarize_content(content, target_length=summary_length)
+        
+        async def extract_keywords() -> List[str]:
+            if llm_structured.FIELD_KEYWORDS in combined:
+                return combined[llm_structured.FIELD_KEYWORDS]
+            if self.local_keywords():
+                return keyword_extractor.extract(title, content, max_keywords=5)
+            return await self.llm_manager.extract_keywords(content, max_keywords=5)
+        
+        async def categorize() -> str:
+            if llm_structured.FIELD_CATEGORY in combined:
+                return combined[llm_structured.FIELD_CATEGORY]
+            return self.normalize_category(await self.llm_manager.categorize_article(title, content, CATEGORIES))
+        
+        tasks: Dict[str, Any] = {}
+        if language_task is not None:
+            tasks[STEP_LANGUAGE] = language_task
+        step_functions = {
+            STEP_TITLE: translate_title,
+            STEP_SUMMARY: summarize,
+            STEP_KEYWORDS: extract_keywords,
+            STEP_CATEGORY: categorize,
         }
+        for step, func in step_functions.items():
+            if step in steps:
+                tasks[step] = func()
+        
+        values = await asyncio.gather(*tasks.values(), return_exceptions=True)
+        return dict(zip(tasks.keys(), values))
+    
+    async def _process_combined(
+        self,
+        title: str,
+        content: str,
+        steps: Tuple[str, ...],
+        prefilled: Dict[str, Any],
+        summary_length: int = 400
+    ) -> Dict[str, Any]:
+        """合并模式：一次调用拿到多个步骤的结果，失败时返回空字典由各步骤单独回退"""
+        if not settings.LLM_COMBINED_PROCESSING:
+            return {}
+        
+        fields = [STEP_FIELDS[step] for step in steps if STEP_FIELDS[step] not in prefilled]
+        # 关键词本地提取、离线语言检测足够可靠时，不再让模型输出这些字段
+        if self.local_keywords() and llm_structured.FIELD_KEYWORDS in fields:
+            fields.remove(llm_structured.FIELD_KEYWORDS)
+        if llm_structured.FIELD_LANGUAGE in fields and \
+                language_detect.detect(f"{title} {content}").confidence >= settings.LANGUAGE_DETECT_MIN_CONFIDENCE:
+            fields.remove(llm_structured.FIELD_LANGUAGE)
+        if len(fields) < 2:
+            return {}
+        
+        try:
+            combined = await self.llm_manager.process_article_combined(
+                title, content, CATEGORIES, target_length=summary_length, max_keywords=5, fields=fields
+            )
+        except Exception as e:
+            logger.warning(f"合并处理失败，回退到逐项调用: {e}")
+            return {}
+        
+        missing = [field for field in fields if field not in combined]
+        if missing:
+            logger.info(f"合并处理缺少字段 {missing}，逐项补齐")
+        return combined
+    
+    @staticmethod
+    def local_keywords() -> bool:
+        """关键词是否由本地 TF-IDF 提取（LLM 提取作为可选项，语料不足时也交给 LLM）"""
+        return settings.KEYWORD_EXTRACTION_MODE == "local" and keyword_extractor.is_ready()
+    
+    @staticmethod
+    def get_pending_steps(article: NewsArticle) -> Tuple[str, ...]:
+        """获取文章需要执行的 LLM 步骤（修订后只重跑受影响的步骤）"""
+        if not article.pending_llm_steps:
+            return ALL_STEPS
+        try:
+            steps = set(json.loads(article.pending_llm_steps))
+        except (TypeError, ValueError):
+            return ALL_STEPS
+        return tuple(step for step in ALL_STEPS if step in steps) or ALL_STEPS
+    
+    @staticmethod
+    def normalize_category(raw_category: str) -> str:
+        """从 LLM 输出中找出合法分类"""
+        # Clean up category - try to find one of the valid categories in the output
+        for cat in CATEGORIES:
+            if cat in (raw_category or ""):
+                return cat
+        return "其他"
+    
+    @staticmethod
+    def apply_result(article: NewsArticle, result: Dict[str, Any]) -> bool:
+        """将处理结果写回文章对象（不提交），返回是否处理成功
+        
+        只更新结果中包含的字段，部分步骤重跑时不会覆盖其余字段；
+        失败的步骤和结果来自降级提供商的步骤记录在 pending_llm_steps 中，下次处理时只重跑这些步骤；
+        文章仍标记为 COMPLETED（已有结果可展示），由后台任务重跑剩余步骤。
+        """
+        # 失败的处理同样消耗了 token，累计到文章上
+        if result.get("prompt_tokens"):
+            article.prompt_tokens = (article.prompt_tokens or 0) + result["prompt_tokens"]
+        
+        if result.get("llm_processing_status") != LLMProcessingStatus.COMPLETED:
+            article.llm_processing_status = LLMProcessingStatus.FAILED
+            return False
+        
+        for field in ("chinese_title", "llm_summary", "original_language", "llm_processed_at"):
+            if field in result:
+                setattr(article, field, result[field])
+        
+        # 更新关键词和分类
+        if result.get("keywords"):
+            article.tags = json.dumps(result["keywords"], ensure_ascii=False)
+        degraded_steps = result.get("degraded_steps") or []
+        # 人工修正的分类优先，不被模型结果覆盖
+        if result.get("category") and article.category_source != CATEGORY_SOURCE_USER:
+            article.category = result["category"]
+            # 规划阶段或降级时由本地分类器给出的分类不能再用于训练分类器
+            local = STEP_CATEGORY in (result.get("skipped_steps") or {}) or STEP_CATEGORY in degraded_steps
+            article.category_source = CATEGORY_SOURCE_LOCAL if local else CATEGORY_SOURCE_LLM
+        
+        failed_steps = result.get("failed_steps") or []
+        rerun = set(failed_steps) | set(degraded_steps)
+        article.pending_llm_steps = json.dumps([step for step in ALL_STEPS if step in rerun]) if rerun else None
+        article.llm_degraded = bool(degraded_steps)
+        # 有步骤失败时累计次数，后台空闲时重跑，达到 LLM_STEP_MAX_ATTEMPTS 后不再重跑
+        article.llm_step_attempts = (article.llm_step_attempts or 0) + 1 if failed_steps else 0
+        article.llm_processing_status = LLMProcessingStatus.COMPLETED
+        return True
+    
+    @staticmethod
+    def revised_since(db: Session, article: NewsArticle, revision: Optional[int]) -> bool:
+        """处理期间文章是否产生了新修订（聚合服务在另一会话中提交）
+        
+        产生新修订的文章已由聚合服务重新排队，此时的处理结果针对旧内容，不应写回；
+        返回 True 时文章已从会话中过期，不会被随后的提交覆盖。
+        """
+        db.refresh(article, ["revision"])
+        if article.revision == revision:
+            return False
+        db.expire(article)
+        return True
     
     async def batch_process_articles(self, articles: List[NewsArticle]) -> List[Dict[str, Any]]:
         """批量处理文章 - 带超时控制"""
@@ -115,8 +354,189 @@ class ContentProcessorService:
     async def _batch_process_articles_internal(self, articles: List[NewsArticle]) -> List[Dict[str, Any]]:
         """内部批量处理方法"""
         results = []
-        for article in articles:
-            result = await self.process_article_content(article)
+        async for article, result in self.iter_process_articles(articles):
             result["article_id"] = article.id
             results.append(result)
         return results
+    
+    async def iter_process_articles(
+        self,
+        articles: List[NewsArticle],
+        max_concurrency: Optional[int] = None
+    ) -> AsyncIterator[Tuple[NewsArticle, Dict[str, Any]]]:
+        """并发处理多篇文章，按完成顺序产出 (文章, 处理结果)
+        
+        同时处理的文章数默认取 LLMConfig.max_concurrent_tasks，单篇超时由 process_article_content 控制。
+        """
+        limit = max_concurrency or self.llm_manager.config.max_concurrent_tasks
+        semaphore = asyncio.Semaphore(max(1, limit))
+        prefilled: Dict[int, Dict[str, Any]] = {}
+        shared_tokens: Dict[int, int] = {}
+        if settings.LLM_BATCH_PROMPTS and len(articles) > 1:
+            prefilled, shared_tokens = await self.prefill_batch(articles)
+        
+        async def run(article: NewsArticle) -> Tuple[NewsArticle, Dict[str, Any]]:
+            async with semaphore:
+                result = await self.process_article_content(article, prefilled.get(article.id))
+            if shared_tokens.get(article.id):
+                result["prompt_tokens"] = result.get("prompt_tokens", 0) + shared_tokens[article.id]
+            return article, result
+        
+        tasks = [asyncio.ensure_future(run(article)) for article in articles]
+        try:
+            for next_done in asyncio.as_completed(tasks):
+                yield await next_done
+        finally:
+            for task in tasks:
+                if not task.done():
+                    task.cancel()
+    
+    async def prefill_batch(
+        self, articles: List[NewsArticle]
+    ) -> Tuple[Dict[int, Dict[str, Any]], Dict[int, int]]:
+        """把多篇文章的语言检测、标题翻译和分类合并为少数几次批量调用
+        
+        Returns:
+            (文章 id -> 已得到的合并字段, 文章 id -> 分摊的提示词 token 数)；
+            批量输出中缺失或不合法的条目不出现在结果中，由单篇处理逐项补齐
+        """
+        with track_usage() as usage:
+            try:
+                prefilled = await asyncio.wait_for(self._prefill_batch(articles), timeout=settings.LLM_SINGLE_TIMEOUT)
+            except Exception as e:
+                logger.warning(f"批量预处理失败，逐篇处理: {e}")
+                prefilled = {}
+        shared_tokens: Dict[int, int] = {}
+        if prefilled and usage.prompt_tokens:
+            share = usage.prompt_tokens // len(prefilled)
+            shared_tokens = {article_id: share for article_id in prefilled}
+        return prefilled, shared_tokens
+    
+    async def _prefill_batch(self, articles: List[NewsArticle]) -> Dict[int, Dict[str, Any]]:
+        fields: Dict[int, Dict[str, Any]] = {}
+        pending = [
+            (article, step_planner.plan(article, self.get_pending_steps(article), record=False).llm_steps)
+            for article in articles
+            if (article.content or article.summary or "").strip()
+        ]
+        
+        # 标题翻译需要源语言，先检测语言
+        need_language = [
+            article for article, steps in pending
+            if STEP_LANGUAGE in steps or (STEP_TITLE in steps and not article.original_language)
+        ]
+        if need_language:
+            languages = await self.llm_manager.detect_languages_batch(
+                [f"{article.title or ''} {article.content or article.summary}" for article in need_language]
+            )
+            for article, language in zip(need_language, languages):
+                if language:
+                    fields.setdefault(article.id, {})[llm_structured.FIELD_LANGUAGE] = language
+        
+        titles: List[NewsArticle] = []
+        for article, steps in pending:
+            if STEP_TITLE not in steps or not article.title:
+                continue
+            language = fields.get(article.id, {}).get(llm_structured.FIELD_LANGUAGE) or article.original_language
+            if (language or "").lower() in CHINESE_LANGUAGES:
+                fields.setdefault(article.id, {})[llm_structured.FIELD_CHINESE_TITLE] = article.title
+            else:
+                titles.append(article)
+        
+        # 规划阶段已去掉本地分类器足够确定的文章，由单篇处理直接采用本地结果
+        uncategorized = [article for article, steps in pending if STEP_CATEGORY in steps]
+        
+        async def no_results() -> List[Optional[str]]:
+            return []
+        
+        translated, categories = await asyncio.gather(
+            self.llm_manager.translate_titles_batch([article.title for article in titles]) if titles else no_results(),
+            self.llm_manager.categorize_batch(
+                [(article.title or "", (article.content or article.summary)[:500]) for article in uncategorized],
+                CATEGORIES
+            ) if uncategorized else no_results()
+        )
+        for article, chinese_title in zip(titles, translated):
+            if chinese_title:
+                fields.setdefault(article.id, {})[llm_structured.FIELD_CHINESE_TITLE] = chinese_title
+        for article, category in zip(uncategorized, categories):
+            if category:
+                fields.setdefault(article.id, {})[llm_structured.FIELD_CATEGORY] = category
+
+        return fields
+    
+    async def process_and_save(
+        self,
+        db: Session,
+        articles: List[NewsArticle],
+        max_concurrency: Optional[int] = None,
+        commit_batch_size: Optional[int] = None
+    ) -> Dict[str, int]:
+        """并发处理文章并在结果陆续返回时小批量提交
+        
+        Returns:
+            {"processed_count": 成功数, "failed_count": 失败数}
+        """
+        commit_batch_size = commit_batch_size or settings.LLM_COMMIT_BATCH_SIZE
+        processed_count = 0
+        failed_count = 0
+        uncommitted = 0
+        
+        # 提交后不让对象过期，避免并发处理中途触发重新加载正文
+        expire_on_commit = db.expire_on_commit
+        db.expire_on_commit = False
+        revisions = {article.id: article.revision for article in articles}
+        done = set()
+        try:
+            for article in articles:
+                article.llm_processing_status = LLMProcessingStatus.PROCESSING
+            db.commit()
+            
+            async for article, result in self.iter_process_articles(articles, max_concurrency):
+                article_id = article.id
+                done.add(article_id)
+                if self.revised_since(db, article, revisions[article_id]):
+                    logger.info(f"文章 {article_id} 处理期间产生新修订，丢弃本次结果")
+                elif self.apply_result(article, result):
+                    processed_count += 1
+                    logger.info(f"文章 {article_id} 处理成功")
+                else:
+                    failed_count += 1
+                    logger.error(f"文章 {article_id} 处理失败: {result.get('error', '未知错误')}")
+                
+                uncommitted += 1
+                if uncommitted >= commit_batch_size:
+                    db.commit()
+                    uncommitted = 0
+            
+            if uncommitted:
+                db.commit()
+        finally:
+            # 被取消或出错时，尚未产出结果的文章恢复为 PENDING，不会一直停留在 PROCESSING
+            unfinished = [article_id for article_id in revisions if article_id not in done]
+            if unfinished:
+                self._release_unfinished(db, unfinished)
+            db.expire_on_commit = expire_on_commit
+        
+        return {"processed_count": processed_count, "failed_count": failed_count}
+    
+    @staticmethod
+    def _release_unfinished(db: Session, article_ids: List[int]):
+        """把仍处于 PROCESSING 的文章恢复为 PENDING 并提交（同时提交已写回但未提交的结果）"""
+        for attempt in range(2):
+            try:
+                db.query(NewsArticle).filter(
+                    NewsArticle.id.in_(article_ids),
+                    NewsArticle.llm_processing_status == LLMProcessingStatus.PROCESSING
+                ).update(
+                    {NewsArticle.llm_processing_status: LLMProcessingStatus.PENDING},
+                    synchronize_session="fetch"
+                )
+                db.commit()
+                logger.warning(f"{len(article_ids)} 篇文章未处理完成，已恢复为待处理")
+                return
+            except Exception as e:
+                # 会话处于失败状态（例如提交出错）时先回滚再重试一次
+                db.rollback()
+                if attempt:
+                    logger.error(f"恢复未完成文章的状态失败: {e}")
@@ -0,0 +1,106 @@
+"""
+本地抽取式摘要 - 所有 LLM 提供商不可用时的降级摘要
+
+按句切分正文（中文句末标点与英文句点都能切开），每句用关键词提取的候选词
+（中文 2~4 字片段、英文单词）按语料 IDF 加权成 TF-IDF 向量，以句子间余弦相似度
+为边权运行 TextRank；新闻的导语信息量最大，得分再乘以随位置递减的加成。
+按得分从高到低选句直到达到目标长度，再按原文顺序拼接。纯 Python 实现，
+几十句的正文耗时在毫秒级。
+"""
+import math
+import re
+from typing import Callable, Dict, List, Optional
+from app.services.keyword_extractor import keyword_extractor, tokenize
+from app.utils import text_budget
+
+DAMPING = 0.85
+MAX_ITERATIONS = 50
+TOLERANCE = 1e-6
+MAX_SENTENCES = 200  # 只对前若干句排序，相似度矩阵为平方复杂度
+MIN_SENTENCE_CHARS = 8  # 过短的句子（小标题、图片说明）不选入摘要
+LEAD_BONUS = 0.5  # 第 i 句的得分乘以 1 + LEAD_BONUS / (1 + i)
+OVERRUN = 1.2  # 已有句子时，加入下一句后不超过目标长度的该倍数
+
+_CJK_END_RE = re.compile(r"[一-鿿。！？；：”’」』）]$")
+_CJK_START_RE = re.compile(r"[一-鿿“‘「『（]")
+
+
+def summarize(text: Optional[str], target_length: int = 400, idf: Optional[Callable[[str], float]] = None) -> str:
+    """抽取不超过约 target_length 字的摘要，正文为空时返回空字符串"""
+    # 重复的句子（转载拼接、短句模板）只保留第一次出现，否则彼此相似会抬高得分；clean_content 只对长行去重
+    sentences = list(dict.fromkeys(s.strip() for s in text_budget.split_sentences(text_budget.clean_content(text))))
+    sentences = [s for s in sentences if s][:MAX_SENTENCES]
+    if not sentences:
+        return ""
+    if sum(len(s) for s in sentences) <= target_length:
+        return _join(sentences)
+
+    idf = idf or keyword_extractor.idf
+    scores = _rank([_vector(sentence, idf) for sentence in sentences])
+    ranked = sorted(
+        range(len(sentences)),
+        key=lambda i: scores[i] * (1 + LEAD_BONUS / (1 + i)),
+        reverse=True
+    )
+
+    chosen: List[int] = []
+    length = 0
+    for i in ranked:
+        if len(sentences[i]) < MIN_SENTENCE_CHARS:
+            continue
+        # 放不下时停止，不再用排名靠后的短句凑长度
+        if chosen and length + len(sentences[i]) > target_length * OVERRUN:
+            break
+        chosen.append(i)
+        length += len(sentences[i])
+        if length >= target_length:
+            break
+    if not chosen:
+        chosen = [ranked[0]]
+    return _join([sentences[i] for i in sorted(chosen)])
+
+
+def _vector(sentence: str, idf: Callable[[str], float]) -> Dict[str, float]:
+    counts, _ = tokenize(sentence)
+    vector = {term: (1 + math.log(tf)) * idf(term) for term, tf in counts.items()}
+    norm = math.sqrt(sum(value * value for value in vector.values()))
+    return {term: value / norm for term, value in vector.items()} if norm else {}
+
+
+def _rank(vectors: List[Dict[str, float]]) -> List[float]:
+    """以余弦相似度为边权的 TextRank（加权 PageRank）"""
+    n = len(vectors)
+    weights = [[0.0] * n for _ in range(n)]
+    for i in range(n):
+        for j in range(i + 1, n):
+            small, large = sorted((vectors[i], vectors[j]), key=len)
+            similarity = sum(value * large.get(term, 0.0) for term, value in small.items())
+            weights[i][j] = weights[j][i] = similarity
+    out_weights = [sum(row) for row in weights]
+
+    scores = [1.0 / n] * n
+    for _ in range(MAX_ITERATIONS):
+        # 与其他句子都不相似的句子把得分平均分给所有句子
+        dangling = sum(scores[j] for j in range(n) if out_weights[j] == 0)
+        updated = [
+            (1 - DAMPING) / n + DAMPING * (
+                dangling / n
+                + sum(weights[j][i] / out_weights[j] * scores[j] for j in range(n) if weights[j][i])
+            )
+            for i in range(n)
+        ]
+        converged = sum(abs(a - b) for a, b in zip(updated, scores)) < TOLERANCE
+        scores = updated
+        if converged:
+            break
+    return scores
+
+
+def _join(sentences: List[str]) -> str:
+    """中文句子直接相连，其余以空格分隔"""
+    parts: List[str] = []
+    for sentence in sentences:
+        if parts and not (_CJK_END_RE.search(parts[-1]) and _CJK_START_RE.match(sentence)):
+            parts.append(" ")
+        parts.append(sentence)
+    return "".join(parts)
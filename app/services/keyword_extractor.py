@@ -0,0 +1,282 @@
+"""
+本地关键词提取 - 基于语料文档频率的 TF-IDF
+
+文档频率（DF）在文章入库时增量更新，按词哈希计入固定数量的桶中并定期落盘，
+内存与文件大小与语料规模无关。中文按连续汉字切出 2~4 字的候选词，
+英文按单词切分并过滤停用词。提取时标题中的词额外加权，并去掉相互重叠的中文候选。
+语料文档数不足 KEYWORD_MIN_CORPUS_DOCUMENTS 时不使用本地提取。
+"""
+import math
+import os
+import re
+import struct
+import sys
+import threading
+import zlib
+from array import array
+from collections import Counter
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+from sqlalchemy.orm import Session
+from app.models.article import NewsArticle
+from app.config import settings
+import logging
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_BUCKETS = 1 << 18
+_FILE_MAGIC = b"KWDF"
+_HEADER = struct.Struct("<4sII")
+
+_LATIN_RE = re.compile(r"[A-Za-z][A-Za-z0-9+#.\-]*[A-Za-z0-9+#]|[A-Za-z]")
+_CJK_RUN_RE = re.compile(r"[一-鿿㐀-䶿]+")
+# 虚词与常见单字，出现在候选词中则丢弃该候选
+_CJK_STOP_CHARS = "的了是在和与也就都而及等这那我你他她它们个之以于上下中对将被把从到说有一不着很或其该此并且但"
+_CJK_STOP_RE = re.compile(f"[{_CJK_STOP_CHARS}]")
+_LATIN_STOPWORDS = frozenset("""
+a about above after again against all also am an and any are as at be because been before being below
+between both but by can could did do does doing down during each few for from further had has have having
+he her here hers herself him himself his how however i if in into is it its itself just last like made make
+many may me more most much must my new news no nor not now of off on once one only or other our ours out
+over own per said same says she should so some such than that the their theirs them then there these they
+this those through to too two under until up us very was we were what when where which while who whom why
+will with would year years you your
+""".split())
+
+_CJK_MIN_N = 2
+_CJK_MAX_N = 4
+_TITLE_BOOST = 2.0
+_LENGTH_BOOST = {2: 1.0, 3: 1.15, 4: 1.3}
+
+
+def _cjk_candidates(run: str) -> Iterable[str]:
+    """连续汉字中的 2~4 字候选词（跨越虚词的片段不算）"""
+    for segment in _CJK_STOP_RE.split(run):
+        for n in range(_CJK_MIN_N, _CJK_MAX_N + 1):
+            for i in range(len(segment) - n + 1):
+                yield segment[i:i + n]
+
+
+def tokenize(text: Optional[str]) -> Tuple[Counter, Dict[str, str]]:
+    """切分候选词，返回 (小写词 -> 次数, 小写词 -> 首次出现的原始写法)"""
+    counts: Counter = Counter()
+    display: Dict[str, str] = {}
+    if not text:
+        return counts, display
+
+    for word in _LATIN_RE.findall(text):
+        key = word.lower()
+        # 保留 AI、EU 这类全大写缩写
+        if key in _LATIN_STOPWORDS or (len(key) < 3 and not word.isupper()):
+            continue
+        counts[key] += 1
+        display.setdefault(key, word)
+
+    for run in _CJK_RUN_RE.findall(text):
+        for term in _cjk_candidates(run):
+            counts[term] += 1
+            display.setdefault(term, term)
+    return counts, display
+
+
+def _find_spans(text: str, term: str) -> List[Tuple[int, int]]:
+    """term 在 text 中各次（不重叠）出现的位置"""
+    spans = []
+    start = text.find(term)
+    while start != -1:
+        spans.append((start, start + len(term)))
+        start = text.find(term, start + len(term))
+    return spans
+
+
+def document_text(title: Optional[str], content: Optional[str]) -> str:
+    """计入文档频率时使用的文本（标题 + 正文）"""
+    return f"{title or ''}\n{content or ''}"
+
+
+class KeywordExtractor:
+    """语料感知的 TF-IDF 关键词提取器"""
+
+    def __init__(self, path: Optional[str] = None, buckets: int = DEFAULT_BUCKETS):
+        self.path = path
+        self.buckets = buckets
+        self._df = array("I", bytes(4 * buckets))
+        self.document_count = 0
+        self._dirty = False
+        self._loaded = False
+        self._lock = threading.Lock()
+
+    def _bucket(self, term: str) -> int:
+        return zlib.crc32(term.encode("utf-8")) % self.buckets
+
+    def _ensure_loaded(self):
+        if self._loaded:
+            return
+        with self._lock:
+            if self._loaded:
+                return
+            if self.path and os.path.exists(self.path):
+                try:
+                    self._read(self.path)
+                except Exception as e:
+                    logger.warning(f"读取关键词文档频率失败，从空语料开始: {e}")
+            self._loaded = True
+
+    def _read(self, path: str):
+        with open(path, "rb") as f:
+            magic, buckets, document_count = _HEADER.unpack(f.read(_HEADER.size))
+            if magic != _FILE_MAGIC or buckets != self.buckets:
+                raise ValueError("文件格式或桶数量不匹配")
+            df = array("I")
+            df.frombytes(f.read())
+        if sys.byteorder == "big":
+            df.byteswap()
+        if len(df) != self.buckets:
+            raise ValueError("文件已损坏")
+        self._df = df
+        self.document_count = document_count
+
+    def add_documents(self, texts: Iterable[Optional[str]]) -> int:
+        """把新文档计入文档频率，返回计入的文档数"""
+        self._ensure_loaded()
+        bucket_sets = [
+            {self._bucket(term) for term in tokenize(text)[0]}
+            for text in texts if text
+        ]
+        with self._lock:
+            for buckets in bucket_sets:
+                for bucket in buckets:
+                    self._df[bucket] += 1
+            self.document_count += len(bucket_sets)
+            if bucket_sets:
+                self._dirty = True
+        return len(bucket_sets)
+
+    def is_ready(self) -> bool:
+        """语料文档数达到 KEYWORD_MIN_CORPUS_DOCUMENTS 后 IDF 才可靠，之前关键词交给 LLM 或订阅源标签"""
+        self._ensure_loaded()
+        return self.document_count >= settings.KEYWORD_MIN_CORPUS_DOCUMENTS
+
+    def idf(self, term: str) -> float:
+        """平滑 IDF；空语料时所有词为 1"""
+        self._ensure_loaded()
+        return math.log((self.document_count + 1) / (self._df[self._bucket(term)] + 1)) + 1.0
+
+    def extract(self, title: Optional[str], content: Optional[str], max_keywords: int = 5) -> List[str]:
+        """提取关键词，按得分从高到低返回原始写法"""
+        self._ensure_loaded()
+        counts, display = tokenize(content)
+        title_counts, title_display = tokenize(title)
+        for term, count in title_counts.items():
+            counts[term] += count
+            display.setdefault(term, title_display[term])
+
+        # 子串约简：中文片段只作为某个更长候选的一部分出现时（次数相同），丢弃该片段
+        redundant = set()
+        for term, tf in counts.items():
+            if len(term) > _CJK_MIN_N and not term.isascii():
+                for part in (term[:-1], term[1:]):
+                    if counts.get(part) == tf:
+                        redundant.add(part)
+
+        # 正文较长时，中文候选至少出现两次或出现在标题中，过滤偶然拼出的片段
+        long_text = len(content or "") > 60
+        scored = []
+        for term, tf in counts.items():
+            is_cjk = not term.isascii()
+            if term in redundant or (is_cjk and long_text and tf < 2 and term not in title_counts):
+                continue
+            score = (1 + math.log(tf)) * self.idf(term)
+            if term in title_counts:
+                score *= _TITLE_BOOST
+            if is_cjk:
+                score *= _LENGTH_BOOST.get(len(term), 1.0)
+            scored.append((score, term))
+        scored.sort(key=lambda item: (-item[0], item[1]))
+
+        # 中文候选与得分更高的已选候选共享二字片段，或在原文中每次出现都与已选候选的位置重叠
+        # （如"人工智能大模型"中的"能大模型"），视为重叠，只保留得分更高的一个
+        text = document_text(title, content)
+        covered = bytearray(len(text))
+        selected: List[str] = []
+        covered_bigrams = set()
+        for _, term in scored:
+            if not term.isascii():
+                bigrams = {term[i:i + 2] for i in range(len(term) - 1)}
+                if bigrams & covered_bigrams:
+                    continue
+                spans = _find_spans(text, term)
+                if spans and all(any(covered[start:end]) for start, end in spans):
+                    continue
+                covered_bigrams |= bigrams
+                for start, end in spans:
+                    covered[start:end] = b"\x01" * (end - start)
+            selected.append(term)
+            if len(selected) >= max_keywords:
+                break
+        return [display[term] for term in selected]
+
+    def extract_many(
+        self,
+        documents: Sequence[Tuple[Optional[str], Optional[str]]],
+        max_keywords: int = 5
+    ) -> List[List[str]]:
+        """批量提取，documents 为 (标题, 正文) 列表，结果与输入一一对应"""
+        self._ensure_loaded()
+        return [self.extract(title, content, max_keywords) for title, content in documents]
+
+    def save(self) -> bool:
+        """有新数据时原子写回文件"""
+        if not self.path or not self._dirty:
+            return False
+        with self._lock:
+            df = array("I", self._df)
+            document_count = self.document_count
+            self._dirty = False
+        if sys.byteorder == "big":
+            df.byteswap()
+        try:
+            os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+            tmp_path = f"{self.path}.tmp"
+            with open(tmp_path, "wb") as f:
+                f.write(_HEADER.pack(_FILE_MAGIC, self.buckets, document_count))
+                f.write(df.tobytes())
+            os.replace(tmp_path, self.path)
+            return True
+        except Exception:
+            self._dirty = True
+            raise
+
+    def rebuild_from_db(self, db: Session, batch_size: int = 1000) -> int:
+        """用热库中的全部文章重建文档频率"""
+        with self._lock:
+            self._df = array("I", bytes(4 * self.buckets))
+            self.document_count = 0
+            self._loaded = True
+
+        total = 0
+        last_id = 0
+        while True:
+            rows = db.query(
+                NewsArticle.id, NewsArticle.title, NewsArticle.summary, NewsArticle.content
+            ).filter(NewsArticle.id > last_id).order_by(NewsArticle.id).limit(batch_size).all()
+            if not rows:
+                break
+            total += self.add_documents(
+                document_text(row.title, row.content or row.summary) for row in rows
+            )
+            last_id = rows[-1].id
+        self._dirty = True
+        return total
+
+    def get_stats(self) -> Dict[str, int]:
+        """语料统计"""
+        self._ensure_loaded()
+        return {
+            "document_count": self.document_count,
+            "buckets": self.buckets,
+            "used_buckets": sum(1 for count in self._df if count),
+        }
+
+
+# 全局关键词提取器实例
+keyword_extractor = KeywordExtractor(settings.KEYWORD_STATS_PATH)
@@ -5,5 +5,6 @@ from .ollama_adapter import OllamaAdapter
 from .openai_adapter import OpenAIAdapter
 from .huoshan_adapter import HuoshanAdapter
 from .qianwen_adapter import QianwenAdapter
+from .extractive_adapter import ExtractiveAdapter
 
-__all__ = ["OllamaAdapter", "OpenAIAdapter", "HuoshanAdapter", "QianwenAdapter"]
+__all__ = ["OllamaAdapter", "OpenAIAdapter", "HuoshanAdapter", "QianwenAdapter", "ExtractiveAdapter"]
@@ -0,0 +1,69 @@
+"""
+本地抽取式降级适配器 - 所有模型提供商都不可用时使用
+
+不调用任何模型：摘要由 TextRank 抽取原文句子，语言、关键词、分类分别使用
+离线语言检测、TF-IDF 关键词提取和本地分类器。翻译无法在本地完成，直接报错；
+合并调用与批量方法沿用基类行为（不支持），由处理流程回退到逐项调用。
+管理器把这里产生的结果标记为降级，模型恢复后文章会重新处理。
+"""
+from typing import Dict, Any, List
+from app.services.llm_interface import LLMServiceInterface, LLMProcessingError
+from app.services.llm_config import ExtractiveConfig
+from app.services import extractive_summary
+from app.services.keyword_extractor import keyword_extractor
+from app.services.category_classifier import category_classifier
+from app.utils import language_detect
+import logging
+
+logger = logging.getLogger(__name__)
+
+CHINESE_LANGUAGES = ("zh", "zh-cn", "chinese")
+
+
+class ExtractiveAdapter(LLMServiceInterface):
+    """本地抽取式降级适配器实现"""
+
+    def __init__(self, config: ExtractiveConfig):
+        self.config = config
+
+    async def summarize_content(self, content: str, target_length: int = 400, **kwargs) -> str:
+        """抽取原文中最具代表性的句子作为摘要"""
+        summary = extractive_summary.summarize(content, target_length)
+        if not summary:
+            raise LLMProcessingError("正文没有可抽取的句子")
+        return summary
+
+    async def translate_to_chinese(self, text: str, source_language: str = "auto", **kwargs) -> str:
+        """中文原样返回，其余语言无法在本地翻译"""
+        if source_language.lower() in CHINESE_LANGUAGES:
+            return text
+        raise LLMProcessingError("抽取式降级不支持翻译")
+
+    async def detect_language(self, text: str, **kwargs) -> str:
+        """离线语言检测（不再受置信度门限限制）"""
+        guess = language_detect.detect(text)
+        if guess.language == language_detect.UNKNOWN:
+            raise LLMProcessingError("无法识别文本语言")
+        return guess.language
+
+    async def extract_keywords(self, content: str, max_keywords: int = 5, **kwargs) -> List[str]:
+        """TF-IDF 关键词提取"""
+        keywords = keyword_extractor.extract(None, content, max_keywords=max_keywords)
+        if not keywords:
+            raise LLMProcessingError("正文没有可提取的关键词")
+        return keywords
+
+    async def categorize_article(self, title: str, content: str, categories: List[str], **kwargs) -> str:
+        """本地分类器的结果（不再受置信度门限限制）"""
+        prediction = category_classifier.classify(title, content)
+        if prediction is None or prediction.category not in categories:
+            raise LLMProcessingError("本地分类器没有可用结果")
+        return prediction.category
+
+    async def health_check(self) -> Dict[str, Any]:
+        """本地计算始终可用"""
+        return {
+            "status": "healthy",
+            "provider": self.config.provider.value,
+            "model": self.config.model,
+        }
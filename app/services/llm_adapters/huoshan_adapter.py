@@ -1,28 +1,35 @@
 """
 火山引擎 LLM 适配器实现
 """
-import httpx
 import json
-from typing import Dict, Any, List
+from typing import Dict, Any, List, Optional
 from app.services.llm_interface import LLMServiceInterface, LLMProcessingError
+from app.services.llm_structured import build_combined_prompt, parse_combined_response
 from app.services.llm_config import HuoshanConfig
+from app.services.llm_usage import record_prompt_tokens
+from app.services.llm_cascade import active_model
+from app.services.llm_http import LoopClient, LoopClientMixin, client_limits
+from app.services.llm_retry import ProviderRateLimiter, send_with_retry
 import logging
 
 logger = logging.getLogger(__name__)
 
 
-class HuoshanAdapter(LLMServiceInterface):
+class HuoshanAdapter(LoopClientMixin, LLMServiceInterface):
     """火山引擎适配器实现"""
 
     def __init__(self, config: HuoshanConfig):
         self.config = config
-        self.client = httpx.AsyncClient(
+        self._http = LoopClient(
+            config.provider.value,
             timeout=config.timeout,
+            limits=client_limits(config.max_concurrency),
             headers={
                 "Authorization": f"Bearer {config.api_key}",
                 "Content-Type": "application/json"
             }
         )
+        self.rate_limiter = ProviderRateLimiter(config.requests_per_minute, config.tokens_per_minute)
 
     async def summarize_content(self, content: str, target_length: int = 400, **kwargs) -> str:
         """使用火山引擎生成摘要"""
@@ -38,16 +45,10 @@ class HuoshanAdapter(LLMServiceInterface):
         return await self._call_huoshan(prompt)
 
     async def detect_language(self, text: str, **kwargs) -> str:
-        """使用火山引擎检测语言"""
-        try:
-            # 优先使用 langdetect 库
-            import langdetect
-            return langdetect.detect(text)
-        except Exception:
-            # 如果检测失败，使用 LLM 检测
-            prompt = f"请检测以下文本的语言，只返回语言代码（如：en, zh, ja等）：\n\n{text[:200]}"
-            response = await self._call_huoshan(prompt)
-            return response.strip().lower()
+        """使用火山引擎检测语言（本地检测置信度不足时由管理器调用）"""
+        prompt = f"请检测以下文本的语言，只返回语言代码（如：en, zh, ja等）：\n\n{text[:200]}"
+        response = await self._call_huoshan(prompt)
+        return response.strip().lower()
 
     async def extract_keywords(self, content: str, max_keywords: int = 5, **kwargs) -> List[str]:
         """提取关键词"""
@@ -62,6 +63,25 @@ class HuoshanAdapter(LLMServiceInterface):
         response = await self._call_huoshan(prompt)
         return response.strip()
 
+    async def process_article_combined(
+        self,
+        title: str,
+        content: str,
+        categories: List[str],
+        target_length: int = 400,
+        max_keywords: int = 5,
+        fields: Optional[List[str]] = None,
+        **kwargs
+    ) -> Dict[str, Any]:
+        """单次调用火山引擎返回 JSON，完成全部处理步骤"""
+        prompt = build_combined_prompt(title, content, categories, target_length, max_keywords, fields)
+        response = await self._call_huoshan(prompt)
+        return parse_combined_response(response, categories, max_keywords, fields)
+
+    async def _generate_json(self, prompt: str) -> str:
+        """批量方法使用的 JSON 输出调用"""
+        return await self._call_huoshan(prompt)
+
     async def health_check(self) -> Dict[str, Any]:
         """健康检查"""
         try:
@@ -90,17 +110,22 @@ class HuoshanAdapter(LLMServiceInterface):
     async def _call_huoshan(self, prompt: str) -> str:
         """调用火山引擎 API"""
         try:
-            response = await self.client.post(
-                f"{self.config.base_url}/chat/completions",
-                json={
-                    "model": self.config.model,
-                    "messages": [
-                        {"role": "user", "content": prompt}
-                    ]
-                }
+            payload = {
+                "model": active_model(self.config.model),
+                "messages": [
+                    {"role": "user", "content": prompt}
+                ]
+            }
+            response = await send_with_retry(
+                lambda: self.client.post(f"{self.config.base_url}/chat/completions", json=payload),
+                self.config.provider.value, self.config.max_retries, self.config.retry_delay,
+                self.rate_limiter, self.estimate_tokens(prompt)
             )
             response.raise_for_status()
             result = response.json()
+            usage = result.get("usage") or {}
+            self.rate_limiter.consume_tokens(usage.get("completion_tokens") or 0)
+            record_prompt_tokens(usage.get("prompt_tokens") or self.estimate_tokens(prompt))
             return result["choices"][0]["message"]["content"]
         except Exception as e:
             logger.error(f"火山引擎 API 调用失败: {e}")
@@ -4,25 +4,56 @@ Ollama LLM 适配器实现
 import httpx
 import asyncio
 import json
-from typing import Dict, Any, List
+import time
+from typing import Dict, Any, AsyncIterator, List, Optional
 from app.services.llm_interface import LLMServiceInterface, LLMProcessingError
-from app.services.llm_config import OllamaConfig
+from app.services.llm_structured import build_combined_prompt, parse_combined_response
+from app.services.llm_config import OllamaConfig, OllamaEndpointConfig
+from app.services.llm_usage import record_prompt_tokens
+from app.services.llm_cascade import active_model
+from app.services.llm_streaming import (
+    SUMMARY_OVERRUN, StreamEvent, StreamLimit, collect_stream, ollama_events, stream_metrics
+)
+from app.services.llm_adapters.ollama_pool import OllamaEndpoint, OllamaEndpointPool
 import logging
 
 logger = logging.getLogger(__name__)
 
+COLD_LOAD_SECONDS = 1.0  # 模型加载耗时超过该值视为一次冷启动
+
 
 class OllamaAdapter(LLMServiceInterface):
     """Ollama 适配器实现"""
     
     def __init__(self, config: OllamaConfig):
         self.config = config
-        self.client = httpx.AsyncClient(timeout=config.timeout)
+        endpoints = config.endpoints or [OllamaEndpointConfig(
+            url=config.base_url, max_concurrency=config.max_concurrency, concurrency_ceiling=config.concurrency_ceiling
+        )]
+        self.pool = OllamaEndpointPool(
+            [
+                OllamaEndpoint(e.url, e.max_concurrency, config.timeout, e.concurrency_ceiling, config.adaptive_concurrency)
+                for e in endpoints
+            ],
+            failure_threshold=config.endpoint_failure_threshold
+        )
+        self.cold_starts = 0
+        self.cold_start_seconds: Optional[float] = None  # 最近一次冷启动的模型加载耗时
+    
+    @property
+    def client(self) -> httpx.AsyncClient:
+        """第一个端点的连接（单端点部署时即唯一的连接）"""
+        return self.pool.endpoints[0].client
+    
+    @client.setter
+    def client(self, client: httpx.AsyncClient):
+        self.pool.endpoints[0].client = client
     
     async def summarize_content(self, content: str, target_length: int = 400, **kwargs) -> str:
         """使用 Ollama 生成摘要"""
         prompt = self._build_summary_prompt(content, target_length)
-        return await self._call_ollama(prompt)
+        limit = StreamLimit(deadline=self.config.stream_deadline, max_chars=int(target_length * SUMMARY_OVERRUN))
+        return await self._call_ollama(prompt, limit=limit)
     
     async def translate_to_chinese(self, text: str, source_language: str = "auto", **kwargs) -> str:
         """使用 Ollama 翻译为中文"""
@@ -33,16 +64,10 @@ class OllamaAdapter(LLMServiceInterface):
         return await self._call_ollama(prompt)
     
     async def detect_language(self, text: str, **kwargs) -> str:
-        """使用 Ollama 检测语言"""
-        try:
-            # 优先使用 langdetect 库
-            import langdetect
-            return langdetect.detect(text)
-        except Exception:
-            # 如果检测失败，使用 LLM 检测
-            prompt = f"请检测以下文本的语言，只返回语言代码（如：en, zh, ja等）：\n\n{text[:200]}"
-            response = await self._call_ollama(prompt)
-            return response.strip().lower()
+        """使用 Ollama 检测语言（本地检测置信度不足时由管理器调用）"""
+        prompt = f"请检测以下文本的语言，只返回语言代码（如：en, zh, ja等）：\n\n{text[:200]}"
+        response = await self._call_ollama(prompt)
+        return response.strip().lower()
     
     async def extract_keywords(self, content: str, max_keywords: int = 5, **kwargs) -> List[str]:
         """提取关键词"""
@@ -57,44 +82,184 @@ class OllamaAdapter(LLMServiceInterface):
         response = await self._call_ollama(prompt)
         return response.strip()
     
+    async def process_article_combined(
+        self,
+        title: str,
+        content: str,
+        categories: List[str],
+        target_length: int = 400,
+        max_keywords: int = 5,
+        fields: Optional[List[str]] = None,
+        **kwargs
+    ) -> Dict[str, Any]:
+        """单次调用Ollama返回 JSON，完成全部处理步骤"""
+        prompt = build_combined_prompt(title, content, categories, target_length, max_keywords, fields)
+        response = await self._call_ollama(prompt, json_mode=True)
+        return parse_combined_response(response, categories, max_keywords, fields)
+
+    async def _generate_json(self, prompt: str) -> str:
+        """批量方法使用的 JSON 输出调用"""
+        return await self._call_ollama(prompt, json_mode=True)
+
     async def health_check(self) -> Dict[str, Any]:
-        """健康检查"""
+        """健康检查：探测所有端点（恢复或摘除端点），报告模型是否常驻内存及最近一次冷启动耗时"""
+        results = await asyncio.gather(*(self._probe_endpoint(e) for e in self.pool.endpoints))
+        healthy = [r for r in results if r["status"] == "healthy"]
+        health: Dict[str, Any] = {
+            "status": "healthy" if healthy else "unhealthy",
+            "provider": self.config.provider.value,
+            "model": self.config.model,
+        }
+        if not healthy:
+            health["error"] = "; ".join(f"{r['url']}: {r.get('error', r['status'])}" for r in results)
+            return health
+        loaded = [r["model_loaded"] for r in healthy if r["model_loaded"] is not None]
+        health.update({
+            "response_time": min(r["response_time"] for r in healthy),
+            # 所有可用端点都已加载模型才算常驻；旧版本 Ollama 无法判断时为 None
+            "model_loaded": all(loaded) if loaded else None,
+            "cold_starts": self.cold_starts,
+            "cold_start_seconds": self.cold_start_seconds,
+        })
+        if len(self.pool.endpoints) > 1:
+            probes = {r["url"]: r for r in results}
+            health["endpoints"] = [{**stats, **probes[stats["url"]]} for stats in self.pool.get_stats()]
+        return health
+
+    async def _probe_endpoint(self, endpoint: OllamaEndpoint) -> Dict[str, Any]:
         try:
-            response = await self.client.get(f"{self.config.base_url}/api/tags")
-            return {
-                "status": "healthy" if response.status_code == 200 else "unhealthy",
-                "provider": self.config.provider.value,
-                "model": self.config.model,
+            response = await endpoint.client.get(f"{endpoint.url}/api/tags")
+            healthy = response.status_code == 200
+            result = {
+                "url": endpoint.url,
+                "status": "healthy" if healthy else "unhealthy",
                 "response_time": response.elapsed.total_seconds()
             }
         except Exception as e:
-            return {
-                "status": "unhealthy",
-                "provider": self.config.provider.value,
-                "error": str(e)
-            }
-    
-    async def _call_ollama(self, prompt: str) -> str:
-        """调用 Ollama API"""
+            self.pool.record_probe(endpoint, False)
+            return {"url": endpoint.url, "status": "unhealthy", "error": str(e)}
+        self.pool.record_probe(endpoint, healthy)
+        if healthy:
+            result["model_loaded"] = await self._model_loaded(endpoint)
+        return result
+
+    async def _model_loaded(self, endpoint: OllamaEndpoint) -> Optional[bool]:
+        try:
+            response = await endpoint.client.get(f"{endpoint.url}/api/ps")
+            response.raise_for_status()
+            loaded = [m.get("name") or m.get("model") for m in response.json().get("models", [])]
+            return self.config.model in loaded
+        except Exception:
+            # 旧版本 Ollama 没有 /api/ps
+            return None
+
+    async def warm_up(self) -> Dict[str, Any]:
+        """向每个可用端点发送空提示词，让 Ollama 加载模型并按 keep_alive 常驻；模型已加载时开销可忽略"""
+        started = time.monotonic()
+        endpoints = [e for e in self.pool.endpoints if e.healthy] or self.pool.endpoints
+        results = await asyncio.gather(*(self._warm_endpoint(e) for e in endpoints))
+        warmed = [r for r in results if r["status"] == "ok"]
+        if not warmed:
+            return {"status": "error", "error": "; ".join(f"{r['url']}: {r['error']}" for r in results)}
+        load_seconds = max(r["load_seconds"] for r in warmed)
+        result = {
+            "status": "ok",
+            "model": self.config.model,
+            "load_seconds": load_seconds,
+            "cold": load_seconds >= COLD_LOAD_SECONDS,
+            "total_seconds": round(time.monotonic() - started, 3)
+        }
+        if len(self.pool.endpoints) > 1:
+            result["endpoints"] = results
+        return result
+
+    async def _warm_endpoint(self, endpoint: OllamaEndpoint) -> Dict[str, Any]:
         try:
-            response = await self.client.post(
-                f"{self.config.base_url}/api/generate",
-                json={
-                    "model": self.config.model,
-                    "prompt": prompt,
-                    "stream": False,
-                    "options": {
-                        "temperature": self.config.temperature
-                    }
-                }
+            response = await endpoint.client.post(
+                f"{endpoint.url}/api/generate",
+                json=self._build_payload("", stream=False)
             )
             response.raise_for_status()
             result = response.json()
+        except Exception as e:
+            logger.warning(f"Ollama 端点 {endpoint.url} 模型预热失败: {e}")
+            return {"url": endpoint.url, "status": "error", "error": str(e)}
+        return {
+            "url": endpoint.url,
+            "status": "ok",
+            "load_seconds": self._record_load((result.get("load_duration") or 0) / 1e9)
+        }
+
+    async def _call_ollama(self, prompt: str, json_mode: bool = False, limit: Optional[StreamLimit] = None) -> str:
+        """调用 Ollama API，json_mode 时约束模型只输出 JSON；给出 limit 且启用流式时流式接收"""
+        if limit is not None and self.config.streaming:
+            return await self._call_ollama_stream(prompt, limit)
+        try:
+            payload = self._build_payload(prompt, stream=False)
+            if json_mode:
+                payload["format"] = "json"
+            async with self.pool.acquire("json" if json_mode else "generate") as endpoint:
+                response = await endpoint.client.post(
+                    f"{endpoint.url}/api/generate",
+                    json=payload
+                )
+                response.raise_for_status()
+            result = response.json()
+            self._record_load((result.get("load_duration") or 0) / 1e9)
+            record_prompt_tokens(result.get("prompt_eval_count") or self.estimate_tokens(prompt))
             return result.get("response", "")
         except Exception as e:
             logger.error(f"Ollama API 调用失败: {e}")
             raise LLMProcessingError(f"Ollama API 调用失败: {e}")
+
+    async def _call_ollama_stream(self, prompt: str, limit: StreamLimit) -> str:
+        """流式调用 Ollama，达到长度或截止时间时关闭连接"""
+        payload = self._build_payload(prompt, stream=True)
+        try:
+            result = await collect_stream(self._stream_events(payload), limit)
+        except LLMProcessingError:
+            raise
+        except Exception as e:
+            logger.error(f"Ollama 流式调用失败: {e}")
+            raise LLMProcessingError(f"Ollama 流式调用失败: {e}")
+        self._record_load(result.load_seconds or 0)
+        record_prompt_tokens(result.prompt_tokens or self.estimate_tokens(prompt))
+        stream_metrics.record(self.config.provider.value, result)
+        return result.output()
+
+    async def _stream_events(self, payload: Dict[str, Any]) -> AsyncIterator[StreamEvent]:
+        async with self.pool.acquire("stream") as endpoint:
+            async with endpoint.client.stream("POST", f"{endpoint.url}/api/generate", json=payload) as response:
+                response.raise_for_status()
+                async for event in ollama_events(response.aiter_lines()):
+                    yield event
     
+    def _build_payload(self, prompt: str, stream: bool) -> Dict[str, Any]:
+        """生成请求体，未配置的推理参数交给服务端默认值"""
+        options: Dict[str, Any] = {"temperature": self.config.temperature}
+        for name in ("num_ctx", "num_predict", "num_thread"):
+            value = getattr(self.config, name)
+            if value:
+                options[name] = value
+        payload = {
+            "model": active_model(self.config.model),
+            "prompt": prompt,
+            "stream": stream,
+            "options": options
+        }
+        if self.config.keep_alive:
+            payload["keep_alive"] = self.config.keep_alive
+        return payload
+
+    def _record_load(self, load_seconds: float) -> float:
+        """记录响应中的模型加载耗时，超过阈值时计为一次冷启动"""
+        load_seconds = round(load_seconds, 3)
+        if load_seconds >= COLD_LOAD_SECONDS:
+            self.cold_starts += 1
+            self.cold_start_seconds = load_seconds
+            logger.info(f"Ollama 模型 {self.config.model} 冷启动，加载耗时 {load_seconds}s")
+        return load_seconds
+
     def _build_summary_prompt(self, content: str, target_length: int) -> str:
         """构建摘要提示词"""
         return f"""
@@ -0,0 +1,210 @@
+"""
+Ollama 多端点连接池 - 按未完成请求数负载均衡
+
+每个端点有独立的并发上限和长连接池（按事件循环分别创建，见 llm_http）。新请求分配给未完成请求占并发上限比例最低的端点，
+比例相同时选 EWMA 延迟较低的一个；所有端点都满时等待。
+端点的并发上限按 AIMD 自适应调整（见 llm_concurrency），不同硬件的端点各自收敛到其实际并行能力。
+端点连续失败达到阈值后暂停分配（被动摘除），由健康探测成功后恢复；
+所有端点都被摘除时仍轮流尝试，请求成功同样恢复该端点。
+端点状态用线程锁保护，后台处理线程和主事件循环共用同一个池；所有端点都满时请求按先后顺序排队，
+端点空出时直接分配给队首请求，由 call_soon_threadsafe 唤醒其所在的事件循环（与 AdaptiveLimiter 相同）。
+"""
+import asyncio
+import logging
+import threading
+import time
+from collections import deque
+from contextlib import asynccontextmanager
+from typing import Any, AsyncIterator, Deque, Dict, List, Optional, Tuple
+import httpx
+from app.services.llm_concurrency import AIMDLimit
+from app.services.llm_http import LoopClient, client_limits
+
+logger = logging.getLogger(__name__)
+
+EWMA_ALPHA = 0.3  # 新样本在延迟均值中的权重
+
+
+class OllamaEndpoint:
+    """单个 Ollama 端点的连接与运行状态"""
+
+    def __init__(
+        self, url: str, max_concurrency: int, timeout: float, concurrency_ceiling: int = 0, adaptive: bool = True
+    ):
+        self.url = url.rstrip("/")
+        self.concurrency = AIMDLimit(f"Ollama 端点 {self.url}", max_concurrency, concurrency_ceiling, adaptive)
+        self._http = LoopClient("ollama", timeout=timeout, limits=client_limits(self.concurrency.ceiling))
+        self.outstanding = 0
+        self.ewma_latency: Optional[float] = None
+        self.healthy = True
+        self.consecutive_failures = 0
+        self.requests = 0
+        self.failures = 0
+
+    @property
+    def client(self) -> httpx.AsyncClient:
+        """当前事件循环中该端点的长连接客户端"""
+        return self._http.get()
+
+    @client.setter
+    def client(self, client: httpx.AsyncClient):
+        self._http.set(client)
+
+    @property
+    def max_concurrency(self) -> int:
+        """当前的并发上限"""
+        return self.concurrency.capacity
+
+    @property
+    def load(self) -> float:
+        return self.outstanding / self.max_concurrency
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {
+            "url": self.url,
+            "healthy": self.healthy,
+            "outstanding": self.outstanding,
+            "max_concurrency": self.max_concurrency,
+            "concurrency": self.concurrency.get_stats(),
+            "ewma_latency": None if self.ewma_latency is None else round(self.ewma_latency, 3),
+            "requests": self.requests,
+            "failures": self.failures,
+        }
+
+
+class OllamaEndpointPool:
+    """Ollama 端点池"""
+
+    def __init__(self, endpoints: List[OllamaEndpoint], failure_threshold: int = 3):
+        if not endpoints:
+            raise ValueError("Ollama 端点池至少需要一个端点")
+        self.endpoints = endpoints
+        self.failure_threshold = max(1, failure_threshold)
+        self._waiters: Deque[Tuple[asyncio.AbstractEventLoop, asyncio.Future]] = deque()
+        self._lock = threading.Lock()
+
+    def _pick(self) -> Optional[OllamaEndpoint]:
+        """选择端点（调用方持有锁）"""
+        # 所有端点都被摘除时仍尝试全部端点，由上层熔断器决定是否放弃该提供商
+        candidates = [e for e in self.endpoints if e.healthy] or self.endpoints
+        free = [e for e in candidates if e.outstanding < e.max_concurrency]
+        if not free:
+            return None
+        return min(free, key=lambda e: (e.load, e.ewma_latency or 0.0))
+
+    @asynccontextmanager
+    async def acquire(self, kind: str = "") -> AsyncIterator[OllamaEndpoint]:
+        """分配一个端点，退出时按结果更新延迟、健康状态和并发上限（kind 区分延迟基线）；被取消或提前关闭不计为失败"""
+        endpoint = await self._wait()
+        with self._lock:
+            saturated = endpoint.outstanding >= endpoint.max_concurrency
+
+        started = time.monotonic()
+        try:
+            yield endpoint
+        except (asyncio.CancelledError, GeneratorExit):
+            raise
+        except Exception as e:
+            self._record_failure(endpoint, e)
+            endpoint.concurrency.record_failure(e, started)
+            raise
+        else:
+            seconds = time.monotonic() - started
+            self._record_success(endpoint, seconds)
+            endpoint.concurrency.record_success(kind, seconds, started, saturated)
+        finally:
+            # 上限可能已提高，释放后按顺序把空出的名额分配给等待者
+            self._release(endpoint)
+
+    async def _wait(self) -> OllamaEndpoint:
+        loop = asyncio.get_running_loop()
+        with self._lock:
+            if not self._waiters:
+                endpoint = self._pick()
+                if endpoint is not None:
+                    self._occupy(endpoint)
+                    return endpoint
+            future = loop.create_future()
+            self._waiters.append((loop, future))
+        try:
+            return await future
+        except asyncio.CancelledError:
+            with self._lock:
+                if (loop, future) in self._waiters:
+                    self._waiters.remove((loop, future))
+                    raise
+            # 端点已经分配给该请求，但在恢复执行前被取消
+            if not future.cancelled():
+                self._release(future.result())
+            raise
+
+    @staticmethod
+    def _occupy(endpoint: OllamaEndpoint):
+        endpoint.outstanding += 1
+        endpoint.requests += 1
+
+    def _release(self, endpoint: OllamaEndpoint):
+        with self._lock:
+            endpoint.outstanding -= 1
+        self._wake()
+
+    def _wake(self):
+        """按先后顺序把空出的端点分配给等待中的请求"""
+        with self._lock:
+            while self._waiters:
+                endpoint = self._pick()
+                if endpoint is None:
+                    return
+                loop, future = self._waiters.popleft()
+                self._occupy(endpoint)
+                try:
+                    loop.call_soon_threadsafe(self._grant, future, endpoint)
+                except RuntimeError:
+                    # 等待者所在的事件循环已关闭
+                    endpoint.outstanding -= 1
+                    endpoint.requests -= 1
+
+    def _grant(self, future: asyncio.Future, endpoint: OllamaEndpoint):
+        if future.cancelled():
+            self._release(endpoint)
+        else:
+            future.set_result(endpoint)
+
+    def _record_success(self, endpoint: OllamaEndpoint, seconds: float):
+        with self._lock:
+            # 全部端点被摘除时请求仍会发往它们，成功即与探测成功一样恢复
+            if not endpoint.healthy:
+                logger.info(f"Ollama 端点 {endpoint.url} 请求成功，重新分配请求")
+            endpoint.healthy = True
+            endpoint.consecutive_failures = 0
+            if endpoint.ewma_latency is None:
+                endpoint.ewma_latency = seconds
+            else:
+                endpoint.ewma_latency = EWMA_ALPHA * seconds + (1 - EWMA_ALPHA) * endpoint.ewma_latency
+
+    def _record_failure(self, endpoint: OllamaEndpoint, error: Exception):
+        with self._lock:
+            endpoint.failures += 1
+            endpoint.consecutive_failures += 1
+            if endpoint.healthy and endpoint.consecutive_failures >= self.failure_threshold:
+                endpoint.healthy = False
+                logger.warning(
+                    f"Ollama 端点 {endpoint.url} 连续失败 {endpoint.consecutive_failures} 次，暂停分配: {error}"
+                )
+
+    def record_probe(self, endpoint: OllamaEndpoint, healthy: bool):
+        """健康探测结果：成功时恢复被摘除的端点，失败时立即摘除"""
+        with self._lock:
+            if healthy:
+                if not endpoint.healthy:
+                    logger.info(f"Ollama 端点 {endpoint.url} 探测恢复，重新分配请求")
+                endpoint.healthy = True
+                endpoint.consecutive_failures = 0
+            else:
+                endpoint.healthy = False
+        if healthy:
+            self._wake()
+
+    def get_stats(self) -> List[Dict[str, Any]]:
+        with self._lock:
+            return [endpoint.get_stats() for endpoint in self.endpoints]
@@ -1,33 +1,48 @@
 """
 OpenAI LLM 适配器实现
 """
-import httpx
 import json
-from typing import Dict, Any, List
+import httpx
+from typing import Dict, Any, AsyncIterator, List, Optional
 from app.services.llm_interface import LLMServiceInterface, LLMProcessingError
+from app.services.llm_structured import build_combined_prompt, parse_combined_response
 from app.services.llm_config import OpenAIConfig
+from app.services.llm_usage import record_prompt_tokens
+from app.services.llm_cascade import active_model
+from app.services.llm_http import LoopClient, LoopClientMixin, client_limits
+from app.services.llm_retry import ProviderRateLimiter, send_with_retry
+from app.services.llm_streaming import (
+    SUMMARY_OVERRUN, StreamEvent, StreamLimit, collect_stream, openai_sse_events, stream_metrics
+)
 import logging
 
 logger = logging.getLogger(__name__)
 
+BATCH_ENDPOINT = "/v1/chat/completions"
+BATCH_COMPLETION_WINDOW = "24h"
 
-class OpenAIAdapter(LLMServiceInterface):
+
+class OpenAIAdapter(LoopClientMixin, LLMServiceInterface):
     """OpenAI 适配器实现"""
 
     def __init__(self, config: OpenAIConfig):
         self.config = config
-        self.client = httpx.AsyncClient(
+        self._http = LoopClient(
+            config.provider.value,
             timeout=config.timeout,
+            limits=client_limits(config.max_concurrency),
             headers={
                 "Authorization": f"Bearer {config.api_key}",
                 "Content-Type": "application/json"
             }
         )
+        self.rate_limiter = ProviderRateLimiter(config.requests_per_minute, config.tokens_per_minute)
 
     async def summarize_content(self, content: str, target_length: int = 400, **kwargs) -> str:
         """使用 OpenAI 生成摘要"""
         prompt = self._build_summary_prompt(content, target_length)
-        return await self._call_openai(prompt)
+        limit = StreamLimit(deadline=self.config.stream_deadline, max_chars=int(target_length * SUMMARY_OVERRUN))
+        return await self._call_openai(prompt, limit=limit)
 
     async def translate_to_chinese(self, text: str, source_language: str = "auto", **kwargs) -> str:
         """使用 OpenAI 翻译为中文"""
@@ -38,16 +53,10 @@ class OpenAIAdapter(LLMServiceInterface):
         return await self._call_openai(prompt)
 
     async def detect_language(self, text: str, **kwargs) -> str:
-        """使用 OpenAI 检测语言"""
-        try:
-            # 优先使用 langdetect 库
-            import langdetect
-            return langdetect.detect(text)
-        except Exception:
-            # 如果检测失败，使用 LLM 检测
-            prompt = f"请检测以下文本的语言，只返回语言代码（如：en, zh, ja等）：\n\n{text[:200]}"
-            response = await self._call_openai(prompt)
-            return response.strip().lower()
+        """使用 OpenAI 检测语言（本地检测置信度不足时由管理器调用）"""
+        prompt = f"请检测以下文本的语言，只返回语言代码（如：en, zh, ja等）：\n\n{text[:200]}"
+        response = await self._call_openai(prompt)
+        return response.strip().lower()
 
     async def extract_keywords(self, content: str, max_keywords: int = 5, **kwargs) -> List[str]:
         """提取关键词"""
@@ -62,6 +71,98 @@ class OpenAIAdapter(LLMServiceInterface):
         response = await self._call_openai(prompt)
         return response.strip()
 
+    async def process_article_combined(
+        self,
+        title: str,
+        content: str,
+        categories: List[str],
+        target_length: int = 400,
+        max_keywords: int = 5,
+        fields: Optional[List[str]] = None,
+        **kwargs
+    ) -> Dict[str, Any]:
+        """单次调用OpenAI返回 JSON，完成全部处理步骤"""
+        prompt = build_combined_prompt(title, content, categories, target_length, max_keywords, fields)
+        response = await self._call_openai(prompt, json_mode=True)
+        return parse_combined_response(response, categories, max_keywords, fields)
+
+    async def _generate_json(self, prompt: str) -> str:
+        """批量方法使用的 JSON 输出调用"""
+        return await self._call_openai(prompt, json_mode=True)
+
+    def build_batch_request(self, custom_id: str, prompt: str) -> Dict[str, Any]:
+        """构建 Batch API 输入文件中的一行：与实时合并调用相同的 JSON 输出请求"""
+        return {
+            "custom_id": custom_id,
+            "method": "POST",
+            "url": BATCH_ENDPOINT,
+            "body": {
+                "model": self.config.model,
+                "messages": [
+                    {"role": "user", "content": prompt}
+                ],
+                "temperature": self.config.temperature,
+                "max_tokens": self.config.max_tokens,
+                "response_format": {"type": "json_object"}
+            }
+        }
+
+    async def submit_batch(self, requests: List[Dict[str, Any]]) -> Dict[str, Any]:
+        """上传 JSONL 输入文件并创建批次，返回批次对象"""
+        lines = "\n".join(json.dumps(request, ensure_ascii=False) for request in requests)
+        # 客户端默认的 JSON Content-Type 会覆盖 multipart 边界，先单独编码再发送
+        upload = httpx.Request(
+            "POST", f"{self.config.base_url}/files",
+            data={"purpose": "batch"},
+            files={"file": ("batch.jsonl", lines.encode("utf-8"), "application/jsonl")}
+        )
+        body = upload.read()
+        input_file = await self._batch_call(lambda: self.client.post(
+            f"{self.config.base_url}/files", content=body,
+            headers={"Content-Type": upload.headers["Content-Type"]}
+        ))
+        return await self._batch_call(lambda: self.client.post(f"{self.config.base_url}/batches", json={
+            "input_file_id": input_file["id"],
+            "endpoint": BATCH_ENDPOINT,
+            "completion_window": BATCH_COMPLETION_WINDOW
+        }))
+
+    async def get_batch(self, batch_id: str) -> Dict[str, Any]:
+        """查询批次状态"""
+        return await self._batch_call(lambda: self.client.get(f"{self.config.base_url}/batches/{batch_id}"))
+
+    async def download_batch_results(self, file_id: str) -> List[Dict[str, Any]]:
+        """下载批次输出（或错误）文件，逐行解析，跳过无法解析的行"""
+        try:
+            response = await send_with_retry(
+                lambda: self.client.get(f"{self.config.base_url}/files/{file_id}/content"),
+                self.config.provider.value, self.config.max_retries, self.config.retry_delay
+            )
+            response.raise_for_status()
+        except Exception as e:
+            logger.error(f"OpenAI 批次结果下载失败: {e}")
+            raise LLMProcessingError(f"OpenAI 批次结果下载失败: {e}")
+        results = []
+        for line in response.text.splitlines():
+            try:
+                results.append(json.loads(line))
+            except ValueError:
+                if line.strip():
+                    logger.warning(f"跳过无法解析的批次结果行: {line[:100]}")
+        return results
+
+    async def _batch_call(self, send) -> Dict[str, Any]:
+        """Batch API 管理接口调用，不占用实时调用的速率配额"""
+        try:
+            response = await send_with_retry(
+                send, self.config.provider.value, self.config.max_retries, self.config.retry_delay
+            )
+            response.raise_for_status()
+            return response.json()
+        except Exception as e:
+            logger.error(f"OpenAI Batch API 调用失败: {e}")
+            raise LLMProcessingError(f"OpenAI Batch API 调用失败: {e}")
+
     async def health_check(self) -> Dict[str, Any]:
         """健康检查"""
         try:
@@ -79,27 +180,75 @@ class OpenAIAdapter(LLMServiceInterface):
                 "error": str(e)
             }
 
-    async def _call_openai(self, prompt: str) -> str:
-        """调用 OpenAI API"""
+    async def _call_openai(self, prompt: str, json_mode: bool = False, limit: Optional[StreamLimit] = None) -> str:
+        """调用 OpenAI API，json_mode 时启用 JSON 输出模式；给出 limit 且启用流式时流式接收"""
+        if limit is not None and self.config.streaming:
+            return await self._call_openai_stream(prompt, limit)
         try:
-            response = await self.client.post(
-                f"{self.config.base_url}/chat/completions",
-                json={
-                    "model": self.config.model,
-                    "messages": [
-                        {"role": "user", "content": prompt}
-                    ],
-                    "temperature": self.config.temperature,
-                    "max_tokens": self.config.max_tokens
-                }
+            payload = {
+                "model": active_model(self.config.model),
+                "messages": [
+                    {"role": "user", "content": prompt}
+                ],
+                "temperature": self.config.temperature,
+                "max_tokens": self.config.max_tokens
+            }
+            if json_mode:
+                payload["response_format"] = {"type": "json_object"}
+            response = await send_with_retry(
+                lambda: self.client.post(f"{self.config.base_url}/chat/completions", json=payload),
+                self.config.provider.value, self.config.max_retries, self.config.retry_delay,
+                self.rate_limiter, self.estimate_tokens(prompt)
             )
             response.raise_for_status()
             result = response.json()
+            usage = result.get("usage") or {}
+            self.rate_limiter.consume_tokens(usage.get("completion_tokens") or 0)
+            record_prompt_tokens(usage.get("prompt_tokens") or self.estimate_tokens(prompt))
             return result["choices"][0]["message"]["content"]
         except Exception as e:
             logger.error(f"OpenAI API 调用失败: {e}")
             raise LLMProcessingError(f"OpenAI API 调用失败: {e}")
 
+    async def _call_openai_stream(self, prompt: str, limit: StreamLimit) -> str:
+        """流式调用 OpenAI，达到长度或截止时间时关闭连接"""
+        payload = {
+            "model": active_model(self.config.model),
+            "messages": [
+                {"role": "user", "content": prompt}
+            ],
+            "temperature": self.config.temperature,
+            "max_tokens": self.config.max_tokens,
+            "stream": True,
+            # 最后一个数据块附带用量
+            "stream_options": {"include_usage": True}
+        }
+        try:
+            result = await collect_stream(self._stream_events(payload, self.estimate_tokens(prompt)), limit)
+        except LLMProcessingError:
+            raise
+        except Exception as e:
+            logger.error(f"OpenAI 流式调用失败: {e}")
+            raise LLMProcessingError(f"OpenAI 流式调用失败: {e}")
+        self.rate_limiter.consume_tokens(result.output_tokens)
+        record_prompt_tokens(result.prompt_tokens or self.estimate_tokens(prompt))
+        stream_metrics.record(self.config.provider.value, result)
+        return result.output()
+
+    async def _stream_events(self, payload: Dict[str, Any], tokens: int = 0) -> AsyncIterator[StreamEvent]:
+        request = self.client.build_request("POST", f"{self.config.base_url}/chat/completions", json=payload)
+        response = await send_with_retry(
+            lambda: self.client.send(request, stream=True),
+            self.config.provider.value, self.config.max_retries, self.config.retry_delay,
+            self.rate_limiter, tokens
+        )
+        try:
+            response.raise_for_status()
+            async for event in openai_sse_events(response.aiter_lines()):
+                yield event
+        finally:
+            await response.aclose()
+
     def _build_summary_prompt(self, content: str, target_length: int) -> str:
         """构建摘要提示词"""
         return f"""
@@ -0,0 +1,287 @@
+"""
+LLM 离线批处理服务 - 通过 OpenAI Batch API 处理积压的待处理文章
+
+积压较多且不急于展示的文章不必占用实时调用的并发和速率配额：把每篇文章的合并处理请求
+写成 JSONL 提交为一个批次（24 小时内完成，费用约为实时调用的一半），由定时任务轮询，
+批次结束后按与实时处理相同的 apply_result 路径写回。
+- 提交前文章标记为 PROCESSING，实时处理不会重复领取；上传失败时恢复为 PENDING；
+- 本地能完成的步骤（置信的分类、本地关键词、置信的离线语言检测）不交给模型；
+- 正文超出输入预算需要分块摘要的文章，以及没有任何步骤需要模型的文章留给实时处理；
+- 批次失败、过期或单条请求出错时，没有拿到结果的文章恢复为 PENDING。
+"""
+import json
+from datetime import datetime, timezone
+from functools import partial
+from typing import Any, Dict, Optional, Tuple
+from sqlalchemy.orm import Session, undefer
+from app.models.article import NewsArticle, LLMProcessingStatus
+from app.models.llm_batch import LLMBatchJob
+from app.services import llm_structured
+from app.services.content_processor import (
+    CATEGORIES, ContentProcessorService, STEP_FIELDS, STEP_KEYWORDS, STEP_LANGUAGE, STEP_RESULT_KEYS, STEP_SUMMARY
+)
+from app.services.keyword_extractor import keyword_extractor
+from app.services.llm_interface import LLMProvider
+from app.services.step_planner import step_planner
+from app.utils import language_detect, text_budget
+from app.config import settings
+import logging
+
+logger = logging.getLogger(__name__)
+
+TERMINAL_STATUSES = {"completed", "failed", "expired", "cancelled"}
+CUSTOM_ID_PREFIX = "article-"
+
+
+class LLMBatchService:
+    """Batch API 批次的提交、轮询与结果写回"""
+
+    def __init__(self, db: Session, adapter: Optional[Any] = None):
+        self.db = db
+        if adapter is None:
+            from app.core.llm_factory import get_llm_manager
+            adapter = get_llm_manager().adapters.get(LLMProvider.OPENAI)
+        self.adapter = adapter
+
+    @property
+    def available(self) -> bool:
+        """是否配置了支持 Batch API 的提供商"""
+        return self.adapter is not None and hasattr(self.adapter, "submit_batch")
+
+    def count_backlog(self) -> int:
+        return self.db.query(NewsArticle).filter(
+            NewsArticle.llm_processing_status == LLMProcessingStatus.PENDING
+        ).count()
+
+    async def submit_pending(self, limit: Optional[int] = None) -> Dict[str, Any]:
+        """把最早的待处理文章提交为一个批次，返回提交结果"""
+        if not self.available:
+            raise ValueError("未配置 OpenAI，无法使用 Batch API")
+        limit = limit or settings.LLM_BATCH_API_MAX_REQUESTS
+
+        articles = self.db.query(NewsArticle).options(undefer(NewsArticle.content)).filter(
+            NewsArticle.llm_processing_status == LLMProcessingStatus.PENDING
+        ).order_by(NewsArticle.id).limit(limit).all()
+
+        requests, batched = [], []
+        for article in articles:
+            prompt = self._build_prompt(article)
+            if prompt is None:
+                continue
+            requests.append(self.adapter.build_batch_request(f"{CUSTOM_ID_PREFIX}{article.id}", prompt))
+            batched.append(article)
+        if not batched:
+            return {"message": "没有可提交的文章", "submitted": 0, "batch": None}
+
+        # 先标记再上传，上传期间实时处理不会领取这些文章
+        for article in batched:
+            article.llm_processing_status = LLMProcessingStatus.PROCESSING
+        self.db.commit()
+
+        try:
+            remote = await self.adapter.submit_batch(requests)
+        except Exception:
+            for article in batched:
+                article.llm_processing_status = LLMProcessingStatus.PENDING
+            self.db.commit()
+            raise
+
+        job = LLMBatchJob(
+            provider=self.adapter.config.provider.value,
+            remote_id=remote["id"],
+            input_file_id=remote.get("input_file_id"),
+            status=remote.get("status") or "validating",
+            article_ids=json.dumps([article.id for article in batched]),
+            request_count=len(batched),
+        )
+        self.db.add(job)
+        self.db.commit()
+        logger.info(f"已提交 Batch API 批次 {job.remote_id}，共 {len(batched)} 篇文章")
+        return {"message": f"已提交 {len(batched)} 篇文章", "submitted": len(batched), "batch": self.serialize(job)}
+
+    async def poll(self) -> Dict[str, Any]:
+        """刷新未完成批次的状态，已结束的批次写回结果"""
+        summary = {"checked": 0, "finished": 0, "applied": 0, "requeued": 0}
+        if not self.available:
+            return summary
+        jobs = self.db.query(LLMBatchJob).filter(LLMBatchJob.finished_at.is_(None)).all()
+        for job in jobs:
+            summary["checked"] += 1
+            try:
+                remote = await self.adapter.get_batch(job.remote_id)
+            except Exception as e:
+                logger.warning(f"查询批次 {job.remote_id} 失败，下次重试: {e}")
+                continue
+            self._update_job(job, remote)
+            if job.status in TERMINAL_STATUSES:
+                try:
+                    applied, requeued = await self._apply_job(job)
+                except Exception as e:
+                    logger.error(f"写回批次 {job.remote_id} 结果失败，下次重试: {e}")
+                    self.db.rollback()
+                    continue
+                summary["finished"] += 1
+                summary["applied"] += applied
+                summary["requeued"] += requeued
+            self.db.commit()
+        return summary
+
+    def get_batches(self, limit: int = 20) -> Dict[str, Any]:
+        """未完成的批次及最近结束的批次"""
+        outstanding = self.db.query(LLMBatchJob).filter(
+            LLMBatchJob.finished_at.is_(None)
+        ).order_by(LLMBatchJob.created_at).all()
+        recent = self.db.query(LLMBatchJob).filter(
+            LLMBatchJob.finished_at.isnot(None)
+        ).order_by(LLMBatchJob.finished_at.desc()).limit(limit).all()
+        return {
+            "enabled": settings.LLM_BATCH_API_ENABLED,
+            "available": self.available,
+            "outstanding_articles": sum(job.request_count or 0 for job in outstanding),
+            "outstanding": [self.serialize(job) for job in outstanding],
+            "recent": [self.serialize(job) for job in recent],
+        }
+
+    @staticmethod
+    def serialize(job: LLMBatchJob) -> Dict[str, Any]:
+        return {
+            "id": job.id,
+            "provider": job.provider,
+            "remote_id": job.remote_id,
+            "status": job.status,
+            "request_count": job.request_count,
+            "completed_count": job.completed_count,
+            "failed_count": job.failed_count,
+            "applied_count": job.applied_count,
+            "error": job.error,
+            "created_at": job.created_at,
+            "finished_at": job.finished_at,
+        }
+
+    def _update_job(self, job: LLMBatchJob, remote: Dict[str, Any]):
+        job.status = remote.get("status") or job.status
+        job.output_file_id = remote.get("output_file_id") or job.output_file_id
+        job.error_file_id = remote.get("error_file_id") or job.error_file_id
+        counts = remote.get("request_counts") or {}
+        job.completed_count = counts.get("completed", job.completed_count)
+        job.failed_count = counts.get("failed", job.failed_count)
+        errors = (remote.get("errors") or {}).get("data") or []
+        if errors:
+            job.error = "; ".join(str(error.get("message") or error) for error in errors)[:1000]
+        job.updated_at = datetime.now(timezone.utc)
+
+    async def _apply_job(self, job: LLMBatchJob) -> Tuple[int, int]:
+        """写回已结束批次的结果（过期或取消的批次也可能有部分结果），返回 (写回数, 恢复待处理数)"""
+        bodies: Dict[int, Dict[str, Any]] = {}
+        if job.output_file_id:
+            for line in await self.adapter.download_batch_results(job.output_file_id):
+                article_id, body = self._parse_output_line(line)
+                if article_id is not None:
+                    bodies[article_id] = body
+
+        article_ids = json.loads(job.article_ids)
+        articles = self.db.query(NewsArticle).options(undefer(NewsArticle.content)).filter(
+            NewsArticle.id.in_(article_ids)
+        ).all()
+        applied = requeued = 0
+        for article in articles:
+            # 提交后文章可能已被重新抓取或手动处理，只写回仍在等待本批次的文章
+            if article.llm_processing_status != LLMProcessingStatus.PROCESSING:
+                continue
+            result = self._build_result(article, bodies.get(article.id))
+            if result is None:
+                article.llm_processing_status = LLMProcessingStatus.PENDING
+                requeued += 1
+            else:
+                ContentProcessorService.apply_result(article, result)
+                applied += 1
+
+        job.applied_count = applied
+        job.finished_at = datetime.now(timezone.utc)
+        logger.info(f"批次 {job.remote_id}（{job.status}）写回 {applied} 篇，{requeued} 篇恢复为待处理")
+        return applied, requeued
+
+    @staticmethod
+    def _parse_output_line(line: Dict[str, Any]) -> Tuple[Optional[int], Optional[Dict[str, Any]]]:
+        custom_id = str(line.get("custom_id") or "")
+        if not custom_id.startswith(CUSTOM_ID_PREFIX):
+            return None, None
+        try:
+            article_id = int(custom_id[len(CUSTOM_ID_PREFIX):])
+        except ValueError:
+            return None, None
+        response = line.get("response") or {}
+        if line.get("error") or response.get("status_code") != 200:
+            return article_id, None
+        return article_id, response.get("body")
+
+    def _plan(
+        self, article: NewsArticle, record: bool = False
+    ) -> Tuple[Tuple[str, ...], Dict[str, Any], int, Dict[str, str]]:
+        """返回 (需要产出结果的步骤, 本地完成的步骤结果, 摘要目标长度, 规划跳过或本地完成的原因)，与实时处理的取舍一致"""
+        title = article.title or ""
+        content = article.content or article.summary or ""
+        plan = step_planner.plan(article, ContentProcessorService.get_pending_steps(article), record=record)
+        steps = plan.run_steps
+        local: Dict[str, Any] = dict(plan.local)
+        if STEP_KEYWORDS in plan.llm_steps and ContentProcessorService.local_keywords():
+            local[STEP_KEYWORDS] = keyword_extractor.extract(title, content, max_keywords=5)
+        if STEP_LANGUAGE in plan.llm_steps:
+            guess = language_detect.detect(f"{title} {content}")
+            if guess.confidence >= settings.LANGUAGE_DETECT_MIN_CONFIDENCE:
+                local[STEP_LANGUAGE] = guess.language
+        return steps, local, plan.summary_length, plan.reasons
+
+    def _build_prompt(self, article: NewsArticle) -> Optional[str]:
+        """构建文章的合并处理提示词，不适合离线批处理时返回 None"""
+        content = text_budget.clean_content(article.content or article.summary or "")
+        if not content.strip():
+            return None
+        steps, local, summary_length, _ = self._plan(article, record=True)
+        llm_steps = [step for step in steps if step not in local]
+        if not llm_steps:
+            return None
+        if STEP_SUMMARY in llm_steps:
+            config = self.adapter.config
+            estimate = partial(
+                text_budget.estimate_tokens,
+                cjk_tokens_per_char=config.cjk_tokens_per_char,
+                latin_tokens_per_word=config.latin_tokens_per_word
+            )
+            if estimate(content) > config.max_input_tokens:
+                return None
+        fields = [STEP_FIELDS[step] for step in llm_steps]
+        return llm_structured.build_combined_prompt(
+            article.title or "", content, CATEGORIES, target_length=summary_length, max_keywords=5, fields=fields
+        )
+
+    def _build_result(self, article: NewsArticle, body: Optional[Dict[str, Any]]) -> Optional[Dict[str, Any]]:
+        """把批次输出转换为 apply_result 使用的处理结果；没有任何可用字段时返回 None"""
+        if not body:
+            return None
+        try:
+            text = body["choices"][0]["message"]["content"]
+        except (KeyError, IndexError, TypeError):
+            return None
+        steps, local, _, reasons = self._plan(article)
+        combined = llm_structured.parse_combined_response(text, CATEGORIES, max_keywords=5)
+        outcomes = dict(local)
+        for step in steps:
+            if step not in outcomes and STEP_FIELDS[step] in combined:
+                outcomes[step] = combined[STEP_FIELDS[step]]
+        if not any(step in outcomes for step in steps if step not in local):
+            return None
+
+        result: Dict[str, Any] = {STEP_RESULT_KEYS[step]: value for step, value in outcomes.items()}
+        failed_steps = [step for step in steps if step not in outcomes]
+        if failed_steps:
+            result["failed_steps"] = failed_steps
+        if reasons:
+            result["skipped_steps"] = dict(reasons)
+        usage = body.get("usage") or {}
+        result.update({
+            "prompt_tokens": usage.get("prompt_tokens") or 0,
+            "llm_processed_at": datetime.utcnow(),
+            "llm_processing_status": LLMProcessingStatus.COMPLETED
+        })
+        return result
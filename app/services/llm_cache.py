@@ -0,0 +1,278 @@
+"""
+LLM 响应缓存 - 内存 LRU + SQLite 持久化两级缓存
+
+缓存键由 (提供商, 模型, 方法, 提示词版本, 归一化输入) 的哈希构成。重试、手动重跑、
+重新排队的失败文章以及转载的重复稿件都会命中缓存，不再重复调用模型。
+同一事件循环内相同的并发请求会合并为一次调用。
+"""
+import asyncio
+import hashlib
+import json
+import os
+import re
+import threading
+import time
+import weakref
+from collections import OrderedDict
+from typing import Any, Awaitable, Callable, Dict, Optional
+from sqlalchemy import create_engine, MetaData, Table, Column, String, Text, Float, select, delete, func
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+import logging
+
+logger = logging.getLogger(__name__)
+
+# 可缓存的 LLM 方法（健康检查等不缓存）
+CACHEABLE_METHODS = frozenset({
+    "summarize_content",
+    "translate_to_chinese",
+    "detect_language",
+    "extract_keywords",
+    "categorize_article",
+    "process_article_combined",
+})
+
+cache_metadata = MetaData()
+
+llm_cache_entries = Table(
+    "llm_cache",
+    cache_metadata,
+    Column("key", String(64), primary_key=True),
+    Column("provider", String(20)),
+    Column("method", String(50)),
+    Column("value", Text, nullable=False),
+    Column("created_at", Float, nullable=False),
+    Column("expires_at", Float, nullable=False, index=True),
+    Column("accessed_at", Float, nullable=False, index=True),
+)
+
+_MISS = object()
+_SPACE_RE = re.compile(r"\s+")
+_EVICT_EVERY = 200  # 每写入多少条检查一次磁盘容量
+
+
+def _normalize(value: Any) -> Any:
+    """归一化输入：合并空白，保证等价输入得到相同的键"""
+    if isinstance(value, str):
+        return _SPACE_RE.sub(" ", value).strip()
+    if isinstance(value, (list, tuple)):
+        return [_normalize(v) for v in value]
+    if isinstance(value, dict):
+        return {str(k): _normalize(v) for k, v in value.items()}
+    return value
+
+
+class LLMResponseCache:
+    """两级 LLM 响应缓存"""
+
+    def __init__(
+        self,
+        path: Optional[str] = None,
+        memory_size: int = 1024,
+        ttl_seconds: int = 7 * 86400,
+        max_entries: int = 50000
+    ):
+        self.memory_size = memory_size
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        self._memory: "OrderedDict[str, tuple[float, Any]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._inflight: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, Dict[str, asyncio.Future]]" = \
+            weakref.WeakKeyDictionary()
+        self._writes_since_evict = 0
+        self._stats = {
+            "memory_hits": 0,
+            "disk_hits": 0,
+            "misses": 0,
+            "coalesced": 0,
+            "stores": 0,
+            "evictions": 0,
+            "errors": 0,
+        }
+
+        self.engine = None
+        if path:
+            directory = os.path.dirname(os.path.abspath(path))
+            os.makedirs(directory, exist_ok=True)
+            self.engine = create_engine(f"sqlite:///{path}")
+            cache_metadata.create_all(self.engine)
+
+    @staticmethod
+    def make_key(provider: str, model: str, method: str, prompt_version: str, args: tuple, kwargs: dict) -> str:
+        """生成缓存键"""
+        payload = json.dumps(
+            [provider, model, method, prompt_version, _normalize(list(args)), _normalize(kwargs)],
+            ensure_ascii=False, sort_keys=True, default=str
+        )
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+    async def get_or_compute(
+        self,
+        key: str,
+        compute: Callable[[], Awaitable[Any]],
+        provider: str = "",
+        method: str = ""
+    ) -> Any:
+        """读取缓存，未命中时调用 compute 并写入；相同键的并发请求只计算一次"""
+        value = self._get_memory(key)
+        if value is not _MISS:
+            self._incr("memory_hits")
+            return value
+
+        loop = asyncio.get_running_loop()
+        inflight = self._inflight.setdefault(loop, {})
+        pending = inflight.get(key)
+        if pending is not None:
+            self._incr("coalesced")
+            return await asyncio.shield(pending)
+
+        future = loop.create_future()
+        # 没有等待者时异常也算已读取，避免 "exception was never retrieved" 警告
+        future.add_done_callback(lambda f: f.cancelled() or f.exception())
+        inflight[key] = future
+        try:
+            value = await asyncio.to_thread(self._get_disk, key) if self.engine else _MISS
+            if value is not _MISS:
+                self._incr("disk_hits")
+                self._put_memory(key, value)
+            else:
+                self._incr("misses")
+                value = await compute()
+                # 因截止时间提前结束的流式输出（PartialText）不缓存，下次重新生成
+                if value and not getattr(value, "partial", False):
+                    self._put_memory(key, value)
+                    if self.engine:
+                        await asyncio.to_thread(self._put_disk, key, value, provider, method)
+            future.set_result(value)
+            return value
+        except asyncio.CancelledError:
+            future.set_exception(RuntimeError("合并的 LLM 请求已被取消"))
+            raise
+        except Exception as e:
+            future.set_exception(e)
+            raise
+        finally:
+            inflight.pop(key, None)
+
+    def _incr(self, name: str, amount: int = 1):
+        with self._lock:
+            self._stats[name] += amount
+
+    def _get_memory(self, key: str) -> Any:
+        with self._lock:
+            entry = self._memory.get(key)
+            if entry is None:
+                return _MISS
+            expires_at, value = entry
+            if expires_at <= time.time():
+                del self._memory[key]
+                return _MISS
+            self._memory.move_to_end(key)
+            return value
+
+    def _put_memory(self, key: str, value: Any):
+        with self._lock:
+            self._memory[key] = (time.time() + self.ttl_seconds, value)
+            self._memory.move_to_end(key)
+            while len(self._memory) > self.memory_size:
+                self._memory.popitem(last=False)
+
+    def _get_disk(self, key: str) -> Any:
+        now = time.time()
+        try:
+            with self.engine.begin() as conn:
+                row = conn.execute(
+                    select(llm_cache_entries.c.value, llm_cache_entries.c.expires_at)
+                    .where(llm_cache_entries.c.key == key)
+                ).first()
+                if row is None:
+                    return _MISS
+                if row.expires_at <= now:
+                    conn.execute(delete(llm_cache_entries).where(llm_cache_entries.c.key == key))
+                    return _MISS
+                conn.execute(
+                    llm_cache_entries.update()
+                    .where(llm_cache_entries.c.key == key)
+                    .values(accessed_at=now)
+                )
+                return json.loads(row.value)
+        except Exception as e:
+            self._incr("errors")
+            logger.warning(f"读取 LLM 缓存失败: {e}")
+            return _MISS
+
+    def _put_disk(self, key: str, value: Any, provider: str, method: str):
+        now = time.time()
+        values = {
+            "key": key,
+            "provider": provider,
+            "method": method,
+            "value": json.dumps(value, ensure_ascii=False),
+            "created_at": now,
+            "expires_at": now + self.ttl_seconds,
+            "accessed_at": now,
+        }
+        try:
+            stmt = sqlite_insert(llm_cache_entries).values(**values)
+            stmt = stmt.on_conflict_do_update(
+                index_elements=[llm_cache_entries.c.key],
+                set_={k: stmt.excluded[k] for k in values if k != "key"}
+            )
+            with self.engine.begin() as conn:
+                conn.execute(stmt)
+            self._incr("stores")
+
+            with self._lock:
+                self._writes_since_evict += 1
+                should_evict = self._writes_since_evict >= _EVICT_EVERY
+                if should_evict:
+                    self._writes_since_evict = 0
+            if should_evict:
+                self.evict()
+        except Exception as e:
+            self._incr("errors")
+            logger.warning(f"写入 LLM 缓存失败: {e}")
+
+    def evict(self) -> int:
+        """删除过期条目，并按最近访问时间淘汰超出容量的条目"""
+        if not self.engine:
+            return 0
+        with self.engine.begin() as conn:
+            removed = conn.execute(
+                delete(llm_cache_entries).where(llm_cache_entries.c.expires_at <= time.time())
+            ).rowcount
+            overflow = conn.execute(select(func.count()).select_from(llm_cache_entries)).scalar() - self.max_entries
+            if overflow > 0:
+                oldest = select(llm_cache_entries.c.key).order_by(llm_cache_entries.c.accessed_at).limit(overflow)
+                removed += conn.execute(
+                    delete(llm_cache_entries).where(llm_cache_entries.c.key.in_(oldest.scalar_subquery()))
+                ).rowcount
+        if removed:
+            self._incr("evictions", removed)
+        return removed
+
+    def clear(self):
+        """清空两级缓存"""
+        with self._lock:
+            self._memory.clear()
+        if self.engine:
+            with self.engine.begin() as conn:
+                conn.execute(delete(llm_cache_entries))
+
+    def get_stats(self) -> Dict[str, Any]:
+        """命中率等统计信息"""
+        with self._lock:
+            stats = dict(self._stats)
+            stats["memory_entries"] = len(self._memory)
+        lookups = stats["memory_hits"] + stats["disk_hits"] + stats["misses"] + stats["coalesced"]
+        stats["hit_rate"] = round((lookups - stats["misses"]) / lookups, 4) if lookups else 0.0
+        if self.engine:
+            with self.engine.connect() as conn:
+                stats["disk_entries"] = conn.execute(
+                    select(func.count()).select_from(llm_cache_entries)
+                ).scalar()
+        stats.update({
+            "memory_size": self.memory_size,
+            "max_entries": self.max_entries,
+            "ttl_seconds": self.ttl_seconds,
+        })
+        return stats
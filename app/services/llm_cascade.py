@@ -0,0 +1,103 @@
+"""
+LLM 模型级联 - 简单步骤先用小模型，输出不合格时再升级到大模型
+
+每个提供商可以为各方法指定模型（method_models），并配置一个小模型（cascade_model）。
+LLMConfig.cascade_methods 中的方法先用小模型调用，出错或输出没有通过校验
+（分类不在候选类别中、关键词格式异常、语言代码不合法等）时改用该方法的正式模型重试。
+本次调用使用的模型保存在 contextvars 中，适配器组装请求时通过 active_model() 读取；
+各方法的升级次数及原因按提供商统计，用于调整哪些方法适合走小模型。
+"""
+import re
+import threading
+from collections import Counter
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Any, Dict, Iterator, Optional, Sequence, Tuple
+from app.services import llm_structured
+
+ESCALATE_INVALID = "invalid"  # 输出没有通过校验
+ESCALATE_ERROR = "error"  # 小模型调用失败
+
+MAX_KEYWORD_LENGTH = 30  # 单个关键词超过该长度视为模型把整段输出当成了一个关键词
+_LANGUAGE_RE = re.compile(r"^[a-z]{2,3}(-[a-z]{2,4})?$")
+_CJK_RE = re.compile(r"[一-鿿]")
+_KEYWORD_SEPARATOR_RE = re.compile(r"[,，、;；\n]")  # 关键词中出现分隔符说明没有正确拆分
+
+_current_model: ContextVar[Optional[str]] = ContextVar("llm_model_override", default=None)
+
+
+@contextmanager
+def use_model(model: Optional[str]) -> Iterator[None]:
+    """在 with 块内让适配器使用指定模型，None 表示使用提供商配置的默认模型"""
+    token = _current_model.set(model)
+    try:
+        yield
+    finally:
+        _current_model.reset(token)
+
+
+def active_model(default: str) -> str:
+    """适配器本次请求应使用的模型"""
+    return _current_model.get() or default
+
+
+def _arg(args: Sequence[Any], kwargs: Dict[str, Any], index: int, name: str, default: Any = None) -> Any:
+    if name in kwargs:
+        return kwargs[name]
+    return args[index] if len(args) > index else default
+
+
+def is_acceptable(method_name: str, result: Any, args: Sequence[Any] = (), kwargs: Optional[Dict[str, Any]] = None) -> bool:
+    """检查小模型的输出是否可以直接使用；没有校验规则的方法一律接受"""
+    kwargs = kwargs or {}
+    if method_name == "categorize_article":
+        categories = _arg(args, kwargs, 2, "categories", ())
+        return llm_structured.match_category(result, categories) is not None
+    if method_name == "extract_keywords":
+        return isinstance(result, list) and bool(result) and len(set(result)) == len(result) and all(
+            isinstance(k, str) and k.strip() and len(k) <= MAX_KEYWORD_LENGTH and not _KEYWORD_SEPARATOR_RE.search(k)
+            for k in result
+        )
+    if method_name == "detect_language":
+        return isinstance(result, str) and bool(_LANGUAGE_RE.match(result.strip().lower()))
+    if method_name == "translate_to_chinese":
+        return isinstance(result, str) and bool(_CJK_RE.search(result))
+    if method_name == "summarize_content":
+        return isinstance(result, str) and len(result.strip()) >= 10 and bool(_CJK_RE.search(result))
+    if method_name == "process_article_combined":
+        fields = _arg(args, kwargs, 5, "fields") or llm_structured.COMBINED_FIELDS
+        return isinstance(result, dict) and all(field in result for field in fields)
+    if method_name in ("translate_titles_batch", "detect_languages_batch", "categorize_batch"):
+        return isinstance(result, list) and all(value is not None for value in result)
+    return True
+
+
+class CascadeMetrics:
+    """按 (提供商, 方法) 统计小模型调用次数和升级次数（线程安全）"""
+
+    def __init__(self):
+        self._attempts: Counter = Counter()
+        self._escalations: Dict[Tuple[str, str], Counter] = {}
+        self._lock = threading.Lock()
+
+    def record_attempt(self, provider: str, method: str):
+        with self._lock:
+            self._attempts[(provider, method)] += 1
+
+    def record_escalation(self, provider: str, method: str, reason: str):
+        with self._lock:
+            self._escalations.setdefault((provider, method), Counter())[reason] += 1
+
+    def get_stats(self) -> Dict[str, Dict[str, Any]]:
+        with self._lock:
+            stats: Dict[str, Dict[str, Any]] = {}
+            for (provider, method), attempts in sorted(self._attempts.items()):
+                reasons = self._escalations.get((provider, method), Counter())
+                escalations = sum(reasons.values())
+                stats.setdefault(provider, {})[method] = {
+                    "attempts": attempts,
+                    "escalations": escalations,
+                    "escalation_rate": round(escalations / attempts, 4) if attempts else 0.0,
+                    "reasons": dict(reasons),
+                }
+            return stats
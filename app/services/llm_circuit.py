@@ -0,0 +1,99 @@
+"""
+LLM 提供商熔断器 - 连续失败后短时间内直接跳过该提供商
+
+状态：关闭（正常调用）→ 连续失败达到阈值后打开（直接拒绝）→ 冷却结束或健康探测成功后
+半开（只放行一个试探请求）→ 试探成功则关闭，失败则重新打开。
+"""
+import threading
+import time
+from enum import Enum
+from typing import Any, Dict, Optional
+from app.services.llm_interface import LLMProcessingError
+
+
+class CircuitState(str, Enum):
+    """熔断器状态"""
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+
+
+class CircuitOpenError(LLMProcessingError):
+    """提供商处于熔断状态，请求未发出"""
+    pass
+
+
+class CircuitBreaker:
+    """单个提供商的熔断器（线程安全，后台处理线程与主事件循环共用）"""
+
+    def __init__(self, failure_threshold: int = 3, recovery_timeout: float = 30.0):
+        self.failure_threshold = max(1, failure_threshold)
+        self.recovery_timeout = recovery_timeout
+        self.state = CircuitState.CLOSED
+        self.consecutive_failures = 0
+        self.opened_at: Optional[float] = None
+        self.last_error: Optional[str] = None
+        self._trial_in_flight = False
+        self._lock = threading.Lock()
+
+    def allow_request(self) -> bool:
+        """是否允许发出请求；半开状态下同一时间只放行一个试探请求"""
+        with self._lock:
+            if self.state == CircuitState.OPEN:
+                if time.monotonic() - self.opened_at < self.recovery_timeout:
+                    return False
+                self.state = CircuitState.HALF_OPEN
+            if self.state == CircuitState.HALF_OPEN:
+                if self._trial_in_flight:
+                    return False
+                self._trial_in_flight = True
+            return True
+
+    def record_success(self):
+        with self._lock:
+            self.state = CircuitState.CLOSED
+            self.consecutive_failures = 0
+            self.opened_at = None
+            self._trial_in_flight = False
+
+    def record_failure(self, error: Any = None):
+        with self._lock:
+            self.consecutive_failures += 1
+            if error is not None:
+                self.last_error = str(error)
+            if self.state == CircuitState.HALF_OPEN or self.consecutive_failures >= self.failure_threshold:
+                self._trip()
+
+    def release(self):
+        """请求被取消时归还试探名额，不计入成功或失败"""
+        with self._lock:
+            self._trial_in_flight = False
+
+    def record_probe(self, healthy: bool, error: Any = None):
+        """后台健康探测结果：不健康立即打开，健康则让打开的熔断器提前进入半开"""
+        with self._lock:
+            if not healthy:
+                if error is not None:
+                    self.last_error = str(error)
+                if self.state != CircuitState.OPEN:
+                    self._trip()
+            elif self.state == CircuitState.OPEN:
+                self.state = CircuitState.HALF_OPEN
+                self._trial_in_flight = False
+
+    def _trip(self):
+        self.state = CircuitState.OPEN
+        self.opened_at = time.monotonic()
+        self._trial_in_flight = False
+
+    def get_state(self) -> Dict[str, Any]:
+        with self._lock:
+            retry_in = None
+            if self.state == CircuitState.OPEN:
+                retry_in = round(max(0.0, self.recovery_timeout - (time.monotonic() - self.opened_at)), 1)
+            return {
+                "state": self.state.value,
+                "consecutive_failures": self.consecutive_failures,
+                "retry_in_seconds": retry_in,
+                "last_error": self.last_error,
+            }
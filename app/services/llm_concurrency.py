@@ -0,0 +1,203 @@
+"""
+LLM 自适应并发控制 - 按 AIMD（加性增、乘性减）调整每个提供商和 Ollama 端点的并发上限
+
+固定的并发上限很难配准：本地 Ollama 同时生成 2~4 路就已饱和，远程 API 则能承受几十路。
+每次请求完成后按结果调整上限：
+- 请求时并发已用满、延迟与基线持平时加性增长，每次成功加 1/当前上限（约每轮增加 1）；
+- 超时、429/503 或延迟超过基线 SPIKE_RATIO 倍时乘以 DECREASE_FACTOR；
+  降低之前发出的请求不再重复触发降低，避免同一波过载把上限一路压到底。
+延迟基线按调用方法分别统计（摘要与关键词提取耗时相差很大）：低于基线的样本直接拉低基线，
+高于基线的样本只缓慢抬高，近似于近期的空载延迟。
+状态用线程锁保护，后台处理线程和主事件循环共用同一个上限；等待中的请求按先后顺序放行，
+由 call_soon_threadsafe 唤醒所在事件循环。
+"""
+import asyncio
+import logging
+import threading
+import time
+from collections import deque
+from contextlib import asynccontextmanager
+from typing import Any, AsyncIterator, Deque, Dict, Optional, Tuple
+import httpx
+
+logger = logging.getLogger(__name__)
+
+DECREASE_FACTOR = 0.7  # 过载时上限乘以该系数
+SPIKE_RATIO = 2.0  # 延迟超过基线该倍数视为过载
+FLAT_RATIO = 1.25  # 延迟不超过基线该倍数视为持平，才继续增长
+BASELINE_RISE_ALPHA = 0.05  # 高于基线的样本抬高基线的权重
+MIN_BASELINE_SAMPLES = 5  # 某方法样本数达到后才判断延迟尖峰
+MIN_BASELINE_SECONDS = 0.1  # 基线低于该值时按该值比较，毫秒级的抖动不算尖峰
+OVERLOAD_STATUS = {429, 503}
+
+
+def is_overload(error: BaseException) -> bool:
+    """错误是否说明提供商已过载：超时或 429/503（适配器会把原始异常包装为 LLMProcessingError）"""
+    seen = set()
+    current: Optional[BaseException] = error
+    while current is not None and id(current) not in seen:
+        seen.add(id(current))
+        if isinstance(current, (asyncio.TimeoutError, httpx.TimeoutException)):
+            return True
+        if isinstance(current, httpx.HTTPStatusError) and current.response.status_code in OVERLOAD_STATUS:
+            return True
+        current = current.__cause__ or current.__context__
+    return False
+
+
+class AIMDLimit:
+    """AIMD 并发上限；ceiling 不大于初始值时只会在过载时降低，之后恢复到初始值"""
+
+    def __init__(self, name: str, initial: int, ceiling: int = 0, adaptive: bool = True, min_limit: int = 1):
+        self.name = name
+        self.min_limit = max(1, min_limit)
+        self.ceiling = max(self.min_limit, initial, ceiling)
+        self.adaptive = adaptive
+        self._limit = float(max(self.min_limit, min(initial, self.ceiling)))
+        self._baselines: Dict[str, Tuple[float, int]] = {}  # 方法 -> (基线延迟, 样本数)
+        self._decreased_at = 0.0
+        self._increases = 0
+        self._decreases = 0
+        self._last_decrease: Optional[str] = None
+        self._lock = threading.Lock()
+
+    @property
+    def limit(self) -> float:
+        return self._limit
+
+    @property
+    def capacity(self) -> int:
+        """当前允许同时进行的请求数"""
+        return max(self.min_limit, int(self._limit))
+
+    def record_success(self, method: str, seconds: float, started: float, saturated: bool) -> bool:
+        """记录一次成功请求，返回上限是否提高"""
+        with self._lock:
+            baseline, samples = self._baselines.get(method, (seconds, 0))
+            reference = max(baseline, MIN_BASELINE_SECONDS)
+            spike = samples >= MIN_BASELINE_SAMPLES and seconds > reference * SPIKE_RATIO
+            flat = samples < MIN_BASELINE_SAMPLES or seconds <= reference * FLAT_RATIO
+            if seconds < baseline:
+                self._baselines[method] = (seconds, samples + 1)
+            else:
+                self._baselines[method] = (baseline + BASELINE_RISE_ALPHA * (seconds - baseline), samples + 1)
+            if not self.adaptive:
+                return False
+            if spike:
+                self._decrease(started, f"{method} 延迟 {seconds:.1f}s 超过基线 {baseline:.1f}s 的 {SPIKE_RATIO:g} 倍")
+                return False
+            if not (saturated and flat) or self._limit >= self.ceiling:
+                return False
+            before = self.capacity
+            self._limit = min(float(self.ceiling), self._limit + 1 / self._limit)
+            self._increases += 1
+            return self.capacity > before
+
+    def record_failure(self, error: BaseException, started: float):
+        """记录一次失败请求，只有超时和限流类错误才降低上限"""
+        if self.adaptive and is_overload(error):
+            with self._lock:
+                self._decrease(started, f"{type(error).__name__}: {error}")
+
+    def _decrease(self, started: float, reason: str):
+        # 上次降低之前发出的请求反映的是旧上限下的负载，不再重复降低
+        if started < self._decreased_at:
+            return
+        before = self._limit
+        self._limit = max(float(self.min_limit), self._limit * DECREASE_FACTOR)
+        self._decreased_at = time.monotonic()
+        self._decreases += 1
+        self._last_decrease = reason
+        logger.info(f"{self.name} 并发上限 {before:.1f} → {self._limit:.1f}（{reason}）")
+
+    def get_stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "adaptive": self.adaptive,
+                "limit": round(self._limit, 2),
+                "capacity": self.capacity,
+                "ceiling": self.ceiling,
+                "increases": self._increases,
+                "decreases": self._decreases,
+                "last_decrease": self._last_decrease,
+                "baseline_latency": {
+                    method: round(baseline, 3) for method, (baseline, _) in sorted(self._baselines.items())
+                },
+            }
+
+
+class AdaptiveLimiter(AIMDLimit):
+    """按 AIMD 上限放行请求的并发限制器，可跨事件循环共用"""
+
+    def __init__(self, name: str, initial: int, ceiling: int = 0, adaptive: bool = True, min_limit: int = 1):
+        super().__init__(name, initial, ceiling, adaptive, min_limit)
+        self.in_flight = 0
+        self._waiters: Deque[Tuple[asyncio.AbstractEventLoop, asyncio.Future]] = deque()
+
+    @asynccontextmanager
+    async def acquire(self, method: str = "") -> AsyncIterator[None]:
+        """占用一个并发名额，退出时按耗时和结果调整上限；被取消或提前关闭不参与调整"""
+        await self._wait()
+        started = time.monotonic()
+        saturated = self.in_flight >= self.capacity
+        try:
+            yield
+        except (asyncio.CancelledError, GeneratorExit):
+            raise
+        except Exception as e:
+            self.record_failure(e, started)
+            raise
+        else:
+            if self.record_success(method, time.monotonic() - started, started, saturated):
+                self._wake()
+        finally:
+            self._release()
+
+    async def _wait(self):
+        loop = asyncio.get_running_loop()
+        with self._lock:
+            if not self._waiters and self.in_flight < self.capacity:
+                self.in_flight += 1
+                return
+            future = loop.create_future()
+            self._waiters.append((loop, future))
+        try:
+            await future
+        except asyncio.CancelledError:
+            with self._lock:
+                if (loop, future) in self._waiters:
+                    self._waiters.remove((loop, future))
+                    raise
+            # 名额已经分配给该请求，但在恢复执行前被取消
+            if not future.cancelled():
+                self._release()
+            raise
+
+    def _release(self):
+        with self._lock:
+            self.in_flight -= 1
+        self._wake()
+
+    def _wake(self):
+        """按先后顺序把空出的名额分配给等待中的请求"""
+        with self._lock:
+            while self._waiters and self.in_flight < self.capacity:
+                loop, future = self._waiters.popleft()
+                self.in_flight += 1
+                try:
+                    loop.call_soon_threadsafe(self._grant, future)
+                except RuntimeError:
+                    # 等待者所在的事件循环已关闭
+                    self.in_flight -= 1
+
+    def _grant(self, future: asyncio.Future):
+        if future.cancelled():
+            self._release()
+        else:
+            future.set_result(None)
+
+    def get_stats(self) -> Dict[str, Any]:
+        stats = super().get_stats()
+        with self._lock:
+            stats.update(in_flight=self.in_flight, waiting=len(self._waiters))
+        return stats
@@ -13,6 +13,25 @@ class LLMProviderConfig(BaseModel):
     timeout: int = 60
     max_retries: int = 3
     retry_delay: int = 1
+    max_concurrency: int = 8  # 同一提供商同时进行的请求上限（启用自适应并发时为初始值）
+    concurrency_ceiling: int = 0  # 自适应并发可增长到的上限，0 表示不超过 max_concurrency
+    adaptive_concurrency: bool = True  # 按延迟和超时/429 在 concurrency_ceiling 以内增减并发（AIMD）
+    relative_cost: float = 1.0  # 相对调用成本，按延迟路由时超过上限的提供商只用于回退
+    max_input_tokens: int = 3000  # 送入提示词的正文 token 上限，超出时分块摘要或截断
+    cjk_tokens_per_char: float = 1.0  # 分词器对汉字的大致比例，用于估算 token 数
+    latin_tokens_per_word: float = 1.3
+    requests_per_minute: int = 0  # 每分钟请求数上限（令牌桶），0 表示不限制
+    tokens_per_minute: int = 0  # 每分钟 token 数上限（令牌桶），0 表示不限制
+    method_models: Dict[str, str] = {}  # 方法名 -> 该方法使用的模型，未列出的方法使用 model
+    cascade_model: Optional[str] = None  # 级联方法先尝试的小模型，None 表示不级联
+    last_resort: bool = False  # 只在其他提供商全部失败后使用，不参与延迟路由和对冲，结果标记为降级
+
+
+class OllamaEndpointConfig(BaseModel):
+    """单个 Ollama 服务端点"""
+    url: str
+    max_concurrency: int = 2
+    concurrency_ceiling: int = 0  # 自适应并发可增长到的上限，0 表示不超过 max_concurrency
 
 
 class OllamaConfig(LLMProviderConfig):
@@ -21,6 +40,18 @@ class OllamaConfig(LLMProviderConfig):
     base_url: str = "http://192.168.11.12:11434"
     model: str = "qwen3"
     temperature: float = 0.7
+    max_concurrency: int = 2  # 本地模型并行能力有限
+    relative_cost: float = 0.0
+    max_input_tokens: int = 1500  # 默认 2048 的上下文窗口需留出提示词和输出空间
+    cjk_tokens_per_char: float = 0.7  # Qwen 系列分词器
+    endpoints: List[OllamaEndpointConfig] = []  # 多台 Ollama 服务时按负载分配请求，为空时只使用 base_url
+    endpoint_failure_threshold: int = 3  # 端点连续失败多少次后暂停分配，健康探测成功后恢复
+    streaming: bool = True  # 摘要以 NDJSON 流接收，达到目标长度即停止生成
+    keep_alive: Optional[str] = "30m"  # 模型在最后一次请求后的常驻时长，None 使用服务端默认（5 分钟）
+    num_ctx: Optional[int] = None  # 以下推理参数为 None 时使用服务端默认
+    num_predict: Optional[int] = None
+    num_thread: Optional[int] = None
+    stream_deadline: Optional[float] = None  # 单次流式调用的截止时间（秒），到期返回已生成部分
 
 
 class OpenAIConfig(LLMProviderConfig):
@@ -31,6 +62,8 @@ class OpenAIConfig(LLMProviderConfig):
     base_url: str = "https://api.openai.com/v1"
     temperature: float = 0.7
     max_tokens: int = 1000
+    streaming: bool = True  # 摘要以 SSE 流接收，达到目标长度即停止生成
+    stream_deadline: Optional[float] = None  # 单次流式调用的截止时间（秒），到期返回已生成部分
 
 
 class HuoshanConfig(LLMProviderConfig):
@@ -40,6 +73,7 @@ class HuoshanConfig(LLMProviderConfig):
     secret_key: str
     model: str = "ep-20240101-xxx"
     base_url: str = "https://ark.cn-beijing.volces.com/api/v3"
+    cjk_tokens_per_char: float = 0.7
 
 
 class QianwenConfig(LLMProviderConfig):
@@ -48,6 +82,16 @@ class QianwenConfig(LLMProviderConfig):
     api_key: str
     model: str = "qwen-turbo"
     base_url: str = "https://dashscope.aliyuncs.com/api/v1"
+    cjk_tokens_per_char: float = 0.7
+
+
+class ExtractiveConfig(LLMProviderConfig):
+    """本地抽取式降级配置（不调用模型）"""
+    provider: LLMProvider = LLMProvider.CUSTOM
+    model: str = "extractive"
+    relative_cost: float = 0.0
+    last_resort: bool = True
+    adaptive_concurrency: bool = False
 
 
 class LLMConfig(BaseModel):
@@ -62,6 +106,21 @@ class LLMConfig(BaseModel):
     summary_target_length: int = 400
     batch_process_size: int = 50
     max_concurrent_tasks: int = 10
+    batch_prompt_size: int = 20  # 标题翻译、语言检测、分类的批量方法每次调用合并的文章数
+    language_detect_min_confidence: float = 0.7  # 离线语言检测低于该置信度时才调用 LLM
+    cascade_methods: List[str] = []  # 先用各提供商 cascade_model、输出不合格再升级的方法
+    
+    # 熔断与健康探测配置
+    circuit_failure_threshold: int = 3  # 连续失败多少次后熔断
+    circuit_recovery_timeout: float = 30.0  # 熔断后多少秒放行试探请求
+    health_cache_ttl: float = 60.0  # 健康检查结果缓存时间（秒）
+    health_probe_timeout: float = 5.0  # 单个提供商健康探测超时（秒）
+    
+    # 路由配置
+    routing_policy: str = "static"  # static: 固定回退顺序；latency: 按实测延迟排序
+    routing_max_cost: float = 1.0  # 参与延迟路由和对冲的提供商成本上限
+    routing_min_samples: int = 20  # 延迟样本少于该数量时不参与分位数估计
+    hedging_enabled: bool = False  # 首选提供商超过其 p95 耗时仍未返回时，向下一个提供商发出对冲请求
     
     # 回退策略配置
     enable_fallback: bool = True
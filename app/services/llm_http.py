@@ -0,0 +1,143 @@
+"""
+LLM HTTP 连接管理 - 每个事件循环一个长连接客户端
+
+httpx.AsyncClient 的连接池绑定创建它的事件循环。LLM 管理器是单例，同时被 FastAPI 的事件循环
+（接口、定时任务）和后台处理线程的事件循环使用，共用一个客户端会让连接在不同循环间失效重建。
+LoopClient 为每个事件循环分别创建客户端并复用其连接；事件循环被回收时对应客户端随之释放，
+关闭服务时由 http_clients.aclose() 关闭当前循环的全部客户端。
+
+通过 httpcore 的 trace 扩展统计新建 TCP 连接数，与请求数之比即为连接复用率。
+"""
+import asyncio
+import threading
+import weakref
+from collections import Counter
+from typing import Any, Dict, Optional
+import httpx
+
+KEEPALIVE_EXPIRY = 120.0  # 空闲连接保留时间（秒），长于后台处理两轮之间的间隔
+
+
+def client_limits(max_concurrency: int, keepalive_expiry: float = KEEPALIVE_EXPIRY) -> httpx.Limits:
+    """按提供商并发上限设置连接池：保留与并发数相同的空闲连接，另留余量给健康探测和对冲请求"""
+    max_concurrency = max(1, max_concurrency)
+    return httpx.Limits(
+        max_connections=max_concurrency * 2,
+        max_keepalive_connections=max_concurrency,
+        keepalive_expiry=keepalive_expiry
+    )
+
+
+class LoopClient:
+    """按事件循环分别创建的 httpx.AsyncClient，name 用于汇总连接统计"""
+
+    def __init__(self, name: str, **client_kwargs: Any):
+        self.name = name
+        self._client_kwargs = client_kwargs
+        self._clients: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, httpx.AsyncClient]" = \
+            weakref.WeakKeyDictionary()
+        self._detached: Optional[httpx.AsyncClient] = None  # 不在事件循环中访问时使用
+        http_clients.register(self)
+
+    def get(self) -> httpx.AsyncClient:
+        """当前事件循环的客户端，不存在或已关闭时新建"""
+        loop = _running_loop()
+        client = self._clients.get(loop) if loop else self._detached
+        if client is None or client.is_closed:
+            client = httpx.AsyncClient(**self._client_kwargs, event_hooks={"request": [self._on_request]})
+            self.set(client)
+        return client
+
+    def set(self, client: httpx.AsyncClient):
+        """替换当前事件循环的客户端（如测试中注入 MockTransport）"""
+        loop = _running_loop()
+        if loop:
+            self._clients[loop] = client
+        else:
+            self._detached = client
+
+    async def aclose(self):
+        """关闭当前事件循环的客户端"""
+        loop = _running_loop()
+        client = self._clients.pop(loop, None) if loop else None
+        if client is not None and not client.is_closed:
+            await client.aclose()
+
+    def open_clients(self) -> int:
+        return sum(1 for client in list(self._clients.values()) if not client.is_closed)
+
+    async def _on_request(self, request: httpx.Request):
+        http_clients.record_request(self.name)
+        if "trace" not in request.extensions:
+            request.extensions["trace"] = self._trace
+
+    async def _trace(self, event_name: str, info: Dict[str, Any]):
+        if event_name == "connection.connect_tcp.complete":
+            http_clients.record_connection(self.name)
+
+
+class LoopClientMixin:
+    """适配器通过 self.client 访问当前事件循环的客户端"""
+    _http: LoopClient
+
+    @property
+    def client(self) -> httpx.AsyncClient:
+        return self._http.get()
+
+    @client.setter
+    def client(self, client: httpx.AsyncClient):
+        self._http.set(client)
+
+
+class HTTPClientRegistry:
+    """所有 LoopClient 的登记表：连接复用统计与统一关闭"""
+
+    def __init__(self):
+        self._loop_clients: "weakref.WeakSet[LoopClient]" = weakref.WeakSet()
+        self._requests: Counter = Counter()
+        self._connections: Counter = Counter()
+        self._lock = threading.Lock()
+
+    def register(self, loop_client: LoopClient):
+        self._loop_clients.add(loop_client)
+
+    def record_request(self, name: str):
+        with self._lock:
+            self._requests[name] += 1
+
+    def record_connection(self, name: str):
+        with self._lock:
+            self._connections[name] += 1
+
+    async def aclose(self):
+        """关闭当前事件循环中的所有客户端（应用关闭或后台线程退出时调用）"""
+        await asyncio.gather(*(c.aclose() for c in list(self._loop_clients)), return_exceptions=True)
+
+    def get_stats(self) -> Dict[str, Dict[str, Any]]:
+        """各提供商的请求数、新建连接数、连接复用率及打开的客户端数"""
+        open_clients: Counter = Counter()
+        for loop_client in list(self._loop_clients):
+            open_clients[loop_client.name] += loop_client.open_clients()
+        with self._lock:
+            names = set(self._requests) | set(open_clients)
+            return {
+                name: {
+                    "requests": self._requests[name],
+                    "new_connections": self._connections[name],
+                    "reuse_rate": round(1 - min(self._connections[name], self._requests[name]) / self._requests[name], 3)
+                    if self._requests[name] else None,
+                    "open_clients": open_clients[name],
+                }
+                for name in sorted(names)
+            }
+
+
+def _running_loop() -> Optional[asyncio.AbstractEventLoop]:
+    try:
+        return asyncio.get_running_loop()
+    except RuntimeError:
+        return None
+
+
+# 全局连接登记表
+http_clients = HTTPClientRegistry()
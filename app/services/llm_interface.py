@@ -3,8 +3,10 @@ LLM 服务接口和枚举定义
 """
 from abc import ABC, abstractmethod
 from enum import Enum
-from typing import Dict, Any, List, Optional
+from typing import Dict, Any, List, Optional, Tuple
 from datetime import datetime
+from app.utils.text_budget import estimate_tokens
+from app.services import llm_structured
 
 
 class LLMProvider(str, Enum):
@@ -20,6 +22,22 @@ class LLMProvider(str, Enum):
 class LLMServiceInterface(ABC):
     """LLM 服务抽象接口 - 定义统一的服务契约"""
     
+    # 提示词版本，修改提示词后递增，使旧的缓存结果失效
+    prompt_version: str = "1"
+    
+    def estimate_tokens(self, text: str) -> int:
+        """按该提供商分词器的大致比例估算 token 数（接口未返回用量时使用）"""
+        config = getattr(self, "config", None)
+        return estimate_tokens(
+            text,
+            getattr(config, "cjk_tokens_per_char", 1.0),
+            getattr(config, "latin_tokens_per_word", 1.3)
+        )
+    
+    async def warm_up(self) -> Optional[Dict[str, Any]]:
+        """预加载模型，需要加载本地模型的适配器覆盖此方法；远程服务无需预热，返回 None"""
+        return None
+    
     @abstractmethod
     async def summarize_content(self, content: str, target_length: int = 400, **kwargs) -> str:
         """生成内容摘要
@@ -90,6 +108,82 @@ class LLMServiceInterface(ABC):
         """
         pass
     
+    async def process_article_combined(
+        self,
+        title: str,
+        content: str,
+        categories: List[str],
+        target_length: int = 400,
+        max_keywords: int = 5,
+        fields: Optional[List[str]] = None,
+        **kwargs
+    ) -> Dict[str, Any]:
+        """单次调用完成语言检测、标题翻译、摘要、关键词和分类
+        
+        Args:
+            title: 文章标题
+            content: 文章内容
+            categories: 候选分类列表
+            target_length: 目标摘要长度
+            max_keywords: 最大关键词数量
+            fields: 需要返回的字段，None 表示全部（见 llm_structured.COMBINED_FIELDS）
+            **kwargs: 扩展参数
+        
+        Returns:
+            通过校验的字段字典，缺失或不合法的字段不包含在内
+        """
+        raise NotImplementedError(f"{type(self).__name__} 不支持合并处理")
+    
+    async def translate_titles_batch(self, titles: List[str], **kwargs) -> List[Optional[str]]:
+        """一次调用翻译多条标题
+        
+        Args:
+            titles: 标题列表
+            **kwargs: 扩展参数
+        
+        Returns:
+            与输入一一对应的中文标题，输出缺失或不合法的条目为 None
+        """
+        prompt = llm_structured.build_batch_prompt(llm_structured.BATCH_TITLE, titles)
+        response = await self._generate_json(prompt)
+        return llm_structured.parse_batch_response(response, llm_structured.BATCH_TITLE, len(titles))
+    
+    async def detect_languages_batch(self, texts: List[str], **kwargs) -> List[Optional[str]]:
+        """一次调用检测多段文本的语言
+        
+        Args:
+            texts: 文本列表（每段只取开头部分）
+            **kwargs: 扩展参数
+        
+        Returns:
+            与输入一一对应的语言代码，输出缺失或不合法的条目为 None
+        """
+        prompt = llm_structured.build_batch_prompt(llm_structured.BATCH_LANGUAGE, texts)
+        response = await self._generate_json(prompt)
+        return llm_structured.parse_batch_response(response, llm_structured.BATCH_LANGUAGE, len(texts))
+    
+    async def categorize_batch(
+        self, articles: List[Tuple[str, str]], categories: List[str], **kwargs
+    ) -> List[Optional[str]]:
+        """一次调用为多篇文章分类
+        
+        Args:
+            articles: (标题, 内容) 列表，内容只取开头部分
+            categories: 候选分类列表
+            **kwargs: 扩展参数
+        
+        Returns:
+            与输入一一对应的分类，输出缺失或不在候选中的条目为 None
+        """
+        items = [f"标题：{title} 内容：{content}" for title, content in articles]
+        prompt = llm_structured.build_batch_prompt(llm_structured.BATCH_CATEGORY, items, categories)
+        response = await self._generate_json(prompt)
+        return llm_structured.parse_batch_response(response, llm_structured.BATCH_CATEGORY, len(articles), categories)
+    
+    async def _generate_json(self, prompt: str) -> str:
+        """发出一次要求输出 JSON 的调用，返回原始输出；适配器覆盖此方法以支持批量方法"""
+        raise NotImplementedError(f"{type(self).__name__} 不支持批量处理")
+    
     @abstractmethod
     async def health_check(self) -> Dict[str, Any]:
         """健康检查
@@ -1,14 +1,27 @@
 """
 LLM 服务管理器 - 实现统一服务入口和回退机制
 """
-from typing import Dict, Type, Any, List
+import asyncio
+import time
+from datetime import datetime
+from functools import partial
+from typing import Callable, Dict, Type, Any, List, Optional, Tuple
 from app.services.llm_interface import LLMServiceInterface, LLMProvider, LLMProcessingError
 from app.services.llm_config import LLMConfig, LLMProviderConfig
-from app.services.llm_adapters import OllamaAdapter, OpenAIAdapter, HuoshanAdapter, QianwenAdapter
+from app.services.llm_adapters import OllamaAdapter, OpenAIAdapter, HuoshanAdapter, QianwenAdapter, ExtractiveAdapter
+from app.services.llm_cache import LLMResponseCache, CACHEABLE_METHODS
+from app.services.llm_circuit import CircuitBreaker, CircuitOpenError, CircuitState
+from app.services.llm_concurrency import AdaptiveLimiter
+from app.services.llm_routing import LatencyTracker, RoutingMetrics, ROUTING_LATENCY
+from app.services import llm_cascade, llm_structured, llm_usage
+from app.utils import language_detect, text_budget
 import logging
 
 logger = logging.getLogger(__name__)
 
+MAP_REDUCE_MAX_DEPTH = 3  # 分块摘要合并后仍超预算时最多再归约的轮数
+MIN_CHUNK_SUMMARY_LENGTH = 150
+
 
 class LLMAdapterFactory:
     """LLM 适配器工厂"""
@@ -18,6 +31,7 @@ class LLMAdapterFactory:
         LLMProvider.OPENAI: OpenAIAdapter,
         LLMProvider.HUOSHAN: HuoshanAdapter,
         LLMProvider.QIANWEN: QianwenAdapter,
+        LLMProvider.CUSTOM: ExtractiveAdapter,
     }
     
     @classmethod
@@ -38,9 +52,19 @@ class LLMAdapterFactory:
 class LLMServiceManager:
     """LLM 服务管理器 - 实现统一服务入口和回退机制"""
     
-    def __init__(self, config: LLMConfig):
+    def __init__(self, config: LLMConfig, cache: Optional[LLMResponseCache] = None):
         self.config = config
+        self.cache = cache
         self.adapters: Dict[LLMProvider, LLMServiceInterface] = {}
+        # 各提供商的并发限制，后台处理线程与主事件循环共用
+        self.limiters: Dict[LLMProvider, AdaptiveLimiter] = {}
+        self.breakers: Dict[LLMProvider, CircuitBreaker] = {}
+        # 最近一次健康探测结果及时间（monotonic），健康检查接口直接返回缓存
+        self._health_results: Dict[LLMProvider, Dict[str, Any]] = {}
+        self._health_checked_at: Optional[float] = None
+        self.latency = LatencyTracker(min_samples=config.routing_min_samples)
+        self.routing_metrics = RoutingMetrics()
+        self.cascade_metrics = llm_cascade.CascadeMetrics()
         self._initialize_adapters()
     
     def _initialize_adapters(self):
@@ -50,52 +74,159 @@ class LLMServiceManager:
                 try:
                     adapter = LLMAdapterFactory.create_adapter(provider_config)
                     self.adapters[provider] = adapter
+                    # 降级提供商不支持的方法会直接报错，不能因此熔断
+                    if not provider_config.last_resort:
+                        self.breakers[provider] = CircuitBreaker(
+                            self.config.circuit_failure_threshold, self.config.circuit_recovery_timeout
+                        )
                     logger.info(f"成功初始化 {provider.value} 适配器")
                 except Exception as e:
                     logger.error(f"初始化 {provider.value} 适配器失败: {e}")
     
     async def summarize_content(self, content: str, target_length: int = 400, **kwargs) -> str:
-        """生成摘要 - 支持回退机制"""
-        return await self._execute_with_fallback("summarize_content", content, target_length, **kwargs)
+        """生成摘要 - 支持回退机制，超出输入预算的长文分块摘要后再合并"""
+        content = text_budget.clean_content(content)
+        max_tokens, estimate = self._input_budget("summarize_content")
+        if estimate(content) <= max_tokens:
+            return await self._execute_with_fallback("summarize_content", content, target_length, **kwargs)
+        return await self._map_reduce_summary(content, target_length, max_tokens, estimate, 1, **kwargs)
+    
+    async def _map_reduce_summary(
+        self,
+        content: str,
+        target_length: int,
+        max_tokens: int,
+        estimate: Callable[[str], int],
+        depth: int,
+        **kwargs
+    ) -> str:
+        """分块并发摘要，再把各块摘要合并为最终摘要；每块单独走响应缓存"""
+        chunks = text_budget.chunk_text(content, max_tokens, estimate)
+        chunk_target = max(MIN_CHUNK_SUMMARY_LENGTH, target_length * 2 // len(chunks))
+        logger.info(f"正文超出输入预算 ({max_tokens} tokens)，分 {len(chunks)} 块摘要（第 {depth} 轮）")
+        partials = await asyncio.gather(*(
+            self._execute_with_fallback("summarize_content", chunk, chunk_target, **kwargs) for chunk in chunks
+        ))
+        merged = "\n".join(partial_summary.strip() for partial_summary in partials)
+        if estimate(merged) > max_tokens:
+            if depth < MAP_REDUCE_MAX_DEPTH and len(chunks) > 1:
+                return await self._map_reduce_summary(merged, target_length, max_tokens, estimate, depth + 1, **kwargs)
+            merged = text_budget.truncate_to_budget(merged, max_tokens, estimate)
+        return await self._execute_with_fallback("summarize_content", merged, target_length, **kwargs)
     
     async def translate_to_chinese(self, text: str, source_language: str = "auto", **kwargs) -> str:
         """翻译为中文 - 支持回退机制"""
         return await self._execute_with_fallback("translate_to_chinese", text, source_language, **kwargs)
     
     async def detect_language(self, text: str, **kwargs) -> str:
-        """检测语言 - 支持回退机制"""
+        """检测语言 - 优先离线检测，置信度不足时调用 LLM"""
+        guess = language_detect.detect(text)
+        if guess.confidence >= self.config.language_detect_min_confidence:
+            return guess.language
         return await self._execute_with_fallback("detect_language", text, **kwargs)
     
     async def extract_keywords(self, content: str, max_keywords: int = 5, **kwargs) -> List[str]:
-        """提取关键词 - 支持回退机制"""
+        """提取关键词 - 支持回退机制，正文超出输入预算时只取开头部分"""
+        content, _ = self._fit_input("extract_keywords", content)
         return await self._execute_with_fallback("extract_keywords", content, max_keywords, **kwargs)
     
     async def categorize_article(self, title: str, content: str, categories: List[str], **kwargs) -> str:
         """文章分类 - 支持回退机制"""
         return await self._execute_with_fallback("categorize_article", title, content, categories, **kwargs)
     
+    async def process_article_combined(
+        self,
+        title: str,
+        content: str,
+        categories: List[str],
+        target_length: int = 400,
+        max_keywords: int = 5,
+        fields: Optional[List[str]] = None,
+        **kwargs
+    ) -> Dict[str, Any]:
+        """单次调用完成多个处理步骤 - 支持回退机制
+        
+        正文超出输入预算时截断送入，且不再要求返回摘要，由调用方对摘要单独做分块摘要。
+        """
+        content, truncated = self._fit_input("process_article_combined", content)
+        if truncated:
+            fields = [f for f in (fields or llm_structured.COMBINED_FIELDS) if f != llm_structured.FIELD_SUMMARY]
+        return await self._execute_with_fallback(
+            "process_article_combined", title, content, categories,
+            target_length, max_keywords, fields, **kwargs
+        )
+    
+    async def translate_titles_batch(self, titles: List[str], **kwargs) -> List[Optional[str]]:
+        """批量翻译标题 - 每 batch_prompt_size 条合并为一次调用，失败的条目为 None 由调用方单独重试"""
+        return await self._execute_batch("translate_titles_batch", titles, **kwargs)
+    
+    async def detect_languages_batch(self, texts: List[str], **kwargs) -> List[Optional[str]]:
+        """批量检测语言 - 离线检测置信度足够的直接返回，其余合并为批量调用"""
+        results: List[Optional[str]] = []
+        unsure: List[int] = []
+        for index, guess in enumerate(language_detect.detect_many(texts)):
+            confident = guess.confidence >= self.config.language_detect_min_confidence
+            results.append(guess.language if confident else None)
+            if not confident:
+                unsure.append(index)
+        if unsure:
+            detected = await self._execute_batch("detect_languages_batch", [texts[i] for i in unsure], **kwargs)
+            for index, language in zip(unsure, detected):
+                results[index] = language
+        return results
+    
+    async def categorize_batch(
+        self, articles: List[Tuple[str, str]], categories: List[str], **kwargs
+    ) -> List[Optional[str]]:
+        """批量分类 - articles 为 (标题, 内容) 列表，失败的条目为 None 由调用方单独重试"""
+        return await self._execute_batch("categorize_batch", articles, categories, **kwargs)
+    
+    async def _execute_batch(self, method_name: str, items: List[Any], *args, **kwargs) -> List[Optional[Any]]:
+        """按 batch_prompt_size 分组并发调用批量方法；整组失败时该组条目均为 None"""
+        size = max(1, self.config.batch_prompt_size)
+        
+        async def run(group: List[Any]) -> List[Optional[Any]]:
+            try:
+                return await self._execute_with_fallback(method_name, group, *args, **kwargs)
+            except Exception as e:
+                logger.warning(f"{method_name} 批量调用失败（{len(group)} 条）: {e}")
+                return [None] * len(group)
+        
+        groups = await asyncio.gather(*(run(items[i:i + size]) for i in range(0, len(items), size)))
+        results = [value for group in groups for value in group]
+        self.routing_metrics.record_batch(method_name, len(results), sum(1 for value in results if value is None))
+        return results
+    
     async def _execute_with_fallback(self, method_name: str, *args, **kwargs) -> Any:
         """执行方法并支持回退机制"""
-        # 优先使用默认提供商
-        providers_to_try = [self.config.default_provider]
-        
-        # 如果启用回退，添加回退提供商列表
-        if self.config.enable_fallback:
-            for provider in self.config.fallback_order:
-                if provider != self.config.default_provider and provider in self.adapters:
-                    providers_to_try.append(provider)
+        remaining = self._plan_providers(method_name)
+        if remaining:
+            self.routing_metrics.record_route(method_name, remaining[0])
         
         last_error = None
-        for provider in providers_to_try:
+        while remaining:
+            provider = remaining.pop(0)
             adapter = self.adapters.get(provider)
             if not adapter:
                 continue
             
             try:
-                method = getattr(adapter, method_name)
-                result = await method(*args, **kwargs)
-                logger.info(f"LLM 调用成功 - 提供商: {provider.value}, 方法: {method_name}")
+                hedge_provider = self._pick_hedge(method_name, provider, remaining)
+                if hedge_provider is None:
+                    result = await self._call_adapter(provider, adapter, method_name, *args, **kwargs)
+                else:
+                    result = await self._call_hedged(method_name, provider, hedge_provider, remaining, args, kwargs)
+                if self._is_last_resort(provider):
+                    llm_usage.record_degraded(method_name)
+                    self.routing_metrics.record_degraded(method_name)
+                    logger.warning(f"所有 LLM 提供商都失败，{method_name} 使用降级结果 ({provider.value})")
+                else:
+                    logger.info(f"LLM 调用成功 - 提供商: {provider.value}, 方法: {method_name}")
                 return result
+            except CircuitOpenError as e:
+                last_error = e
+                logger.debug(f"跳过熔断中的提供商: {provider.value}, 方法: {method_name}")
+                continue
             except Exception as e:
                 last_error = e
                 logger.warning(f"LLM 调用失败 - 提供商: {provider.value}, 方法: {method_name}, 错误: {e}")
@@ -104,19 +235,326 @@ class LLMServiceManager:
         # 所有提供商都失败
         raise LLMProcessingError(f"所有 LLM 提供商都失败，最后错误: {last_error}")
     
-    async def health_check_all(self) -> Dict[str, Any]:
-        """检查所有适配器的健康状态"""
+    def _plan_providers(self, method_name: str) -> List[LLMProvider]:
+        """本次调用依次尝试的提供商
+        
+        固定策略：默认提供商在前，其后按回退顺序；
+        延迟策略：成本上限内的提供商按期望延迟排序，超出成本上限的只按回退顺序排在最后。
+        两种策略下降级提供商（last_resort）都排在所有提供商之后。
+        """
+        providers = [self.config.default_provider]
+        if not self.config.enable_fallback:
+            return providers
+        for provider in self.config.fallback_order:
+            if provider not in providers and provider in self.adapters and not self._is_last_resort(provider):
+                providers.append(provider)
+        last_resort = [p for p in self.adapters if p not in providers and self._is_last_resort(p)]
+        if self.config.routing_policy != ROUTING_LATENCY:
+            return providers + last_resort
+        
+        affordable = [p for p in providers if self._within_cost(p)]
+        expensive = [p for p in providers if not self._within_cost(p)]
+        # sorted 是稳定排序，期望延迟相同时保持原有顺序
+        affordable.sort(key=lambda p: self.latency.expected_latency(p, method_name))
+        return affordable + expensive + last_resort
+    
+    def _input_budget(self, method_name: str) -> Tuple[int, Callable[[str], int]]:
+        """本次调用可能用到的提供商中最严格的正文 token 预算，及该提供商的估算函数"""
+        budget: Optional[Tuple[int, Callable[[str], int]]] = None
+        for provider in self._plan_providers(method_name):
+            provider_config = self.config.providers.get(provider)
+            if provider not in self.adapters or provider_config is None or provider_config.last_resort:
+                continue
+            if budget is None or provider_config.max_input_tokens < budget[0]:
+                budget = (provider_config.max_input_tokens, partial(
+                    text_budget.estimate_tokens,
+                    cjk_tokens_per_char=provider_config.cjk_tokens_per_char,
+                    latin_tokens_per_word=provider_config.latin_tokens_per_word
+                ))
+        return budget or (LLMProviderConfig.model_fields["max_input_tokens"].default, text_budget.estimate_tokens)
+    
+    def _fit_input(self, method_name: str, content: str) -> Tuple[str, bool]:
+        """清理模板文字，超出预算时截断，返回 (正文, 是否截断)"""
+        content = text_budget.clean_content(content)
+        max_tokens, estimate = self._input_budget(method_name)
+        if estimate(content) <= max_tokens:
+            return content, False
+        return text_budget.truncate_to_budget(content, max_tokens, estimate), True
+    
+    def _is_last_resort(self, provider: LLMProvider) -> bool:
+        provider_config = self.config.providers.get(provider)
+        return provider_config is not None and provider_config.last_resort
+    
+    def has_llm_available(self) -> bool:
+        """是否有未熔断的模型提供商（不含降级提供商），用于判断能否重新处理降级结果"""
+        return any(
+            breaker.state == CircuitState.CLOSED
+            for provider, breaker in self.breakers.items()
+            if provider in self.adapters and not self._is_last_resort(provider)
+        )
+    
+    def _within_cost(self, provider: LLMProvider) -> bool:
+        provider_config = self.config.providers.get(provider)
+        return provider_config is None or provider_config.relative_cost <= self.config.routing_max_cost
+    
+    def _pick_hedge(
+        self, method_name: str, provider: LLMProvider, remaining: List[LLMProvider]
+    ) -> Optional[LLMProvider]:
+        """对冲目标：首选提供商已有 p95 统计时，取后续第一个成本允许且未熔断的提供商"""
+        if not self.config.hedging_enabled or self.latency.percentile(provider, method_name, 0.95) is None:
+            return None
+        for candidate in remaining:
+            breaker = self.breakers.get(candidate)
+            if candidate in self.adapters and self._within_cost(candidate) and not self._is_last_resort(candidate) and \
+                    (breaker is None or breaker.state == CircuitState.CLOSED):
+                return candidate
+        return None
+    
+    async def _call_hedged(
+        self,
+        method_name: str,
+        provider: LLMProvider,
+        hedge_provider: LLMProvider,
+        remaining: List[LLMProvider],
+        args: Tuple[Any, ...],
+        kwargs: Dict[str, Any]
+    ) -> Any:
+        """首选提供商超过其 p95 耗时仍未返回时，并行请求对冲提供商，取先成功的结果
+        
+        对冲发出后，对冲提供商从 remaining 中移除，两者都失败时由调用方继续回退。
+        """
+        delay = self.latency.percentile(provider, method_name, 0.95)
+        tasks = [asyncio.ensure_future(
+            self._call_adapter(provider, self.adapters[provider], method_name, *args, **kwargs)
+        )]
+        try:
+            done, _ = await asyncio.wait(tasks, timeout=delay)
+            if done:
+                return tasks[0].result()
+            
+            remaining.remove(hedge_provider)
+            self.routing_metrics.record_hedge(method_name)
+            logger.info(f"{provider.value} 超过 p95 ({delay:.1f}s) 未返回，对冲请求 {hedge_provider.value}")
+            tasks.append(asyncio.ensure_future(
+                self._call_adapter(hedge_provider, self.adapters[hedge_provider], method_name, *args, **kwargs)
+            ))
+            pending = set(tasks)
+            last_error: Optional[BaseException] = None
+            while pending:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    if task.exception() is None:
+                        if task is tasks[1]:
+                            self.routing_metrics.record_hedge_win(method_name)
+                        return task.result()
+                    last_error = task.exception()
+            raise last_error
+        finally:
+            for task in tasks:
+                if not task.done():
+                    task.cancel()
+                # 落败请求的异常不再需要
+                task.add_done_callback(lambda t: t.cancelled() or t.exception())
+    
+    async def _call_adapter(
+        self, provider: LLMProvider, adapter: LLMServiceInterface, method_name: str, *args, **kwargs
+    ) -> Any:
+        """调用适配器方法；级联方法先用小模型，出错或输出未通过校验时升级到该方法的正式模型
+        
+        小模型的尝试不经过提供商熔断器和延迟统计：小模型缺失或不稳定既不会熔断整个提供商，
+        也不会拉低路由和对冲使用的延迟分位数。提供商已熔断时直接交给正式模型（由其报告熔断）。
+        """
+        models = self._plan_models(provider, method_name)
+        breaker = self.breakers.get(provider)
+        if breaker is not None and breaker.state == CircuitState.OPEN:
+            models = models[-1:]
+        for model in models[:-1]:
+            self.cascade_metrics.record_attempt(provider.value, method_name)
+            try:
+                result = await self._call_model(
+                    provider, adapter, model, method_name, *args, tracked=False, **kwargs
+                )
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                reason = llm_cascade.ESCALATE_ERROR
+                logger.info(f"{provider.value} 小模型 {model} 执行 {method_name} 失败，升级模型: {e}")
+            else:
+                if llm_cascade.is_acceptable(method_name, result, args, kwargs):
+                    return result
+                reason = llm_cascade.ESCALATE_INVALID
+                logger.info(f"{provider.value} 小模型 {model} 的 {method_name} 输出未通过校验，升级模型")
+            self.cascade_metrics.record_escalation(provider.value, method_name, reason)
+        return await self._call_model(provider, adapter, models[-1], method_name, *args, **kwargs)
+    
+    def _plan_models(self, provider: LLMProvider, method_name: str) -> List[Optional[str]]:
+        """本次调用依次使用的模型，None 表示提供商配置的默认模型"""
+        provider_config = self.config.providers.get(provider)
+        if provider_config is None:
+            return [None]
+        model = provider_config.method_models.get(method_name) or getattr(provider_config, "model", None)
+        cascade_model = provider_config.cascade_model
+        if cascade_model and cascade_model != model and method_name in self.config.cascade_methods:
+            return [cascade_model, model]
+        return [model]
+    
+    async def _call_model(
+        self,
+        provider: LLMProvider,
+        adapter: LLMServiceInterface,
+        model: Optional[str],
+        method_name: str,
+        *args,
+        tracked: bool = True,
+        **kwargs
+    ) -> Any:
+        """用指定模型调用适配器方法，可缓存的方法先查响应缓存，熔断中的提供商不发出请求
+        
+        tracked 为 False 时（级联的小模型）不经过熔断器和延迟统计，并发上限按单独的延迟基线调整。
+        """
+        breaker = self.breakers.get(provider) if tracked else None
+        limiter_key = method_name if tracked else f"{method_name}@{model}"
+        
+        async def invoke() -> Any:
+            with llm_cascade.use_model(model):
+                if breaker is None:
+                    async with self._get_limiter(provider).acquire(limiter_key):
+                        return await getattr(adapter, method_name)(*args, **kwargs)
+                if not breaker.allow_request():
+                    raise CircuitOpenError(f"提供商 {provider.value} 处于熔断状态")
+                started = time.monotonic()
+                try:
+                    async with self._get_limiter(provider).acquire(method_name):
+                        result = await getattr(adapter, method_name)(*args, **kwargs)
+                except asyncio.CancelledError:
+                    breaker.release()
+                    raise
+                except Exception as e:
+                    breaker.record_failure(e)
+                    self.latency.record_failure(provider, method_name)
+                    raise
+                breaker.record_success()
+                self.latency.record_success(provider, method_name, time.monotonic() - started)
+                return result
+        
+        if self.cache is None or method_name not in CACHEABLE_METHODS:
+            return await invoke()
+        
+        key = self.cache.make_key(
+            provider.value,
+            model or "",
+            method_name,
+            adapter.prompt_version,
+            args,
+            kwargs
+        )
+        return await self.cache.get_or_compute(key, invoke, provider=provider.value, method=method_name)
+    
+    def _get_limiter(self, provider: LLMProvider) -> AdaptiveLimiter:
+        """获取某个提供商的并发限制：从 max_concurrency 起步，启用自适应时在 concurrency_ceiling 以内按 AIMD 调整"""
+        limiter = self.limiters.get(provider)
+        if limiter is None:
+            provider_config = self.config.providers.get(provider)
+            if provider_config:
+                limiter = AdaptiveLimiter(
+                    provider.value, provider_config.max_concurrency, provider_config.concurrency_ceiling,
+                    adaptive=provider_config.adaptive_concurrency
+                )
+            else:
+                limiter = AdaptiveLimiter(provider.value, self.config.max_concurrent_tasks, adaptive=False)
+            # setdefault 保证两个线程同时创建时只保留一个
+            limiter = self.limiters.setdefault(provider, limiter)
+        return limiter
+    
+    async def health_check_all(self, max_age: Optional[float] = None) -> Dict[str, Any]:
+        """获取所有适配器的健康状态，缓存未过期时直接返回缓存结果"""
+        max_age = self.config.health_cache_ttl if max_age is None else max_age
+        if self._health_checked_at is None or time.monotonic() - self._health_checked_at > max_age:
+            await self.probe_health()
         results = {}
-        for provider, adapter in self.adapters.items():
+        for provider, health in self._health_results.items():
+            breaker = self.breakers.get(provider)
+            results[provider.value] = {**health, "circuit": breaker.get_state() if breaker else None}
+        return results
+    
+    async def probe_health(self) -> Dict[str, Any]:
+        """并发探测所有提供商，更新健康缓存并把结果反馈给熔断器（由后台任务定期调用）"""
+        async def probe(provider: LLMProvider, adapter: LLMServiceInterface) -> Dict[str, Any]:
             try:
-                health = await adapter.health_check()
-                results[provider.value] = health
+                health = await asyncio.wait_for(adapter.health_check(), timeout=self.config.health_probe_timeout)
+            except asyncio.TimeoutError:
+                health = {"status": "unhealthy", "error": f"健康探测超时 ({self.config.health_probe_timeout}s)"}
             except Exception as e:
-                results[provider.value] = {
-                    "status": "error",
-                    "error": str(e)
+                health = {"status": "error", "error": str(e)}
+            healthy = health.get("status") == "healthy"
+            breaker = self.breakers.get(provider)
+            if breaker is not None:
+                breaker.record_probe(healthy, None if healthy else health.get("error"))
+            return {**health, "checked_at": datetime.utcnow().isoformat()}
+        
+        providers = list(self.adapters.items())
+        results = await asyncio.gather(*(probe(provider, adapter) for provider, adapter in providers))
+        self._health_results = {provider: health for (provider, _), health in zip(providers, results)}
+        self._health_checked_at = time.monotonic()
+        return {provider.value: health for provider, health in self._health_results.items()}
+    
+    async def warm_up(self) -> Dict[str, Any]:
+        """预热需要加载本地模型的提供商（后台处理启动时及积压期间定期调用）"""
+        async def warm(adapter: LLMServiceInterface) -> Optional[Dict[str, Any]]:
+            try:
+                return await adapter.warm_up()
+            except Exception as e:
+                return {"status": "error", "error": str(e)}
+        
+        providers = list(self.adapters.items())
+        results = await asyncio.gather(*(warm(adapter) for _, adapter in providers))
+        return {provider.value: result for (provider, _), result in zip(providers, results) if result is not None}
+    
+    def get_routing_stats(self) -> Dict[str, Any]:
+        """路由策略、各提供商延迟分位数及路由决策统计"""
+        return {
+            "policy": self.config.routing_policy,
+            "hedging_enabled": self.config.hedging_enabled,
+            "latency": self.latency.get_stats(),
+            **self.routing_metrics.get_stats(),
+        }
+    
+    def get_cascade_stats(self) -> Dict[str, Any]:
+        """级联配置及各提供商、各方法的小模型调用次数与升级率"""
+        return {
+            "methods": list(self.config.cascade_methods),
+            "models": {
+                provider.value: {
+                    "cascade_model": provider_config.cascade_model,
+                    "method_models": dict(provider_config.method_models),
                 }
-        return results
+                for provider, provider_config in self.config.providers.items()
+                if provider in self.adapters
+            },
+            "escalations": self.cascade_metrics.get_stats(),
+        }
+    
+    def get_rate_limiter_stats(self) -> Dict[str, Any]:
+        """各远程提供商 RPM/TPM 令牌桶的剩余额度与排队统计"""
+        return {
+            provider.value: adapter.rate_limiter.get_stats()
+            for provider, adapter in self.adapters.items()
+            if getattr(adapter, "rate_limiter", None) is not None
+        }
+    
+    def get_concurrency_stats(self) -> Dict[str, Any]:
+        """各提供商（及 Ollama 各端点）当前的并发上限、进行中与排队的请求数"""
+        stats = {}
+        for provider, adapter in self.adapters.items():
+            stats[provider.value] = self._get_limiter(provider).get_stats()
+            pool = getattr(adapter, "pool", None)
+            if pool is not None:
+                stats[provider.value]["endpoints"] = pool.get_stats()
+        return stats
+    
+    def get_circuit_states(self) -> Dict[str, Any]:
+        """各提供商的熔断状态"""
+        return {provider.value: breaker.get_state() for provider, breaker in self.breakers.items()}
     
     def switch_default_provider(self, provider: LLMProvider):
         """切换默认提供商"""
@@ -0,0 +1,216 @@
+"""
+LLM 请求重试与限速 - 指数退避、Retry-After 与每分钟请求数/token 数令牌桶
+
+429 和 5xx 响应以及连接错误在适配器内按带抖动的指数退避重试，服务端给出 Retry-After 时按其等待；
+等待时间超过上限时不再重试，交给管理器回退到下一个提供商。
+每个提供商可配置每分钟请求数（RPM）和 token 数（TPM）上限，发出请求前先从令牌桶取额度，
+并发的处理任务在触发服务端限流之前自行排队；收到 429 时整个提供商暂停到 Retry-After 之后。
+令牌桶用线程锁保护、用 asyncio.sleep 等待，不绑定事件循环。
+"""
+import asyncio
+import email.utils
+import logging
+import random
+import threading
+import time
+from collections import Counter
+from typing import Any, Awaitable, Callable, Dict, Optional
+import httpx
+
+logger = logging.getLogger(__name__)
+
+RETRYABLE_STATUS = {429, 500, 502, 503, 504}
+MAX_BACKOFF = 30.0  # 单次退避上限（秒）
+RETRY_AFTER_LIMIT = 30.0  # Retry-After 超过该值时不再等待，直接回退到其他提供商
+
+
+def parse_retry_after(value: Optional[str]) -> Optional[float]:
+    """解析 Retry-After：秒数或 HTTP 日期"""
+    if not value:
+        return None
+    value = value.strip()
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        retry_at = email.utils.parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    return max(0.0, retry_at.timestamp() - time.time())
+
+
+def backoff_delay(attempt: int, base_delay: float, retry_after: Optional[float] = None) -> Optional[float]:
+    """第 attempt 次重试前的等待时间；Retry-After 超过上限时返回 None 表示放弃重试"""
+    if retry_after is not None:
+        if retry_after > RETRY_AFTER_LIMIT:
+            return None
+        # 在服务端要求的时间之后再错开一点，避免所有任务同时重试
+        return retry_after + random.uniform(0, base_delay)
+    delay = min(MAX_BACKOFF, base_delay * (2 ** attempt))
+    return random.uniform(delay / 2, delay)
+
+
+def _retryable_error(error: Exception) -> bool:
+    # 读超时说明请求已被处理但生成太慢，重试只会再等一遍
+    return isinstance(error, httpx.TransportError) and not isinstance(error, httpx.ReadTimeout)
+
+
+class ProviderRateLimiter:
+    """单个提供商的 RPM/TPM 令牌桶，上限为 0 表示不限制"""
+
+    def __init__(self, requests_per_minute: int = 0, tokens_per_minute: int = 0):
+        self.requests_per_minute = requests_per_minute
+        self.tokens_per_minute = tokens_per_minute
+        self._requests = float(requests_per_minute)
+        self._tokens = float(tokens_per_minute)
+        self._updated = time.monotonic()
+        self._paused_until = 0.0
+        self._waits = 0
+        self._wait_seconds = 0.0
+        self._lock = threading.Lock()
+
+    @property
+    def enabled(self) -> bool:
+        return bool(self.requests_per_minute or self.tokens_per_minute)
+
+    async def acquire(self, tokens: int = 0):
+        """取得一次请求和 tokens 个 token 的额度，不足时等待"""
+        started = None
+        while True:
+            wait = self._try_acquire(tokens)
+            if wait <= 0:
+                break
+            if started is None:
+                started = time.monotonic()
+            await asyncio.sleep(wait)
+        if started is not None:
+            with self._lock:
+                self._waits += 1
+                self._wait_seconds += time.monotonic() - started
+
+    def _try_acquire(self, tokens: int) -> float:
+        with self._lock:
+            now = time.monotonic()
+            self._refill(now)
+            if now < self._paused_until:
+                return self._paused_until - now
+            # 单次请求超过整桶容量时按整桶计，否则永远取不到
+            tokens = min(tokens, self.tokens_per_minute) if self.tokens_per_minute else 0
+            wait = 0.0
+            if self.requests_per_minute and self._requests < 1:
+                wait = max(wait, (1 - self._requests) * 60 / self.requests_per_minute)
+            if self.tokens_per_minute and self._tokens < tokens:
+                wait = max(wait, (tokens - self._tokens) * 60 / self.tokens_per_minute)
+            if wait > 0:
+                return wait
+            if self.requests_per_minute:
+                self._requests -= 1
+            self._tokens -= tokens
+            return 0.0
+
+    def _refill(self, now: float):
+        elapsed = now - self._updated
+        self._updated = now
+        if self.requests_per_minute:
+            self._requests = min(self.requests_per_minute, self._requests + elapsed * self.requests_per_minute / 60)
+        if self.tokens_per_minute:
+            self._tokens = min(self.tokens_per_minute, self._tokens + elapsed * self.tokens_per_minute / 60)
+
+    def consume_tokens(self, tokens: int):
+        """按实际用量补扣 token（如生成的输出），余额可以暂时为负"""
+        if self.tokens_per_minute and tokens > 0:
+            with self._lock:
+                self._refill(time.monotonic())
+                self._tokens -= tokens
+
+    def pause(self, seconds: float):
+        """收到 429 后让该提供商的所有请求等待"""
+        with self._lock:
+            self._paused_until = max(self._paused_until, time.monotonic() + seconds)
+
+    def get_stats(self) -> Dict[str, Any]:
+        with self._lock:
+            self._refill(time.monotonic())
+            return {
+                "requests_per_minute": self.requests_per_minute or None,
+                "tokens_per_minute": self.tokens_per_minute or None,
+                "available_requests": round(self._requests, 1) if self.requests_per_minute else None,
+                "available_tokens": round(self._tokens) if self.tokens_per_minute else None,
+                "throttled_requests": self._waits,
+                "throttled_seconds": round(self._wait_seconds, 3),
+            }
+
+
+class RetryMetrics:
+    """各提供商的重试统计"""
+
+    def __init__(self):
+        self._retries: Dict[str, Counter] = {}
+        self._exhausted: Counter = Counter()
+        self._lock = threading.Lock()
+
+    def record_retry(self, provider: str, reason: str):
+        with self._lock:
+            self._retries.setdefault(provider, Counter())[reason] += 1
+
+    def record_exhausted(self, provider: str):
+        with self._lock:
+            self._exhausted[provider] += 1
+
+    def get_stats(self) -> Dict[str, Dict[str, Any]]:
+        with self._lock:
+            providers = set(self._retries) | set(self._exhausted)
+            return {
+                provider: {
+                    "retries": sum(self._retries.get(provider, Counter()).values()),
+                    "by_reason": dict(self._retries.get(provider, Counter())),
+                    "exhausted": self._exhausted[provider],
+                }
+                for provider in sorted(providers)
+            }
+
+
+# 全局重试统计实例
+retry_metrics = RetryMetrics()
+
+
+async def send_with_retry(
+    send: Callable[[], Awaitable[httpx.Response]],
+    provider: str,
+    max_retries: int,
+    retry_delay: float,
+    limiter: Optional[ProviderRateLimiter] = None,
+    tokens: int = 0
+) -> httpx.Response:
+    """发送请求，对 429/5xx 和连接错误重试；返回最后一次响应，由调用方检查状态码"""
+    attempt = 0
+    while True:
+        if limiter is not None and limiter.enabled:
+            await limiter.acquire(tokens)
+        try:
+            response = await send()
+        except Exception as e:
+            if not _retryable_error(e):
+                raise
+            if attempt >= max_retries:
+                retry_metrics.record_exhausted(provider)
+                raise
+            delay = backoff_delay(attempt, retry_delay)
+            reason = type(e).__name__
+        else:
+            if response.status_code not in RETRYABLE_STATUS:
+                return response
+            retry_after = parse_retry_after(response.headers.get("Retry-After"))
+            delay = backoff_delay(attempt, retry_delay, retry_after) if attempt < max_retries else None
+            if delay is None:
+                retry_metrics.record_exhausted(provider)
+                return response
+            await response.aclose()
+            if response.status_code == 429 and limiter is not None:
+                limiter.pause(delay)
+            reason = str(response.status_code)
+        retry_metrics.record_retry(provider, reason)
+        logger.warning(f"{provider} 请求失败 ({reason})，{delay:.1f}s 后第 {attempt + 1} 次重试")
+        await asyncio.sleep(delay)
+        attempt += 1
@@ -0,0 +1,142 @@
+"""
+LLM 路由 - 按各提供商、各方法的实际延迟选择提供商，并支持对冲请求
+
+每个 (提供商, 方法) 保留最近若干次成功调用的耗时，按分位数估计延迟；
+期望延迟 = 中位数 / 成功率，失败率高的提供商会被自然排后。
+样本不足的提供商按 0 延迟处理，先分到少量请求以积累样本。
+"""
+import threading
+from collections import Counter, deque
+from typing import Any, Deque, Dict, Optional, Tuple
+from app.services.llm_interface import LLMProvider
+
+ROUTING_STATIC = "static"
+ROUTING_LATENCY = "latency"
+ROUTING_POLICIES = (ROUTING_STATIC, ROUTING_LATENCY)
+
+DEFAULT_WINDOW = 200
+
+
+class _LatencyWindow:
+    """单个 (提供商, 方法) 的最近耗时样本与成败计数"""
+
+    def __init__(self, size: int):
+        self.samples: Deque[float] = deque(maxlen=size)
+        self.successes = 0
+        self.failures = 0
+
+    def percentile(self, q: float) -> Optional[float]:
+        if not self.samples:
+            return None
+        ordered = sorted(self.samples)
+        return ordered[min(len(ordered) - 1, int(q * len(ordered)))]
+
+    @property
+    def success_rate(self) -> float:
+        total = self.successes + self.failures
+        return self.successes / total if total else 1.0
+
+
+class LatencyTracker:
+    """按提供商和方法统计调用延迟（线程安全）"""
+
+    def __init__(self, window: int = DEFAULT_WINDOW, min_samples: int = 20):
+        self.window = window
+        self.min_samples = min_samples
+        self._windows: Dict[Tuple[LLMProvider, str], _LatencyWindow] = {}
+        self._lock = threading.Lock()
+
+    def _get(self, provider: LLMProvider, method: str) -> _LatencyWindow:
+        key = (provider, method)
+        if key not in self._windows:
+            self._windows[key] = _LatencyWindow(self.window)
+        return self._windows[key]
+
+    def record_success(self, provider: LLMProvider, method: str, seconds: float):
+        with self._lock:
+            window = self._get(provider, method)
+            window.samples.append(seconds)
+            window.successes += 1
+
+    def record_failure(self, provider: LLMProvider, method: str):
+        with self._lock:
+            self._get(provider, method).failures += 1
+
+    def percentile(self, provider: LLMProvider, method: str, q: float) -> Optional[float]:
+        """样本足够时返回分位数耗时（秒），否则返回 None"""
+        with self._lock:
+            window = self._windows.get((provider, method))
+            if window is None or len(window.samples) < self.min_samples:
+                return None
+            return window.percentile(q)
+
+    def expected_latency(self, provider: LLMProvider, method: str) -> float:
+        """期望耗时：中位数除以成功率；样本不足时为 0，优先分到请求以积累样本"""
+        with self._lock:
+            window = self._windows.get((provider, method))
+            if window is None or len(window.samples) < self.min_samples:
+                return 0.0
+            return window.percentile(0.5) / max(window.success_rate, 0.05)
+
+    def get_stats(self) -> Dict[str, Dict[str, Any]]:
+        with self._lock:
+            stats: Dict[str, Dict[str, Any]] = {}
+            for (provider, method), window in self._windows.items():
+                stats.setdefault(provider.value, {})[method] = {
+                    "samples": len(window.samples),
+                    "successes": window.successes,
+                    "failures": window.failures,
+                    "p50": _round(window.percentile(0.5)),
+                    "p95": _round(window.percentile(0.95)),
+                    "p99": _round(window.percentile(0.99)),
+                }
+            return stats
+
+
+class RoutingMetrics:
+    """路由决策统计：各方法首选了哪个提供商、对冲次数及对冲胜出次数、批量调用的条目数，以及降级次数"""
+
+    def __init__(self):
+        self.routes: Dict[str, Counter] = {}
+        self.hedges: Counter = Counter()
+        self.hedge_wins: Counter = Counter()
+        self.batch_items: Counter = Counter()
+        self.batch_failed_items: Counter = Counter()
+        self.degraded: Counter = Counter()
+        self._lock = threading.Lock()
+
+    def record_route(self, method: str, provider: LLMProvider):
+        with self._lock:
+            self.routes.setdefault(method, Counter())[provider.value] += 1
+
+    def record_hedge(self, method: str):
+        with self._lock:
+            self.hedges[method] += 1
+
+    def record_hedge_win(self, method: str):
+        with self._lock:
+            self.hedge_wins[method] += 1
+
+    def record_batch(self, method: str, items: int, failed: int):
+        with self._lock:
+            self.batch_items[method] += items
+            self.batch_failed_items[method] += failed
+
+    def record_degraded(self, method: str):
+        with self._lock:
+            self.degraded[method] += 1
+
+    def get_stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "routes": {method: dict(counts) for method, counts in self.routes.items()},
+                "hedges": dict(self.hedges),
+                "hedge_wins": dict(self.hedge_wins),
+                "batch_items": dict(self.batch_items),
+                "batch_failed_items": dict(self.batch_failed_items),
+                "degraded": dict(self.degraded),
+            }
+
+
+def _round(value: Optional[float]) -> Optional[float]:
+    return None if value is None else round(value, 3)
@@ -0,0 +1,221 @@
+"""
+LLM 流式输出 - 截止时间、提前停止与吞吐统计
+
+适配器以流的方式接收生成结果（Ollama 为 NDJSON，OpenAI 为 SSE），逐块累积：
+- 达到目标长度后在句末停止，关闭连接即可让服务端停止生成；
+- 超过本次调用的截止时间时停止等待，已生成的部分作为结果返回（不写入响应缓存）。
+每个提供商的输出 token 数、生成耗时和首 token 延迟汇总为吞吐统计。
+"""
+import asyncio
+import json
+import re
+import threading
+import time
+from collections import Counter
+from dataclasses import dataclass
+from typing import Any, AsyncIterator, Dict, Optional
+from app.services.llm_interface import LLMProcessingError
+
+STOP_DONE = "done"
+STOP_LENGTH = "length"
+STOP_DEADLINE = "deadline"
+
+SUMMARY_OVERRUN = 1.2  # 摘要超过目标长度的该倍数后，遇到句末即停止
+HARD_OVERRUN = 1.5  # 超过 max_chars 的该倍数时不等句末直接停止
+
+_THINK_RE = re.compile(r"<think>.*?</think>", re.S)
+_SENTENCE_END = "。！？!?.\n"
+
+
+@dataclass
+class StreamLimit:
+    """单次流式调用的截止条件"""
+    deadline: Optional[float] = None  # 秒，None 表示只受 HTTP 超时限制
+    max_chars: Optional[int] = None  # 可见输出达到该长度后在句末停止
+
+
+@dataclass
+class StreamEvent:
+    """流中的一块输出；用量字段只在服务端返回时才有值"""
+    text: str = ""
+    prompt_tokens: Optional[int] = None
+    output_tokens: Optional[int] = None
+    load_seconds: Optional[float] = None  # 模型加载耗时（Ollama），冷启动时达数秒
+
+
+class PartialText(str):
+    """因截止时间提前结束的输出，响应缓存不保存此类结果"""
+    partial = True
+
+
+@dataclass
+class StreamResult:
+    """流式调用结果"""
+    text: str
+    stop_reason: str
+    prompt_tokens: Optional[int]
+    output_tokens: int
+    seconds: float
+    first_token_seconds: Optional[float]
+    load_seconds: Optional[float] = None
+
+    def output(self) -> str:
+        if self.stop_reason == STOP_LENGTH:
+            return trim_to_sentence(self.text)
+        if self.stop_reason == STOP_DEADLINE:
+            return PartialText(trim_to_sentence(self.text))
+        return self.text
+
+
+def visible_text(text: str) -> str:
+    """去掉推理模型的 <think> 段落；思考尚未结束时没有可见输出"""
+    text = _THINK_RE.sub("", text)
+    if "<think>" in text:
+        return ""
+    return text.strip()
+
+
+def trim_to_sentence(text: str) -> str:
+    """截到最后一个句末标点，截掉的部分不超过四成时才截"""
+    stripped = text.rstrip()
+    cut = max(stripped.rfind(mark) for mark in _SENTENCE_END)
+    if cut >= 0 and cut + 1 >= len(stripped) * 0.6:
+        return stripped[:cut + 1]
+    return stripped
+
+
+def _reached_length(text: str, max_chars: int) -> bool:
+    visible = visible_text(text)
+    if len(visible) >= max_chars * HARD_OVERRUN:
+        return True
+    return len(visible) >= max_chars and visible[-1] in _SENTENCE_END
+
+
+async def collect_stream(events: AsyncIterator[StreamEvent], limit: StreamLimit) -> StreamResult:
+    """累积流式输出，直到结束、达到长度或截止时间"""
+    started = time.monotonic()
+    deadline_at = started + limit.deadline if limit.deadline else None
+    parts = []
+    chunks = 0
+    prompt_tokens = output_tokens = load_seconds = None
+    first_token_at = None
+    stop_reason = STOP_DONE
+    iterator = events.__aiter__()
+    try:
+        while True:
+            timeout = None if deadline_at is None else deadline_at - time.monotonic()
+            if timeout is not None and timeout <= 0:
+                stop_reason = STOP_DEADLINE
+                break
+            try:
+                event = await asyncio.wait_for(iterator.__anext__(), timeout)
+            except StopAsyncIteration:
+                break
+            except asyncio.TimeoutError:
+                stop_reason = STOP_DEADLINE
+                break
+            if event.text:
+                if first_token_at is None:
+                    first_token_at = time.monotonic()
+                parts.append(event.text)
+                chunks += 1
+            prompt_tokens = event.prompt_tokens or prompt_tokens
+            output_tokens = event.output_tokens or output_tokens
+            load_seconds = event.load_seconds or load_seconds
+            if limit.max_chars and event.text and _reached_length("".join(parts), limit.max_chars):
+                stop_reason = STOP_LENGTH
+                break
+    finally:
+        # 关闭生成器会关闭 HTTP 流，服务端随之停止生成
+        await iterator.aclose()
+
+    text = "".join(parts)
+    if stop_reason == STOP_DEADLINE and not visible_text(text):
+        raise LLMProcessingError(f"流式生成超过截止时间 ({limit.deadline}s) 且没有输出")
+    return StreamResult(
+        text=text,
+        stop_reason=stop_reason,
+        prompt_tokens=prompt_tokens,
+        # 服务端未给出输出 token 数时按块数估计（每块通常是一个 token）
+        output_tokens=output_tokens or chunks,
+        seconds=time.monotonic() - started,
+        first_token_seconds=None if first_token_at is None else first_token_at - started,
+        load_seconds=load_seconds,
+    )
+
+
+async def ollama_events(lines: AsyncIterator[str]) -> AsyncIterator[StreamEvent]:
+    """解析 Ollama /api/generate 的 NDJSON 流"""
+    async for line in lines:
+        if not line.strip():
+            continue
+        data = json.loads(line)
+        if data.get("error"):
+            raise LLMProcessingError(f"Ollama 流式生成失败: {data['error']}")
+        load_duration = data.get("load_duration")
+        yield StreamEvent(
+            data.get("response", ""), data.get("prompt_eval_count"), data.get("eval_count"),
+            load_duration / 1e9 if load_duration else None
+        )
+        if data.get("done"):
+            return
+
+
+async def openai_sse_events(lines: AsyncIterator[str]) -> AsyncIterator[StreamEvent]:
+    """解析 OpenAI 兼容接口的 SSE 流（data: {...}，以 [DONE] 结束）"""
+    async for line in lines:
+        if not line.startswith("data:"):
+            continue
+        data = line[len("data:"):].strip()
+        if data == "[DONE]":
+            return
+        chunk = json.loads(data)
+        usage = chunk.get("usage") or {}
+        choices = chunk.get("choices") or []
+        text = ((choices[0].get("delta") or {}).get("content") or "") if choices else ""
+        yield StreamEvent(text, usage.get("prompt_tokens"), usage.get("completion_tokens"))
+
+
+class StreamMetrics:
+    """各提供商的流式生成吞吐统计（线程安全）"""
+
+    def __init__(self):
+        self._stats: Dict[str, Dict[str, Any]] = {}
+        self._lock = threading.Lock()
+
+    def record(self, provider: str, result: StreamResult):
+        with self._lock:
+            stats = self._stats.setdefault(provider, {
+                "streams": 0,
+                "output_tokens": 0,
+                "generation_seconds": 0.0,
+                "first_token_seconds": 0.0,
+                "first_token_samples": 0,
+                "stop_reasons": Counter(),
+            })
+            stats["streams"] += 1
+            stats["output_tokens"] += result.output_tokens
+            stats["generation_seconds"] += result.seconds
+            if result.first_token_seconds is not None:
+                stats["first_token_seconds"] += result.first_token_seconds
+                stats["first_token_samples"] += 1
+            stats["stop_reasons"][result.stop_reason] += 1
+
+    def get_stats(self) -> Dict[str, Dict[str, Any]]:
+        with self._lock:
+            report = {}
+            for provider, stats in self._stats.items():
+                seconds = stats["generation_seconds"]
+                samples = stats["first_token_samples"]
+                report[provider] = {
+                    "streams": stats["streams"],
+                    "output_tokens": stats["output_tokens"],
+                    "tokens_per_second": round(stats["output_tokens"] / seconds, 2) if seconds else None,
+                    "avg_first_token_seconds": round(stats["first_token_seconds"] / samples, 3) if samples else None,
+                    "stop_reasons": dict(stats["stop_reasons"]),
+                }
+            return report
+
+
+# 全局吞吐统计实例
+stream_metrics = StreamMetrics()
@@ -0,0 +1,206 @@
+"""
+结构化 LLM 输出 - 单次调用完成多个处理步骤的提示词构建与结果校验
+"""
+import json
+import re
+from typing import Dict, Any, List, Optional, Sequence
+
+# 合并调用支持的字段
+FIELD_LANGUAGE = "language"
+FIELD_CHINESE_TITLE = "chinese_title"
+FIELD_SUMMARY = "summary"
+FIELD_KEYWORDS = "keywords"
+FIELD_CATEGORY = "category"
+COMBINED_FIELDS = (FIELD_LANGUAGE, FIELD_CHINESE_TITLE, FIELD_SUMMARY, FIELD_KEYWORDS, FIELD_CATEGORY)
+
+_THINK_RE = re.compile(r"<think>.*?</think>", re.DOTALL)
+_FENCE_RE = re.compile(r"```(?:json)?\s*(.*?)```", re.DOTALL)
+_TRAILING_COMMA_RE = re.compile(r",\s*([}\]])")
+_LANGUAGE_RE = re.compile(r"^[a-z]{2,3}(-[a-z]{2,4})?$")
+_MIN_SUMMARY_LENGTH = 10
+
+
+def build_combined_prompt(
+    title: str,
+    content: str,
+    categories: Sequence[str],
+    target_length: int = 400,
+    max_keywords: int = 5,
+    fields: Optional[Sequence[str]] = None
+) -> str:
+    """构建一次性返回多个字段的 JSON 提示词"""
+    fields = [f for f in COMBINED_FIELDS if fields is None or f in fields]
+    descriptions = {
+        FIELD_LANGUAGE: '"language": 原文语言代码（如 en, zh, ja）',
+        FIELD_CHINESE_TITLE: '"chinese_title": 标题的简体中文翻译（标题已是中文则原样返回）',
+        FIELD_SUMMARY: f'"summary": 约 {target_length} 字的中文摘要，保留核心信息，客观中性',
+        FIELD_KEYWORDS: f'"keywords": 不超过 {max_keywords} 个最重要关键词组成的字符串数组',
+        FIELD_CATEGORY: f'"category": 从以下类别中选择一个：{"、".join(categories)}',
+    }
+    field_lines = "\n".join(f"- {descriptions[f]}" for f in fields)
+    return f"""
+请阅读以下文章，并只返回一个 JSON 对象，不要包含任何其他文字。JSON 字段如下：
+{field_lines}
+
+标题：{title}
+
+文章内容：
+{content}
+"""
+
+
+def extract_json_object(text: str) -> Optional[Any]:
+    """从模型输出中提取 JSON，尽量修复常见格式问题"""
+    if not text:
+        return None
+
+    text = _THINK_RE.sub("", text).strip()
+    fence = _FENCE_RE.search(text)
+    if fence:
+        text = fence.group(1).strip()
+
+    candidates = [text]
+    for open_char, close_char in (("{", "}"), ("[", "]")):
+        start, end = text.find(open_char), text.rfind(close_char)
+        if 0 <= start < end:
+            candidates.append(text[start:end + 1])
+
+    for candidate in candidates:
+        for attempt in (candidate, _TRAILING_COMMA_RE.sub(r"\1", candidate)):
+            try:
+                return json.loads(attempt)
+            except (TypeError, ValueError):
+                continue
+    return None
+
+
+def normalize_keywords(value: Any, max_keywords: int) -> List[str]:
+    """把列表或逗号分隔字符串规范为去重后的关键词列表"""
+    if isinstance(value, str):
+        value = re.split(r"[,，、;；\n]", value)
+    if not isinstance(value, list):
+        return []
+
+    keywords: List[str] = []
+    for item in value:
+        if not isinstance(item, str):
+            continue
+        keyword = item.strip().strip("\"'#")
+        if keyword and keyword not in keywords:
+            keywords.append(keyword)
+    return keywords[:max_keywords]
+
+
+def match_category(value: Any, categories: Sequence[str]) -> Optional[str]:
+    """在输出中找到合法分类，找不到返回 None"""
+    if not isinstance(value, str):
+        return None
+    value = value.strip()
+    if value in categories:
+        return value
+    for category in categories:
+        if category in value:
+            return category
+    return None
+
+
+def parse_combined_response(
+    text: str,
+    categories: Sequence[str],
+    max_keywords: int = 5,
+    fields: Optional[Sequence[str]] = None
+) -> Dict[str, Any]:
+    """解析合并调用的输出，只返回通过校验的字段
+
+    缺失或不合法的字段不会出现在结果中，由调用方逐项回退到单独的方法。
+    """
+    data = extract_json_object(text)
+    if not isinstance(data, dict):
+        return {}
+
+    wanted = set(fields) if fields is not None else set(COMBINED_FIELDS)
+    result: Dict[str, Any] = {}
+
+    language = data.get(FIELD_LANGUAGE)
+    if FIELD_LANGUAGE in wanted and isinstance(language, str):
+        language = language.strip().lower()
+        if _LANGUAGE_RE.match(language):
+            result[FIELD_LANGUAGE] = language
+
+    chinese_title = data.get(FIELD_CHINESE_TITLE)
+    if FIELD_CHINESE_TITLE in wanted and isinstance(chinese_title, str) and chinese_title.strip():
+        result[FIELD_CHINESE_TITLE] = chinese_title.strip()
+
+    summary = data.get(FIELD_SUMMARY)
+    if FIELD_SUMMARY in wanted and isinstance(summary, str) and len(summary.strip()) >= _MIN_SUMMARY_LENGTH:
+        result[FIELD_SUMMARY] = summary.strip()
+
+    if FIELD_KEYWORDS in wanted:
+        keywords = normalize_keywords(data.get(FIELD_KEYWORDS), max_keywords)
+        if keywords:
+            result[FIELD_KEYWORDS] = keywords
+
+    if FIELD_CATEGORY in wanted:
+        category = match_category(data.get(FIELD_CATEGORY), categories)
+        if category:
+            result[FIELD_CATEGORY] = category
+
+    return result
+
+
+# 多篇文章合并为一次调用的批量任务
+BATCH_TITLE = "title"
+BATCH_LANGUAGE = "language"
+BATCH_CATEGORY = "category"
+
+_BATCH_ITEM_CHARS = 300  # 每个条目送入的最大字符数，标题和语言检测只需要很短的输入
+
+
+def build_batch_prompt(task: str, items: Sequence[str], categories: Sequence[str] = ()) -> str:
+    """构建多条目批量提示词：条目按 [编号] 逐行列出，要求返回以编号为键的 JSON 对象"""
+    instructions = {
+        BATCH_TITLE: "请把以下每条新闻标题翻译为简体中文，已是中文的标题原样返回。",
+        BATCH_LANGUAGE: "请判断以下每段文本的语言，结果为语言代码（如 en, zh, ja）。",
+        BATCH_CATEGORY: f"请为以下每篇文章从这些类别中选择一个：{'、'.join(categories)}。",
+    }
+    lines = "\n".join(
+        f"[{index}] {' '.join(item.split())[:_BATCH_ITEM_CHARS]}" for index, item in enumerate(items, 1)
+    )
+    return f"""
+{instructions[task]}
+只返回一个 JSON 对象，不要包含任何其他文字：键为条目编号（"1" 到 "{len(items)}"），值为该条目的结果字符串。
+
+{lines}
+"""
+
+
+def _batch_value(task: str, value: Any, categories: Sequence[str]) -> Optional[str]:
+    if task == BATCH_CATEGORY:
+        return match_category(value, categories)
+    if not isinstance(value, str) or not value.strip():
+        return None
+    value = value.strip()
+    if task == BATCH_LANGUAGE:
+        value = value.lower()
+        return value if _LANGUAGE_RE.match(value) else None
+    return value
+
+
+def parse_batch_response(
+    text: str,
+    task: str,
+    count: int,
+    categories: Sequence[str] = ()
+) -> List[Optional[str]]:
+    """解析批量输出，结果与条目一一对应；缺失或不合法的条目为 None，由调用方单独重试
+
+    兼容模型返回按顺序排列的数组，或把结果包在单个外层字段中的情况。
+    """
+    data = extract_json_object(text)
+    if isinstance(data, dict) and len(data) == 1 and "1" not in data:
+        data = next(iter(data.values()))
+    if isinstance(data, list):
+        data = {str(index): value for index, value in enumerate(data, 1)}
+    if not isinstance(data, dict):
+        return [None] * count
+    return [_batch_value(task, data.get(str(index)), categories) for index in range(1, count + 1)]
@@ -0,0 +1,48 @@
+"""
+LLM token 用量统计 - 按正在处理的文章累计提示词 token 数
+
+处理文章时用 track_usage() 开启统计，适配器每次实际发出请求后调用 record_prompt_tokens()；
+所有提供商都失败、由降级提供商给出结果的方法通过 record_degraded() 记录。
+统计对象保存在 contextvars 中，asyncio 子任务会继承同一个对象；命中缓存的调用不计入。
+"""
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+from typing import Iterator, Optional, Set
+
+
+@dataclass
+class TokenUsage:
+    """一次处理过程中的用量"""
+    prompt_tokens: int = 0
+    calls: int = 0
+    degraded_methods: Set[str] = field(default_factory=set)  # 结果来自降级提供商的方法
+
+
+_current_usage: ContextVar[Optional[TokenUsage]] = ContextVar("llm_token_usage", default=None)
+
+
+@contextmanager
+def track_usage() -> Iterator[TokenUsage]:
+    """在 with 块内统计所有 LLM 调用的提示词 token 数"""
+    usage = TokenUsage()
+    token = _current_usage.set(usage)
+    try:
+        yield usage
+    finally:
+        _current_usage.reset(token)
+
+
+def record_prompt_tokens(count: Optional[int]):
+    """记录一次 LLM 请求的提示词 token 数（不在统计范围内时忽略）"""
+    usage = _current_usage.get()
+    if usage is not None and count:
+        usage.prompt_tokens += int(count)
+        usage.calls += 1
+
+
+def record_degraded(method_name: str):
+    """记录某个方法的结果来自降级提供商（不在统计范围内时忽略）"""
+    usage = _current_usage.get()
+    if usage is not None:
+        usage.degraded_methods.add(method_name)
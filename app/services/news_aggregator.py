@@ -2,15 +2,23 @@
 新闻聚合服务 - 从RSS源获取文章
 """
 import asyncio
+import json
 import logging
 from datetime import datetime
 from typing import Dict, Any, List, Optional
 from sqlalchemy.orm import Session
 from sqlalchemy.exc import IntegrityError
 
-from app.models.article import NewsArticle
 from app.models.source import NewsSource
+from app.models.article import NewsArticle, LLMProcessingStatus, CATEGORY_SOURCE_LOCAL
+from app.services.content_processor import (
+    ALL_STEPS, STEP_LANGUAGE, STEP_TITLE, STEP_SUMMARY, STEP_KEYWORDS, STEP_CATEGORY
+)
+from app.services.keyword_extractor import keyword_extractor, document_text
+from app.services.category_classifier import category_classifier
+from app.utils.fingerprint import normalize_text, simhash, similarity
 from app.utils.rss_parser import UniversalRSSParser
+from app.config import settings
 
 logger = logging.getLogger(__name__)
 
@@ -98,6 +106,7 @@ class NewsAggregatorService:
                 article = self._create_article_from_data(article_data, source.id)
                 if article:
                     saved_articles.append(article)
+            self._classify_new_articles(saved_articles)
             
             logger.info(f"从源 {source.name} 成功获取 {len(saved_articles)} 篇文章")
             return saved_articles
@@ -106,6 +115,35 @@ class NewsAggregatorService:
             logger.error(f"获取源 {source.name} 失败: {e}")
             raise
     
+    def _classify_new_articles(self, articles: List[NewsArticle]):
+        """入库后批量本地分类，置信度足够的文章不再排队 LLM 分类"""
+        new_articles = [
+            article for article in articles
+            if article.llm_processing_status == LLMProcessingStatus.PENDING and not article.pending_llm_steps
+        ]
+        if not new_articles:
+            return
+        try:
+            predictions = category_classifier.classify_many(
+                [(article.title, article.content or article.summary) for article in new_articles]
+            )
+        except Exception as e:
+            logger.warning(f"本地分类失败，交由 LLM 分类: {e}")
+            return
+        
+        classified = 0
+        remaining_steps = json.dumps([step for step in ALL_STEPS if step != STEP_CATEGORY])
+        for article, prediction in zip(new_articles, predictions):
+            if category_classifier.is_confident(prediction):
+                article.category = prediction.category
+                article.category_source = CATEGORY_SOURCE_LOCAL
+                article.pending_llm_steps = remaining_steps
+                classified += 1
+        if classified:
+            category_classifier.record_decision(local=True, count=classified)
+            self.db.commit()
+            logger.info(f"本地分类完成 {classified}/{len(new_articles)} 篇新文章")
+    
     def _create_article_from_data(
         self, 
         article_data: Dict[str, Any], 
@@ -119,7 +157,16 @@ class NewsAggregatorService:
             ).first()
             
             if existing:
-                logger.debug(f"文章已存在: {article_data.get('title')}")
+                if self._apply_revision(existing, article_data):
+                    logger.info(f"文章 {existing.id} 内容已修订，重新排队受影响的 LLM 步骤")
+                else:
+                    logger.debug(f"文章已存在: {article_data.get('title')}")
+                return None
+            
+            # 已归档的文章不再重新入库
+            from app.services.archive_service import ArchiveService
+            if ArchiveService(self.db).is_archived_url(article_data.get("url")):
+                logger.debug(f"文章已归档: {article_data.get('title')}")
                 return None
             
             # Extract tags list
@@ -137,13 +184,18 @@ class NewsAggregatorService:
                 fetched_at=datetime.utcnow(),
                 is_processed=False,
                 llm_processing_status="PENDING",  # Use uppercase for enum
-                tags=",".join(tags_list[:10])  # 限制标签数量，保持文本字段兼容
+                tags=",".join(tags_list[:10]),  # 限制标签数量，保持文本字段兼容
+                content_fingerprint=simhash(article_data.get("content", "")),
+                revision=1
             )
             
             self.db.add(article)
             self.db.commit()
             self.db.refresh(article)
             
+            # 更新关键词文档频率
+            keyword_extractor.add_documents([document_text(article.title, article.content or article.summary)])
+            
             # Link tags to article using TagService
             if tags_list:
                 from app.services.tag_service import TagService
@@ -162,3 +214,59 @@ class NewsAggregatorService:
             self.db.rollback()
             logger.error(f"创建文章失败: {e}, 数据: {article_data.get('title')}")
             return None
+    
+    def _apply_revision(self, article: NewsArticle, article_data: Dict[str, Any]) -> bool:
+        """检测同一 URL 的重新发布是否为实质修改
+        
+        与最近一次处理时的正文指纹比较，相似度低于阈值或标题变化时
+        更新文章、递增修订号，并只把受影响的 LLM 步骤重新排队。
+        返回是否产生了新修订。
+        """
+        new_title = (article_data.get("title") or "")[:500]
+        new_content = article_data.get("content") or ""
+        new_fingerprint = simhash(new_content)
+        
+        old_fingerprint = article.content_fingerprint
+        if old_fingerprint is None:
+            # 旧数据没有指纹，先按当前存储的正文补齐
+            old_fingerprint = simhash(article.content or "")
+            article.content_fingerprint = old_fingerprint
+        
+        title_changed = bool(new_title) and normalize_text(new_title) != normalize_text(article.title)
+        content_changed = bool(new_content.strip()) and (
+            similarity(old_fingerprint, new_fingerprint) < settings.REVISION_SIMILARITY_THRESHOLD
+        )
+        
+        if not title_changed and not content_changed:
+            if self.db.is_modified(article):
+                self.db.commit()
+            return False
+        
+        steps = set()
+        if title_changed:
+            article.title = new_title
+            steps.update({STEP_TITLE, STEP_CATEGORY})
+        if content_changed:
+            article.content = new_content
+            article.summary = (article_data.get("summary") or "")[:1000]
+            article.content_fingerprint = new_fingerprint
+            steps.update({STEP_LANGUAGE, STEP_SUMMARY, STEP_KEYWORDS, STEP_CATEGORY})
+        
+        article.revision = (article.revision or 1) + 1
+        
+        # 只有处理完成的文章才缩小处理范围（并保留尚未完成的步骤）；
+        # 待处理、失败或正在处理（处理中的结果会因修订号变化而丢弃）的文章重新完整处理
+        if article.llm_processing_status == LLMProcessingStatus.COMPLETED:
+            if article.pending_llm_steps:
+                try:
+                    steps.update(json.loads(article.pending_llm_steps))
+                except (TypeError, ValueError):
+                    pass
+            article.pending_llm_steps = json.dumps([step for step in ALL_STEPS if step in steps])
+        else:
+            article.pending_llm_steps = None
+        article.llm_step_attempts = 0
+        article.llm_processing_status = LLMProcessingStatus.PENDING
+        
+        self.db.commit()
+        return True
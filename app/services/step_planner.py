@@ -0,0 +1,165 @@
+"""
+LLM 步骤规划 - 按文章的廉价特征决定哪些处理步骤需要调用 LLM
+
+在调用 LLM 之前逐篇判断：
+- 源配置（RSSSourceConfig.llm_skip_steps / llm_force_steps）可以跳过或强制某些步骤；
+- 标题本身是中文时直接作为中文标题，不再翻译；
+- 中文正文不长于摘要目标长度时直接作为摘要，非中文的短文摘要长度不超过原文；
+- 订阅源已给出足够多的标签时保留这些标签，不再提取关键词；
+- 本地分类器足够确定时采用本地分类。
+被跳过或本地完成的步骤及原因计入统计，处理结果中也会列出。
+"""
+import threading
+from collections import Counter
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional, Tuple
+from app.models.article import NewsArticle
+from app.services.category_classifier import category_classifier
+from app.utils import language_detect, text_budget
+from app.utils.rss_config import RSSSourceConfig, rss_config_manager
+from app.config import settings
+import logging
+
+logger = logging.getLogger(__name__)
+
+# LLM 处理步骤
+STEP_LANGUAGE = "language"
+STEP_TITLE = "title"
+STEP_SUMMARY = "summary"
+STEP_KEYWORDS = "keywords"
+STEP_CATEGORY = "category"
+ALL_STEPS = (STEP_LANGUAGE, STEP_TITLE, STEP_SUMMARY, STEP_KEYWORDS, STEP_CATEGORY)
+
+# 跳过或本地完成步骤的原因
+REASON_SOURCE_CONFIG = "source_config"
+REASON_CHINESE_TITLE = "chinese_title"
+REASON_SHORT_CONTENT = "short_content"
+REASON_FEED_TAGS = "feed_tags"
+REASON_LOCAL_CLASSIFIER = "local_classifier"
+
+
+@dataclass
+class StepPlan:
+    """单篇文章的处理计划"""
+    steps: Tuple[str, ...]  # 待处理的步骤（pending_llm_steps）
+    llm_steps: Tuple[str, ...]  # 需要调用 LLM 的步骤
+    local: Dict[str, Any] = field(default_factory=dict)  # 本地完成的步骤 -> 结果
+    skipped: Dict[str, str] = field(default_factory=dict)  # 不执行的步骤 -> 原因
+    reasons: Dict[str, str] = field(default_factory=dict)  # 本地完成或跳过的步骤 -> 原因
+    summary_length: int = 400  # 摘要目标长度
+
+    @property
+    def run_steps(self) -> Tuple[str, ...]:
+        """需要产出结果的步骤（不含跳过的步骤）"""
+        return tuple(step for step in self.steps if step not in self.skipped)
+
+
+class StepPlanner:
+    """按源配置与文章特征规划处理步骤，并统计各步骤的决策"""
+
+    def __init__(self):
+        self._decisions: Dict[str, Counter] = {}
+        self._reasons: Counter = Counter()
+        self._lock = threading.Lock()
+
+    def plan(
+        self,
+        article: NewsArticle,
+        steps: Tuple[str, ...],
+        title: Optional[str] = None,
+        content: Optional[str] = None,
+        record: bool = True
+    ) -> StepPlan:
+        """规划一篇文章的处理步骤；record 为 False 时不计入统计（同一篇文章重复规划时使用）"""
+        title = (article.title or "") if title is None else title
+        content = (article.content or article.summary or "") if content is None else content
+        target_length = settings.SUMMARY_TARGET_LENGTH
+        plan = StepPlan(steps=tuple(steps), llm_steps=(), summary_length=target_length)
+
+        config = self._source_config(article)
+        forced = set(config.llm_force_steps) if config else set()
+        if config:
+            for step in config.llm_skip_steps:
+                if step in plan.steps and step not in forced:
+                    plan.skipped[step] = REASON_SOURCE_CONFIG
+
+        def undecided(step: str) -> bool:
+            return step in plan.steps and step not in plan.skipped and step not in forced
+
+        if settings.LLM_STEP_PLANNER_ENABLED:
+            if undecided(STEP_TITLE) and self._is_chinese(title):
+                plan.local[STEP_TITLE] = title
+                plan.reasons[STEP_TITLE] = REASON_CHINESE_TITLE
+
+            if undecided(STEP_SUMMARY):
+                cleaned = text_budget.clean_content(content).strip()
+                if cleaned and len(cleaned) <= target_length:
+                    if self._is_chinese(cleaned):
+                        plan.local[STEP_SUMMARY] = cleaned
+                        plan.reasons[STEP_SUMMARY] = REASON_SHORT_CONTENT
+                    else:
+                        # 非中文短文仍需翻译，但摘要不长于原文
+                        plan.summary_length = len(cleaned)
+
+            if undecided(STEP_KEYWORDS) and len(self._feed_tags(article)) >= settings.LLM_PLANNER_MIN_FEED_TAGS:
+                plan.skipped[STEP_KEYWORDS] = REASON_FEED_TAGS
+
+        if undecided(STEP_CATEGORY):
+            prediction = category_classifier.classify(title, content)
+            confident = category_classifier.is_confident(prediction)
+            if record:
+                category_classifier.record_decision(local=confident)
+            if confident:
+                plan.local[STEP_CATEGORY] = prediction.category
+                plan.reasons[STEP_CATEGORY] = REASON_LOCAL_CLASSIFIER
+
+        plan.reasons.update(plan.skipped)
+        plan.llm_steps = tuple(step for step in plan.steps if step not in plan.local and step not in plan.skipped)
+        if record:
+            self._record(plan)
+        return plan
+
+    @staticmethod
+    def _source_config(article: NewsArticle) -> Optional[RSSSourceConfig]:
+        source = article.source
+        if source is None:
+            return None
+        return rss_config_manager.config_for_source(source.name, source.url)
+
+    @staticmethod
+    def _is_chinese(text: str) -> bool:
+        guess = language_detect.detect(text)
+        return guess.language == "zh" and guess.confidence >= settings.LANGUAGE_DETECT_MIN_CONFIDENCE
+
+    @staticmethod
+    def _feed_tags(article: NewsArticle) -> List[str]:
+        """入库时保存的订阅源标签（逗号分隔）；已是 LLM 关键词（JSON 数组）时返回空列表"""
+        tags = (article.tags or "").strip()
+        if not tags or tags.startswith("["):
+            return []
+        return [tag for tag in (part.strip() for part in tags.split(",")) if tag]
+
+    def _record(self, plan: StepPlan):
+        with self._lock:
+            for step in plan.steps:
+                if step in plan.skipped:
+                    decision = "skipped"
+                elif step in plan.local:
+                    decision = "local"
+                else:
+                    decision = "llm"
+                self._decisions.setdefault(step, Counter())[decision] += 1
+            self._reasons.update(plan.reasons.values())
+
+    def get_stats(self) -> Dict[str, Any]:
+        """各步骤交给 LLM、本地完成、跳过的次数及原因分布"""
+        with self._lock:
+            return {
+                "enabled": settings.LLM_STEP_PLANNER_ENABLED,
+                "steps": {step: dict(self._decisions[step]) for step in ALL_STEPS if step in self._decisions},
+                "reasons": dict(self._reasons),
+            }
+
+
+# 全局步骤规划器实例
+step_planner = StepPlanner()
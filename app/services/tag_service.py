@@ -1,14 +1,17 @@
-from typing import List
+from typing import List, Optional
+from sqlalchemy import desc
 from sqlalchemy.orm import Session
 from app.models.tag import Tag, ArticleTag
 from app.models.article import NewsArticle
+from app.services.tag_stats import TagStatsBuffer, tag_stats_buffer
 import logging
 
 logger = logging.getLogger(__name__)
 
 class TagService:
-    def __init__(self, db: Session):
+    def __init__(self, db: Session, stats_buffer: Optional[TagStatsBuffer] = None):
         self.db = db
+        self.stats_buffer = stats_buffer or tag_stats_buffer
 
     def link_tags_to_article(self, article: NewsArticle, tag_names: List[str]) -> List[Tag]:
         """
@@ -56,20 +59,23 @@ class TagService:
             ).all()
             linked_tag_ids = {link.tag_id for link in existing_links}
 
-            new_links_created = False
+            new_tag_ids = []
             for tag in all_tags:
                 if tag.id not in linked_tag_ids:
                     article_tag = ArticleTag(article_id=article.id, tag_id=tag.id)
                     self.db.add(article_tag)
-                    new_links_created = True
+                    new_tag_ids.append(tag.id)
             
             # Update cache field with comma-separated list of ALL linked tags
             current_text_tags = set(article.tags.split(',')) if article.tags else set()
             current_text_tags.update(normalized_names)
             article.tags = ",".join(sorted(current_text_tags))
 
-            if new_links_created:
+            if new_tag_ids:
                 self.db.commit()
+                # Counters are maintained incrementally, see app/services/tag_stats.py
+                self.stats_buffer.record_links(new_tag_ids)
+                self.stats_buffer.flush_if_needed(self.db)
                 
             return all_tags
 
@@ -78,6 +84,31 @@ class TagService:
             self.db.rollback()
             return []
 
+    def unlink_article_tags(self, article: NewsArticle) -> None:
+        """
+        Record removal of all tag links of an article that is about to be deleted.
+        The links themselves go away with the article (cascade).
+        """
+        tag_ids = [link.tag_id for link in article.article_tags]
+        if tag_ids:
+            self.stats_buffer.record_unlinks(tag_ids)
+
+    def get_tags(self, sort: str = "popular", limit: int = 50, skip: int = 0) -> List[Tag]:
+        """
+        List active tags ordered by the precomputed counters.
+        sort: popular (popularity_score), count (article_count) or name.
+        """
+        query = self.db.query(Tag).filter(Tag.is_active == True)
+
+        if sort == "count":
+            query = query.order_by(desc(Tag.article_count), Tag.name)
+        elif sort == "name":
+            query = query.order_by(Tag.name)
+        else:
+            query = query.order_by(desc(Tag.popularity_score), desc(Tag.article_count))
+
+        return query.offset(skip).limit(limit).all()
+
     def update_preference(self, user_id: int, tag_id: int, score_delta: float):
         """
         Update user's preference score for a tag.
@@ -0,0 +1,198 @@
+"""
+标签统计服务 - 增量维护 Tag.article_count 与 Tag.popularity_score
+
+文章-标签关联的增删只在内存中记录增量，按批次合并写回 tags 表，
+避免热门标签查询对 article_tags 做 GROUP BY。定期对账任务负责修正漂移
+并按半衰期重新计算时间衰减热度。
+"""
+import threading
+from collections import defaultdict
+from datetime import datetime, timedelta
+from typing import Dict, Iterable, Optional, Tuple
+from sqlalchemy import func, update, bindparam, case
+from sqlalchemy.orm import Session
+from app.models.tag import Tag, ArticleTag
+from app.config import settings
+import logging
+
+logger = logging.getLogger(__name__)
+
+# 对账时只回溯这么多个半衰期，更早的关联对热度的贡献可以忽略（< 0.1%）
+RECONCILE_HALF_LIVES = 10
+
+
+class TagStatsBuffer:
+    """标签计数增量缓冲区（线程安全）"""
+
+    def __init__(self, flush_size: Optional[int] = None):
+        self.flush_size = flush_size or settings.TAG_STATS_FLUSH_SIZE
+        self._count_deltas: Dict[int, int] = defaultdict(int)
+        self._score_deltas: Dict[int, float] = defaultdict(float)
+        self._pending_events = 0
+        self._lock = threading.Lock()
+
+    def record_links(self, tag_ids: Iterable[int], weight: float = 1.0):
+        """记录新建的文章-标签关联"""
+        self._record(tag_ids, 1, weight)
+
+    def record_unlinks(self, tag_ids: Iterable[int]):
+        """记录删除的文章-标签关联（热度不回退，由对账任务自然衰减）"""
+        self._record(tag_ids, -1, 0.0)
+
+    def _record(self, tag_ids: Iterable[int], count_delta: int, score_delta: float):
+        with self._lock:
+            for tag_id in tag_ids:
+                if tag_id is None:
+                    continue
+                self._count_deltas[tag_id] += count_delta
+                self._score_deltas[tag_id] += score_delta
+                self._pending_events += 1
+
+    @property
+    def pending_events(self) -> int:
+        """尚未写回数据库的事件数"""
+        return self._pending_events
+
+    def should_flush(self) -> bool:
+        """缓冲区是否已达到批量写回阈值"""
+        return self._pending_events >= self.flush_size
+
+    def flush(self, db: Session) -> int:
+        """将缓冲的增量合并写回 tags 表，返回更新的标签数"""
+        with self._lock:
+            count_deltas = dict(self._count_deltas)
+            score_deltas = dict(self._score_deltas)
+            self._count_deltas.clear()
+            self._score_deltas.clear()
+            self._pending_events = 0
+
+        params = [
+            {
+                "tag_id": tag_id,
+                "count_delta": count_deltas[tag_id],
+                "score_delta": score_deltas.get(tag_id, 0.0),
+            }
+            for tag_id in count_deltas
+            if count_deltas[tag_id] or score_deltas.get(tag_id)
+        ]
+        if not params:
+            return 0
+
+        tags = Tag.__table__
+        new_count = func.coalesce(tags.c.article_count, 0) + bindparam("count_delta")
+        stmt = (
+            update(tags)
+            .where(tags.c.id == bindparam("tag_id"))
+            .values(
+                article_count=case((new_count < 0, 0), else_=new_count),
+                popularity_score=func.coalesce(tags.c.popularity_score, 0.0)
+                + bindparam("score_delta"),
+            )
+        )
+        try:
+            db.execute(stmt, params)
+            db.commit()
+        except Exception as e:
+            logger.error(f"写回标签统计失败: {e}")
+            db.rollback()
+            # 写回失败时把增量放回缓冲区，等待下次重试
+            with self._lock:
+                for item in params:
+                    self._count_deltas[item["tag_id"]] += item["count_delta"]
+                    self._score_deltas[item["tag_id"]] += item["score_delta"]
+                    self._pending_events += 1
+            return 0
+
+        logger.debug(f"标签统计已写回: {len(params)} 个标签")
+        return len(params)
+
+    def snapshot(self) -> Tuple[Dict[int, int], Dict[int, float], int]:
+        """复制当前缓冲的增量，对账提交后用 discard 扣除"""
+        with self._lock:
+            return dict(self._count_deltas), dict(self._score_deltas), self._pending_events
+
+    def discard(self, snapshot: Tuple[Dict[int, int], Dict[int, float], int]):
+        """扣除快照中的增量（已由对账以 article_tags 为准），保留快照之后记录的增量"""
+        count_deltas, score_deltas, pending_events = snapshot
+        with self._lock:
+            for tag_id, delta in count_deltas.items():
+                self._count_deltas[tag_id] -= delta
+                if not self._count_deltas[tag_id]:
+                    del self._count_deltas[tag_id]
+            for tag_id, delta in score_deltas.items():
+                self._score_deltas[tag_id] -= delta
+                if not self._score_deltas[tag_id]:
+                    del self._score_deltas[tag_id]
+            self._pending_events = max(self._pending_events - pending_events, 0)
+
+    def flush_if_needed(self, db: Session) -> int:
+        """达到阈值时写回"""
+        if self.should_flush():
+            return self.flush(db)
+        return 0
+
+
+def decay_factor(age: timedelta, half_life_hours: Optional[float] = None) -> float:
+    """计算给定时间间隔的热度衰减系数"""
+    half_life = half_life_hours or settings.TAG_POPULARITY_HALF_LIFE_HOURS
+    hours = max(age.total_seconds() / 3600.0, 0.0)
+    return 0.5 ** (hours / half_life)
+
+
+def reconcile_tag_stats(
+    db: Session,
+    now: Optional[datetime] = None,
+    buffer: Optional[TagStatsBuffer] = None,
+) -> Dict[str, int]:
+    """对账：按 article_tags 重新计算标签计数与衰减热度
+
+    计数按 tag_id 聚合；热度只回溯最近若干个半衰期，并按天聚合，
+    因此代价与近期关联量成正比，而不是全部历史关联。
+    """
+    now = now or datetime.utcnow()
+    buffer = buffer or tag_stats_buffer
+    # 此前记录的关联都会被下面的聚合统计到，提交后扣除；对账期间新记录的增量保留到下次写回
+    snapshot = buffer.snapshot()
+    half_life = settings.TAG_POPULARITY_HALF_LIFE_HOURS
+    cutoff = now - timedelta(hours=half_life * RECONCILE_HALF_LIVES)
+
+    counts = dict(
+        db.query(ArticleTag.tag_id, func.count(ArticleTag.id))
+        .group_by(ArticleTag.tag_id)
+        .all()
+    )
+
+    scores: Dict[int, float] = defaultdict(float)
+    day_col = func.date(ArticleTag.created_at)
+    recent = (
+        db.query(ArticleTag.tag_id, day_col, func.count(ArticleTag.id))
+        .filter(ArticleTag.created_at >= cutoff)
+        .group_by(ArticleTag.tag_id, day_col)
+        .all()
+    )
+    for tag_id, day, link_count in recent:
+        if day is None:
+            continue
+        if isinstance(day, str):
+            day = datetime.strptime(day, "%Y-%m-%d")
+        # 以当天正午作为该批关联的代表时间
+        day_mid = datetime(day.year, day.month, day.day, 12)
+        scores[tag_id] += link_count * decay_factor(now - day_mid, half_life)
+
+    updated = 0
+    for tag in db.query(Tag).all():
+        article_count = counts.get(tag.id, 0)
+        popularity_score = round(scores.get(tag.id, 0.0), 6)
+        if tag.article_count != article_count or (tag.popularity_score or 0.0) != popularity_score:
+            tag.article_count = article_count
+            tag.popularity_score = popularity_score
+            updated += 1
+
+    db.commit()
+    buffer.discard(snapshot)
+    logger.info(f"标签统计对账完成: 共 {len(counts)} 个有关联的标签, 修正 {updated} 个")
+    return {"tags_with_links": len(counts), "tags_updated": updated}
+
+
+# 全局缓冲区实例
+tag_stats_buffer = TagStatsBuffer()
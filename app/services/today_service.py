@@ -4,7 +4,7 @@
 import asyncio
 from typing import List, Dict, Any, Optional
 from datetime import datetime, date
-from sqlalchemy.orm import Session
+from sqlalchemy.orm import Session, undefer
 from sqlalchemy import func, and_
 from app.models.article import NewsArticle, LLMProcessingStatus
 from app.models.source import NewsSource
@@ -70,7 +70,10 @@ class TodayService:
             
             # Use eager loading for article_tags
             from sqlalchemy.orm import joinedload
-            query = query.options(joinedload(NewsArticle.article_tags))
+            query = query.options(
+                joinedload(NewsArticle.article_tags),
+                joinedload(NewsArticle.source)
+            )
             
             # Fetch ALL today's articles
             # Note: For larger datasets, we should do this scoring in SQL,
@@ -108,7 +111,7 @@ class TodayService:
         else:
             # Standard Sort - Optimization: Eager Load
             from sqlalchemy.orm import joinedload
-            articles = query.options(joinedload(NewsArticle.article_tags))\
+            articles = query.options(joinedload(NewsArticle.article_tags), joinedload(NewsArticle.source))\
                            .order_by(NewsArticle.published_at.desc())\
                            .offset((page - 1) * size)\
                            .limit(size)\
@@ -193,7 +196,9 @@ class TodayService:
         """处理今日待处理文章"""
         
         # 获取待处理文章
-        pending_articles = self.db.query(NewsArticle).filter(
+        pending_articles = self.db.query(NewsArticle).options(
+            undefer(NewsArticle.content)
+        ).filter(
             func.date(NewsArticle.published_at) == date.today(),
             NewsArticle.llm_processing_status == LLMProcessingStatus.PENDING
         ).limit(limit).all()
@@ -204,45 +209,10 @@ class TodayService:
                 "processed_count": 0
             }
         
-        # 批量处理
-        processed_count = 0
-        failed_count = 0
-        
-        for article in pending_articles:
-            try:
-                # 更新状态为处理中
-                article.llm_processing_status = LLMProcessingStatus.PROCESSING
-                self.db.commit()
-                
-                # 处理文章
-                result = await self.content_processor.process_article_content(article)
-                
-                # 更新文章信息
-                if result.get("llm_processing_status") == LLMProcessingStatus.COMPLETED:
-                    article.chinese_title = result.get("chinese_title")
-                    article.llm_summary = result.get("llm_summary")
-                    article.original_language = result.get("original_language")
-                    article.llm_processed_at = result.get("llm_processed_at")
-                    article.llm_processing_status = LLMProcessingStatus.COMPLETED
-                    
-                    # 更新关键词和分类
-                    if result.get("keywords"):
-                        article.tags = json.dumps(result["keywords"], ensure_ascii=False)
-                    if result.get("category"):
-                        article.category = result["category"]
-                    
-                    processed_count += 1
-                else:
-                    article.llm_processing_status = LLMProcessingStatus.FAILED
-                    failed_count += 1
-                
-                self.db.commit()
-                
-            except Exception as e:
-                logger.error(f"处理文章 {article.id} 失败: {e}")
-                article.llm_processing_status = LLMProcessingStatus.FAILED
-                self.db.commit()
-                failed_count += 1
+        # 并发批量处理
+        counts = await self.content_processor.process_and_save(self.db, pending_articles)
+        processed_count = counts["processed_count"]
+        failed_count = counts["failed_count"]
         
         return {
             "message": f"处理完成，成功: {processed_count}, 失败: {failed_count}",
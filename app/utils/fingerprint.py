@@ -0,0 +1,59 @@
+"""
+文本指纹工具 - 用于检测同一 URL 的文章是否发生了实质修改
+"""
+import hashlib
+import re
+from collections import Counter
+from typing import Optional
+
+SIMHASH_BITS = 64
+
+_WORD_RE = re.compile(r"[a-z0-9]+")
+_CJK_RE = re.compile(r"[぀-ヿ㐀-䶿一-鿿가-힯]+")
+_SPACE_RE = re.compile(r"\s+")
+
+
+def normalize_text(text: Optional[str]) -> str:
+    """归一化文本：小写、合并空白"""
+    if not text:
+        return ""
+    return _SPACE_RE.sub(" ", text.lower()).strip()
+
+
+def _features(text: str) -> Counter:
+    """提取特征：拉丁词 + CJK 字符二元组"""
+    features: Counter = Counter(_WORD_RE.findall(text))
+    for run in _CJK_RE.findall(text):
+        if len(run) == 1:
+            features[run] += 1
+        for i in range(len(run) - 1):
+            features[run[i:i + 2]] += 1
+    return features
+
+
+def simhash(text: Optional[str]) -> str:
+    """计算 64 位 SimHash，返回 16 位十六进制字符串"""
+    features = _features(normalize_text(text))
+    if not features:
+        return "0" * (SIMHASH_BITS // 4)
+
+    weights = [0] * SIMHASH_BITS
+    for feature, count in features.items():
+        value = int.from_bytes(hashlib.blake2b(feature.encode("utf-8"), digest_size=8).digest(), "big")
+        for bit in range(SIMHASH_BITS):
+            if value >> bit & 1:
+                weights[bit] += count
+            else:
+                weights[bit] -= count
+
+    fingerprint = 0
+    for bit, weight in enumerate(weights):
+        if weight > 0:
+            fingerprint |= 1 << bit
+    return f"{fingerprint:016x}"
+
+
+def similarity(fingerprint_a: str, fingerprint_b: str) -> float:
+    """两个 SimHash 指纹的相似度（1 - 汉明距离 / 64）"""
+    distance = bin(int(fingerprint_a, 16) ^ int(fingerprint_b, 16)).count("1")
+    return 1.0 - distance / SIMHASH_BITS
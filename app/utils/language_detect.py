@@ -0,0 +1,218 @@
+"""
+离线语言检测 - Unicode 文字区段启发式 + 紧凑的字符 n-gram 语言模型
+
+中日韩、西里尔、阿拉伯等文字直接按字符区段判断；拉丁字母语言用内置的
+高频词与字符三元组特征打分。单次检测为微秒到毫秒级，置信度不足时再交给 LLM。
+"""
+import re
+from collections import Counter
+from dataclasses import dataclass
+from typing import Dict, FrozenSet, Iterable, List, Optional, Tuple
+
+UNKNOWN = "unknown"
+MAX_SAMPLE_CHARS = 2000  # 只取前若干字符检测
+
+# 文字区段 -> (语言代码, 若干码点区间)
+_SCRIPT_RANGES: Dict[str, Tuple[Tuple[int, int], ...]] = {
+    "han": ((0x4E00, 0x9FFF), (0x3400, 0x4DBF), (0xF900, 0xFAFF)),
+    "kana": ((0x3040, 0x30FF), (0x31F0, 0x31FF)),
+    "hangul": ((0xAC00, 0xD7AF), (0x1100, 0x11FF), (0x3130, 0x318F)),
+    "cyrillic": ((0x0400, 0x04FF),),
+    "arabic": ((0x0600, 0x06FF), (0x0750, 0x077F)),
+    "hebrew": ((0x0590, 0x05FF),),
+    "thai": ((0x0E00, 0x0E7F),),
+    "greek": ((0x0370, 0x03FF),),
+    "devanagari": ((0x0900, 0x097F),),
+}
+_SCRIPT_LANGUAGES = {
+    "hangul": "ko",
+    "hebrew": "he",
+    "thai": "th",
+    "greek": "el",
+    "devanagari": "hi",
+}
+_UKRAINIAN_CHARS = frozenset("іїєґ")
+_PERSIAN_CHARS = frozenset("پچژگ")
+
+# 一个汉字的信息量约等于半个到一个拉丁单词，按单词数 * 该权重与汉字数比较
+_LATIN_WORD_WEIGHT = 1.5
+
+# 拉丁字母语言模型：高频功能词 + 高频字符三元组（词首尾以空格补齐）
+_PROFILES: Dict[str, Tuple[str, str]] = {
+    "en": (
+        "the of and to a in is that for it on with as was are be by this from at have has not but "
+        "an or they he she we you said will its their which were been more also after would who about than",
+        " th|the|he |and|nd | an| of|of |ing|ng |ion|on |tio|ed |er |ent|re |es | in|in | to|to |hat|tha|"
+        "is | is| co| wa|was|for| fo|or |ati|ter|ers|her|ere|ly |al | be| wh|wit|ith",
+    ),
+    "fr": (
+        "le la les de des du un une et est en que qui dans pour pas sur au aux par plus ce cette il elle "
+        "ont été avec son sa ses nous vous mais ou sont être selon leur entre lui ne se",
+        " de|de |es |le | le|ent|nt | la|la |ion|les|que|ue | qu|tio|re |our| po|pou|ait|ais|men|eme|"
+        " et|et |des| pa|par|ée |té |ans| da|dan|eur|ur |ons|ont| en|qui",
+    ),
+    "de": (
+        "der die das und ist nicht ein eine zu den mit von sich des auf für im dem auch es an als "
+        "werden wird wurde bei nach sie er wir hat haben sind oder aber noch über vor durch mehr",
+        "en |er |ch |der|ein|sch|ich|nde|die| di| de|und| un|nd |cht|ung|ng |te |ie |gen|den|ine|"
+        " ei|che|ber|ten|end|ers|ver| ve|ge |st |ter| au|auf|ach|eit",
+    ),
+    "es": (
+        "el la los las de del que y en un una es por con para no se al lo como más pero sus su ha fue "
+        "son sobre este esta también entre según desde hasta muy ya está han",
+        " de|de |os |la | la|el | el|es |ent|que| qu|ue |ión|ón |as | co|con|ado|nte|ien|ara| pa|par|"
+        " lo|los|del|ra |cia|dad|ad | es|est|ero|mos| se|aci",
+    ),
+    "it": (
+        "il lo la i gli le di del della dei che e è un una per non in con da sono ha come anche più "
+        "al alla nel nella si ma questo questa ci suo sua tra dopo essere stato",
+        " di|di |la |che| ch|he |re |to |ell|lla|del| de| la|one|ne |zio|ion|ent|nte|ato| co|con|"
+        " il|il |per| pe|ere|sta|gli| un|are|no |tto|ssi| ne|nel",
+    ),
+    "pt": (
+        "o a os as de do da dos das que e em um uma para com não por se no na mais como mas foi ao "
+        "ele ela são está também seu sua pelo pela entre após já ser tem",
+        " de|de |os |do | do|da | da|ão |ção|çõe|ões|que| qu|ent|nte|ra |ar |as | co|com| pa|par|"
+        "ado|em |men| um|um |ia |não|est| nã|ment|ais",
+    ),
+    "nl": (
+        "de het een en van in is op te dat die voor met zijn niet aan er ook als bij door om maar dan "
+        "nog worden wordt werd heeft hebben meer naar over uit tot",
+        "en |de | de|an |het| he|et |van| va|een| ee|ij |aar|oor|ver|nde|ing|ng | in|ijk|gen|den|"
+        "der|ter|ten|sch|cht|ie |ijn|zij| zi| vo|voo|ord|wor",
+    ),
+}
+
+# 特征性变音字母带来的额外分数
+_DIACRITIC_HINTS: Dict[str, Dict[str, float]] = {
+    "ñ": {"es": 2.0},
+    "¿": {"es": 2.0},
+    "¡": {"es": 2.0},
+    "ã": {"pt": 2.0},
+    "õ": {"pt": 2.0},
+    "ç": {"pt": 1.0, "fr": 1.0},
+    "ß": {"de": 2.0},
+    "ä": {"de": 1.0},
+    "ö": {"de": 1.0, "nl": 0.3},
+    "ü": {"de": 1.0},
+    "è": {"fr": 1.0, "it": 0.5},
+    "ê": {"fr": 1.0, "pt": 0.5},
+    "â": {"fr": 1.0, "pt": 0.5},
+    "î": {"fr": 1.0},
+    "ô": {"fr": 1.0, "pt": 0.5},
+    "ù": {"fr": 1.0, "it": 0.5},
+    "ì": {"it": 1.5},
+    "ò": {"it": 1.5},
+}
+
+_TRIGRAM_WEIGHT = 0.1
+_EVIDENCE_SCORE = 5.0  # 达到该分数视为证据充分
+_WORD_RE = re.compile(r"[^\W\d_]+", re.UNICODE)
+
+
+def _compile_profiles() -> Dict[str, Tuple[FrozenSet[str], FrozenSet[str]]]:
+    return {
+        lang: (frozenset(words.split()), frozenset(trigrams.split("|")))
+        for lang, (words, trigrams) in _PROFILES.items()
+    }
+
+
+_COMPILED_PROFILES = _compile_profiles()
+SUPPORTED_LANGUAGES = tuple(sorted(set(_PROFILES) | set(_SCRIPT_LANGUAGES.values()) | {
+    "zh", "ja", "ru", "uk", "ar", "fa"
+}))
+
+
+@dataclass(frozen=True)
+class LanguageGuess:
+    """检测结果"""
+    language: str
+    confidence: float
+    script: str
+
+
+def _script_of(code_point: int) -> Optional[str]:
+    if code_point < 0x0370:
+        return None
+    for script, ranges in _SCRIPT_RANGES.items():
+        for start, end in ranges:
+            if start <= code_point <= end:
+                return script
+    return None
+
+
+def _score_latin(words: List[str], text: str) -> Dict[str, float]:
+    """拉丁字母语言打分"""
+    counts = Counter(words)
+    trigrams: Counter = Counter()
+    for word, count in counts.items():
+        padded = f" {word} "
+        for i in range(len(padded) - 2):
+            trigrams[padded[i:i + 3]] += count
+
+    scores: Dict[str, float] = {}
+    for lang, (stopwords, profile) in _COMPILED_PROFILES.items():
+        score = sum(count for word, count in counts.items() if word in stopwords)
+        score += _TRIGRAM_WEIGHT * sum(count for gram, count in trigrams.items() if gram in profile)
+        scores[lang] = score
+
+    for char, hints in _DIACRITIC_HINTS.items():
+        occurrences = text.count(char)
+        if occurrences:
+            for lang, weight in hints.items():
+                scores[lang] += weight * min(occurrences, 5)
+    return scores
+
+
+def detect(text: Optional[str]) -> LanguageGuess:
+    """检测单段文本的语言"""
+    if not text:
+        return LanguageGuess(UNKNOWN, 0.0, "")
+
+    sample = text[:MAX_SAMPLE_CHARS].lower()
+    script_counts: Counter = Counter()
+    for char in sample:
+        script = _script_of(ord(char))
+        if script:
+            script_counts[script] += 1
+    latin_words = [w for w in _WORD_RE.findall(sample) if w.isascii() or _script_of(ord(w[0])) is None]
+
+    units = dict(script_counts)
+    units["latin"] = len(latin_words) * _LATIN_WORD_WEIGHT
+    total = sum(units.values())
+    if total == 0:
+        return LanguageGuess(UNKNOWN, 0.0, "")
+
+    # 汉字与假名合并计算，假名出现即判为日文
+    cjk = units.get("han", 0) + units.get("kana", 0)
+    if cjk and cjk >= max(units.values()):
+        kana_share = units.get("kana", 0) / cjk
+        language = "ja" if kana_share > 0.05 else "zh"
+        return LanguageGuess(language, round(cjk / total, 4), "kana" if language == "ja" else "han")
+
+    script = max(units, key=units.get)
+    share = units[script] / total
+    if script == "cyrillic":
+        language = "uk" if any(c in _UKRAINIAN_CHARS for c in sample) else "ru"
+        return LanguageGuess(language, round(share, 4), script)
+    if script == "arabic":
+        language = "fa" if any(c in _PERSIAN_CHARS for c in sample) else "ar"
+        return LanguageGuess(language, round(share, 4), script)
+    if script in _SCRIPT_LANGUAGES:
+        return LanguageGuess(_SCRIPT_LANGUAGES[script], round(share, 4), script)
+
+    scores = _score_latin(latin_words, sample)
+    ranked = sorted(scores.items(), key=lambda item: item[1], reverse=True)
+    (best_lang, best), (_, second) = ranked[0], ranked[1]
+    if best <= 0:
+        return LanguageGuess(UNKNOWN, 0.0, "latin")
+
+    evidence = min(1.0, best / _EVIDENCE_SCORE)
+    margin = (best - second) / best
+    confidence = evidence * (0.5 + 0.5 * margin) * share
+    return LanguageGuess(best_lang, round(confidence, 4), "latin")
+
+
+def detect_many(texts: Iterable[Optional[str]]) -> List[LanguageGuess]:
+    """批量检测，结果与输入一一对应"""
+    return [detect(text) for text in texts]
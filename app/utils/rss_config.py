@@ -88,6 +88,10 @@ class RSSSourceConfig:
     required_fields: List[str] = field(default_factory=lambda: ['title', 'url'])
     min_title_length: int = 5
     min_content_length: int = 10
+    
+    # LLM 处理步骤覆盖（步骤名：language、title、summary、keywords、category）
+    llm_skip_steps: List[str] = field(default_factory=list)  # 该源的文章不执行的步骤
+    llm_force_steps: List[str] = field(default_factory=list)  # 总是交给 LLM、不做本地判断的步骤
 
 
 class RSSConfigManager:
@@ -177,7 +181,8 @@ class RSSConfigManager:
                         'comments_count': lambda entry: self._extract_hn_comments(entry.get('description', ''))
                     }
                 ),
-                max_content_length=500
+                max_content_length=500,
+                llm_skip_steps=['summary']  # 描述只有链接、点数和评论数，没有可摘要的正文
             )
         }
     
@@ -204,6 +209,12 @@ class RSSConfigManager:
         else:
             return self.configs['default']
     
+    def config_for_source(self, name: Optional[str], url: Optional[str]) -> RSSSourceConfig:
+        """按新闻源名称查找自定义配置，没有时根据URL检测"""
+        if name and name in self.configs:
+            return self.configs[name]
+        return self.detect_config(url or "")
+    
     def add_config(self, name: str, config: RSSSourceConfig):
         """添加自定义配置"""
         self.configs[name] = config
@@ -249,3 +260,7 @@ class RSSConfigManager:
         """提取HackerNews评论数"""
         match = re.search(r'(\d+) comments?', description)
         return int(match.group(1)) if match else None
+
+
+# 全局RSS配置管理器实例
+rss_config_manager = RSSConfigManager()
@@ -0,0 +1,115 @@
+"""
+提示词输入预算 - 正文清理、token 估算与按句切块
+
+RSS 正文常带有分享链接、"The post … appeared first on …"、阅读原文等模板文字，
+以及转载时重复的段落，送入 LLM 前先去掉。token 数按文字类别估算（不同模型的分词器
+对汉字的压缩率不同，比例由提供商配置给出），超出预算的正文按句子切成多块。
+"""
+import math
+import re
+from typing import Callable, List, Optional
+
+# 整句匹配即删除的模板文字（不区分大小写）
+_BOILERPLATE_PATTERNS = [
+    r"the post .+ appeared first on .+",
+    r"(continue|keep) reading\b.*",
+    r"read (more|the full (story|article|post))\b.*",
+    r"(click to )?share (this|on|via)\b.*",
+    r"(related (posts|articles|stories)|you (may|might) also like|recommended for you)\b.*",
+    r"(subscribe|sign up)\b.{0,40}\bnewsletter\b.*",
+    r"(all rights reserved|copyright\b|©).*",
+    r"(image|photo)( credit| source)?\s*:.*",
+    r"follow us on\b.*",
+    r"(阅读原文|点击(这里|此处)?(查看|阅读)|展开全文|责任编辑|本文来源|来源：|原标题：|免责声明|版权声明|"
+    r"扫码关注|关注我们|分享到|欢迎转发|未经授权).*",
+    r"\[(…|\.\.\.)\]",
+]
+_BOILERPLATE_RE = re.compile("|".join(f"(?:{p})" for p in _BOILERPLATE_PATTERNS), re.IGNORECASE)
+# 句末标点后切分；英文句点后需跟空白，且不在单个大写字母或 Mr/Dr 等缩写之后，避免切开 U.S.、3.5 之类
+_SENTENCE_RE = re.compile(
+    r".+?(?:[。！？!?]+[”’\"']?|(?<!\b[A-Z])(?<!\bMr)(?<!\bMs)(?<!\bDr)(?<!\bMrs)[.;](?=\s)|\n|$)\s*",
+    re.S
+)
+_CJK_RE = re.compile(r"[一-鿿㐀-䶿぀-ヿ가-힯]")
+_WORD_RE = re.compile(r"[A-Za-z0-9]+")
+_SYMBOL_RE = re.compile(r"[^\sA-Za-z0-9一-鿿㐀-䶿぀-ヿ가-힯]")
+_DEDUP_KEY_RE = re.compile(r"\W+")
+_MIN_DEDUP_CHARS = 10  # 过短的句子（如"是的。"）重复出现属于正常行文
+
+
+def split_sentences(text: Optional[str]) -> List[str]:
+    """按句切分，保留句末标点和其后的空白，拼接后与原文一致"""
+    if not text:
+        return []
+    return [m.group(0) for m in _SENTENCE_RE.finditer(text) if m.group(0)]
+
+
+def clean_content(text: Optional[str]) -> str:
+    """去掉模板文字和重复句子"""
+    if not text:
+        return ""
+    kept: List[str] = []
+    seen = set()
+    for sentence in split_sentences(text):
+        stripped = sentence.strip()
+        if not stripped:
+            if kept and not kept[-1].endswith("\n"):
+                kept.append(sentence)
+            continue
+        if _BOILERPLATE_RE.fullmatch(stripped):
+            continue
+        key = _DEDUP_KEY_RE.sub("", stripped.lower())
+        if len(key) >= _MIN_DEDUP_CHARS:
+            if key in seen:
+                continue
+            seen.add(key)
+        kept.append(sentence)
+    cleaned = "".join(kept)
+    return re.sub(r"[ \t]{2,}", " ", re.sub(r"\n{3,}", "\n\n", cleaned)).strip()
+
+
+def estimate_tokens(text: Optional[str], cjk_tokens_per_char: float = 1.0, latin_tokens_per_word: float = 1.3) -> int:
+    """估算文本的 token 数：汉字/假名/谚文按字、拉丁字母和数字按词，标点约半个 token"""
+    if not text:
+        return 0
+    cjk = len(_CJK_RE.findall(text))
+    words = len(_WORD_RE.findall(text))
+    symbols = len(_SYMBOL_RE.findall(text))
+    return math.ceil(cjk * cjk_tokens_per_char + words * latin_tokens_per_word + symbols * 0.5)
+
+
+def chunk_text(text: str, max_tokens: int, estimate: Callable[[str], int] = estimate_tokens) -> List[str]:
+    """按句子把文本切成不超过 max_tokens 的若干块，单句超长时按字符硬切"""
+    if estimate(text) <= max_tokens:
+        return [text] if text else []
+
+    chunks: List[str] = []
+    current: List[str] = []
+    current_tokens = 0
+    for sentence in split_sentences(text):
+        tokens = estimate(sentence)
+        if tokens > max_tokens:
+            if current:
+                chunks.append("".join(current).strip())
+                current, current_tokens = [], 0
+            chunks.extend(_hard_split(sentence, max_tokens, tokens))
+            continue
+        if current and current_tokens + tokens > max_tokens:
+            chunks.append("".join(current).strip())
+            current, current_tokens = [], 0
+        current.append(sentence)
+        current_tokens += tokens
+    if current:
+        chunks.append("".join(current).strip())
+    return [chunk for chunk in chunks if chunk]
+
+
+def truncate_to_budget(text: str, max_tokens: int, estimate: Callable[[str], int] = estimate_tokens) -> str:
+    """只保留预算内的开头部分（新闻的关键信息通常在前）"""
+    chunks = chunk_text(text, max_tokens, estimate)
+    return chunks[0] if chunks else ""
+
+
+def _hard_split(sentence: str, max_tokens: int, tokens: int) -> List[str]:
+    size = max(1, int(len(sentence) * max_tokens / tokens))
+    return [sentence[i:i + size].strip() for i in range(0, len(sentence), size) if sentence[i:i + size].strip()]
@@ -8,6 +8,7 @@ import type {
   NewsSource,
   Stats,
   Tag,
+  LLMBatchOverview,
 } from '@/types'
 
 // 文章 API
@@ -92,6 +93,12 @@ export const adminApi = {
     delete: (id: number) => apiClient.delete(`/sources/${id}`),
     fetch: (id: number) => apiClient.post(`/sources/${id}/fetch`),
   },
+  // Batch API 批次
+  llmBatches: {
+    list: () => apiClient.get<LLMBatchOverview>('/admin/llm/batches'),
+    submit: () => apiClient.post('/admin/llm/batches'),
+    poll: () => apiClient.post('/admin/llm/batches/poll'),
+  },
 }
 
 // 标签 API
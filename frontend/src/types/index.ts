@@ -109,6 +109,29 @@ export interface Stats {
   active_sources: number
 }
 
+// Batch API 批次
+export interface LLMBatchJob {
+  id: number
+  provider: string
+  remote_id: string
+  status: string
+  request_count: number
+  completed_count: number
+  failed_count: number
+  applied_count: number
+  error?: string
+  created_at: string
+  finished_at?: string
+}
+
+export interface LLMBatchOverview {
+  enabled: boolean
+  available: boolean
+  outstanding_articles: number
+  outstanding: LLMBatchJob[]
+  recent: LLMBatchJob[]
+}
+
 // 今日统计信息
 export interface TodayStats {
   total_articles: number
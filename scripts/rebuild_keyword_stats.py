@@ -0,0 +1,38 @@
+"""
+重建关键词文档频率脚本 - 首次启用本地关键词提取或语料变化较大时运行
+"""
+import sys
+from pathlib import Path
+
+# 添加项目根目录到Python路径
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+
+from app.models.database import SessionLocal
+from app.services.keyword_extractor import keyword_extractor
+
+
+def main():
+    """主函数"""
+    print("Rebuild keyword document frequencies")
+    print("====================================")
+
+    db = SessionLocal()
+    try:
+        total = keyword_extractor.rebuild_from_db(db)
+        keyword_extractor.save()
+        stats = keyword_extractor.get_stats()
+        print(f"\nIndexed {total} articles into {keyword_extractor.path}")
+        print(f"  - Used buckets: {stats['used_buckets']} / {stats['buckets']}")
+    except KeyboardInterrupt:
+        print("\nRebuild interrupted by user.")
+        sys.exit(1)
+    except Exception as e:
+        print(f"\nRebuild failed: {e}")
+        sys.exit(1)
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,48 @@
+"""
+训练本地分类模型脚本 - 用已由 LLM 分类的文章训练，语料增长后可重复运行以重新训练
+"""
+import sys
+from pathlib import Path
+
+# 添加项目根目录到Python路径
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+
+from app.models.database import SessionLocal
+from app.services.category_classifier import category_classifier
+from app.services.content_processor import CATEGORIES
+
+
+def main():
+    """主函数"""
+    print("Train local category classifier")
+    print("===============================")
+
+    if not category_classifier.path:
+        print("\nCATEGORY_MODEL_PATH is not set, nothing to do.")
+        sys.exit(1)
+
+    db = SessionLocal()
+    try:
+        metadata = category_classifier.train_from_db(db, CATEGORIES)
+        print(f"\nTrained on {metadata['documents']} articles, saved to {category_classifier.path}")
+        print(f"  - Features: {metadata['features']}")
+        if metadata.get("holdout_documents"):
+            print(f"  - Holdout articles: {metadata['holdout_documents']}")
+            print(f"  - Holdout accuracy: {metadata['holdout_accuracy']:.2%}")
+            print(f"  - Classified locally at confidence >= {metadata['threshold']}: "
+                  f"{metadata['confident_coverage']:.2%}")
+            if metadata["confident_accuracy"] is not None:
+                print(f"  - Accuracy of local classifications: {metadata['confident_accuracy']:.2%}")
+    except KeyboardInterrupt:
+        print("\nTraining interrupted by user.")
+        sys.exit(1)
+    except Exception as e:
+        print(f"\nTraining failed: {e}")
+        sys.exit(1)
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -7,6 +7,11 @@ from sqlalchemy import create_engine
 from sqlalchemy.orm import sessionmaker
 from fastapi.testclient import TestClient
 
+# 测试中不读写持久化的 LLM 响应缓存、关键词文档频率和分类模型
+os.environ.setdefault("LLM_CACHE_ENABLED", "False")
+os.environ.setdefault("KEYWORD_STATS_PATH", "")
+os.environ.setdefault("CATEGORY_MODEL_PATH", "")
+
 from app.main import app
 from app.models.database import Base, get_db
 from app.models import User
@@ -0,0 +1,179 @@
+import pytest
+from datetime import datetime, timedelta
+from fastapi.testclient import TestClient
+from sqlalchemy.orm import Session
+from app.config import settings
+from app.models.article import NewsArticle, LLMProcessingStatus
+from app.models.interaction import ReadingHistory, AggregatedTopic, TopicArticle
+from app.models.source import NewsSource
+from app.models.tag import Tag, ArticleTag
+from app.services.archive_service import ArchiveService
+
+
+@pytest.fixture
+def archive_dir(tmp_path, monkeypatch):
+    path = tmp_path / "archive"
+    monkeypatch.setattr(settings, "ARCHIVE_DIR", str(path))
+    monkeypatch.setattr(settings, "ARCHIVE_AFTER_DAYS", 30)
+    monkeypatch.setattr(settings, "ARCHIVE_MAX_HOT_ARTICLES", 0)
+    return path
+
+
+@pytest.fixture
+def aged_articles(db_session: Session):
+    source = NewsSource(name="ArchiveSource", url="https://archive.example.com")
+    db_session.add(source)
+    db_session.commit()
+
+    now = datetime.utcnow()
+    old = NewsArticle(
+        title="Ancient quantum news",
+        url="https://archive.example.com/old",
+        content="quantum body",
+        source_id=source.id,
+        published_at=now - timedelta(days=120),
+        fetched_at=now - timedelta(days=120),
+        llm_processing_status=LLMProcessingStatus.COMPLETED,
+    )
+    fresh = NewsArticle(
+        title="Fresh quantum news",
+        url="https://archive.example.com/fresh",
+        content="quantum body",
+        source_id=source.id,
+        published_at=now,
+        fetched_at=now,
+    )
+    db_session.add_all([old, fresh])
+    db_session.commit()
+
+    tag = Tag(name="quantum", slug="quantum")
+    db_session.add(tag)
+    db_session.commit()
+    db_session.add(ArticleTag(article_id=old.id, tag_id=tag.id, relevance_score=0.7))
+    db_session.commit()
+    return {"old": old, "fresh": fresh, "tag": tag}
+
+
+def test_archive_moves_old_articles(db_session: Session, archive_dir, aged_articles):
+    old_id = aged_articles["old"].id
+    service = ArchiveService(db_session)
+
+    result = service.archive_articles()
+
+    assert result["archived"] == 1
+    assert db_session.query(NewsArticle).filter(NewsArticle.id == old_id).first() is None
+    assert db_session.query(ArticleTag).filter(ArticleTag.article_id == old_id).count() == 0
+    assert service.is_archived_url("https://archive.example.com/old")
+    assert len(service.list_archive_keys()) == 1
+
+    archived = service.get_archived_article(old_id)
+    assert archived["title"] == "Ancient quantum news"
+    assert archived["content"] == "quantum body"
+    assert archived["llm_processing_status"] == "completed"
+    assert archived["article_tags"][0]["tag"]["name"] == "quantum"
+
+    # Running again is a no-op
+    assert service.archive_articles()["archived"] == 0
+
+
+def test_max_hot_articles_cap(db_session: Session, archive_dir, aged_articles, monkeypatch):
+    monkeypatch.setattr(settings, "ARCHIVE_AFTER_DAYS", 3650)
+    monkeypatch.setattr(settings, "ARCHIVE_MAX_HOT_ARTICLES", 1)
+
+    result = ArchiveService(db_session).archive_articles()
+
+    assert result["archived"] >= 1
+    assert result["hot_articles"] == 1
+    assert db_session.query(NewsArticle).filter(
+        NewsArticle.id == aged_articles["fresh"].id
+    ).first() is not None
+
+
+def test_archived_article_reachable_via_api(client: TestClient, db_session: Session, archive_dir, aged_articles):
+    old_id = aged_articles["old"].id
+    ArchiveService(db_session).archive_articles()
+
+    response = client.get(f"/api/v1/articles/{old_id}")
+    assert response.status_code == 200
+    data = response.json()
+    assert data["title"] == "Ancient quantum news"
+    assert data["tags"][0]["tag"]["name"] == "quantum"
+
+    response = client.get("/api/v1/search/", params={"q": "quantum"})
+    titles = [a["title"] for a in response.json()["articles"]]
+    assert "Ancient quantum news" not in titles
+
+    response = client.get("/api/v1/search/", params={"q": "quantum", "include_archive": True})
+    data = response.json()
+    titles = [a["title"] for a in data["articles"]]
+    assert titles.index("Fresh quantum news") < titles.index("Ancient quantum news")
+    assert data["total"] >= 2
+
+
+def _aged(db_session: Session, source_id: int, slug: str, days: int) -> NewsArticle:
+    moment = datetime.utcnow() - timedelta(days=days)
+    article = NewsArticle(title=f"Quantum {slug}", url=f"https://archive.example.com/{slug}", content="quantum body",
+                          source_id=source_id, published_at=moment, fetched_at=moment)
+    db_session.add(article)
+    db_session.commit()
+    return article
+
+
+def test_referenced_articles_stay_hot(db_session: Session, archive_dir, aged_articles, test_user):
+    source_id = aged_articles["old"].source_id
+    read = _aged(db_session, source_id, "read", 200)
+    in_topic = _aged(db_session, source_id, "topic", 200)
+    topic = AggregatedTopic(title="Quantum")
+    db_session.add(topic)
+    db_session.commit()
+    db_session.add_all([
+        ReadingHistory(user_id=test_user.id, article_id=read.id),
+        TopicArticle(topic_id=topic.id, article_id=in_topic.id),
+    ])
+    db_session.commit()
+
+    result = ArchiveService(db_session).archive_articles()
+
+    assert result["archived"] == 1
+    assert db_session.query(ReadingHistory).filter(ReadingHistory.article_id == read.id).count() == 1
+    assert db_session.query(TopicArticle).filter(TopicArticle.article_id == in_topic.id).count() == 1
+
+
+def test_search_merges_hot_and_archive_hits_by_date(client: TestClient, db_session: Session, archive_dir,
+                                                    aged_articles, test_user):
+    kept = _aged(db_session, aged_articles["old"].source_id, "kept", 200)
+    db_session.add(ReadingHistory(user_id=test_user.id, article_id=kept.id))
+    db_session.commit()
+    ArchiveService(db_session).archive_articles()
+
+    response = client.get("/api/v1/search/", params={"q": "quantum", "include_archive": True, "size": 2})
+    data = response.json()
+    assert data["total"] == 3
+    assert [a["title"] for a in data["articles"]] == ["Fresh quantum news", "Ancient quantum news"]
+
+    response = client.get("/api/v1/search/", params={"q": "quantum", "include_archive": True, "size": 2, "page": 2})
+    assert [a["title"] for a in response.json()["articles"]] == ["Quantum kept"]
+
+
+@pytest.mark.asyncio
+async def test_archive_job_runs_off_the_event_loop(monkeypatch):
+    import threading
+    from app.core import scheduler
+
+    threads = []
+
+    def archive():
+        threads.append(threading.get_ident())
+        return {"archived": 1}
+
+    def compact():
+        threads.append(threading.get_ident())
+        return True
+
+    monkeypatch.setattr(scheduler, "_archive_articles", archive)
+    monkeypatch.setattr(scheduler, "_compact_hot_db", compact)
+
+    await scheduler.archive_articles_job()
+
+    assert len(threads) == 2
+    assert threading.get_ident() not in threads
@@ -57,3 +57,49 @@ class TestArticles:
         """Test getting non-existent article"""
         response = client.get("/api/v1/articles/999999")
         assert response.status_code == 404
+
+    def test_list_omits_content_detail_includes_it(self, client: TestClient, db_session):
+        """List responses stay slim; content is only returned by the detail view"""
+        source = NewsSource(name="Body Source", url="http://body.com")
+        db_session.add(source)
+        db_session.commit()
+        
+        article = NewsArticle(
+            title="Body Article",
+            url="http://body.com/1",
+            source_id=source.id,
+            content="x" * 5000
+        )
+        db_session.add(article)
+        db_session.commit()
+        article_id = article.id
+        db_session.expunge_all()
+        
+        response = client.get("/api/v1/articles/")
+        assert response.status_code == 200
+        listed = [a for a in response.json()["articles"] if a["id"] == article_id]
+        assert listed and "content" not in listed[0]
+        
+        response = client.get(f"/api/v1/articles/{article_id}")
+        assert response.json()["content"] == "x" * 5000
+
+    def test_list_query_does_not_load_content(self, db_session):
+        """content is a deferred column and is not fetched by list queries"""
+        from sqlalchemy import inspect
+        from app.services.article_service import ArticleService
+        
+        source = NewsSource(name="Deferred Source", url="http://deferred.com")
+        db_session.add(source)
+        db_session.commit()
+        db_session.add(NewsArticle(
+            title="Deferred Article",
+            url="http://deferred.com/1",
+            source_id=source.id,
+            content="long body"
+        ))
+        db_session.commit()
+        db_session.expunge_all()
+        
+        articles = ArticleService(db_session).get_articles(limit=100)
+        assert articles
+        assert all("content" in inspect(a).unloaded for a in articles)
@@ -0,0 +1,127 @@
+import json
+import httpx
+import pytest
+from unittest.mock import AsyncMock, Mock
+from app.config import settings
+from app.models.article import NewsArticle, LLMProcessingStatus
+from app.services.content_processor import ContentProcessorService, CATEGORIES
+from app.services.llm_adapters.ollama_adapter import OllamaAdapter
+from app.services.llm_config import LLMConfig, OllamaConfig
+from app.services.llm_interface import LLMProvider
+from app.services.llm_manager import LLMServiceManager
+from app.services.llm_structured import (
+    BATCH_CATEGORY, BATCH_LANGUAGE, BATCH_TITLE, build_batch_prompt, parse_batch_response
+)
+
+
+def test_batch_prompt_numbers_items_on_single_lines():
+    prompt = build_batch_prompt(BATCH_TITLE, ["Rates rise\nagain", "Chips ship"])
+
+    assert "[1] Rates rise again" in prompt
+    assert "[2] Chips ship" in prompt
+    assert '"1" 到 "2"' in prompt
+
+
+def test_batch_response_is_validated_per_item():
+    text = '```json\n{"1": "EN", "2": "English", "4": "ja"}\n```'
+    assert parse_batch_response(text, BATCH_LANGUAGE, 4) == ["en", None, None, "ja"]
+
+    # 数组形式及包在外层字段中的结果
+    assert parse_batch_response('["科技", "天气"]', BATCH_CATEGORY, 2, CATEGORIES) == ["科技", None]
+    assert parse_batch_response('{"results": {"1": "央行加息", "2": " "}}', BATCH_TITLE, 2) == ["央行加息", None]
+    assert parse_batch_response("抱歉，我无法完成", BATCH_TITLE, 2) == [None, None]
+
+
+@pytest.mark.asyncio
+async def test_adapter_sends_one_json_request_per_batch():
+    requests = []
+
+    def handler(request):
+        requests.append(json.loads(request.content))
+        return httpx.Response(200, json={"response": '{"1": "央行加息", "2": "芯片出货"}'})
+
+    adapter = OllamaAdapter(OllamaConfig(base_url="http://localhost:11434"))
+    adapter.client = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+
+    titles = await adapter.translate_titles_batch(["Central bank raises rates", "Chips ship"])
+
+    assert titles == ["央行加息", "芯片出货"]
+    assert len(requests) == 1
+    assert requests[0]["format"] == "json"
+
+
+def _manager(batch_prompt_size):
+    manager = LLMServiceManager(LLMConfig(
+        providers={LLMProvider.OLLAMA: OllamaConfig(base_url="http://localhost:11434")},
+        enable_fallback=False,
+        batch_prompt_size=batch_prompt_size,
+    ))
+    adapter = Mock()
+    manager.adapters[LLMProvider.OLLAMA] = adapter
+    return manager, adapter
+
+
+@pytest.mark.asyncio
+async def test_manager_splits_batches_and_isolates_failed_groups():
+    manager, adapter = _manager(batch_prompt_size=2)
+
+    async def translate(titles, **kwargs):
+        if "boom" in titles:
+            raise RuntimeError("输出被截断")
+        return [f"译:{title}" for title in titles]
+
+    adapter.translate_titles_batch = AsyncMock(side_effect=translate)
+
+    results = await manager.translate_titles_batch(["a", "b", "boom", "c", "d"])
+
+    assert results == ["译:a", "译:b", None, None, "译:d"]
+    assert adapter.translate_titles_batch.await_count == 3
+    stats = manager.get_routing_stats()
+    assert stats["batch_items"]["translate_titles_batch"] == 5
+    assert stats["batch_failed_items"]["translate_titles_batch"] == 2
+
+
+@pytest.mark.asyncio
+async def test_manager_batches_only_uncertain_languages():
+    manager, adapter = _manager(batch_prompt_size=20)
+    adapter.detect_languages_batch = AsyncMock(return_value=["fr"])
+
+    results = await manager.detect_languages_batch([
+        "The central bank raised interest rates again on Tuesday to fight persistent inflation.",
+        "Paris",
+    ])
+
+    assert results == ["en", "fr"]
+    adapter.detect_languages_batch.assert_awaited_once_with(["Paris"])
+
+
+@pytest.mark.asyncio
+async def test_processor_uses_batches_and_retries_failed_items_individually(monkeypatch):
+    monkeypatch.setattr(settings, "LLM_BATCH_PROMPTS", True)
+    monkeypatch.setattr(settings, "KEYWORD_EXTRACTION_MODE", "local")
+    monkeypatch.setattr(settings, "KEYWORD_MIN_CORPUS_DOCUMENTS", 0)
+    articles = [
+        NewsArticle(id=i, title=f"Headline {i}", content=f"Market news number {i} about chips and rates.")
+        for i in range(4)
+    ]
+    llm_manager = Mock()
+    llm_manager.config.max_concurrent_tasks = 4
+    llm_manager.detect_languages_batch = AsyncMock(return_value=["en"] * 4)
+    llm_manager.translate_titles_batch = AsyncMock(return_value=["标题0", "标题1", None, "标题3"])
+    llm_manager.categorize_batch = AsyncMock(return_value=["科技", "财经", "科技", None])
+    llm_manager.translate_to_chinese = AsyncMock(return_value="标题2")
+    llm_manager.categorize_article = AsyncMock(return_value="体育")
+    llm_manager.detect_language = AsyncMock(return_value="en")
+    llm_manager.summarize_content = AsyncMock(return_value="摘要内容")
+
+    processor = ContentProcessorService(llm_manager)
+    results = {article.id: result async for article, result in processor.iter_process_articles(articles)}
+
+    assert all(r["llm_processing_status"] == LLMProcessingStatus.COMPLETED for r in results.values())
+    assert [results[i]["chinese_title"] for i in range(4)] == ["标题0", "标题1", "标题2", "标题3"]
+    assert [results[i]["category"] for i in range(4)] == ["科技", "财经", "科技", "体育"]
+    # 只有批量输出中失败的条目单独重试
+    llm_manager.translate_to_chinese.assert_awaited_once_with("Headline 2", "en")
+    llm_manager.categorize_article.assert_awaited_once()
+    llm_manager.detect_language.assert_not_awaited()
+    assert llm_manager.translate_titles_batch.await_count == 1
@@ -0,0 +1,211 @@
+import json
+import pytest
+from unittest.mock import AsyncMock, Mock
+from fastapi.testclient import TestClient
+from app.config import settings
+from app.models.article import NewsArticle, LLMProcessingStatus
+from app.models.source import NewsSource
+from app.services.category_classifier import CategoryClassifier
+from app.services.content_processor import ContentProcessorService, CATEGORIES, STEP_CATEGORY
+from app.services.news_aggregator import NewsAggregatorService
+
+CORPUS = {
+    "科技": [
+        ("芯片厂商发布新一代处理器", "新一代处理器采用先进制程，芯片性能提升，人工智能算力大幅增强。"),
+        ("人工智能模型开源", "研究团队开源人工智能模型，算法在芯片上的推理速度更快。"),
+        ("NVIDIA unveils new GPU", "The new GPU chip accelerates artificial intelligence software and data centers."),
+    ],
+    "体育": [
+        ("主队加时赛绝杀夺冠", "主队在加时赛中绝杀对手，球员发挥出色，球迷庆祝冠军。"),
+        ("国家队公布世界杯名单", "主教练公布世界杯名单，多名球员入选国家队，比赛即将开始。"),
+        ("Striker scores twice in derby", "The striker scored twice as the team won the football match before fans."),
+    ],
+}
+
+
+def _seed(db_session, copies=4):
+    source = NewsSource(name="LabelSource", url="https://labels.example.com")
+    db_session.add(source)
+    db_session.commit()
+    articles = []
+    for category, samples in CORPUS.items():
+        for copy in range(copies):
+            for title, content in samples:
+                articles.append(NewsArticle(
+                    title=title, content=content, category=category, source_id=source.id,
+                    url=f"https://labels.example.com/{len(articles)}",
+                    llm_processing_status=LLMProcessingStatus.COMPLETED, category_source="llm",
+                ))
+    db_session.add_all(articles)
+    db_session.commit()
+    return source
+
+
+@pytest.fixture
+def trained(db_session, tmp_path, monkeypatch):
+    monkeypatch.setattr(settings, "CATEGORY_CLASSIFIER_MIN_CONFIDENCE", 0.9)
+    classifier = CategoryClassifier(str(tmp_path / "category_model.json.gz"), buckets=1 << 12)
+    source = _seed(db_session)
+    classifier.train_from_db(db_session, CATEGORIES, batch_size=5)
+    for module in ("app.services.step_planner", "app.services.news_aggregator", "app.api.v1.admin"):
+        monkeypatch.setattr(f"{module}.category_classifier", classifier)
+    return classifier, source
+
+
+def test_train_reports_holdout_and_classifies(trained):
+    classifier, _ = trained
+
+    assert classifier.metadata["documents"] == 24
+    assert classifier.metadata["holdout_documents"] > 0
+    prediction = classifier.classify("芯片性能提升", "新处理器让人工智能推理更快。")
+    assert prediction.category == "科技"
+    assert classifier.is_confident(prediction)
+    assert classifier.classify_many([("Football match", "The team won the match."), (None, None)])[0].category == "体育"
+
+
+def test_model_file_is_reloaded_by_other_instances(trained):
+    classifier, _ = trained
+    other = CategoryClassifier(classifier.path, buckets=classifier.buckets)
+
+    assert other.is_loaded
+    assert other.classify("主队夺冠", "球员在比赛中绝杀对手。").category == "体育"
+
+
+def test_without_model_nothing_is_classified(db_session):
+    classifier = CategoryClassifier()
+
+    assert classifier.classify("芯片", "处理器") is None
+    assert classifier.classify_many([("a", "b")]) == [None]
+    with pytest.raises(ValueError):
+        classifier.train_from_db(db_session, CATEGORIES)
+
+
+def _llm_manager():
+    llm_manager = Mock()
+    llm_manager.detect_language = AsyncMock(return_value="zh")
+    llm_manager.translate_to_chinese = AsyncMock(return_value="标题")
+    llm_manager.summarize_content = AsyncMock(return_value="摘要内容")
+    llm_manager.extract_keywords = AsyncMock(return_value=["关键词"])
+    llm_manager.categorize_article = AsyncMock(return_value="其他")
+    return llm_manager
+
+
+@pytest.mark.asyncio
+async def test_processor_defers_to_llm_only_when_unsure(trained, monkeypatch):
+    classifier, _ = trained
+    monkeypatch.setattr(settings, "LLM_COMBINED_PROCESSING", False)
+    llm_manager = _llm_manager()
+    processor = ContentProcessorService(llm_manager)
+
+    confident = NewsArticle(id=1, title="新一代芯片发布", content="处理器芯片性能提升，人工智能算力增强。")
+    result = await processor.process_article_content(confident)
+    assert result["category"] == "科技"
+    llm_manager.categorize_article.assert_not_called()
+
+    unsure = NewsArticle(id=2, title="天气", content="明天多云。")
+    result = await processor.process_article_content(unsure)
+    assert result["category"] == "其他"
+    llm_manager.categorize_article.assert_awaited_once()
+
+    stats = classifier.get_stats()
+    assert (stats["local_decisions"], stats["deferred_decisions"]) == (1, 1)
+    assert stats["deferral_rate"] == 0.5
+
+
+def test_ingest_classifies_new_articles_in_batch(trained, db_session):
+    classifier, source = trained
+    articles = [
+        NewsArticle(title="芯片公司发布人工智能处理器", content="新芯片让人工智能算力提升。",
+                    url="https://labels.example.com/new-1", source_id=source.id,
+                    llm_processing_status=LLMProcessingStatus.PENDING),
+        NewsArticle(title="天气", content="明天多云。", url="https://labels.example.com/new-2",
+                    source_id=source.id, llm_processing_status=LLMProcessingStatus.PENDING),
+    ]
+    db_session.add_all(articles)
+    db_session.commit()
+
+    NewsAggregatorService(db_session)._classify_new_articles(articles)
+
+    assert articles[0].category == "科技"
+    assert articles[0].category_source == "local"
+    assert STEP_CATEGORY not in json.loads(articles[0].pending_llm_steps)
+    assert articles[1].pending_llm_steps is None
+    assert ContentProcessorService.get_pending_steps(articles[0]) == ("language", "title", "summary", "keywords")
+    assert classifier.local_decisions == 1
+
+
+def test_admin_classifier_stats(client: TestClient, trained):
+    response = client.get("/api/v1/admin/llm/classifier")
+
+    assert response.status_code == 200
+    data = response.json()
+    assert data["model_loaded"] is True
+    assert data["model"]["documents"] == 24
+    assert "deferral_rate" in data
+
+
+def test_training_skips_labels_from_the_local_classifier(db_session, tmp_path):
+    source = _seed(db_session, copies=1)
+    # 本地分类器给出的标签（哪怕是错的）不参与训练
+    db_session.add_all([
+        NewsArticle(title="主队夺冠", content="球员庆祝冠军。", category="科技", category_source="local",
+                    url=f"https://labels.example.com/local-{i}", source_id=source.id,
+                    llm_processing_status=LLMProcessingStatus.COMPLETED)
+        for i in range(5)
+    ])
+    db_session.commit()
+    classifier = CategoryClassifier(str(tmp_path / "category_model.json.gz"), buckets=1 << 12)
+
+    metadata = classifier.train_from_db(db_session, CATEGORIES)
+
+    assert metadata["documents"] == 6
+
+
+def test_apply_result_records_the_category_source():
+    article = NewsArticle(id=1, title="t", content="c")
+    ContentProcessorService.apply_result(article, {
+        "category": "科技", "skipped_steps": {STEP_CATEGORY: "local_classifier"},
+        "llm_processing_status": LLMProcessingStatus.COMPLETED,
+    })
+    assert article.category_source == "local"
+
+    ContentProcessorService.apply_result(article, {
+        "category": "科技", "degraded_steps": [STEP_CATEGORY],
+        "llm_processing_status": LLMProcessingStatus.COMPLETED,
+    })
+    assert article.category_source == "local"
+
+    ContentProcessorService.apply_result(article, {
+        "category": "体育", "llm_processing_status": LLMProcessingStatus.COMPLETED,
+    })
+    assert article.category_source == "llm"
+
+
+def test_user_corrections_are_kept_and_used_for_training(client: TestClient, db_session, tmp_path):
+    source = _seed(db_session, copies=1)
+    article = NewsArticle(title="主队夺冠", content="球员庆祝冠军。", category="科技", category_source="local",
+                          url="https://labels.example.com/corrected", source_id=source.id,
+                          llm_processing_status=LLMProcessingStatus.COMPLETED,
+                          pending_llm_steps=json.dumps(["summary", "category"]))
+    db_session.add(article)
+    db_session.commit()
+
+    response = client.put(f"/api/v1/articles/{article.id}", json={"category": "体育"})
+
+    assert response.status_code == 200
+    assert response.json()["category"] == "体育"
+    db_session.refresh(article)
+    assert article.category_source == "user"
+    assert json.loads(article.pending_llm_steps) == ["summary"]
+
+    # 后续重跑的模型结果不覆盖人工修正
+    ContentProcessorService.apply_result(article, {
+        "category": "科技", "llm_processing_status": LLMProcessingStatus.COMPLETED,
+    })
+    assert article.category == "体育"
+    assert article.category_source == "user"
+    db_session.commit()
+
+    classifier = CategoryClassifier(str(tmp_path / "category_model.json.gz"), buckets=1 << 12)
+    assert classifier.train_from_db(db_session, CATEGORIES)["documents"] == 7
+
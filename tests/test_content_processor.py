@@ -0,0 +1,257 @@
+import asyncio
+import json
+import pytest
+from unittest.mock import AsyncMock, Mock
+from app.config import settings
+from app.models.article import NewsArticle, LLMProcessingStatus
+from app.models.source import NewsSource
+from app.services.content_processor import ContentProcessorService
+from app.services.llm_config import LLMConfig, OllamaConfig
+from app.services.llm_interface import LLMProvider
+from app.services.llm_manager import LLMServiceManager
+
+
+@pytest.fixture(autouse=True)
+def sequential_mode(monkeypatch):
+    monkeypatch.setattr(settings, "LLM_COMBINED_PROCESSING", False)
+    monkeypatch.setattr(settings, "KEYWORD_EXTRACTION_MODE", "llm")
+
+
+def _slow(value, delay=0.05, tracker=None):
+    async def call(*args, **kwargs):
+        if tracker is not None:
+            tracker["active"] += 1
+            tracker["peak"] = max(tracker["peak"], tracker["active"])
+        await asyncio.sleep(delay)
+        if tracker is not None:
+            tracker["active"] -= 1
+        if isinstance(value, Exception):
+            raise value
+        return value
+    return AsyncMock(side_effect=call)
+
+
+def _article():
+    return NewsArticle(id=1, title="Central bank raises rates", content="The central bank raised rates.")
+
+
+@pytest.mark.asyncio
+async def test_independent_steps_run_concurrently():
+    tracker = {"active": 0, "peak": 0}
+    llm_manager = Mock()
+    llm_manager.detect_language = _slow("en", tracker=tracker)
+    llm_manager.translate_to_chinese = _slow("央行加息", tracker=tracker)
+    llm_manager.summarize_content = _slow("央行宣布加息。", tracker=tracker)
+    llm_manager.extract_keywords = _slow(["央行"], tracker=tracker)
+    llm_manager.categorize_article = _slow("财经", tracker=tracker)
+
+    result = await ContentProcessorService(llm_manager).process_article_content(_article())
+
+    assert result["llm_processing_status"] == LLMProcessingStatus.COMPLETED
+    assert result["category"] == "财经"
+    # language + summary + keywords + category start together; title waits for language
+    assert tracker["peak"] >= 4
+    llm_manager.translate_to_chinese.assert_awaited_once_with("Central bank raises rates", "en")
+
+
+@pytest.mark.asyncio
+async def test_step_failures_are_isolated():
+    llm_manager = Mock()
+    llm_manager.detect_language = _slow(RuntimeError("language down"))
+    llm_manager.translate_to_chinese = _slow("央行加息")
+    llm_manager.summarize_content = _slow("央行宣布加息。")
+    llm_manager.extract_keywords = _slow(RuntimeError("keywords down"))
+    llm_manager.categorize_article = _slow("财经")
+    article = _article()
+    processor = ContentProcessorService(llm_manager)
+
+    result = await processor.process_article_content(article)
+
+    assert result["llm_processing_status"] == LLMProcessingStatus.COMPLETED
+    assert result["failed_steps"] == ["language", "keywords"]
+    assert result["chinese_title"] == "央行加息"
+    llm_manager.translate_to_chinese.assert_awaited_once_with("Central bank raises rates", "auto")
+
+    assert processor.apply_result(article, result)
+    assert article.llm_summary == "央行宣布加息。"
+    assert json.loads(article.pending_llm_steps) == ["language", "keywords"]
+
+
+@pytest.mark.asyncio
+async def test_all_steps_failing_fails_article():
+    llm_manager = Mock()
+    for method in ("detect_language", "translate_to_chinese", "summarize_content",
+                   "extract_keywords", "categorize_article"):
+        setattr(llm_manager, method, _slow(RuntimeError("down"), delay=0))
+
+    result = await ContentProcessorService(llm_manager).process_article_content(_article())
+
+    assert result["llm_processing_status"] == LLMProcessingStatus.FAILED
+
+
+@pytest.mark.asyncio
+async def test_manager_caps_provider_concurrency():
+    manager = LLMServiceManager(LLMConfig(
+        providers={LLMProvider.OLLAMA: OllamaConfig(base_url="http://localhost:11434", max_concurrency=2)},
+        enable_fallback=False,
+    ))
+    tracker = {"active": 0, "peak": 0}
+    adapter = Mock()
+    adapter.summarize_content = _slow("摘要", tracker=tracker)
+    manager.adapters[LLMProvider.OLLAMA] = adapter
+
+    results = await asyncio.gather(*(manager.summarize_content("text") for _ in range(6)))
+
+    assert results == ["摘要"] * 6
+    assert tracker["peak"] == 2
+
+
+def _batch_manager(tracker, delays):
+    llm_manager = Mock()
+    llm_manager.config.max_concurrent_tasks = 3
+
+    async def summarize(content, **kwargs):
+        tracker["active"] += 1
+        tracker["peak"] = max(tracker["peak"], tracker["active"])
+        await asyncio.sleep(delays[content])
+        tracker["active"] -= 1
+        return f"{content} 的中文摘要"
+
+    llm_manager.detect_language = AsyncMock(return_value="zh")
+    llm_manager.translate_to_chinese = AsyncMock(side_effect=lambda text, lang: text)
+    llm_manager.summarize_content = AsyncMock(side_effect=summarize)
+    llm_manager.extract_keywords = AsyncMock(return_value=["关键词"])
+    llm_manager.categorize_article = AsyncMock(return_value="科技")
+    return llm_manager
+
+
+@pytest.mark.asyncio
+async def test_batch_yields_in_completion_order_within_limit():
+    delays = {f"content-{i}": 0.01 * (6 - i) for i in range(6)}
+    tracker = {"active": 0, "peak": 0}
+    processor = ContentProcessorService(_batch_manager(tracker, delays))
+    articles = [NewsArticle(id=i, title=f"t{i}", content=f"content-{i}") for i in range(6)]
+
+    order = [article.id async for article, _ in processor.iter_process_articles(articles)]
+
+    assert sorted(order) == list(range(6))
+    assert order != list(range(6))
+    assert tracker["peak"] == 3
+
+
+@pytest.mark.asyncio
+async def test_process_and_save_commits_in_batches(db_session):
+    source = NewsSource(name="BatchSource", url="https://batch.example.com")
+    db_session.add(source)
+    db_session.commit()
+    articles = [
+        NewsArticle(title=f"批量 {i}", url=f"https://batch.example.com/{i}", content=f"content-{i}",
+                    source_id=source.id, llm_processing_status=LLMProcessingStatus.PENDING)
+        for i in range(5)
+    ]
+    db_session.add_all(articles)
+    db_session.commit()
+
+    delays = {f"content-{i}": 0 for i in range(5)}
+    processor = ContentProcessorService(_batch_manager({"active": 0, "peak": 0}, delays))
+    commits = []
+    original_commit = db_session.commit
+    db_session.commit = lambda: (commits.append(1), original_commit())
+
+    counts = await processor.process_and_save(db_session, articles, commit_batch_size=2)
+
+    assert counts == {"processed_count": 5, "failed_count": 0}
+    # one commit for PROCESSING, then ceil(5 / 2) for results
+    assert len(commits) == 4
+    db_session.expire_all()
+    statuses = {a.llm_processing_status for a in db_session.query(NewsArticle).filter(NewsArticle.source_id == source.id)}
+    assert statuses == {LLMProcessingStatus.COMPLETED}
+
+
+@pytest.mark.asyncio
+async def test_interrupted_batch_releases_unfinished_articles(db_session):
+    source = NewsSource(name="InterruptedSource", url="https://interrupted.example.com")
+    db_session.add(source)
+    db_session.commit()
+    articles = [
+        NewsArticle(title=f"中断 {i}", url=f"https://interrupted.example.com/{i}", content=f"content-{i}",
+                    source_id=source.id, llm_processing_status=LLMProcessingStatus.PENDING)
+        for i in range(3)
+    ]
+    db_session.add_all(articles)
+    db_session.commit()
+
+    delays = {"content-0": 0, "content-1": 0, "content-2": 10}
+    processor = ContentProcessorService(_batch_manager({"active": 0, "peak": 0}, delays))
+
+    with pytest.raises(asyncio.TimeoutError):
+        await asyncio.wait_for(processor.process_and_save(db_session, articles, commit_batch_size=5), timeout=0.5)
+
+    db_session.expire_all()
+    statuses = [article.llm_processing_status for article in articles]
+    assert statuses == [LLMProcessingStatus.COMPLETED, LLMProcessingStatus.COMPLETED, LLMProcessingStatus.PENDING]
+
+
+@pytest.mark.asyncio
+async def test_partially_failed_article_is_retried_next_cycle(db_session, monkeypatch):
+    from app.core import tasks
+
+    llm_manager = Mock()
+    llm_manager.detect_language = AsyncMock(return_value="en")
+    llm_manager.translate_to_chinese = AsyncMock(return_value="央行加息")
+    llm_manager.summarize_content = AsyncMock(return_value="央行宣布加息。")
+    llm_manager.extract_keywords = AsyncMock(side_effect=[RuntimeError("keywords down"), ["央行"]])
+    llm_manager.categorize_article = AsyncMock(return_value="财经")
+    llm_manager.config.max_concurrent_tasks = 4
+    monkeypatch.setattr(tasks, "get_llm_manager", lambda: llm_manager)
+    monkeypatch.setattr(tasks, "SessionLocal", lambda: db_session)
+    monkeypatch.setattr(db_session, "close", lambda: None)
+
+    source = NewsSource(name="RetrySource", url="https://retry.example.com/feed")
+    db_session.add(source)
+    db_session.commit()
+    article = NewsArticle(title="Central bank raises rates", content="The central bank raised rates.",
+                          url="https://retry.example.com/1", source_id=source.id,
+                          llm_processing_status=LLMProcessingStatus.PENDING)
+    db_session.add(article)
+    db_session.commit()
+    manager = tasks.BackgroundTaskManager()
+
+    await manager._process_articles_batch()
+
+    assert article.llm_processing_status == LLMProcessingStatus.COMPLETED
+    assert json.loads(article.pending_llm_steps) == ["keywords"]
+    assert article.llm_step_attempts == 1
+
+    await manager._process_articles_batch()
+
+    assert article.pending_llm_steps is None
+    assert article.llm_step_attempts == 0
+    assert json.loads(article.tags) == ["央行"]
+    assert llm_manager.extract_keywords.await_count == 2
+    assert llm_manager.summarize_content.await_count == 1
+
+
+@pytest.mark.asyncio
+async def test_retries_stop_after_max_attempts(db_session, monkeypatch):
+    from app.core import tasks
+
+    llm_manager = Mock()
+    llm_manager.extract_keywords = AsyncMock(side_effect=RuntimeError("keywords down"))
+    llm_manager.config.max_concurrent_tasks = 4
+    monkeypatch.setattr(tasks, "get_llm_manager", lambda: llm_manager)
+    monkeypatch.setattr(tasks, "SessionLocal", lambda: db_session)
+    monkeypatch.setattr(db_session, "close", lambda: None)
+    monkeypatch.setattr(settings, "LLM_STEP_MAX_ATTEMPTS", 2)
+    article = NewsArticle(title="Central bank raises rates", content="The central bank raised rates.",
+                          url="https://retry.example.com/2", pending_llm_steps=json.dumps(["keywords"]),
+                          llm_step_attempts=1, llm_processing_status=LLMProcessingStatus.COMPLETED)
+    db_session.add(article)
+    db_session.commit()
+    processor = tasks.AsyncTaskProcessor()
+
+    assert await processor.retry_incomplete_articles() == {"completed_count": 0, "retried_count": 1}
+    assert article.llm_step_attempts == 2
+    assert await processor.retry_incomplete_articles() == {"completed_count": 0, "retried_count": 0}
+    assert article.llm_processing_status == LLMProcessingStatus.COMPLETED
+    assert json.loads(article.pending_llm_steps) == ["keywords"]
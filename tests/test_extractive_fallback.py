@@ -0,0 +1,247 @@
+import json
+import time
+from datetime import datetime
+from unittest.mock import Mock
+import pytest
+from app.config import settings
+from app.core import tasks
+from app.models.article import NewsArticle, LLMProcessingStatus
+from app.models.source import NewsSource
+from app.services import extractive_summary
+from app.services.content_processor import ContentProcessorService
+from app.services.llm_circuit import CircuitState
+from app.services.llm_config import ExtractiveConfig, LLMConfig, OllamaConfig
+from app.services.llm_interface import LLMProvider
+from app.services.llm_manager import LLMServiceManager
+from app.services.llm_usage import track_usage
+
+CHINESE_NEWS = (
+    "全球芯片出货量在第三季度创下历史新高，数据中心需求是主要推动力。"
+    "多家芯片厂商上调了全年业绩预期。"
+    "本站记者现场报道。"
+    "分析人士认为，数据中心对高端芯片的需求将持续到明年。"
+    "与此同时，消费电子市场的芯片需求仍然疲软。"
+    "天气晴朗，适合出行。"
+    "芯片厂商正在扩大产能以满足数据中心订单。"
+    "多家芯片厂商上调了全年业绩预期。"
+)
+
+ENGLISH_NEWS = (
+    "Global chip shipments hit a record in the third quarter, driven by data center demand. "
+    "Several chip makers raised their full-year outlook. "
+    "The weather was sunny in the capital. "
+    "Analysts expect data center demand for high-end chips to continue into next year. "
+    "Chip makers are expanding capacity to meet data center orders."
+)
+
+
+def test_summary_keeps_lead_and_central_sentences():
+    started = time.perf_counter()
+    summary = extractive_summary.summarize(CHINESE_NEWS, target_length=80)
+    elapsed = time.perf_counter() - started
+
+    assert summary.startswith("全球芯片出货量在第三季度创下历史新高")
+    assert "天气晴朗" not in summary
+    assert "本站记者" not in summary
+    assert len(summary) <= 80 * extractive_summary.OVERRUN
+    # 重复的句子只保留一次
+    assert summary.count("多家芯片厂商") == 1
+    assert elapsed < 0.1
+
+
+def test_english_summary_joins_sentences_with_spaces():
+    summary = extractive_summary.summarize(ENGLISH_NEWS, target_length=150)
+
+    assert summary.startswith("Global chip shipments hit a record")
+    assert "weather" not in summary
+    assert ". " in summary
+
+
+def test_short_text_is_returned_whole():
+    assert extractive_summary.summarize("芯片出货量创新高。", target_length=400) == "芯片出货量创新高。"
+    assert extractive_summary.summarize("") == ""
+
+
+def _manager():
+    manager = LLMServiceManager(LLMConfig(
+        providers={
+            LLMProvider.OLLAMA: OllamaConfig(base_url="http://localhost:11434"),
+            LLMProvider.CUSTOM: ExtractiveConfig(),
+        },
+        circuit_failure_threshold=100,
+    ))
+
+    async def unavailable(*args, **kwargs):
+        raise ConnectionError("Ollama 不可用")
+
+    adapter = Mock()
+    for method in ("summarize_content", "translate_to_chinese", "detect_language", "extract_keywords",
+                   "categorize_article", "process_article_combined", "translate_titles_batch",
+                   "detect_languages_batch", "categorize_batch"):
+        setattr(adapter, method, unavailable)
+    manager.adapters[LLMProvider.OLLAMA] = adapter
+    return manager
+
+
+@pytest.mark.asyncio
+async def test_last_resort_provider_answers_when_every_model_fails():
+    manager = _manager()
+
+    assert manager._plan_providers("summarize_content")[-1] == LLMProvider.CUSTOM
+    assert LLMProvider.CUSTOM not in manager.breakers
+    with track_usage() as usage:
+        summary = await manager.summarize_content(CHINESE_NEWS, target_length=80)
+
+    assert summary.startswith("全球芯片出货量")
+    assert usage.degraded_methods == {"summarize_content"}
+    assert manager.get_routing_stats()["degraded"] == {"summarize_content": 1}
+    assert manager.has_llm_available()
+
+
+def _article(db_session, content=CHINESE_NEWS):
+    source = NewsSource(name="DegradedSource", url="https://degraded.example.com")
+    db_session.add(source)
+    db_session.commit()
+    article = NewsArticle(
+        title="Chip shipments hit a record",
+        url="https://degraded.example.com/1",
+        content=content,
+        source_id=source.id,
+        published_at=datetime.utcnow(),
+        llm_processing_status=LLMProcessingStatus.PENDING,
+    )
+    db_session.add(article)
+    db_session.commit()
+    return article
+
+
+@pytest.mark.asyncio
+async def test_degraded_steps_are_marked_for_upgrade(db_session, monkeypatch):
+    monkeypatch.setattr(settings, "KEYWORD_MIN_CORPUS_DOCUMENTS", 0)
+    article = _article(db_session, ENGLISH_NEWS)
+    processor = ContentProcessorService(_manager())
+
+    result = await processor.process_article_content(article)
+
+    assert result["llm_processing_status"] == LLMProcessingStatus.COMPLETED
+    assert result["degraded_steps"] == ["summary"]
+    assert processor.apply_result(article, result)
+    assert article.llm_degraded is True
+    assert article.llm_summary.startswith("Global chip shipments")
+    # 标题无法在本地翻译而失败，与降级的步骤一起等待模型恢复后重跑
+    assert json.loads(article.pending_llm_steps) == ["title", "summary", "category"]
+
+
+def test_today_process_marks_degraded_articles(client, db_session, monkeypatch):
+    from app.api.v1.today import get_content_processor
+    from app.main import app
+    from app.services.news_aggregator import NewsAggregatorService
+
+    async def fetch_nothing(self):
+        return {"total_sources": 0, "total_fetched": 0, "sources_processed": [], "errors": []}
+
+    monkeypatch.setattr(settings, "KEYWORD_MIN_CORPUS_DOCUMENTS", 0)
+    monkeypatch.setattr(NewsAggregatorService, "fetch_all_sources", fetch_nothing)
+    processor = ContentProcessorService(_manager())
+    app.dependency_overrides[get_content_processor] = lambda: processor
+    article = _article(db_session, ENGLISH_NEWS)
+    article.fetched_at = datetime.now()
+    db_session.commit()
+
+    response = client.post("/api/v1/today/process")
+
+    assert response.status_code == 200
+    assert response.json()["processing_result"]["processed"] == 1
+    db_session.refresh(article)
+    assert article.llm_processing_status == LLMProcessingStatus.COMPLETED
+    assert article.llm_degraded is True
+    assert json.loads(article.pending_llm_steps) == ["title", "summary", "category"]
+
+
+@pytest.mark.asyncio
+async def test_upgrade_replaces_degraded_results_once_models_recover(db_session, monkeypatch):
+    article = _article(db_session, ENGLISH_NEWS)
+    article.llm_processing_status = LLMProcessingStatus.COMPLETED
+    article.llm_summary = "降级摘要"
+    article.llm_degraded = True
+    article.pending_llm_steps = json.dumps(["summary"])
+    db_session.commit()
+
+    manager = LLMServiceManager(LLMConfig(
+        providers={
+            LLMProvider.OLLAMA: OllamaConfig(base_url="http://localhost:11434"),
+            LLMProvider.CUSTOM: ExtractiveConfig(),
+        },
+    ))
+
+    async def summarize(content, target_length=400, **kwargs):
+        return "芯片出货量创新高，数据中心需求强劲。"
+
+    adapter = Mock()
+    adapter.summarize_content = summarize
+    manager.adapters[LLMProvider.OLLAMA] = adapter
+    monkeypatch.setattr(tasks, "get_llm_manager", lambda: manager)
+    monkeypatch.setattr(tasks, "SessionLocal", lambda: db_session)
+    monkeypatch.setattr(db_session, "close", lambda: None)
+
+    summary = await tasks.AsyncTaskProcessor().upgrade_degraded_articles()
+
+    assert summary == {"upgraded_count": 1, "skipped_count": 0}
+    assert article.llm_summary == "芯片出货量创新高，数据中心需求强劲。"
+    assert article.llm_degraded is False
+    assert article.pending_llm_steps is None
+
+
+@pytest.mark.asyncio
+async def test_upgrade_waits_while_every_model_is_down(monkeypatch):
+    manager = _manager()
+    manager.breakers[LLMProvider.OLLAMA].state = CircuitState.OPEN
+    monkeypatch.setattr(tasks, "get_llm_manager", lambda: manager)
+
+    summary = await tasks.AsyncTaskProcessor().upgrade_degraded_articles()
+
+    assert summary == {"upgraded_count": 0, "skipped_count": 0}
+
+
+@pytest.mark.asyncio
+async def test_articles_that_never_upgrade_stop_blocking_the_queue(db_session, monkeypatch):
+    source = NewsSource(name="StuckSource", url="https://stuck.example.com")
+    db_session.add(source)
+    db_session.commit()
+    stuck = [
+        NewsArticle(title=f"Stuck {i}", url=f"https://stuck.example.com/{i}", content=ENGLISH_NEWS,
+                    source_id=source.id, llm_summary="降级摘要", llm_degraded=True,
+                    pending_llm_steps=json.dumps(["summary"]), llm_processing_status=LLMProcessingStatus.COMPLETED)
+        for i in range(3)
+    ]
+    db_session.add_all(stuck)
+    db_session.commit()
+    upgradable = NewsArticle(title="Upgradable", url="https://stuck.example.com/ok", content=CHINESE_NEWS,
+                             source_id=source.id, llm_summary="降级摘要", llm_degraded=True,
+                             pending_llm_steps=json.dumps(["summary"]),
+                             llm_processing_status=LLMProcessingStatus.COMPLETED)
+    db_session.add(upgradable)
+    db_session.commit()
+
+    manager = _manager()
+
+    async def summarize(content, target_length=400, **kwargs):
+        if content.startswith("Global"):
+            raise ConnectionError("模型仍然无法处理这篇文章")
+        return "芯片出货量创新高。"
+
+    manager.adapters[LLMProvider.OLLAMA].summarize_content = summarize
+    monkeypatch.setattr(tasks, "get_llm_manager", lambda: manager)
+    monkeypatch.setattr(tasks, "SessionLocal", lambda: db_session)
+    monkeypatch.setattr(db_session, "close", lambda: None)
+    monkeypatch.setattr(tasks.settings, "LLM_STEP_MAX_ATTEMPTS", 2)
+    processor = tasks.AsyncTaskProcessor()
+
+    # 每轮只处理 3 篇：第一轮被始终失败的文章占满，第二轮它们排到后面
+    assert await processor.upgrade_degraded_articles(limit=3) == {"upgraded_count": 0, "skipped_count": 3}
+    assert await processor.upgrade_degraded_articles(limit=3) == {"upgraded_count": 1, "skipped_count": 2}
+    assert upgradable.llm_degraded is False
+    assert await processor.upgrade_degraded_articles(limit=3) == {"upgraded_count": 0, "skipped_count": 1}
+    assert await processor.upgrade_degraded_articles(limit=3) == {"upgraded_count": 0, "skipped_count": 0}
+    assert [article.llm_step_attempts for article in stuck] == [2, 2, 2]
+    assert all(article.llm_degraded for article in stuck)
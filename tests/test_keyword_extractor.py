@@ -0,0 +1,135 @@
+import pytest
+from unittest.mock import AsyncMock, Mock
+from sqlalchemy.orm import Session
+from app.config import settings
+from app.models.article import NewsArticle
+from app.models.source import NewsSource
+from app.services.content_processor import ContentProcessorService
+from app.services.keyword_extractor import KeywordExtractor, tokenize
+
+MARKET_ZH = "市场周二上涨，投资者关注央行的决定。公司表示今年业绩增长。"
+MARKET_EN = "The stock market rose on Tuesday as investors weighed the central bank decision."
+
+CHIP_TITLE = "华为发布新一代人工智能芯片"
+CHIP_BODY = (
+    "华为周二发布了新一代人工智能芯片昇腾，称该芯片在大模型训练方面性能提升明显。"
+    "华为表示，昇腾芯片将用于人工智能数据中心，市场人士认为这将加剧人工智能芯片领域的竞争。"
+)
+
+
+@pytest.fixture
+def extractor():
+    extractor = KeywordExtractor(buckets=1 << 12)
+    extractor.add_documents([MARKET_ZH] * 20 + [MARKET_EN] * 20)
+    return extractor
+
+
+def test_tokenize_keeps_acronyms_and_drops_stopwords():
+    counts, display = tokenize("The EU and AI rules: OpenAI said the rules are new.")
+    assert display["ai"] == "AI"
+    assert display["openai"] == "OpenAI"
+    assert "the" not in counts and "said" not in counts
+    assert counts["rules"] == 2
+
+
+def test_chinese_keywords_prefer_whole_terms(extractor):
+    keywords = extractor.extract(CHIP_TITLE, CHIP_BODY, max_keywords=5)
+    assert keywords[:2] == ["人工智能", "芯片"]
+    assert {"华为", "昇腾"} <= set(keywords)
+    assert "工智能芯" not in keywords
+
+
+def test_chinese_keywords_do_not_span_word_boundaries(extractor):
+    text = "人工智能大模型推动产业升级"
+    keywords = extractor.extract(None, text, max_keywords=5)
+
+    assert "人工智能" in keywords and "产业升级" in keywords
+    assert "能大模型" not in keywords
+    # 选出的关键词在原文中互不重叠
+    covered = set()
+    for keyword in keywords:
+        start = text.index(keyword)
+        span = set(range(start, start + len(keyword)))
+        assert not span & covered
+        covered |= span
+
+
+def test_corpus_common_words_rank_lower(extractor):
+    keywords = extractor.extract(
+        "Google unveils quantum chip Willow",
+        "Google said its quantum chip Willow solved a benchmark in minutes. "
+        "The quantum team said Willow reduces errors. The market reacted calmly on Tuesday.",
+        max_keywords=4,
+    )
+    assert keywords[0] == "quantum"
+    assert "market" not in keywords and "Tuesday" not in keywords
+
+
+def test_extract_many_matches_single(extractor):
+    docs = [(CHIP_TITLE, CHIP_BODY), ("", ""), ("Willow", "Willow quantum chip")]
+    assert extractor.extract_many(docs, 3) == [extractor.extract(t, c, 3) for t, c in docs]
+
+
+def test_save_and_reload_round_trip(extractor, tmp_path):
+    extractor.path = str(tmp_path / "keyword_df.bin")
+    extractor._dirty = True
+    assert extractor.save()
+    assert not extractor.save()  # nothing new to write
+
+    reloaded = KeywordExtractor(extractor.path, buckets=1 << 12)
+    assert reloaded.get_stats()["document_count"] == 40
+    assert reloaded.idf("市场") == pytest.approx(extractor.idf("市场"))
+
+
+def test_rebuild_from_db(db_session: Session):
+    source = NewsSource(name="KeywordSource", url="https://kw.example.com")
+    db_session.add(source)
+    db_session.commit()
+    db_session.add_all([
+        NewsArticle(title=f"市场 {i}", content=MARKET_ZH, url=f"https://kw.example.com/{i}", source_id=source.id)
+        for i in range(3)
+    ])
+    db_session.commit()
+
+    extractor = KeywordExtractor(buckets=1 << 12)
+    assert extractor.rebuild_from_db(db_session, batch_size=2) == db_session.query(NewsArticle).count()
+    assert extractor.idf("市场") < extractor.idf("量子")
+
+
+@pytest.mark.asyncio
+async def test_processor_extracts_keywords_locally(monkeypatch):
+    monkeypatch.setattr(settings, "LLM_COMBINED_PROCESSING", False)
+    monkeypatch.setattr(settings, "KEYWORD_EXTRACTION_MODE", "local")
+    monkeypatch.setattr(settings, "KEYWORD_MIN_CORPUS_DOCUMENTS", 0)
+    llm_manager = Mock()
+    llm_manager.detect_language = AsyncMock(return_value="zh")
+    llm_manager.translate_to_chinese = AsyncMock(return_value=CHIP_TITLE)
+    llm_manager.summarize_content = AsyncMock(return_value="华为发布昇腾芯片。")
+    llm_manager.extract_keywords = AsyncMock(return_value=["不应调用"])
+    llm_manager.categorize_article = AsyncMock(return_value="科技")
+
+    article = NewsArticle(id=1, title=CHIP_TITLE, content=CHIP_BODY)
+    result = await ContentProcessorService(llm_manager).process_article_content(article)
+
+    assert "人工智能" in result["keywords"]
+    llm_manager.extract_keywords.assert_not_called()
+
+
+@pytest.mark.asyncio
+async def test_small_corpus_falls_back_to_llm(monkeypatch):
+    monkeypatch.setattr(settings, "LLM_COMBINED_PROCESSING", False)
+    monkeypatch.setattr(settings, "KEYWORD_EXTRACTION_MODE", "local")
+    monkeypatch.setattr(settings, "KEYWORD_MIN_CORPUS_DOCUMENTS", 100)
+    monkeypatch.setattr("app.services.content_processor.keyword_extractor", KeywordExtractor(buckets=1 << 12))
+    llm_manager = Mock()
+    llm_manager.detect_language = AsyncMock(return_value="zh")
+    llm_manager.translate_to_chinese = AsyncMock(return_value=CHIP_TITLE)
+    llm_manager.summarize_content = AsyncMock(return_value="华为发布昇腾芯片。")
+    llm_manager.extract_keywords = AsyncMock(return_value=["昇腾"])
+    llm_manager.categorize_article = AsyncMock(return_value="科技")
+
+    article = NewsArticle(id=1, title=CHIP_TITLE, content=CHIP_BODY)
+    result = await ContentProcessorService(llm_manager).process_article_content(article)
+
+    assert result["keywords"] == ["昇腾"]
+    llm_manager.extract_keywords.assert_awaited_once()
@@ -0,0 +1,70 @@
+import pytest
+from unittest.mock import AsyncMock, Mock
+from app.services.llm_config import LLMConfig, OllamaConfig
+from app.services.llm_interface import LLMProvider
+from app.services.llm_manager import LLMServiceManager
+from app.utils.language_detect import detect, detect_many, UNKNOWN
+
+SAMPLES = {
+    "en": "The central bank raised interest rates by a quarter point on Tuesday, citing persistent "
+          "inflation and a strong labour market. Analysts said that the move was widely expected.",
+    "fr": "La banque centrale a relevé ses taux d'intérêt mardi, invoquant une inflation persistante "
+          "et un marché du travail solide. Les analystes estiment que cette décision était attendue.",
+    "de": "Die Zentralbank hat am Dienstag die Zinsen erhöht und verwies auf die anhaltende Inflation "
+          "und einen starken Arbeitsmarkt. Analysten sagen, dass der Schritt erwartet wurde.",
+    "es": "El banco central subió las tasas de interés el martes, citando la inflación persistente y "
+          "un mercado laboral sólido. Los analistas dijeron que la decisión era esperada.",
+    "it": "La banca centrale ha alzato i tassi di interesse martedì, citando l'inflazione persistente e "
+          "un mercato del lavoro solido. Gli analisti hanno detto che la mossa era attesa.",
+    "pt": "O banco central elevou as taxas de juros na terça-feira, citando a inflação persistente e um "
+          "mercado de trabalho sólido. Os analistas disseram que a decisão já era esperada.",
+    "nl": "De centrale bank heeft dinsdag de rente verhoogd, met verwijzing naar de aanhoudende inflatie "
+          "en een sterke arbeidsmarkt. Analisten zeggen dat de stap werd verwacht.",
+    "zh": "央行周二宣布加息25个基点，理由是通胀持续且劳动力市场强劲。OpenAI 同日发布了 GPT 新模型。",
+    "ja": "中央銀行は火曜日に利上げを発表し、根強いインフレと堅調な労働市場を理由に挙げた。",
+    "ko": "중앙은행은 화요일 금리를 인상했다고 발표했다.",
+    "ru": "Центральный банк во вторник повысил процентные ставки.",
+    "uk": "Центральний банк у вівторок підвищив процентні ставки, посилаючись на інфляцію.",
+    "ar": "رفع البنك المركزي أسعار الفائدة يوم الثلاثاء",
+}
+
+
+@pytest.mark.parametrize("language", sorted(SAMPLES))
+def test_detects_language_confidently(language):
+    guess = detect(SAMPLES[language])
+    assert guess.language == language
+    assert guess.confidence >= 0.7
+
+
+def test_short_or_empty_text_has_low_confidence():
+    assert detect("Apple iPhone 16").confidence < 0.7
+    assert detect("").language == UNKNOWN
+    assert detect("12345 !!!").confidence == 0.0
+
+
+def test_detect_many_preserves_order():
+    texts = [SAMPLES["de"], None, SAMPLES["zh"]]
+    assert [g.language for g in detect_many(texts)] == ["de", UNKNOWN, "zh"]
+
+
+def _manager():
+    manager = LLMServiceManager(LLMConfig(
+        providers={LLMProvider.OLLAMA: OllamaConfig(base_url="http://localhost:11434")},
+        enable_fallback=False,
+        language_detect_min_confidence=0.7,
+    ))
+    adapter = Mock()
+    adapter.detect_language = AsyncMock(return_value="en")
+    manager.adapters[LLMProvider.OLLAMA] = adapter
+    return manager, adapter
+
+
+@pytest.mark.asyncio
+async def test_manager_uses_llm_only_below_threshold():
+    manager, adapter = _manager()
+
+    assert await manager.detect_language(SAMPLES["fr"]) == "fr"
+    adapter.detect_language.assert_not_called()
+
+    assert await manager.detect_language("Apple iPhone 16") == "en"
+    adapter.detect_language.assert_awaited_once()
@@ -0,0 +1,200 @@
+import json
+from datetime import datetime
+import httpx
+import pytest
+from fastapi.testclient import TestClient
+from app.models.article import NewsArticle, LLMProcessingStatus
+from app.models.llm_batch import LLMBatchJob
+from app.models.source import NewsSource
+from app.services.llm_adapters.openai_adapter import OpenAIAdapter
+from app.services.llm_batch import LLMBatchService
+from app.services.llm_config import OpenAIConfig
+from app.services.llm_interface import LLMProcessingError
+
+
+class BatchStandIn:
+    """实现 /files 与 /batches 接口的本地替身，批次结果由 answer 逐条生成"""
+
+    def __init__(self, answer):
+        self.answer = answer
+        self.files = {}
+        self.batches = {}
+        self.upload_content_type = None
+
+    def complete(self, batch_id, status="completed"):
+        batch = self.batches[batch_id]
+        output, errors = [], []
+        for line in self.files[batch["input_file_id"]].splitlines():
+            request = json.loads(line)
+            content = self.answer(request)
+            if content is None:
+                errors.append({"custom_id": request["custom_id"], "response": None,
+                               "error": {"code": "server_error", "message": "失败"}})
+                continue
+            output.append({"custom_id": request["custom_id"], "error": None, "response": {
+                "status_code": 200,
+                "body": {"choices": [{"message": {"content": content}}], "usage": {"prompt_tokens": 120}},
+            }})
+        if output:
+            batch["output_file_id"] = self._store("\n".join(json.dumps(line) for line in output))
+        if errors:
+            batch["error_file_id"] = self._store("\n".join(json.dumps(line) for line in errors))
+        batch["status"] = status
+        batch["request_counts"] = {"total": len(output) + len(errors), "completed": len(output), "failed": len(errors)}
+
+    def _store(self, content):
+        file_id = f"file-{len(self.files) + 1}"
+        self.files[file_id] = content
+        return file_id
+
+    async def handler(self, request: httpx.Request) -> httpx.Response:
+        path = request.url.path.removeprefix("/v1")
+        if request.method == "POST" and path == "/files":
+            self.upload_content_type = request.headers["Content-Type"]
+            body = request.read().decode()
+            start = body.index("\r\n\r\n", body.index('filename="batch.jsonl"')) + 4
+            content = body[start:body.index("\r\n--", start)]
+            return httpx.Response(200, json={"id": self._store(content), "purpose": "batch"})
+        if request.method == "POST" and path == "/batches":
+            payload = json.loads(request.content)
+            batch_id = f"batch-{len(self.batches) + 1}"
+            self.batches[batch_id] = {"id": batch_id, "status": "validating", **payload}
+            return httpx.Response(200, json=self.batches[batch_id])
+        if request.method == "GET" and path.startswith("/batches/"):
+            return httpx.Response(200, json=self.batches[path.split("/")[-1]])
+        if request.method == "GET" and path.endswith("/content"):
+            return httpx.Response(200, text=self.files[path.split("/")[-2]])
+        return httpx.Response(404)
+
+
+def _answer(request):
+    prompt = request["body"]["messages"][0]["content"]
+    if "Broken" in prompt:
+        return None
+    return json.dumps({
+        "language": "en",
+        "chinese_title": "芯片出货量创新高",
+        "summary": "全球芯片出货量在本季度创下新高，主要受数据中心需求推动。",
+        "keywords": ["芯片", "出货量"],
+        "category": "科技",
+    }, ensure_ascii=False)
+
+
+@pytest.fixture
+def stand_in():
+    return BatchStandIn(_answer)
+
+
+@pytest.fixture
+def service(db_session, stand_in):
+    adapter = OpenAIAdapter(OpenAIConfig(api_key="sk-test", base_url="http://batch.local/v1", max_retries=0))
+    return LLMBatchService(db_session, adapter)
+
+
+def _connect(service, handler):
+    """客户端按事件循环绑定，需在测试的事件循环中设置"""
+    service.adapter.client = httpx.AsyncClient(
+        transport=httpx.MockTransport(handler),
+        headers={"Content-Type": "application/json"}
+    )
+
+
+def _articles(db_session, *titles):
+    source = NewsSource(name="BatchSource", url="https://batch.example.com")
+    db_session.add(source)
+    db_session.commit()
+    articles = []
+    for i, title in enumerate(titles):
+        article = NewsArticle(
+            title=title,
+            url=f"https://batch.example.com/{i}",
+            content=f"{title}. Chip shipments reached a record this quarter on data center demand.",
+            source_id=source.id,
+            published_at=datetime.utcnow(),
+            llm_processing_status=LLMProcessingStatus.PENDING,
+        )
+        db_session.add(article)
+        articles.append(article)
+    db_session.commit()
+    return articles
+
+
+@pytest.mark.asyncio
+async def test_submit_poll_and_apply(db_session, service, stand_in):
+    first, second = _articles(db_session, "Chips ship", "Chips ship again")
+    _connect(service, stand_in.handler)
+
+    result = await service.submit_pending()
+
+    assert result["submitted"] == 2
+    assert stand_in.upload_content_type.startswith("multipart/form-data")
+    assert first.llm_processing_status == LLMProcessingStatus.PROCESSING
+    requests = [json.loads(line) for line in stand_in.files["file-1"].splitlines()]
+    assert [r["custom_id"] for r in requests] == [f"article-{first.id}", f"article-{second.id}"]
+    assert requests[0]["body"]["response_format"] == {"type": "json_object"}
+
+    # 批次进行中：只更新状态
+    stand_in.batches["batch-1"]["status"] = "in_progress"
+    assert (await service.poll())["finished"] == 0
+    assert service.get_batches()["outstanding"][0]["status"] == "in_progress"
+
+    stand_in.complete("batch-1")
+    summary = await service.poll()
+
+    assert (summary["finished"], summary["applied"], summary["requeued"]) == (1, 2, 0)
+    for article in (first, second):
+        assert article.llm_processing_status == LLMProcessingStatus.COMPLETED
+        assert article.chinese_title == "芯片出货量创新高"
+        assert article.category == "科技"
+        assert article.prompt_tokens == 120
+    overview = service.get_batches()
+    assert overview["outstanding"] == []
+    assert overview["recent"][0]["applied_count"] == 2
+
+
+@pytest.mark.asyncio
+async def test_failed_requests_return_to_pending(db_session, service, stand_in):
+    good, broken = _articles(db_session, "Chips ship", "Broken feed")
+    _connect(service, stand_in.handler)
+
+    await service.submit_pending()
+    stand_in.complete("batch-1")
+    summary = await service.poll()
+
+    assert (summary["applied"], summary["requeued"]) == (1, 1)
+    assert good.llm_processing_status == LLMProcessingStatus.COMPLETED
+    assert broken.llm_processing_status == LLMProcessingStatus.PENDING
+    job = db_session.query(LLMBatchJob).one()
+    assert (job.completed_count, job.failed_count) == (1, 1)
+
+
+@pytest.mark.asyncio
+async def test_expired_batch_returns_articles_to_pending(db_session, service, stand_in):
+    article, = _articles(db_session, "Chips ship")
+    _connect(service, stand_in.handler)
+
+    await service.submit_pending()
+    stand_in.batches["batch-1"].update(status="expired", errors={"data": [{"message": "24 小时内未完成"}]})
+    await service.poll()
+
+    assert article.llm_processing_status == LLMProcessingStatus.PENDING
+    assert service.get_batches()["recent"][0]["error"] == "24 小时内未完成"
+
+
+@pytest.mark.asyncio
+async def test_upload_failure_restores_pending(db_session, service):
+    article, = _articles(db_session, "Chips ship")
+    _connect(service, lambda request: httpx.Response(400))
+
+    with pytest.raises(LLMProcessingError):
+        await service.submit_pending()
+
+    assert article.llm_processing_status == LLMProcessingStatus.PENDING
+    assert db_session.query(LLMBatchJob).count() == 0
+
+
+def test_admin_batches_endpoint(client: TestClient):
+    response = client.get("/api/v1/admin/llm/batches")
+
+    assert response.status_code == 200
+    assert response.json()["outstanding"] == []
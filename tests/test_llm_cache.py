@@ -0,0 +1,128 @@
+import asyncio
+import time
+import pytest
+from unittest.mock import AsyncMock, Mock
+from fastapi.testclient import TestClient
+from app.services.llm_cache import LLMResponseCache
+from app.services.llm_config import LLMConfig, OllamaConfig
+from app.services.llm_interface import LLMProvider
+from app.services.llm_manager import LLMServiceManager
+
+
+@pytest.fixture
+def cache(tmp_path):
+    return LLMResponseCache(path=str(tmp_path / "llm_cache.db"), memory_size=2, ttl_seconds=60, max_entries=3)
+
+
+def _manager(cache, adapter):
+    manager = LLMServiceManager(
+        LLMConfig(
+            providers={LLMProvider.OLLAMA: OllamaConfig(base_url="http://localhost:11434", model="qwen3")},
+            enable_fallback=False,
+        ),
+        cache=cache,
+    )
+    manager.adapters[LLMProvider.OLLAMA] = adapter
+    return manager
+
+
+def _adapter(**methods):
+    adapter = Mock()
+    adapter.prompt_version = "1"
+    for name, value in methods.items():
+        setattr(adapter, name, value)
+    return adapter
+
+
+def test_key_normalizes_whitespace_and_separates_versions():
+    key = LLMResponseCache.make_key("ollama", "qwen3", "summarize_content", "1", ("a  b\n c",), {})
+    assert key == LLMResponseCache.make_key("ollama", "qwen3", "summarize_content", "1", (" a b c ",), {})
+    assert key != LLMResponseCache.make_key("ollama", "qwen3", "summarize_content", "2", ("a b c",), {})
+    assert key != LLMResponseCache.make_key("openai", "qwen3", "summarize_content", "1", ("a b c",), {})
+
+
+@pytest.mark.asyncio
+async def test_manager_serves_repeats_from_cache(cache):
+    adapter = _adapter(summarize_content=AsyncMock(return_value="摘要"))
+    manager = _manager(cache, adapter)
+
+    assert await manager.summarize_content("same text") == "摘要"
+    assert await manager.summarize_content("same   text") == "摘要"
+
+    adapter.summarize_content.assert_awaited_once()
+    stats = cache.get_stats()
+    assert stats["misses"] == 1
+    assert stats["memory_hits"] == 1
+    assert stats["disk_entries"] == 1
+
+
+@pytest.mark.asyncio
+async def test_disk_tier_survives_restart(cache, tmp_path):
+    adapter = _adapter(extract_keywords=AsyncMock(return_value=["央行", "利率"]))
+    await _manager(cache, adapter).extract_keywords("text", 5)
+
+    restarted = LLMResponseCache(path=str(tmp_path / "llm_cache.db"))
+    other_adapter = _adapter(extract_keywords=AsyncMock(return_value=["wrong"]))
+    assert await _manager(restarted, other_adapter).extract_keywords("text", 5) == ["央行", "利率"]
+    other_adapter.extract_keywords.assert_not_called()
+    assert restarted.get_stats()["disk_hits"] == 1
+
+
+@pytest.mark.asyncio
+async def test_concurrent_identical_requests_are_coalesced(cache):
+    async def slow_translate(text, source_language="auto", **kwargs):
+        await asyncio.sleep(0.05)
+        return "翻译"
+
+    adapter = _adapter(translate_to_chinese=AsyncMock(side_effect=slow_translate))
+    manager = _manager(cache, adapter)
+
+    results = await asyncio.gather(*(manager.translate_to_chinese("Hello", "en") for _ in range(5)))
+
+    assert results == ["翻译"] * 5
+    adapter.translate_to_chinese.assert_awaited_once()
+    assert cache.get_stats()["coalesced"] == 4
+
+
+@pytest.mark.asyncio
+async def test_failures_and_empty_results_are_not_cached(cache):
+    adapter = _adapter(categorize_article=AsyncMock(side_effect=[RuntimeError("down"), "", "科技"]))
+    manager = _manager(cache, adapter)
+
+    with pytest.raises(Exception):
+        await manager.categorize_article("t", "c", ["科技"])
+    assert await manager.categorize_article("t", "c", ["科技"]) == ""
+    assert await manager.categorize_article("t", "c", ["科技"]) == "科技"
+    assert adapter.categorize_article.await_count == 3
+
+
+def test_eviction_enforces_ttl_and_size(cache):
+    for i in range(5):
+        cache._put_disk(f"key-{i}", f"value-{i}", "ollama", "summarize_content")
+        time.sleep(0.001)
+    assert cache.evict() == 2
+    assert cache.get_stats()["disk_entries"] == 3
+    assert cache._get_disk("key-0") != "value-0"
+    assert cache._get_disk("key-4") == "value-4"
+
+    cache.ttl_seconds = -1
+    cache._put_disk("expired", "value", "ollama", "summarize_content")
+    cache.evict()
+    assert cache.get_stats()["disk_entries"] == 3
+
+
+def test_admin_cache_endpoints(client: TestClient, cache, monkeypatch):
+    from app.api.v1 import admin
+
+    manager = Mock()
+    manager.cache = cache
+    monkeypatch.setattr(admin, "get_llm_manager", lambda: manager)
+    cache._put_disk("key", "value", "ollama", "summarize_content")
+
+    response = client.get("/api/v1/admin/llm/cache")
+    assert response.status_code == 200
+    assert response.json()["enabled"] is True
+    assert response.json()["disk_entries"] == 1
+
+    assert client.delete("/api/v1/admin/llm/cache").status_code == 200
+    assert cache.get_stats()["disk_entries"] == 0
@@ -0,0 +1,141 @@
+import asyncio
+import json
+from unittest.mock import Mock
+import httpx
+import pytest
+from fastapi.testclient import TestClient
+from app.services.content_processor import CATEGORIES
+from app.services.llm_adapters.ollama_adapter import OllamaAdapter
+from app.services.llm_cascade import active_model, is_acceptable, use_model
+from app.services.llm_circuit import CircuitState
+from app.services.llm_config import LLMConfig, OllamaConfig
+from app.services.llm_interface import LLMProvider
+from app.services.llm_manager import LLMServiceManager
+
+
+def test_output_validation_per_method():
+    assert is_acceptable("categorize_article", "科技", ("标题", "正文", CATEGORIES))
+    assert not is_acceptable("categorize_article", "天气", ("标题", "正文", CATEGORIES))
+    assert is_acceptable("extract_keywords", ["芯片", "出货量"])
+    # 模型用中文逗号分隔时整段输出成了一个关键词
+    assert not is_acceptable("extract_keywords", ["芯片，出货量，数据中心，需求，季度，新高，全球市场"])
+    assert not is_acceptable("extract_keywords", [])
+    assert is_acceptable("detect_language", "en")
+    assert not is_acceptable("detect_language", "the language is english")
+    assert not is_acceptable("process_article_combined", {"category": "科技"},
+                             ("标题", "正文", CATEGORIES), {"fields": ["category", "summary"]})
+    assert not is_acceptable("categorize_batch", ["科技", None])
+    # 没有校验规则的方法直接接受
+    assert is_acceptable("unknown_method", None)
+
+
+def test_model_override_is_scoped():
+    assert active_model("qwen3") == "qwen3"
+    with use_model("qwen3:1.7b"):
+        assert active_model("qwen3") == "qwen3:1.7b"
+    assert active_model("qwen3") == "qwen3"
+
+
+def _manager(**provider_config):
+    return LLMServiceManager(LLMConfig(
+        providers={LLMProvider.OLLAMA: OllamaConfig(base_url="http://localhost:11434", model="big", **provider_config)},
+        enable_fallback=False,
+        cascade_methods=["categorize_article", "extract_keywords"],
+    ))
+
+
+@pytest.mark.asyncio
+async def test_escalates_only_when_small_model_output_is_invalid():
+    manager = _manager(cascade_model="small")
+    calls = []
+
+    async def categorize(title, content, categories, **kwargs):
+        model = active_model("big")
+        calls.append(model)
+        if model == "small" and title == "hard":
+            return "这篇文章讲的是天气"
+        return "科技"
+
+    adapter = Mock()
+    adapter.categorize_article = categorize
+    manager.adapters[LLMProvider.OLLAMA] = adapter
+
+    assert await manager.categorize_article("easy", "正文", CATEGORIES) == "科技"
+    assert await manager.categorize_article("hard", "正文", CATEGORIES) == "科技"
+
+    assert calls == ["small", "small", "big"]
+    stats = manager.get_cascade_stats()["escalations"]["ollama"]["categorize_article"]
+    assert stats == {"attempts": 2, "escalations": 1, "escalation_rate": 0.5, "reasons": {"invalid": 1}}
+
+
+@pytest.mark.asyncio
+async def test_escalates_when_small_model_fails():
+    manager = _manager(cascade_model="small")
+
+    async def extract(content, max_keywords=5, **kwargs):
+        if active_model("big") == "small":
+            raise RuntimeError("model 'small' not found")
+        return ["芯片"]
+
+    adapter = Mock()
+    adapter.extract_keywords = extract
+    manager.adapters[LLMProvider.OLLAMA] = adapter
+
+    assert await manager.extract_keywords("正文") == ["芯片"]
+    assert manager.get_cascade_stats()["escalations"]["ollama"]["extract_keywords"]["reasons"] == {"error": 1}
+
+
+@pytest.mark.asyncio
+async def test_missing_small_model_does_not_open_the_provider_circuit():
+    manager = LLMServiceManager(LLMConfig(
+        providers={LLMProvider.OLLAMA: OllamaConfig(base_url="http://localhost:11434", model="big",
+                                                    cascade_model="small")},
+        enable_fallback=False,
+        cascade_methods=["categorize_article"],
+        circuit_failure_threshold=2,
+    ))
+
+    async def categorize(title, content, categories, **kwargs):
+        await asyncio.sleep(0.01)
+        if active_model("big") == "small":
+            raise RuntimeError("model 'small' not found")
+        return "科技"
+
+    adapter = Mock()
+    adapter.categorize_article = categorize
+    manager.adapters[LLMProvider.OLLAMA] = adapter
+
+    results = await asyncio.gather(*(manager.categorize_article(f"t{i}", "正文", CATEGORIES) for i in range(6)))
+
+    assert results == ["科技"] * 6
+    assert manager.breakers[LLMProvider.OLLAMA].state == CircuitState.CLOSED
+    # 延迟统计只包含正式模型的调用
+    assert manager.latency.get_stats()["ollama"]["categorize_article"]["successes"] == 6
+
+
+@pytest.mark.asyncio
+async def test_method_models_route_requests_to_the_adapter():
+    models = []
+
+    def handler(request):
+        payload = json.loads(request.content)
+        models.append(payload["model"])
+        return httpx.Response(200, json={"response": "科技" if payload["model"] == "small" else "要闻摘要内容"})
+
+    manager = _manager(cascade_model="small", method_models={"summarize_content": "summary-model"}, streaming=False)
+    adapter = manager.adapters[LLMProvider.OLLAMA]
+    adapter.client = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+
+    await manager.categorize_article("标题", "正文", CATEGORIES)
+    await manager.summarize_content("正文内容")
+
+    # 摘要不在级联方法中，直接使用为其指定的模型
+    assert models == ["small", "summary-model"]
+    assert isinstance(adapter, OllamaAdapter)
+
+
+def test_admin_cascade_endpoint(client: TestClient):
+    response = client.get("/api/v1/admin/llm/cascade")
+
+    assert response.status_code == 200
+    assert "categorize_article" in response.json()["methods"]
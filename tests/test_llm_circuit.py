@@ -0,0 +1,129 @@
+import asyncio
+import time
+import pytest
+from unittest.mock import AsyncMock, Mock
+from app.services.llm_circuit import CircuitBreaker, CircuitState
+from app.services.llm_config import LLMConfig, OllamaConfig, OpenAIConfig
+from app.services.llm_interface import LLMProvider, LLMProcessingError
+from app.services.llm_manager import LLMServiceManager
+
+
+def test_breaker_opens_after_consecutive_failures():
+    breaker = CircuitBreaker(failure_threshold=2, recovery_timeout=60)
+
+    breaker.record_failure("timeout")
+    assert breaker.allow_request()
+    breaker.record_failure("timeout")
+
+    assert breaker.state == CircuitState.OPEN
+    assert not breaker.allow_request()
+    assert breaker.get_state()["last_error"] == "timeout"
+
+
+def test_half_open_allows_single_trial(monkeypatch):
+    breaker = CircuitBreaker(failure_threshold=1, recovery_timeout=10)
+    breaker.record_failure()
+    now = time.monotonic()
+    monkeypatch.setattr(time, "monotonic", lambda: now + 11)
+
+    assert breaker.allow_request()
+    assert breaker.state == CircuitState.HALF_OPEN
+    assert not breaker.allow_request()
+
+    breaker.record_failure()
+    assert breaker.state == CircuitState.OPEN
+
+    monkeypatch.setattr(time, "monotonic", lambda: now + 30)
+    assert breaker.allow_request()
+    breaker.record_success()
+    assert breaker.state == CircuitState.CLOSED
+    assert breaker.allow_request()
+
+
+def test_probe_trips_and_recovers_breaker():
+    breaker = CircuitBreaker(failure_threshold=3, recovery_timeout=60)
+
+    breaker.record_probe(False, "connection refused")
+    assert breaker.state == CircuitState.OPEN
+    assert not breaker.allow_request()
+
+    breaker.record_probe(True)
+    assert breaker.state == CircuitState.HALF_OPEN
+    assert breaker.allow_request()
+
+
+def _manager():
+    manager = LLMServiceManager(LLMConfig(
+        providers={
+            LLMProvider.OLLAMA: OllamaConfig(base_url="http://localhost:11434"),
+            LLMProvider.OPENAI: OpenAIConfig(api_key="sk-test"),
+        },
+        circuit_failure_threshold=1,
+        circuit_recovery_timeout=60,
+    ))
+    ollama, openai = Mock(), Mock()
+    ollama.summarize_content = AsyncMock(side_effect=LLMProcessingError("Ollama 请求超时"))
+    openai.summarize_content = AsyncMock(return_value="摘要")
+    manager.adapters[LLMProvider.OLLAMA] = ollama
+    manager.adapters[LLMProvider.OPENAI] = openai
+    return manager, ollama, openai
+
+
+@pytest.mark.asyncio
+async def test_open_provider_is_skipped_without_calling_it():
+    manager, ollama, openai = _manager()
+
+    assert await manager.summarize_content("正文") == "摘要"
+    assert await manager.summarize_content("正文") == "摘要"
+
+    assert ollama.summarize_content.await_count == 1
+    assert openai.summarize_content.await_count == 2
+    assert manager.get_circuit_states()["ollama"]["state"] == "open"
+
+
+@pytest.mark.asyncio
+async def test_all_providers_open_fails_fast():
+    manager, _, openai = _manager()
+    openai.summarize_content.side_effect = LLMProcessingError("OpenAI 请求失败")
+    with pytest.raises(LLMProcessingError):
+        await manager.summarize_content("正文")
+
+    start = time.perf_counter()
+    with pytest.raises(LLMProcessingError):
+        await manager.summarize_content("正文")
+    assert time.perf_counter() - start < 0.05
+    assert openai.summarize_content.await_count == 1
+
+
+@pytest.mark.asyncio
+async def test_health_results_are_cached_and_feed_breakers():
+    manager, ollama, openai = _manager()
+    ollama.health_check = AsyncMock(return_value={"status": "unhealthy", "error": "connection refused"})
+    openai.health_check = AsyncMock(return_value={"status": "healthy"})
+
+    first = await manager.health_check_all()
+    second = await manager.health_check_all()
+
+    assert ollama.health_check.await_count == 1
+    assert first["ollama"]["circuit"]["state"] == "open"
+    assert second["openai"]["status"] == "healthy"
+    assert "checked_at" in second["openai"]
+
+    await manager.health_check_all(max_age=0)
+    assert ollama.health_check.await_count == 2
+
+
+@pytest.mark.asyncio
+async def test_slow_probe_times_out():
+    manager, ollama, openai = _manager()
+    manager.config.health_probe_timeout = 0.01
+
+    async def hang():
+        await asyncio.sleep(1)
+
+    ollama.health_check = hang
+    openai.health_check = AsyncMock(return_value={"status": "healthy"})
+
+    results = await manager.probe_health()
+    assert results["ollama"]["status"] == "unhealthy"
+    assert manager.breakers[LLMProvider.OLLAMA].state == CircuitState.OPEN
@@ -0,0 +1,236 @@
+import asyncio
+import threading
+import time
+from unittest.mock import Mock
+import httpx
+import pytest
+from fastapi.testclient import TestClient
+from app.services.llm_adapters.ollama_adapter import OllamaAdapter
+from app.services.llm_concurrency import AdaptiveLimiter, AIMDLimit, is_overload
+from app.services.llm_config import LLMConfig, OllamaConfig, OpenAIConfig
+from app.services.llm_interface import LLMProcessingError, LLMProvider
+from app.services.llm_manager import LLMServiceManager
+
+
+def _wrapped(error):
+    """与适配器一样把原始异常包装为 LLMProcessingError"""
+    try:
+        try:
+            raise error
+        except Exception as e:
+            raise LLMProcessingError(f"调用失败: {e}")
+    except LLMProcessingError as wrapped:
+        return wrapped
+
+
+def _status_error(status):
+    request = httpx.Request("POST", "http://llm/generate")
+    return httpx.HTTPStatusError("error", request=request, response=httpx.Response(status, request=request))
+
+
+def test_overload_errors_are_recognised_through_wrapping():
+    assert is_overload(_wrapped(httpx.ReadTimeout("slow")))
+    assert is_overload(_wrapped(_status_error(429)))
+    assert is_overload(asyncio.TimeoutError())
+    assert not is_overload(_wrapped(_status_error(400)))
+    assert not is_overload(_wrapped(httpx.ConnectError("refused")))
+
+
+def test_limit_grows_additively_only_when_saturated_and_flat():
+    limit = AIMDLimit("test", initial=2, ceiling=4)
+
+    # 未用满上限时不增长
+    for _ in range(10):
+        limit.record_success("summarize", 1.0, time.monotonic(), saturated=False)
+    assert limit.limit == 2
+
+    # 每次成功加 1/上限：2 → 2.5 → 2.9 → 3.24
+    for _ in range(3):
+        limit.record_success("summarize", 1.0, time.monotonic(), saturated=True)
+    assert limit.capacity == 3
+
+    for _ in range(20):
+        limit.record_success("summarize", 1.0, time.monotonic(), saturated=True)
+    assert limit.limit == 4
+
+    # 延迟明显高于基线时停止增长
+    held = AIMDLimit("test", initial=2, ceiling=8)
+    for _ in range(5):
+        held.record_success("summarize", 1.0, time.monotonic(), saturated=False)
+    held.record_success("summarize", 1.6, time.monotonic(), saturated=True)
+    assert held.limit == 2
+
+
+def test_overload_shrinks_multiplicatively_once_per_wave():
+    limit = AIMDLimit("test", initial=10, ceiling=10)
+    wave_started = time.monotonic()
+
+    limit.record_failure(_wrapped(httpx.ReadTimeout("slow")), wave_started)
+    assert limit.limit == pytest.approx(7)
+
+    # 同一波（降低之前发出）的请求不再重复降低
+    limit.record_failure(_wrapped(_status_error(429)), wave_started)
+    assert limit.limit == pytest.approx(7)
+
+    # 非过载错误不影响上限
+    limit.record_failure(_wrapped(_status_error(400)), time.monotonic())
+    assert limit.limit == pytest.approx(7)
+
+    limit.record_failure(_wrapped(_status_error(429)), time.monotonic())
+    assert limit.limit == pytest.approx(4.9)
+    assert limit.get_stats()["decreases"] == 2
+
+
+def test_latency_spike_shrinks_per_method_baseline():
+    limit = AIMDLimit("test", initial=4, ceiling=4)
+    for _ in range(5):
+        limit.record_success("extract_keywords", 0.5, time.monotonic(), saturated=False)
+        limit.record_success("summarize_content", 3.0, time.monotonic(), saturated=False)
+
+    # 摘要的正常耗时对关键词提取而言是尖峰，反之不是
+    limit.record_success("summarize_content", 3.2, time.monotonic(), saturated=False)
+    assert limit.limit == 4
+    limit.record_success("extract_keywords", 1.5, time.monotonic(), saturated=False)
+    assert limit.limit == pytest.approx(2.8)
+    assert "extract_keywords" in limit.get_stats()["last_decrease"]
+
+
+def test_fixed_limit_does_not_adapt():
+    limit = AIMDLimit("test", initial=2, ceiling=8, adaptive=False)
+    limit.record_failure(_wrapped(httpx.ReadTimeout("slow")), time.monotonic())
+    limit.record_success("summarize", 1.0, time.monotonic(), saturated=True)
+
+    assert limit.limit == 2
+
+
+@pytest.mark.asyncio
+async def test_limiter_caps_in_flight_and_survives_cancellation():
+    limiter = AdaptiveLimiter("test", initial=2, adaptive=False)
+    release = asyncio.Event()
+    peak = 0
+
+    async def call():
+        nonlocal peak
+        async with limiter.acquire("summarize"):
+            peak = max(peak, limiter.in_flight)
+            await release.wait()
+
+    tasks = [asyncio.create_task(call()) for _ in range(5)]
+    await asyncio.sleep(0.01)
+    assert (limiter.in_flight, limiter.get_stats()["waiting"]) == (2, 3)
+
+    tasks[2].cancel()
+    await asyncio.sleep(0.01)
+    release.set()
+    await asyncio.gather(*tasks, return_exceptions=True)
+
+    assert peak == 2
+    assert (limiter.in_flight, limiter.get_stats()["waiting"]) == (0, 0)
+
+
+def test_limiter_is_shared_across_event_loops():
+    limiter = AdaptiveLimiter("test", initial=1, adaptive=False)
+    entered, release = threading.Event(), threading.Event()
+
+    async def hold():
+        async with limiter.acquire():
+            entered.set()
+            await asyncio.get_running_loop().run_in_executor(None, release.wait)
+
+    worker = threading.Thread(target=lambda: asyncio.run(hold()))
+    worker.start()
+    entered.wait(1)
+
+    async def wait_for_slot():
+        waiter = asyncio.create_task(_enter(limiter))
+        await asyncio.sleep(0.05)
+        assert not waiter.done()
+        # 另一个事件循环释放名额后唤醒本循环的等待者
+        release.set()
+        await asyncio.wait_for(waiter, 1)
+
+    asyncio.run(wait_for_slot())
+    worker.join(1)
+    assert limiter.in_flight == 0
+
+
+async def _enter(limiter):
+    async with limiter.acquire():
+        pass
+
+
+def _manager(**provider_config):
+    manager = LLMServiceManager(LLMConfig(
+        providers={LLMProvider.OPENAI: OpenAIConfig(api_key="sk-test", **provider_config)},
+        default_provider=LLMProvider.OPENAI,
+        enable_fallback=False,
+    ))
+    tracker = {"active": 0, "peak": 0}
+
+    async def summarize(content, *args, **kwargs):
+        tracker["active"] += 1
+        tracker["peak"] = max(tracker["peak"], tracker["active"])
+        await asyncio.sleep(0.01)
+        tracker["active"] -= 1
+        if content == "timeout":
+            raise _wrapped(httpx.ReadTimeout("slow"))
+        return "摘要"
+
+    adapter = Mock()
+    adapter.summarize_content = summarize
+    manager.adapters[LLMProvider.OPENAI] = adapter
+    return manager, tracker
+
+
+@pytest.mark.asyncio
+async def test_manager_grows_concurrency_up_to_ceiling():
+    manager, tracker = _manager(max_concurrency=2, concurrency_ceiling=6)
+
+    await asyncio.gather(*(manager.summarize_content(f"正文 {i}") for i in range(60)))
+
+    stats = manager.get_concurrency_stats()["openai"]
+    assert 2 < tracker["peak"] <= 6
+    assert stats["capacity"] == 6
+    assert (stats["in_flight"], stats["waiting"]) == (0, 0)
+
+
+@pytest.mark.asyncio
+async def test_manager_shrinks_concurrency_on_timeouts():
+    manager, _ = _manager(max_concurrency=10, concurrency_ceiling=10)
+
+    with pytest.raises(LLMProcessingError):
+        await manager.summarize_content("timeout")
+
+    assert manager.get_concurrency_stats()["openai"]["limit"] == pytest.approx(7)
+
+
+@pytest.mark.asyncio
+async def test_ollama_endpoint_limit_adapts():
+    calls = 0
+
+    async def handler(request):
+        nonlocal calls
+        calls += 1
+        if calls == 1:
+            raise httpx.ReadTimeout("生成超时", request=request)
+        await asyncio.sleep(0.01)
+        return httpx.Response(200, json={"response": "en"})
+
+    adapter = OllamaAdapter(OllamaConfig(max_concurrency=3, concurrency_ceiling=4))
+    adapter.client = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+    endpoint = adapter.pool.endpoints[0]
+
+    with pytest.raises(LLMProcessingError):
+        await adapter.detect_language("hello")
+    assert endpoint.max_concurrency == 2
+
+    await asyncio.gather(*(adapter.detect_language("hello") for _ in range(12)))
+    assert endpoint.max_concurrency > 2
+    assert endpoint.get_stats()["concurrency"]["ceiling"] == 4
+
+
+def test_admin_concurrency_endpoint(client: TestClient):
+    response = client.get("/api/v1/admin/llm/concurrency")
+
+    assert response.status_code == 200
+    assert "ollama" in response.json()
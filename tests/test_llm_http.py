@@ -0,0 +1,100 @@
+import asyncio
+import json
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+import pytest
+from fastapi.testclient import TestClient
+from app.services.llm_adapters.openai_adapter import OpenAIAdapter
+from app.services.llm_config import OpenAIConfig
+from app.services.llm_http import LoopClient, client_limits, http_clients
+
+
+class KeepAliveHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def do_GET(self):
+        body = json.dumps({"models": []}).encode()
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture
+def local_server():
+    server = ThreadingHTTPServer(("127.0.0.1", 0), KeepAliveHandler)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield f"http://127.0.0.1:{server.server_address[1]}"
+    server.shutdown()
+    server.server_close()
+
+
+def test_connections_are_reused_within_a_loop(local_server):
+    http = LoopClient("test-reuse", timeout=5, limits=client_limits(2))
+
+    async def requests(count):
+        for _ in range(count):
+            response = await http.get().get(f"{local_server}/api/tags")
+            assert response.status_code == 200
+        await http_clients.aclose()
+
+    asyncio.run(requests(3))
+    stats = http_clients.get_stats()["test-reuse"]
+    assert (stats["requests"], stats["new_connections"]) == (3, 1)
+    assert stats["reuse_rate"] == pytest.approx(0.667)
+    assert stats["open_clients"] == 0
+
+
+def test_each_event_loop_gets_its_own_client():
+    http = LoopClient("test-loops", timeout=5)
+
+    async def clients():
+        return http.get(), http.get()
+
+    first, same = asyncio.run(clients())
+    second, _ = asyncio.run(clients())
+
+    assert first is same
+    assert second is not first
+
+
+@pytest.mark.asyncio
+async def test_closed_client_is_replaced():
+    http = LoopClient("test-closed", timeout=5)
+    client = http.get()
+
+    await http.aclose()
+
+    assert client.is_closed
+    assert http.get() is not client
+
+
+def test_adapter_client_follows_the_running_loop():
+    adapter = OpenAIAdapter(OpenAIConfig(api_key="sk-test", max_concurrency=4))
+
+    async def client():
+        return adapter.client
+
+    first = asyncio.run(client())
+    second = asyncio.run(client())
+
+    assert first is not second
+    assert first.headers["Authorization"] == "Bearer sk-test"
+
+
+def test_admin_connections_endpoint(client: TestClient, local_server):
+    http = LoopClient("test-admin", timeout=5)
+
+    async def request():
+        await http.get().get(f"{local_server}/api/tags")
+
+    asyncio.run(request())
+    response = client.get("/api/v1/admin/llm/connections")
+
+    assert response.status_code == 200
+    assert response.json()["test-admin"]["requests"] == 1
@@ -0,0 +1,168 @@
+import asyncio
+import json
+import time
+from email.utils import formatdate
+import httpx
+import pytest
+from fastapi.testclient import TestClient
+from app.services.llm_adapters.openai_adapter import OpenAIAdapter
+from app.services.llm_adapters.qianwen_adapter import QianwenAdapter
+from app.services.llm_config import OpenAIConfig, QianwenConfig
+from app.services.llm_interface import LLMProcessingError
+from app.services.llm_retry import (
+    RETRY_AFTER_LIMIT, ProviderRateLimiter, backoff_delay, parse_retry_after, retry_metrics
+)
+
+
+def test_retry_after_and_backoff():
+    assert parse_retry_after("3") == 3.0
+    assert parse_retry_after(formatdate(time.time() + 20, usegmt=True)) == pytest.approx(20, abs=1.5)
+    assert parse_retry_after("soon") is None
+
+    assert 2.0 <= backoff_delay(2, 1.0) <= 4.0
+    assert 5.0 <= backoff_delay(0, 1.0, retry_after=5.0) <= 6.0
+    assert backoff_delay(0, 1.0, retry_after=RETRY_AFTER_LIMIT + 1) is None
+
+
+class Upstream:
+    """按顺序返回预设状态码的模拟服务"""
+
+    def __init__(self, *statuses, headers=None):
+        self.statuses = list(statuses)
+        self.headers = headers or {}
+        self.calls = 0
+
+    def handle(self, request):
+        self.calls += 1
+        status = self.statuses.pop(0) if self.statuses else 200
+        if status != 200:
+            return httpx.Response(status, headers=self.headers, json={"error": "busy"})
+        return httpx.Response(200, json={
+            "choices": [{"message": {"content": "摘要"}}],
+            "usage": {"prompt_tokens": 10, "completion_tokens": 5},
+        })
+
+
+def _openai(upstream, **config):
+    adapter = OpenAIAdapter(OpenAIConfig(api_key="sk-test", retry_delay=0, streaming=False, **config))
+    adapter.client = httpx.AsyncClient(transport=httpx.MockTransport(upstream.handle))
+    return adapter
+
+
+@pytest.mark.asyncio
+async def test_transient_errors_are_retried():
+    before = retry_metrics.get_stats().get("openai", {}).get("retries", 0)
+    upstream = Upstream(429, 503, headers={"Retry-After": "0"})
+
+    assert await _openai(upstream).summarize_content("正文") == "摘要"
+    assert upstream.calls == 3
+    assert retry_metrics.get_stats()["openai"]["retries"] == before + 2
+
+
+@pytest.mark.asyncio
+async def test_retries_are_bounded():
+    upstream = Upstream(500, 500, 500)
+
+    with pytest.raises(LLMProcessingError):
+        await _openai(upstream, max_retries=2).summarize_content("正文")
+    assert upstream.calls == 3
+
+
+@pytest.mark.asyncio
+async def test_client_errors_and_long_retry_after_are_not_retried():
+    bad_request = Upstream(400)
+    with pytest.raises(LLMProcessingError):
+        await _openai(bad_request).summarize_content("正文")
+    assert bad_request.calls == 1
+
+    # 服务端要求等待太久时交给管理器回退到其他提供商
+    throttled = Upstream(429, headers={"Retry-After": "120"})
+    with pytest.raises(LLMProcessingError):
+        await _openai(throttled).summarize_content("正文")
+    assert throttled.calls == 1
+
+
+@pytest.mark.asyncio
+async def test_stream_is_retried_before_first_byte():
+    calls = []
+
+    def handler(request):
+        calls.append(1)
+        if len(calls) == 1:
+            return httpx.Response(503)
+        body = f"data: {json.dumps({'choices': [{'delta': {'content': '流式摘要。'}}]})}\n\ndata: [DONE]\n\n"
+        return httpx.Response(200, content=body.encode())
+
+    adapter = OpenAIAdapter(OpenAIConfig(api_key="sk-test", retry_delay=0))
+    adapter.client = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+
+    assert await adapter.summarize_content("正文") == "流式摘要。"
+    assert len(calls) == 2
+
+
+@pytest.mark.asyncio
+async def test_qianwen_uses_the_same_retry_path():
+    def handler(request):
+        if not calls:
+            calls.append(1)
+            return httpx.Response(502)
+        return httpx.Response(200, json={"output": {"text": "千问摘要"}, "usage": {"input_tokens": 8}})
+
+    calls = []
+    adapter = QianwenAdapter(QianwenConfig(api_key="qw-test", retry_delay=0))
+    adapter.client = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+
+    assert await adapter.summarize_content("正文") == "千问摘要"
+
+
+def test_token_buckets_throttle_before_the_provider_does():
+    limiter = ProviderRateLimiter(requests_per_minute=2, tokens_per_minute=600)
+
+    assert limiter._try_acquire(100) == 0
+    assert limiter._try_acquire(100) == 0
+    # 每分钟 2 次，第三次约需等待 30 秒
+    assert limiter._try_acquire(100) == pytest.approx(30, abs=0.5)
+
+    tokens_only = ProviderRateLimiter(tokens_per_minute=600)
+    assert tokens_only._try_acquire(550) == 0
+    # 余 50，需要 100：按每秒 10 个补充，约 5 秒
+    assert tokens_only._try_acquire(100) == pytest.approx(5, abs=0.1)
+    # 超过整桶容量的请求按整桶计
+    assert ProviderRateLimiter(tokens_per_minute=600)._try_acquire(5000) == 0
+
+
+@pytest.mark.asyncio
+async def test_acquire_waits_for_refill_and_pause():
+    limiter = ProviderRateLimiter(tokens_per_minute=6000)
+    await limiter.acquire(6000)
+
+    started = time.monotonic()
+    await limiter.acquire(10)  # 每秒补充 100 个
+    assert time.monotonic() - started >= 0.08
+
+    limiter.pause(0.1)
+    started = time.monotonic()
+    await limiter.acquire(0)
+    assert time.monotonic() - started >= 0.08
+    assert limiter.get_stats()["throttled_requests"] == 2
+
+
+@pytest.mark.asyncio
+async def test_429_pauses_the_whole_provider():
+    upstream = Upstream(429, headers={"Retry-After": "0.2"})
+    adapter = _openai(upstream, requests_per_minute=600)
+
+    first = asyncio.create_task(adapter.summarize_content("正文"))
+    await asyncio.sleep(0.05)
+    started = time.monotonic()
+    await adapter.rate_limiter.acquire()
+
+    assert time.monotonic() - started >= 0.1
+    assert await first == "摘要"
+
+
+def test_admin_rate_limit_endpoint(client: TestClient):
+    response = client.get("/api/v1/admin/llm/rate-limits")
+
+    assert response.status_code == 200
+    assert set(response.json()) == {"retries", "limiters"}
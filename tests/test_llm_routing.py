@@ -0,0 +1,133 @@
+import asyncio
+import pytest
+from unittest.mock import AsyncMock, Mock
+from fastapi.testclient import TestClient
+from app.services.llm_config import LLMConfig, OllamaConfig, OpenAIConfig, QianwenConfig
+from app.services.llm_interface import LLMProvider, LLMProcessingError
+from app.services.llm_manager import LLMServiceManager
+from app.services.llm_routing import LatencyTracker
+
+
+def test_tracker_percentiles_and_expected_latency():
+    tracker = LatencyTracker(min_samples=4)
+    for seconds in (1.0, 2.0, 3.0):
+        tracker.record_success(LLMProvider.OLLAMA, "summarize_content", seconds)
+    assert tracker.percentile(LLMProvider.OLLAMA, "summarize_content", 0.95) is None
+    assert tracker.expected_latency(LLMProvider.OLLAMA, "summarize_content") == 0.0
+
+    tracker.record_success(LLMProvider.OLLAMA, "summarize_content", 10.0)
+    tracker.record_failure(LLMProvider.OLLAMA, "summarize_content")
+    assert tracker.percentile(LLMProvider.OLLAMA, "summarize_content", 0.95) == 10.0
+    # 中位数 3.0，成功率 4/5
+    assert tracker.expected_latency(LLMProvider.OLLAMA, "summarize_content") == pytest.approx(3.75)
+
+
+def _manager(**config):
+    manager = LLMServiceManager(LLMConfig(
+        providers={
+            LLMProvider.OLLAMA: OllamaConfig(base_url="http://localhost:11434"),
+            LLMProvider.OPENAI: OpenAIConfig(api_key="sk-test", relative_cost=5.0),
+            LLMProvider.QIANWEN: QianwenConfig(api_key="qw-test", relative_cost=0.5),
+        },
+        routing_min_samples=3,
+        **config,
+    ))
+    adapters = {}
+    for provider in manager.config.providers:
+        adapters[provider] = Mock()
+        manager.adapters[provider] = adapters[provider]
+    return manager, adapters
+
+
+def _seed(manager, provider, seconds, method="summarize_content", count=3):
+    for _ in range(count):
+        manager.latency.record_success(provider, method, seconds)
+
+
+def test_static_policy_keeps_fallback_order():
+    manager, _ = _manager()
+    _seed(manager, LLMProvider.OLLAMA, 40.0)
+    _seed(manager, LLMProvider.QIANWEN, 1.0)
+
+    assert manager._plan_providers("summarize_content") == [
+        LLMProvider.OLLAMA, LLMProvider.OPENAI, LLMProvider.QIANWEN
+    ]
+
+
+def test_latency_policy_prefers_fastest_affordable_provider():
+    manager, _ = _manager(routing_policy="latency", routing_max_cost=1.0)
+    _seed(manager, LLMProvider.OLLAMA, 40.0)
+    _seed(manager, LLMProvider.QIANWEN, 1.0)
+    _seed(manager, LLMProvider.OPENAI, 0.5)
+
+    # OpenAI 最快但超出成本上限，只作为最后的回退
+    assert manager._plan_providers("summarize_content") == [
+        LLMProvider.QIANWEN, LLMProvider.OLLAMA, LLMProvider.OPENAI
+    ]
+    # 各方法分别统计，其他方法没有样本时保持原顺序
+    assert manager._plan_providers("translate_to_chinese")[0] == LLMProvider.OLLAMA
+
+
+@pytest.mark.asyncio
+async def test_hedge_fires_after_p95_and_takes_faster_result():
+    manager, adapters = _manager(hedging_enabled=True)
+    _seed(manager, LLMProvider.OLLAMA, 0.05)
+
+    async def slow_summary(*args, **kwargs):
+        await asyncio.sleep(1)
+        return "慢摘要"
+
+    adapters[LLMProvider.OLLAMA].summarize_content = slow_summary
+    adapters[LLMProvider.QIANWEN].summarize_content = AsyncMock(return_value="快摘要")
+
+    assert await manager.summarize_content("正文") == "快摘要"
+
+    stats = manager.get_routing_stats()
+    assert stats["routes"]["summarize_content"] == {"ollama": 1}
+    assert stats["hedges"] == {"summarize_content": 1}
+    assert stats["hedge_wins"] == {"summarize_content": 1}
+    # 被取消的慢请求不计入失败
+    assert manager.breakers[LLMProvider.OLLAMA].consecutive_failures == 0
+
+
+@pytest.mark.asyncio
+async def test_no_hedge_when_primary_answers_in_time():
+    manager, adapters = _manager(hedging_enabled=True)
+    _seed(manager, LLMProvider.OLLAMA, 1.0)
+    adapters[LLMProvider.OLLAMA].summarize_content = AsyncMock(return_value="摘要")
+    adapters[LLMProvider.QIANWEN].summarize_content = AsyncMock(return_value="对冲")
+
+    assert await manager.summarize_content("正文") == "摘要"
+    adapters[LLMProvider.QIANWEN].summarize_content.assert_not_called()
+    assert manager.get_routing_stats()["hedges"] == {}
+
+
+@pytest.mark.asyncio
+async def test_failed_hedge_pair_falls_back_to_remaining_provider():
+    manager, adapters = _manager(hedging_enabled=True, routing_max_cost=10.0)
+    _seed(manager, LLMProvider.OLLAMA, 0.01)
+
+    async def slow_failure(*args, **kwargs):
+        await asyncio.sleep(0.05)
+        raise LLMProcessingError("Ollama 请求超时")
+
+    adapters[LLMProvider.OLLAMA].summarize_content = slow_failure
+    adapters[LLMProvider.OPENAI].summarize_content = AsyncMock(side_effect=LLMProcessingError("OpenAI 失败"))
+    adapters[LLMProvider.QIANWEN].summarize_content = AsyncMock(return_value="千问摘要")
+
+    assert await manager.summarize_content("正文") == "千问摘要"
+    adapters[LLMProvider.OPENAI].summarize_content.assert_awaited_once()
+
+
+def test_admin_routing_endpoint(client: TestClient, monkeypatch):
+    from app.api.v1 import admin
+    manager, _ = _manager(routing_policy="latency")
+    _seed(manager, LLMProvider.OLLAMA, 2.0)
+    monkeypatch.setattr(admin, "get_llm_manager", lambda: manager)
+
+    response = client.get("/api/v1/admin/llm/routing")
+
+    assert response.status_code == 200
+    data = response.json()
+    assert data["policy"] == "latency"
+    assert data["latency"]["ollama"]["summarize_content"]["p50"] == 2.0
@@ -0,0 +1,156 @@
+import asyncio
+import json
+import httpx
+import pytest
+from fastapi.testclient import TestClient
+from app.services.llm_adapters.ollama_adapter import OllamaAdapter
+from app.services.llm_adapters.openai_adapter import OpenAIAdapter
+from app.services.llm_cache import LLMResponseCache
+from app.services.llm_config import OllamaConfig, OpenAIConfig
+from app.services.llm_interface import LLMProcessingError
+from app.services.llm_streaming import (
+    STOP_DEADLINE, STOP_DONE, StreamEvent, StreamLimit, StreamMetrics, collect_stream
+)
+from app.services.llm_usage import track_usage
+
+
+def _adapter(adapter_cls, config, handler):
+    adapter = adapter_cls(config)
+    adapter.client = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+    return adapter
+
+
+@pytest.mark.asyncio
+async def test_ollama_summary_streams_until_done():
+    requests = []
+
+    def handler(request):
+        requests.append(json.loads(request.content))
+        lines = [{"response": "第一句。", "done": False}, {"response": "第二句。", "done": False},
+                 {"response": "", "done": True, "prompt_eval_count": 42, "eval_count": 6}]
+        return httpx.Response(200, content="\n".join(json.dumps(line) for line in lines).encode())
+
+    adapter = _adapter(OllamaAdapter, OllamaConfig(base_url="http://ollama"), handler)
+    with track_usage() as usage:
+        summary = await adapter.summarize_content("正文", target_length=400)
+
+    assert summary == "第一句。第二句。"
+    assert requests[0]["stream"] is True
+    assert usage.prompt_tokens == 42
+
+
+@pytest.mark.asyncio
+async def test_ollama_stops_reading_at_target_length():
+    sent = []
+
+    async def endless():
+        while True:
+            sent.append(1)
+            yield (json.dumps({"response": "这是一个十个字的句子。", "done": False}) + "\n").encode()
+
+    def handler(request):
+        return httpx.Response(200, content=endless())
+
+    adapter = _adapter(OllamaAdapter, OllamaConfig(base_url="http://ollama"), handler)
+    summary = await adapter.summarize_content("正文", target_length=40)
+
+    # 目标 40 字，超过 48 字后在句末停止
+    assert len(summary) == 55 and summary.endswith("。")
+    assert len(sent) < 10
+
+
+@pytest.mark.asyncio
+async def test_non_summary_calls_do_not_stream():
+    def handler(request):
+        assert json.loads(request.content)["stream"] is False
+        return httpx.Response(200, json={"response": "科技"})
+
+    adapter = _adapter(OllamaAdapter, OllamaConfig(base_url="http://ollama"), handler)
+    assert await adapter.categorize_article("标题", "正文", ["科技"]) == "科技"
+
+
+@pytest.mark.asyncio
+async def test_openai_sse_stream_with_usage():
+    def handler(request):
+        payload = json.loads(request.content)
+        assert payload["stream"] is True and payload["stream_options"] == {"include_usage": True}
+        chunks = [
+            {"choices": [{"delta": {"role": "assistant"}}]},
+            {"choices": [{"delta": {"content": "OpenAI "}}]},
+            {"choices": [{"delta": {"content": "摘要。"}}]},
+            {"choices": [], "usage": {"prompt_tokens": 30, "completion_tokens": 3}},
+        ]
+        body = "".join(f"data: {json.dumps(chunk)}\n\n" for chunk in chunks) + "data: [DONE]\n\n"
+        return httpx.Response(200, content=body.encode())
+
+    adapter = _adapter(OpenAIAdapter, OpenAIConfig(api_key="sk-test"), handler)
+    metrics = StreamMetrics()
+    result = await collect_stream(
+        adapter._stream_events({"stream": True, "stream_options": {"include_usage": True}}), StreamLimit()
+    )
+    metrics.record("openai", result)
+
+    assert result.text == "OpenAI 摘要。" and result.stop_reason == STOP_DONE
+    assert result.prompt_tokens == 30 and result.output_tokens == 3
+    assert metrics.get_stats()["openai"]["stop_reasons"] == {"done": 1}
+
+
+async def _slow_events(texts, delay):
+    for text in texts:
+        yield StreamEvent(text)
+        await asyncio.sleep(delay)
+    await asyncio.sleep(10)
+
+
+@pytest.mark.asyncio
+async def test_deadline_returns_partial_output():
+    result = await collect_stream(_slow_events(["已经生成的第一句话。", "后半"], 0.01), StreamLimit(deadline=0.1))
+
+    assert result.stop_reason == STOP_DEADLINE
+    # 截到最后一个完整句子
+    output = result.output()
+    assert output == "已经生成的第一句话。"
+    assert output.partial is True
+
+
+@pytest.mark.asyncio
+async def test_deadline_without_visible_output_raises():
+    with pytest.raises(LLMProcessingError):
+        await collect_stream(_slow_events(["<think>还在思考"], 0.01), StreamLimit(deadline=0.05))
+
+
+@pytest.mark.asyncio
+async def test_partial_output_is_not_cached(tmp_path):
+    cache = LLMResponseCache(path=str(tmp_path / "cache.db"))
+    result = await collect_stream(_slow_events(["部分摘要。"], 0.01), StreamLimit(deadline=0.05))
+    calls = []
+
+    async def compute():
+        calls.append(1)
+        return result.output()
+
+    await cache.get_or_compute("key", compute)
+    await cache.get_or_compute("key", compute)
+
+    assert len(calls) == 2
+
+
+def test_admin_throughput_endpoint(client: TestClient, monkeypatch):
+    from app.api.v1 import admin
+    metrics = StreamMetrics()
+    monkeypatch.setattr(admin, "stream_metrics", metrics)
+    asyncio.run(_record(metrics))
+
+    response = client.get("/api/v1/admin/llm/throughput")
+
+    assert response.status_code == 200
+    stats = response.json()["ollama"]
+    assert stats["streams"] == 1 and stats["output_tokens"] == 2
+    assert stats["tokens_per_second"] > 0
+
+
+async def _record(metrics):
+    async def events():
+        yield StreamEvent("你好", output_tokens=2)
+
+    metrics.record("ollama", await collect_stream(events(), StreamLimit()))
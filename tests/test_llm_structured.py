@@ -0,0 +1,107 @@
+import pytest
+from unittest.mock import AsyncMock, Mock
+from app.config import settings
+from app.models.article import NewsArticle, LLMProcessingStatus
+from app.services.content_processor import ContentProcessorService, CATEGORIES
+from app.services.llm_structured import (
+    build_combined_prompt,
+    extract_json_object,
+    parse_combined_response,
+)
+
+
+def test_prompt_only_lists_requested_fields():
+    prompt = build_combined_prompt("Title", "Body", CATEGORIES, fields=["summary", "category"])
+    assert '"summary"' in prompt
+    assert '"category"' in prompt
+    assert '"keywords"' not in prompt
+    assert '"chinese_title"' not in prompt
+
+
+def test_extract_json_repairs_common_issues():
+    text = '<think>let me see</think>\n```json\n{"language": "en", "keywords": ["a", "b",],}\n```'
+    assert extract_json_object(text) == {"language": "en", "keywords": ["a", "b"]}
+    assert extract_json_object('Sure! Here it is: {"category": "科技"} Hope this helps.') == {"category": "科技"}
+    assert extract_json_object("not json at all") is None
+
+
+def test_parse_drops_invalid_fields():
+    text = """{
+        "language": "English",
+        "chinese_title": "  央行加息  ",
+        "summary": "太短",
+        "keywords": "利率, 央行, 利率, 通胀",
+        "category": "类别：财经新闻"
+    }"""
+    result = parse_combined_response(text, CATEGORIES, max_keywords=2)
+    assert result == {
+        "chinese_title": "央行加息",
+        "keywords": ["利率", "央行"],
+        "category": "财经",
+    }
+
+
+@pytest.fixture(autouse=True)
+def llm_keywords(monkeypatch):
+    monkeypatch.setattr(settings, "KEYWORD_EXTRACTION_MODE", "llm")
+
+
+def _llm_manager(combined):
+    llm_manager = Mock()
+    llm_manager.process_article_combined = AsyncMock(return_value=combined)
+    llm_manager.detect_language = AsyncMock(return_value="en")
+    llm_manager.translate_to_chinese = AsyncMock(return_value="逐项标题")
+    llm_manager.summarize_content = AsyncMock(return_value="逐项生成的摘要内容")
+    llm_manager.extract_keywords = AsyncMock(return_value=["逐项"])
+    llm_manager.categorize_article = AsyncMock(return_value="其他")
+    return llm_manager
+
+
+@pytest.mark.asyncio
+async def test_combined_mode_uses_single_call():
+    llm_manager = _llm_manager({
+        "language": "en",
+        "chinese_title": "央行加息",
+        "summary": "央行周二宣布加息二十五个基点。",
+        "keywords": ["央行", "利率"],
+        "category": "财经",
+    })
+    article = NewsArticle(id=1, title="Central bank raises rates", content="The central bank raised rates.")
+
+    result = await ContentProcessorService(llm_manager).process_article_content(article)
+
+    assert result["llm_processing_status"] == LLMProcessingStatus.COMPLETED
+    assert result["chinese_title"] == "央行加息"
+    assert result["category"] == "财经"
+    llm_manager.process_article_combined.assert_awaited_once()
+    for method in ("detect_language", "translate_to_chinese", "summarize_content",
+                   "extract_keywords", "categorize_article"):
+        getattr(llm_manager, method).assert_not_called()
+
+
+@pytest.mark.asyncio
+async def test_combined_mode_falls_back_per_field():
+    llm_manager = _llm_manager({"language": "en", "category": "科技"})
+    article = NewsArticle(id=2, title="New chip", content="A new chip was released.")
+
+    result = await ContentProcessorService(llm_manager).process_article_content(article)
+
+    assert result["category"] == "科技"
+    assert result["chinese_title"] == "逐项标题"
+    assert result["llm_summary"] == "逐项生成的摘要内容"
+    llm_manager.detect_language.assert_not_called()
+    llm_manager.categorize_article.assert_not_called()
+    llm_manager.summarize_content.assert_awaited_once()
+
+
+@pytest.mark.asyncio
+async def test_combined_failure_falls_back_to_all_steps():
+    llm_manager = _llm_manager({})
+    llm_manager.process_article_combined.side_effect = RuntimeError("boom")
+    article = NewsArticle(id=3, title="Match report", content="The home team won.")
+
+    result = await ContentProcessorService(llm_manager).process_article_content(article)
+
+    assert result["llm_processing_status"] == LLMProcessingStatus.COMPLETED
+    assert result["original_language"] == "en"
+    assert result["keywords"] == ["逐项"]
@@ -0,0 +1,176 @@
+import asyncio
+import json
+import httpx
+import pytest
+from app.core.llm_factory import parse_ollama_endpoints
+from app.services.llm_adapters.ollama_adapter import OllamaAdapter
+from app.services.llm_config import OllamaConfig, OllamaEndpointConfig
+from app.services.llm_interface import LLMProcessingError
+
+
+class StandIn:
+    """模拟一台 Ollama 服务：记录收到的请求，可阻塞生成请求或返回错误"""
+
+    def __init__(self, status=200):
+        self.status = status
+        self.generate_calls = 0
+        self.release = asyncio.Event()
+        self.release.set()
+
+    async def handle(self, request):
+        if request.url.path == "/api/generate":
+            self.generate_calls += 1
+            await self.release.wait()
+            if self.status != 200:
+                return httpx.Response(self.status, json={"error": "模型加载失败"})
+            return httpx.Response(200, json={"response": "en"})
+        return httpx.Response(self.status, content=_body(b'{"models": []}'))
+
+
+async def _body(data):
+    yield data
+
+
+def _adapter(*servers, limits=(2, 2), failure_threshold=3):
+    urls = [f"http://gpu{i}:11434" for i in range(len(servers))]
+    adapter = OllamaAdapter(OllamaConfig(
+        endpoints=[OllamaEndpointConfig(url=url, max_concurrency=limit) for url, limit in zip(urls, limits)],
+        endpoint_failure_threshold=failure_threshold,
+    ))
+    for endpoint, server in zip(adapter.pool.endpoints, servers):
+        endpoint.client = httpx.AsyncClient(transport=httpx.MockTransport(server.handle))
+    return adapter
+
+
+@pytest.mark.asyncio
+async def test_requests_go_to_least_loaded_endpoint_within_limits():
+    big, small = StandIn(), StandIn()
+    big.release.clear()
+    small.release.clear()
+    adapter = _adapter(big, small, limits=(2, 1))
+
+    calls = [asyncio.create_task(adapter.detect_language("hello")) for _ in range(4)]
+    await asyncio.sleep(0.05)
+
+    # 各端点按并发上限接满，第 4 个请求排队
+    assert (big.generate_calls, small.generate_calls) == (2, 1)
+    assert [e.outstanding for e in adapter.pool.endpoints] == [2, 1]
+
+    small.release.set()
+    await asyncio.sleep(0.05)
+    assert small.generate_calls == 2
+
+    big.release.set()
+    assert await asyncio.gather(*calls) == ["en"] * 4
+    assert [e.outstanding for e in adapter.pool.endpoints] == [0, 0]
+
+
+@pytest.mark.asyncio
+async def test_failing_endpoint_is_ejected_and_readmitted_by_probe():
+    broken, healthy = StandIn(status=500), StandIn()
+    adapter = _adapter(broken, healthy, failure_threshold=2)
+
+    for _ in range(2):
+        with pytest.raises(LLMProcessingError):
+            await adapter._call_ollama("hello")
+    # 两个端点负载相同时第一个优先，连续失败两次后被摘除
+    assert adapter.pool.endpoints[0].healthy is False
+
+    for _ in range(3):
+        assert await adapter.detect_language("hello") == "en"
+    assert broken.generate_calls == 2 and healthy.generate_calls == 3
+
+    broken.status = 200
+    health = await adapter.health_check()
+    assert health["status"] == "healthy"
+    assert [e["healthy"] for e in health["endpoints"]] == [True, True]
+
+
+@pytest.mark.asyncio
+async def test_all_endpoints_ejected_still_tries_them():
+    server = StandIn(status=500)
+    adapter = _adapter(server, limits=(1,), failure_threshold=1)
+
+    with pytest.raises(LLMProcessingError):
+        await adapter._call_ollama("hello")
+    server.status = 200
+
+    assert await adapter.detect_language("hello") == "en"
+    assert adapter.pool.endpoints[0].healthy is True
+
+
+@pytest.mark.asyncio
+async def test_early_stream_close_is_not_a_failure():
+    lines = [json.dumps({"response": "第一句话已经足够长了。", "done": False})] * 20
+
+    def handler(request):
+        return httpx.Response(200, content="\n".join(lines).encode())
+
+    adapter = OllamaAdapter(OllamaConfig(base_url="http://ollama", endpoint_failure_threshold=1))
+    adapter.client = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+
+    await adapter.summarize_content("正文", target_length=10)
+
+    endpoint = adapter.pool.endpoints[0]
+    assert endpoint.healthy is True and endpoint.failures == 0 and endpoint.outstanding == 0
+
+
+def test_parse_endpoints():
+    endpoints = parse_ollama_endpoints("http://gpu1:11434=4, http://gpu2:11434,", default_concurrency=2)
+
+    assert [(e.url, e.max_concurrency) for e in endpoints] == [
+        ("http://gpu1:11434", 4), ("http://gpu2:11434", 2)
+    ]
+    assert parse_ollama_endpoints("", default_concurrency=2) == []
+
+
+@pytest.mark.asyncio
+async def test_release_from_another_thread_wakes_waiter():
+    import threading
+
+    adapter = _adapter(StandIn(), limits=(1,))
+    pool = adapter.pool
+    acquired, release = threading.Event(), threading.Event()
+
+    async def hold():
+        async with pool.acquire():
+            acquired.set()
+            await asyncio.get_running_loop().run_in_executor(None, release.wait)
+
+    # 后台处理线程在自己的事件循环中占满唯一的名额
+    worker = threading.Thread(target=lambda: asyncio.run(hold()))
+    worker.start()
+    await asyncio.get_running_loop().run_in_executor(None, acquired.wait)
+
+    async def wait_for_endpoint():
+        async with pool.acquire() as endpoint:
+            return endpoint
+
+    waiter = asyncio.create_task(wait_for_endpoint())
+    await asyncio.sleep(0.05)
+    assert not waiter.done()
+
+    release.set()
+    endpoint = await asyncio.wait_for(waiter, timeout=2)
+    worker.join()
+
+    assert endpoint is pool.endpoints[0]
+    assert endpoint.outstanding == 0
+
+
+@pytest.mark.asyncio
+async def test_cancelled_waiter_does_not_leak_a_slot():
+    server = StandIn()
+    server.release.clear()
+    adapter = _adapter(server, limits=(1,))
+
+    first = asyncio.create_task(adapter.detect_language("hello"))
+    await asyncio.sleep(0.02)
+    queued = asyncio.create_task(adapter.detect_language("hello"))
+    await asyncio.sleep(0.02)
+    queued.cancel()
+    server.release.set()
+
+    assert await first == "en"
+    assert await adapter.detect_language("hello") == "en"
+    assert adapter.pool.endpoints[0].outstanding == 0
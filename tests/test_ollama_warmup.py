@@ -0,0 +1,106 @@
+import json
+import httpx
+import pytest
+from unittest.mock import AsyncMock, Mock
+from app.core import scheduler
+from app.models.article import NewsArticle, LLMProcessingStatus
+from app.models.source import NewsSource
+from app.services.llm_adapters.ollama_adapter import OllamaAdapter
+from app.services.llm_config import LLMConfig, OllamaConfig, OpenAIConfig
+from app.services.llm_interface import LLMProvider
+from app.services.llm_manager import LLMServiceManager
+
+
+async def _body(data):
+    yield data
+
+
+def _adapter(handler, **config):
+    adapter = OllamaAdapter(OllamaConfig(base_url="http://ollama", model="qwen3", **config))
+    adapter.client = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+    return adapter
+
+
+@pytest.mark.asyncio
+async def test_requests_carry_keep_alive_and_configured_options():
+    payloads = []
+
+    def handler(request):
+        payloads.append(json.loads(request.content))
+        return httpx.Response(200, json={"response": "en", "load_duration": 2_000_000})
+
+    adapter = _adapter(handler, keep_alive="1h", num_ctx=8192, num_thread=8)
+    await adapter.detect_language("hello")
+
+    assert payloads[0]["keep_alive"] == "1h"
+    assert payloads[0]["options"] == {"temperature": 0.7, "num_ctx": 8192, "num_thread": 8}
+    assert adapter.cold_starts == 0
+
+
+@pytest.mark.asyncio
+async def test_unset_options_use_server_defaults():
+    payloads = []
+
+    def handler(request):
+        payloads.append(json.loads(request.content))
+        return httpx.Response(200, json={"response": "en"})
+
+    await _adapter(handler, keep_alive=None).detect_language("hello")
+
+    assert "keep_alive" not in payloads[0]
+    assert payloads[0]["options"] == {"temperature": 0.7}
+
+
+@pytest.mark.asyncio
+async def test_warm_up_measures_cold_start_and_health_reports_it():
+    def handler(request):
+        if request.url.path == "/api/generate":
+            assert json.loads(request.content)["prompt"] == ""
+            return httpx.Response(200, json={"response": "", "done": True, "load_duration": 4_200_000_000})
+        if request.url.path == "/api/ps":
+            return httpx.Response(200, json={"models": [{"name": "qwen3", "model": "qwen3"}]})
+        # 流式响应体读完后才有 elapsed，与真实传输一致
+        return httpx.Response(200, content=_body(b'{"models": []}'))
+
+    adapter = _adapter(handler)
+    result = await adapter.warm_up()
+
+    assert result["cold"] is True and result["load_seconds"] == 4.2
+    health = await adapter.health_check()
+    assert health["status"] == "healthy"
+    assert health["model_loaded"] is True
+    assert health["cold_starts"] == 1 and health["cold_start_seconds"] == 4.2
+
+
+@pytest.mark.asyncio
+async def test_manager_warms_only_local_models():
+    manager = LLMServiceManager(LLMConfig(providers={
+        LLMProvider.OLLAMA: OllamaConfig(base_url="http://ollama"),
+        LLMProvider.OPENAI: OpenAIConfig(api_key="sk-test"),
+    }))
+    manager.adapters[LLMProvider.OLLAMA].warm_up = AsyncMock(return_value={"status": "ok"})
+
+    assert await manager.warm_up() == {"ollama": {"status": "ok"}}
+
+
+@pytest.mark.asyncio
+async def test_keep_warm_job_pings_only_with_backlog(db_session, monkeypatch):
+    from app.core import llm_factory
+    manager = Mock()
+    manager.warm_up = AsyncMock(return_value={})
+    monkeypatch.setattr(llm_factory, "get_llm_manager", lambda: manager)
+    monkeypatch.setattr(scheduler, "SessionLocal", lambda: db_session)
+    monkeypatch.setattr(db_session, "close", lambda: None)
+
+    await scheduler.keep_llm_warm_job()
+    manager.warm_up.assert_not_called()
+
+    source = NewsSource(name="WarmSource", url="https://warm.example.com")
+    db_session.add(source)
+    db_session.commit()
+    db_session.add(NewsArticle(title="待处理", content="正文", url="https://warm.example.com/1",
+                               source_id=source.id, llm_processing_status=LLMProcessingStatus.PENDING))
+    db_session.commit()
+
+    await scheduler.keep_llm_warm_job()
+    manager.warm_up.assert_awaited_once()
@@ -0,0 +1,172 @@
+import json
+import pytest
+from unittest.mock import AsyncMock, Mock
+from sqlalchemy.orm import Session
+from app.models.article import NewsArticle, LLMProcessingStatus
+from app.models.source import NewsSource
+from app.services.content_processor import ContentProcessorService
+from app.services.news_aggregator import NewsAggregatorService
+from app.utils.fingerprint import simhash, similarity
+
+BODY = (
+    "The central bank raised interest rates by a quarter point on Tuesday, citing persistent "
+    "inflation in services and a tight labour market. Officials signalled that further increases "
+    "remain possible if price pressures do not ease over the coming months."
+)
+
+
+def test_simhash_similarity():
+    assert similarity(simhash(BODY), simhash(BODY)) == 1.0
+    assert similarity(simhash(BODY), simhash(BODY + " Markets were calm.")) >= 0.9
+    assert similarity(simhash(BODY), simhash("完全不同的中文内容，关于体育比赛的报道。")) < 0.9
+
+
+@pytest.fixture
+def aggregator(db_session: Session):
+    source = NewsSource(name="RevisionSource", url="https://rev.example.com")
+    db_session.add(source)
+    db_session.commit()
+    return NewsAggregatorService(db_session), source
+
+
+def _entry(title=None, content=BODY):
+    return {
+        "title": title or "Central bank raises rates",
+        "url": "https://rev.example.com/rates",
+        "content": content,
+        "summary": content[:100],
+    }
+
+
+def _mark_completed(db_session, article):
+    article.llm_processing_status = LLMProcessingStatus.COMPLETED
+    db_session.commit()
+
+
+def test_minor_edit_is_ignored(db_session: Session, aggregator):
+    service, source = aggregator
+    article = service._create_article_from_data(_entry(), source.id)
+    _mark_completed(db_session, article)
+
+    assert service._create_article_from_data(_entry(content=BODY + " Updated."), source.id) is None
+    db_session.refresh(article)
+    assert article.revision == 1
+    assert article.llm_processing_status == LLMProcessingStatus.COMPLETED
+
+
+def test_content_change_requeues_content_steps_only(db_session: Session, aggregator):
+    service, source = aggregator
+    article = service._create_article_from_data(_entry(), source.id)
+    _mark_completed(db_session, article)
+
+    rewritten = "A completely rewritten report about a football final that went to penalties."
+    service._create_article_from_data(_entry(content=rewritten), source.id)
+
+    db_session.refresh(article)
+    assert article.revision == 2
+    assert article.llm_processing_status == LLMProcessingStatus.PENDING
+    steps = json.loads(article.pending_llm_steps)
+    assert "summary" in steps and "keywords" in steps
+    assert "title" not in steps
+
+
+def test_title_change_requeues_title_translation(db_session: Session, aggregator):
+    service, source = aggregator
+    article = service._create_article_from_data(_entry(), source.id)
+    _mark_completed(db_session, article)
+
+    service._create_article_from_data(_entry(title="Central bank surprises with rate hike"), source.id)
+
+    db_session.refresh(article)
+    assert article.revision == 2
+    steps = json.loads(article.pending_llm_steps)
+    assert "title" in steps
+    assert "summary" not in steps
+
+
+@pytest.mark.asyncio
+async def test_processor_runs_only_pending_steps():
+    llm_manager = Mock()
+    llm_manager.detect_language = AsyncMock(return_value="en")
+    llm_manager.translate_to_chinese = AsyncMock(return_value="新标题")
+    llm_manager.summarize_content = AsyncMock(return_value="新摘要")
+    llm_manager.extract_keywords = AsyncMock(return_value=["利率"])
+    llm_manager.categorize_article = AsyncMock(return_value="财经")
+
+    article = NewsArticle(
+        id=1,
+        title="Central bank raises rates",
+        content=BODY,
+        original_language="en",
+        chinese_title="旧标题",
+        pending_llm_steps=json.dumps(["summary"]),
+    )
+    processor = ContentProcessorService(llm_manager)
+    result = await processor.process_article_content(article)
+
+    assert result["llm_summary"] == "新摘要"
+    assert "chinese_title" not in result
+    llm_manager.translate_to_chinese.assert_not_called()
+    llm_manager.detect_language.assert_not_called()
+
+    assert processor.apply_result(article, result)
+    assert article.chinese_title == "旧标题"
+    assert article.llm_summary == "新摘要"
+    assert article.pending_llm_steps is None
+
+
+def test_failed_article_gets_a_full_run(db_session: Session, aggregator):
+    service, source = aggregator
+    article = service._create_article_from_data(_entry(), source.id)
+    article.llm_processing_status = LLMProcessingStatus.FAILED
+    db_session.commit()
+
+    service._create_article_from_data(_entry(title="Central bank surprises with rate hike"), source.id)
+
+    db_session.refresh(article)
+    assert article.revision == 2
+    assert article.llm_processing_status == LLMProcessingStatus.PENDING
+    assert article.pending_llm_steps is None
+
+
+def test_revision_keeps_steps_still_pending(db_session: Session, aggregator):
+    service, source = aggregator
+    article = service._create_article_from_data(_entry(), source.id)
+    article.pending_llm_steps = json.dumps(["keywords"])
+    _mark_completed(db_session, article)
+
+    service._create_article_from_data(_entry(title="Central bank surprises with rate hike"), source.id)
+
+    db_session.refresh(article)
+    assert json.loads(article.pending_llm_steps) == ["title", "keywords", "category"]
+
+
+@pytest.mark.asyncio
+async def test_revision_during_processing_discards_the_in_flight_result(db_session: Session, aggregator):
+    service, source = aggregator
+    article = service._create_article_from_data(_entry(), source.id)
+    rewritten = "A completely rewritten report about a football final that went to penalties."
+
+    async def summarize(*args, **kwargs):
+        # 处理过程中同一 URL 被重新发布
+        assert article.llm_processing_status == LLMProcessingStatus.PROCESSING
+        service._create_article_from_data(_entry(content=rewritten), source.id)
+        return "旧正文的摘要"
+
+    llm_manager = Mock()
+    llm_manager.config.max_concurrent_tasks = 1
+    llm_manager.detect_language = AsyncMock(return_value="en")
+    llm_manager.translate_to_chinese = AsyncMock(return_value="央行加息")
+    llm_manager.summarize_content = AsyncMock(side_effect=summarize)
+    llm_manager.extract_keywords = AsyncMock(return_value=["利率"])
+    llm_manager.categorize_article = AsyncMock(return_value="财经")
+
+    counts = await ContentProcessorService(llm_manager).process_and_save(db_session, [article])
+
+    db_session.refresh(article)
+    assert counts == {"processed_count": 0, "failed_count": 0}
+    assert article.revision == 2
+    assert article.content == rewritten
+    assert article.llm_processing_status == LLMProcessingStatus.PENDING
+    assert article.pending_llm_steps is None
+    assert article.llm_summary is None
@@ -0,0 +1,121 @@
+from unittest.mock import AsyncMock, Mock
+import pytest
+from fastapi.testclient import TestClient
+from app.config import settings
+from app.models.article import NewsArticle, LLMProcessingStatus
+from app.models.source import NewsSource
+from app.services.content_processor import ContentProcessorService
+from app.services.step_planner import step_planner
+from app.utils.rss_config import RSSSourceConfig, rss_config_manager
+
+LONG_ENGLISH = " ".join(
+    f"Paragraph {i} explains how chip makers are expanding capacity for data center demand." for i in range(8)
+)
+
+
+@pytest.fixture
+def llm_manager(monkeypatch):
+    monkeypatch.setattr(settings, "LLM_COMBINED_PROCESSING", False)
+    manager = Mock()
+    manager.detect_language = AsyncMock(return_value="en")
+    manager.translate_to_chinese = AsyncMock(return_value="芯片厂商扩大产能")
+    manager.summarize_content = AsyncMock(return_value="芯片厂商正在扩大产能。")
+    manager.extract_keywords = AsyncMock(return_value=["芯片"])
+    manager.categorize_article = AsyncMock(return_value="科技")
+    return manager
+
+
+def _article(db_session, title, content, tags=None, source_name="PlannerSource"):
+    source = NewsSource(name=source_name, url="https://planner.example.com/feed")
+    db_session.add(source)
+    db_session.commit()
+    article = NewsArticle(title=title, content=content, tags=tags, source_id=source.id,
+                          url=f"https://planner.example.com/{source_name}",
+                          llm_processing_status=LLMProcessingStatus.PENDING)
+    db_session.add(article)
+    db_session.commit()
+    return article
+
+
+@pytest.mark.asyncio
+async def test_chinese_title_and_short_chinese_text_skip_the_llm(db_session, llm_manager):
+    content = "国产芯片厂商宣布扩大产能，以满足数据中心的订单需求。"
+    article = _article(db_session, "芯片厂商扩大产能", content)
+
+    result = await ContentProcessorService(llm_manager).process_article_content(article)
+
+    assert result["chinese_title"] == "芯片厂商扩大产能"
+    assert result["llm_summary"] == content
+    assert result["skipped_steps"]["title"] == "chinese_title"
+    assert result["skipped_steps"]["summary"] == "short_content"
+    llm_manager.translate_to_chinese.assert_not_called()
+    llm_manager.summarize_content.assert_not_called()
+    llm_manager.categorize_article.assert_awaited_once()
+
+
+@pytest.mark.asyncio
+async def test_short_foreign_text_gets_a_summary_no_longer_than_itself(db_session, llm_manager):
+    content = "Chip makers are expanding capacity to meet data center orders."
+    article = _article(db_session, "Chip makers expand capacity", content)
+
+    await ContentProcessorService(llm_manager).process_article_content(article)
+
+    llm_manager.translate_to_chinese.assert_awaited_once()
+    assert llm_manager.summarize_content.await_args.kwargs["target_length"] == len(content)
+
+
+@pytest.mark.asyncio
+async def test_feed_tags_replace_keyword_extraction(db_session, llm_manager):
+    article = _article(db_session, "Chip makers expand capacity", LONG_ENGLISH, tags="Chips,Data Centers,Manufacturing")
+    processor = ContentProcessorService(llm_manager)
+
+    result = await processor.process_article_content(article)
+    processor.apply_result(article, result)
+
+    assert "keywords" not in result
+    assert result["skipped_steps"] == {"keywords": "feed_tags"}
+    assert article.tags == "Chips,Data Centers,Manufacturing"
+    assert article.pending_llm_steps is None
+    assert llm_manager.summarize_content.await_args.kwargs["target_length"] == settings.SUMMARY_TARGET_LENGTH
+
+
+@pytest.mark.asyncio
+async def test_source_config_overrides_the_plan(db_session, llm_manager, monkeypatch):
+    monkeypatch.setitem(rss_config_manager.configs, "PlannerOverride", RSSSourceConfig(
+        name="PlannerOverride", llm_skip_steps=["category"], llm_force_steps=["title"]
+    ))
+    article = _article(db_session, "芯片厂商扩大产能", LONG_ENGLISH, source_name="PlannerOverride")
+    processor = ContentProcessorService(llm_manager)
+
+    result = await processor.process_article_content(article)
+    processor.apply_result(article, result)
+
+    # 标题虽然是中文，但源配置要求交给 LLM
+    llm_manager.translate_to_chinese.assert_awaited_once()
+    llm_manager.categorize_article.assert_not_called()
+    assert result["skipped_steps"] == {"category": "source_config"}
+    assert article.category is None
+    assert article.pending_llm_steps is None
+
+
+def test_hackernews_items_skip_summaries(db_session):
+    source = NewsSource(name="Hacker News", url="https://news.ycombinator.com/rss")
+    db_session.add(source)
+    db_session.commit()
+    article = NewsArticle(title="Show HN: A faster parser", content="Article URL: https://example.com Points: 120",
+                          source_id=source.id, url="https://news.ycombinator.com/item?id=1")
+    db_session.add(article)
+    db_session.commit()
+
+    plan = step_planner.plan(article, ("title", "summary"), record=False)
+
+    assert plan.skipped == {"summary": "source_config"}
+    assert plan.llm_steps == ("title",)
+    assert plan.run_steps == ("title",)
+
+
+def test_admin_planner_endpoint(client: TestClient):
+    response = client.get("/api/v1/admin/llm/planner")
+
+    assert response.status_code == 200
+    assert response.json()["enabled"] is True
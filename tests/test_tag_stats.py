@@ -0,0 +1,145 @@
+import pytest
+from datetime import datetime, timedelta
+from fastapi.testclient import TestClient
+from sqlalchemy.orm import Session
+from app.models.article import NewsArticle
+from app.models.source import NewsSource
+from app.models.tag import Tag, ArticleTag
+from app.services.tag_service import TagService
+from app.services.tag_stats import TagStatsBuffer, reconcile_tag_stats, decay_factor
+
+
+@pytest.fixture
+def articles(db_session: Session):
+    source = NewsSource(name="StatsSource", url="https://stats.example.com")
+    db_session.add(source)
+    db_session.commit()
+
+    arts = [
+        NewsArticle(title=f"Stats Article {i}", url=f"https://stats.example.com/{i}", source_id=source.id)
+        for i in range(3)
+    ]
+    db_session.add_all(arts)
+    db_session.commit()
+    return arts
+
+
+def test_links_are_buffered_then_flushed(db_session: Session, articles):
+    buffer = TagStatsBuffer(flush_size=1000)
+    service = TagService(db_session, stats_buffer=buffer)
+
+    service.link_tags_to_article(articles[0], ["python", "ai"])
+    service.link_tags_to_article(articles[1], ["python"])
+    # Re-linking an existing tag must not be counted twice
+    service.link_tags_to_article(articles[1], ["python"])
+
+    python_tag = db_session.query(Tag).filter(Tag.name == "python").one()
+    assert (python_tag.article_count or 0) == 0
+    assert buffer.pending_events == 3
+
+    assert buffer.flush(db_session) == 2
+    db_session.refresh(python_tag)
+    assert python_tag.article_count == 2
+    assert python_tag.popularity_score == pytest.approx(2.0)
+    assert buffer.pending_events == 0
+
+
+def test_flush_size_triggers_write(db_session: Session, articles):
+    buffer = TagStatsBuffer(flush_size=2)
+    service = TagService(db_session, stats_buffer=buffer)
+
+    service.link_tags_to_article(articles[0], ["rust", "go"])
+
+    rust_tag = db_session.query(Tag).filter(Tag.name == "rust").one()
+    db_session.refresh(rust_tag)
+    assert rust_tag.article_count == 1
+    assert buffer.pending_events == 0
+
+
+def test_unlinks_never_go_negative(db_session: Session, articles):
+    buffer = TagStatsBuffer(flush_size=1000)
+    service = TagService(db_session, stats_buffer=buffer)
+    service.link_tags_to_article(articles[0], ["cloud"])
+    buffer.flush(db_session)
+
+    db_session.refresh(articles[0])
+    service.unlink_article_tags(articles[0])
+    service.unlink_article_tags(articles[0])
+    buffer.flush(db_session)
+
+    cloud_tag = db_session.query(Tag).filter(Tag.name == "cloud").one()
+    db_session.refresh(cloud_tag)
+    assert cloud_tag.article_count == 0
+
+
+def test_reconcile_fixes_drift_and_decays(db_session: Session, articles):
+    buffer = TagStatsBuffer(flush_size=1000)
+    tag = Tag(name="drifted", article_count=42, popularity_score=99.0)
+    db_session.add(tag)
+    db_session.commit()
+
+    now = datetime.utcnow()
+    db_session.add_all([
+        ArticleTag(article_id=articles[0].id, tag_id=tag.id, created_at=now),
+        ArticleTag(article_id=articles[1].id, tag_id=tag.id, created_at=now - timedelta(days=6)),
+    ])
+    db_session.commit()
+    buffer.record_links([tag.id, tag.id])
+
+    result = reconcile_tag_stats(db_session, now=now, buffer=buffer)
+
+    db_session.refresh(tag)
+    assert result["tags_updated"] >= 1
+    assert tag.article_count == 2
+    # The fresh link dominates, the 6-day-old one has decayed to a fraction
+    assert 1.0 < tag.popularity_score < 2.0
+    assert buffer.pending_events == 0
+
+
+def test_reconcile_keeps_links_recorded_during_the_recount(db_session: Session, articles, monkeypatch):
+    buffer = TagStatsBuffer(flush_size=1000)
+    tag = Tag(name="concurrent")
+    db_session.add(tag)
+    db_session.commit()
+    db_session.add(ArticleTag(article_id=articles[0].id, tag_id=tag.id, created_at=datetime.utcnow()))
+    db_session.commit()
+    buffer.record_links([tag.id])
+
+    original_commit = db_session.commit
+
+    def commit_with_concurrent_link():
+        # 对账统计完成后、提交前，另一篇文章关联了该标签（尚未计入 article_tags 的统计）
+        buffer.record_links([tag.id])
+        original_commit()
+
+    monkeypatch.setattr(db_session, "commit", commit_with_concurrent_link)
+    reconcile_tag_stats(db_session, buffer=buffer)
+    monkeypatch.setattr(db_session, "commit", original_commit)
+
+    assert buffer.pending_events == 1
+    buffer.flush(db_session)
+    db_session.refresh(tag)
+    assert tag.article_count == 2
+
+
+def test_decay_factor_half_life():
+    assert decay_factor(timedelta(0), 24) == pytest.approx(1.0)
+    assert decay_factor(timedelta(hours=24), 24) == pytest.approx(0.5)
+    assert decay_factor(timedelta(hours=48), 24) == pytest.approx(0.25)
+
+
+def test_list_tags_sorted_by_popularity(client: TestClient, db_session: Session):
+    db_session.add_all([
+        Tag(name="cold", slug="cold", article_count=50, popularity_score=0.5),
+        Tag(name="hot", slug="hot", article_count=5, popularity_score=9.0),
+    ])
+    db_session.commit()
+
+    response = client.get("/api/v1/tags/?sort=popular")
+    assert response.status_code == 200
+    names = [t["name"] for t in response.json()]
+    assert names.index("hot") < names.index("cold")
+
+    response = client.get("/api/v1/tags/?sort=count")
+    names = [t["name"] for t in response.json()]
+    assert names.index("cold") < names.index("hot")
@@ -0,0 +1,136 @@
+import pytest
+from unittest.mock import AsyncMock, Mock
+from app.models.article import NewsArticle, LLMProcessingStatus
+from app.services.content_processor import ContentProcessorService
+from app.services.llm_cache import LLMResponseCache
+from app.services.llm_config import LLMConfig, OllamaConfig
+from app.services.llm_interface import LLMProvider
+from app.services.llm_manager import LLMServiceManager
+from app.services.llm_usage import record_prompt_tokens, track_usage
+from app.utils.text_budget import chunk_text, clean_content, estimate_tokens, split_sentences
+
+
+def test_clean_removes_boilerplate_and_duplicate_sentences():
+    text = (
+        "The central bank raised rates on Tuesday. Analysts expected the move.\n"
+        "The central bank raised rates on Tuesday.\n"
+        "Share this: Twitter Facebook\n"
+        "央行周二宣布加息。阅读原文\n"
+        "The post Rates rise again appeared first on Example News."
+    )
+    cleaned = clean_content(text)
+
+    assert cleaned.count("The central bank raised rates") == 1
+    assert "Analysts expected the move." in cleaned
+    assert "央行周二宣布加息。" in cleaned
+    for boilerplate in ("Share this", "阅读原文", "appeared first on"):
+        assert boilerplate not in cleaned
+
+
+def test_split_sentences_keeps_text_intact():
+    text = "U.S. GDP grew 3.5% last year. 中国经济增长5%！真的吗？Yes.\nNext line"
+    sentences = split_sentences(text)
+
+    assert "".join(sentences) == text
+    assert sentences[0] == "U.S. GDP grew 3.5% last year. "
+
+
+def test_estimate_tokens_uses_provider_ratios():
+    assert estimate_tokens("") == 0
+    assert estimate_tokens("人工智能", cjk_tokens_per_char=0.5) == 2
+    assert estimate_tokens("hello world", latin_tokens_per_word=1.0) == 2
+
+
+def test_chunks_respect_budget():
+    text = "".join(f"第{i}句话讲的是一件完全不同的事情。" for i in range(40))
+    chunks = chunk_text(text, 50)
+
+    assert len(chunks) > 1
+    assert all(estimate_tokens(chunk) <= 50 for chunk in chunks)
+    assert "".join(chunks) == text
+    # 单句超长时硬切
+    assert all(estimate_tokens(c) <= 60 for c in chunk_text("很" * 300, 50))
+
+
+def _manager(cache=None):
+    manager = LLMServiceManager(LLMConfig(
+        providers={LLMProvider.OLLAMA: OllamaConfig(
+            base_url="http://localhost:11434", max_input_tokens=60, cjk_tokens_per_char=1.0
+        )},
+        enable_fallback=False,
+    ), cache=cache)
+    adapter = Mock()
+    adapter.prompt_version = "1"
+
+    async def summarize(content, target_length=400, **kwargs):
+        record_prompt_tokens(estimate_tokens(content))
+        return f"摘要{len(content)}"
+
+    adapter.summarize_content = AsyncMock(side_effect=summarize)
+    adapter.process_article_combined = AsyncMock(return_value={"category": "科技"})
+    manager.adapters[LLMProvider.OLLAMA] = adapter
+    return manager, adapter
+
+
+LONG_TEXT = "".join(f"第{i}段报道介绍了一项新的研究成果和它的影响。" for i in range(20))
+
+
+@pytest.mark.asyncio
+async def test_short_input_is_summarized_in_one_call():
+    manager, adapter = _manager()
+
+    await manager.summarize_content("一句很短的新闻。阅读原文", target_length=100)
+
+    adapter.summarize_content.assert_awaited_once_with("一句很短的新闻。", 100)
+
+
+@pytest.mark.asyncio
+async def test_long_input_is_map_reduced_with_cached_chunks(tmp_path):
+    cache = LLMResponseCache(path=str(tmp_path / "cache.db"))
+    manager, adapter = _manager(cache)
+
+    with track_usage() as usage:
+        summary = await manager.summarize_content(LONG_TEXT, target_length=400)
+    calls = adapter.summarize_content.await_count
+
+    assert summary.startswith("摘要")
+    assert calls > 2
+    # 每次调用的正文都在预算内
+    for call in adapter.summarize_content.await_args_list:
+        assert estimate_tokens(call.args[0]) <= 60
+    assert usage.calls == calls and usage.prompt_tokens > 0
+
+    # 再次处理时各块与合并结果都命中缓存
+    await manager.summarize_content(LONG_TEXT, target_length=400)
+    assert adapter.summarize_content.await_count == calls
+
+
+@pytest.mark.asyncio
+async def test_combined_call_drops_summary_for_over_budget_input():
+    manager, adapter = _manager()
+
+    await manager.process_article_combined("标题", LONG_TEXT, ["科技"], fields=["summary", "category"])
+
+    args = adapter.process_article_combined.await_args.args
+    assert estimate_tokens(args[1]) <= 60
+    assert args[5] == ["category"]
+
+
+@pytest.mark.asyncio
+async def test_prompt_tokens_are_recorded_per_article():
+    llm_manager = Mock()
+    llm_manager.process_article_combined = AsyncMock(return_value={})
+
+    async def summarize(content, target_length=400):
+        record_prompt_tokens(120)
+        return "摘要内容"
+
+    llm_manager.summarize_content = AsyncMock(side_effect=summarize)
+    article = NewsArticle(id=1, title="标题", content=LONG_TEXT, pending_llm_steps='["summary"]',
+                          prompt_tokens=30, llm_processing_status=LLMProcessingStatus.PENDING)
+
+    result = await ContentProcessorService(llm_manager).process_article_content(article)
+    ContentProcessorService.apply_result(article, result)
+
+    assert result["prompt_tokens"] == 120
+    assert article.prompt_tokens == 150